@@ -9,11 +9,15 @@ from backend.middleware.auth_middleware import admin_required
 from werkzeug.security import generate_password_hash
 from sqlalchemy import desc, or_, func
 import logging
+import os
 from datetime import date, datetime, timedelta
 from backend.services.alert_service import AlertService
 from backend.services.prediction_analytics_service import PredictionAnalyticsService
-from backend.models import ModelVersion
+from backend.models import ModelVersion, ModelEvaluation
 from backend.services.reports_service import ReportsService
+from backend.services.job_service import job_service
+from backend.services.feature_drift_service import feature_drift_service
+from backend.services.system_config_service import system_config_service
 
 
 logger = logging.getLogger('admin')
@@ -525,16 +529,8 @@ def get_courses():
 def get_system_config():
     """Get system configuration"""
     try:
-        config = {
-            'attendance_threshold': 70,
-            'prediction_frequency': 'daily',
-            'alert_email_enabled': True,
-            'model_version': 'v1.0',
-            'max_file_upload_size': 10485760,  # 10MB
-            'session_timeout': 3600,  # 1 hour
-            'password_min_length': 8,
-            'maintenance_mode': False
-        }
+        config = system_config_service.get_all()
+        config['config_version'] = system_config_service.version
         
         return api_response(data=config, message="System configuration retrieved successfully")
         
@@ -549,11 +545,16 @@ def update_system_config():
     """Update system configuration"""
     try:
         data = request.get_json()
+        if not data:
+            return error_response("No configuration values provided", 400)
         
-        # In a real implementation, this would update a configuration table
-        # For now, just return success
+        try:
+            config = system_config_service.update(data, user_id=int(get_jwt_identity()))
+        except ValueError as e:
+            return error_response(str(e), 400)
+        config['config_version'] = system_config_service.version
         
-        return api_response(message="System configuration updated successfully")
+        return api_response(data=config, message="System configuration updated successfully")
         
     except Exception as e:
         logger.error(f"Error updating system config: {str(e)}")
@@ -1265,6 +1266,81 @@ def get_model_performance():
         logger.error(f"Error getting model performance: {str(e)}")
         return error_response("Failed to get model performance", 500)
 
+@admin_bp.route('/predictions/model/evaluate', methods=['POST'])
+@jwt_required()
+@admin_required
+def evaluate_model():
+    """Queue a backtest of the deployed model over completed terms"""
+    try:
+        data = request.get_json(silent=True) or {}
+        term_ids = data.get('term_ids')
+        if term_ids is not None and (not isinstance(term_ids, list)
+                                     or not all(isinstance(t, int) for t in term_ids)):
+            return error_response("term_ids must be a list of term IDs", 400)
+
+        weeks = data.get('weeks')
+        if weeks is not None and (not isinstance(weeks, int) or weeks < 1):
+            return error_response("weeks must be a positive integer", 400)
+
+        payload = {'term_ids': term_ids}
+        if weeks:
+            payload['offsets'] = [7 * week for week in range(1, weeks + 1)]
+
+        job = job_service.enqueue('evaluate_model', payload=payload, created_by=int(get_jwt_identity()))
+        if not job:
+            return error_response("Failed to queue model evaluation", 500)
+
+        return api_response(
+            data={'job_id': job.job_id, 'status': job.status},
+            message="Model evaluation queued",
+            status=202
+        )
+
+    except Exception as e:
+        logger.error(f"Error queueing model evaluation: {str(e)}")
+        return error_response("Failed to queue model evaluation", 500)
+
+@admin_bp.route('/predictions/model/drift', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_feature_drift():
+    """Drift of production features against the model's training data"""
+    try:
+        days = min(max(request.args.get('days', 28, type=int), 1), 365)
+
+        report = feature_drift_service.get_drift_report(
+            days=days, model_version=request.args.get('model_version')
+        )
+
+        return api_response(
+            data=report,
+            message="Feature drift retrieved successfully"
+        )
+
+    except Exception as e:
+        logger.error(f"Error getting feature drift: {str(e)}")
+        return error_response("Failed to get feature drift", 500)
+
+@admin_bp.route('/predictions/model/evaluations', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_model_evaluations():
+    """List backtests, newest first"""
+    try:
+        limit = min(request.args.get('limit', 20, type=int), 100)
+        evaluations = ModelEvaluation.query.order_by(
+            desc(ModelEvaluation.started_at)
+        ).limit(limit).all()
+
+        return api_response(
+            data=[evaluation.to_dict() for evaluation in evaluations],
+            message="Model evaluations retrieved successfully"
+        )
+
+    except Exception as e:
+        logger.error(f"Error getting model evaluations: {str(e)}")
+        return error_response("Failed to get model evaluations", 500)
+
 @admin_bp.route('/predictions/export', methods=['GET'])
 @jwt_required()
 @admin_required
@@ -1493,4 +1569,122 @@ def get_system_usage_report():
         
     except Exception as e:
         logger.error(f"Error generating system usage report: {str(e)}")
-        return error_response("Failed to generate system usage report", 500)
\ No newline at end of file
+        return error_response("Failed to generate system usage report", 500)
+
+@admin_bp.route('/jobs', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_jobs():
+    """Get recent background jobs"""
+    try:
+        status = request.args.get('status')
+        job_type = request.args.get('job_type')
+        limit = min(request.args.get('limit', 50, type=int), 200)
+        
+        jobs = job_service.get_recent_jobs(status=status, job_type=job_type, limit=limit)
+        
+        return api_response(
+            data=[job.to_dict() for job in jobs],
+            message="Jobs retrieved successfully"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error getting jobs: {str(e)}")
+        return error_response("Failed to get jobs", 500)
+
+@admin_bp.route('/jobs/metrics', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_job_metrics():
+    """Get background job counts and durations per job type"""
+    try:
+        hours = request.args.get('hours', 24, type=int)
+        
+        metrics = job_service.get_job_metrics(hours)
+        
+        return api_response(
+            data={'hours': hours, 'job_types': metrics},
+            message="Job metrics retrieved successfully"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error getting job metrics: {str(e)}")
+        return error_response("Failed to get job metrics", 500)
+
+@admin_bp.route('/system/db-stats', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_db_stats():
+    """Get per-endpoint query counts and DB time for this worker process"""
+    try:
+        instrumentation = current_app.extensions.get('query_instrumentation')
+        if not instrumentation:
+            return error_response("Query instrumentation is not enabled", 404)
+        
+        if request.args.get('reset', 'false').lower() == 'true':
+            instrumentation.stats.reset()
+        
+        return api_response(
+            data={
+                'process_id': os.getpid(),
+                'slow_query_count': instrumentation.slow_query_count,
+                'slow_db_time_ms': instrumentation.slow_db_time_ms,
+                'endpoints': instrumentation.stats.snapshot()
+            },
+            message="Database statistics retrieved successfully"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error getting database statistics: {str(e)}")
+        return error_response("Failed to get database statistics", 500)
+
+@admin_bp.route('/system/profiles', methods=['GET'])
+@jwt_required()
+@admin_required
+def list_profiles():
+    """List saved request and batch profiles, newest first"""
+    try:
+        profiler = current_app.extensions.get('request_profiler')
+        if not profiler:
+            return error_response("Profiling is not configured", 404)
+        
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        
+        return api_response(
+            data={
+                'enabled': profiler.enabled,
+                'sample_rate': profiler.sample_rate,
+                'profiles': profiler.store.list_profiles(limit)
+            },
+            message="Profiles retrieved successfully"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error listing profiles: {str(e)}")
+        return error_response("Failed to list profiles", 500)
+
+@admin_bp.route('/system/profiles/<profile_id>', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_profile_summary(profile_id):
+    """Top-N functions of a saved profile (?limit=30&sort=cumulative|tottime|ncalls)"""
+    try:
+        profiler = current_app.extensions.get('request_profiler')
+        if not profiler:
+            return error_response("Profiling is not configured", 404)
+        
+        limit = min(request.args.get('limit', 30, type=int), 200)
+        sort = request.args.get('sort', 'cumulative')
+        
+        summary = profiler.store.summarize(profile_id, limit=limit, sort=sort)
+        if summary is None:
+            return error_response("Profile not found", 404)
+        
+        return api_response(
+            data=summary,
+            message="Profile summary retrieved successfully"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error summarizing profile {profile_id}: {str(e)}")
+        return error_response("Failed to summarize profile", 500)
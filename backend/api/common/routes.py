@@ -1,8 +1,10 @@
-from flask import Blueprint, jsonify, current_app
+from flask import Blueprint, jsonify, current_app, request, Response
 from backend.extensions import db
 from backend.utils.api import api_response
 from sqlalchemy import inspect
 from sqlalchemy import text
+from backend.utils.metrics import metrics
+import hmac
 
 common_bp = Blueprint('common', __name__)
 
@@ -47,4 +49,16 @@ def list_tables():
     return api_response({
         'tables': tables,
         'count': len(tables)
-    }, 'Database tables retrieved successfully')
\ No newline at end of file
+    }, 'Database tables retrieved successfully')
+
+@common_bp.route('/metrics')
+def metrics_endpoint():
+    """Metrics in Prometheus text exposition format; requires METRICS_TOKEN"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        # Disabled until a scrape token is configured
+        return Response('Not Found\n', status=404, mimetype='text/plain')
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
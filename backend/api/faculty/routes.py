@@ -14,9 +14,11 @@ import logging
 from backend.extensions import db 
 from backend.models import User, CourseOffering
 import os
-from flask import send_file, current_app
+from flask import send_file, current_app, Response
 from werkzeug.utils import secure_filename 
 from backend.services.gpa_service import gpa_service
+from backend.services.engagement_baseline_service import engagement_baseline_service
+from backend.utils.zip_stream import iter_zip
 from flask_login import login_required, current_user
 
 
@@ -353,6 +355,21 @@ def get_analytics():
             'submission_rate': 92.3  # Placeholder
         }
         
+        # Precomputed peer engagement per course and window
+        offering_ids = [course['offering_id'] for course in courses]
+        baselines = {
+            window_days: engagement_baseline_service.get_baselines(window_days, offering_ids)
+            for window_days in current_app.config.get('ENGAGEMENT_BASELINE_WINDOWS', [7, 28])
+        }
+        analytics['engagement_baselines'] = {
+            offering_id: {
+                f'{window_days}d': baselines[window_days][offering_id].to_dict()
+                if offering_id in baselines[window_days] else None
+                for window_days in baselines
+            }
+            for offering_id in offering_ids
+        }
+        
         return jsonify({
             'status': 'success',
             'data': analytics
@@ -687,6 +704,38 @@ def get_assessment_statistics(assessment_id):
         logger.error(f"Error getting assessment statistics: {str(e)}")
         return error_response('Failed to get assessment statistics', 500)
     
+@faculty_bp.route('/courses/<int:offering_id>/statistics', methods=['GET'])
+@jwt_required()
+@faculty_required
+def get_course_statistics(offering_id):
+    """Get course statistics including assessment score distribution"""
+    try:
+        user_id = get_jwt_identity()
+        user = get_user_by_id(user_id)
+        
+        if not user or not user.faculty:
+            return error_response('Faculty profile not found', 404)
+        
+        # Verify faculty teaches this course
+        offering = CourseOffering.query.filter_by(
+            offering_id=offering_id,
+            faculty_id=user.faculty.faculty_id
+        ).first()
+        
+        if not offering:
+            return error_response('Unauthorized', 403)
+        
+        statistics = faculty_service.get_course_statistics(offering_id)
+        
+        if statistics:
+            return api_response(statistics, 'Statistics retrieved successfully')
+        else:
+            return error_response('Course not found', 404)
+        
+    except Exception as e:
+        logger.error(f"Error getting course statistics: {str(e)}")
+        return error_response('Failed to get course statistics', 500)
+    
 @faculty_bp.route('/assessments/grade', methods=['POST'])
 @jwt_required()
 @faculty_required
@@ -1042,34 +1091,66 @@ def get_submission_details(submission_id):
 @jwt_required()
 @faculty_required
 def download_submission(submission_id):
-    """Download submission file"""
+    """Download submission file (supports conditional and Range requests)"""
     try:
-        submission = AssessmentSubmission.query.get(submission_id)
+        # Get current user
+        user_id = get_jwt_identity()
+        user = get_user_by_id(user_id)
         
-        if not submission:
-            return error_response('Submission not found', 404)
+        if not user or not user.faculty:
+            return error_response('Faculty profile not found', 404)
         
-        if not submission.file_path:
-            return error_response('No file attached to this submission', 404)
+        # Get file download response (checks the faculty teaches the course)
+        file_response = assessment_service.download_submission_file(submission_id, user.faculty.faculty_id)
         
-        # TODO: Verify faculty teaches this course
+        if file_response:
+            return file_response
+        else:
+            return error_response('File not found or access denied', 404)
         
-        # Construct file path
-        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], submission.file_path)
+    except Exception as e:
+        logger.error(f"Error downloading submission: {str(e)}")
+        return error_response('Failed to download submission', 500)
+    
+@faculty_bp.route('/assessments/<int:assessment_id>/submissions/archive', methods=['GET'])
+@jwt_required()
+@faculty_required
+def download_submissions_archive(assessment_id):
+    """Stream a ZIP of every submitted file for an assessment"""
+    try:
+        user_id = get_jwt_identity()
+        user = get_user_by_id(user_id)
         
-        if not os.path.exists(file_path):
-            return error_response('File not found on server', 404)
+        if not user or not user.faculty:
+            return error_response('Faculty profile not found', 404)
         
-        return send_file(
-            file_path,
-            download_name=submission.file_name or 'submission',
-            as_attachment=True,
-            mimetype=submission.mime_type or 'application/octet-stream'
+        assessment, entries = assessment_service.get_submission_archive_entries(
+            assessment_id, user.faculty.faculty_id
+        )
+        
+        if assessment is None:
+            return error_response('Assessment not found or access denied', 404)
+        
+        if not entries:
+            return error_response('No submitted files for this assessment', 404)
+        
+        archive_name = secure_filename(f"{assessment.title}_submissions") or 'submissions'
+        logger.info(f"Streaming {len(entries)} submission files for assessment {assessment_id}")
+        
+        # Built while it is sent - constant memory, no temporary file
+        chunk_size = current_app.config.get('UPLOAD_CHUNK_SIZE', 1024 * 1024)
+        return Response(
+            iter_zip(entries, chunk_size=chunk_size),
+            mimetype='application/zip',
+            headers={
+                'Content-Disposition': f'attachment; filename="{archive_name}.zip"',
+                'X-Accel-Buffering': 'no'
+            }
         )
         
     except Exception as e:
-        logger.error(f"Error downloading submission: {str(e)}")
-        return error_response('Failed to download submission', 500)
+        logger.error(f"Error exporting submissions: {str(e)}")
+        return error_response('Failed to export submissions', 500)
     
 @faculty_bp.route('/assessments/<int:assessment_id>/submissions', methods=['GET'])
 @jwt_required()
@@ -1122,34 +1203,6 @@ def get_assessment_submissions(assessment_id):
         logger.error(f"Error getting submissions: {str(e)}")
         return error_response('Failed to get submissions', 500)
     
-@faculty_bp.route('/submissions/<int:submission_id>/download', methods=['GET'])
-@jwt_required()
-@faculty_required
-def download_submission_file(submission_id):
-    """Download submission file"""
-    try:
-        # Get current user
-        user_id = get_jwt_identity()
-        user = get_user_by_id(user_id)
-        
-        if not user or not user.faculty:
-            return error_response('Faculty profile not found', 404)
-        
-        faculty_id = user.faculty.faculty_id
-        
-        # Get file download response
-        file_response = assessment_service.download_submission_file(submission_id, faculty_id)
-        
-        if file_response:
-            return file_response
-        else:
-            return error_response('File not found or access denied', 404)
-        
-    except Exception as e:
-        logger.error(f"Error downloading submission file: {str(e)}")
-        return error_response('Failed to download file', 500)
-    
-
 #gpa roues 
 
 
@@ -1235,37 +1288,34 @@ def finalize_grades():
         if authorized_count != len(enrollment_ids):
             return jsonify({'status': 'error', 'message': 'Unauthorized access to some enrollments'}), 403
         
-        # Process grades
-        success_count = 0
-        errors = []
+        # Process grades in one transaction and refresh affected GPAs in bulk
+        success_count, errors, gpa_update = gpa_service.finalize_grades(grades)
         
-        for grade_data in grades:
-            enrollment_id = grade_data['enrollment_id']
-            final_grade = grade_data['final_grade']
-            override_reason = grade_data.get('override_reason')
-            
-            success, message = gpa_service.finalize_grade(
-                enrollment_id, 
-                final_grade, 
-                override_reason
-            )
-            
-            if success:
-                success_count += 1
-            else:
-                errors.append({
-                    'enrollment_id': enrollment_id,
-                    'error': message
-                })
+        data = {
+            'success_count': success_count,
+            'total': len(grades),
+            'errors': errors,
+            'gpa_update': gpa_update
+        }
+        
+        if gpa_update is None:
+            return jsonify({'status': 'error', 'message': 'Failed to finalize grades', 'data': data}), 500
+        
+        if gpa_update['status'] == 'failed':
+            return jsonify({
+                'status': 'error',
+                'message': f'Finalized {success_count} grades but failed to update student GPAs',
+                'data': data
+            }), 500
+        
+        message = f'Successfully finalized {success_count} grades'
+        if gpa_update['status'] == 'queued':
+            message += f"; GPA update queued as job {gpa_update['job_id']}"
         
         return jsonify({
             'status': 'success',
-            'message': f'Successfully finalized {success_count} grades',
-            'data': {
-                'success_count': success_count,
-                'total': len(grades),
-                'errors': errors
-            }
+            'message': message,
+            'data': data
         })
         
     except Exception as e:
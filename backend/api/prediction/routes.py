@@ -1,11 +1,17 @@
 from flask import Blueprint, request, jsonify, current_app
-from backend.models import Prediction, Student, Enrollment
+from backend.models import Prediction, Student, Enrollment, CourseOffering
 from backend.extensions import db
 from backend.utils.api import api_response, error_response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from backend.services.prediction_service import PredictionService
+from backend.services.job_service import job_service
+from backend.services.dirty_tracking_service import dirty_tracking_service
+from backend.services.auth_service import get_user_by_id
+from backend.utils.lazy_import import lazy_import
 import logging
 
+np = lazy_import('numpy')
+
 logger = logging.getLogger('prediction')
 
 prediction_bp = Blueprint('prediction', __name__)
@@ -76,6 +82,15 @@ def get_course_predictions(offering_id):
                 latest_prediction['student_name'] = f"{student.first_name} {student.last_name}"
                 predictions.append(latest_prediction)
         
+        # Explanations for the whole course in one batched call
+        if request.args.get('explain', 'false').lower() == 'true' and predictions:
+            records = Prediction.query.filter(
+                Prediction.prediction_id.in_([p['prediction_id'] for p in predictions])
+            ).all()
+            explanations = prediction_service.explain_predictions(records)
+            for p in predictions:
+                p['explanation'] = explanations.get(p['prediction_id'])
+        
         # Sort by risk level (high, medium, low)
         risk_order = {'high': 0, 'medium': 1, 'low': 2}
         predictions.sort(key=lambda x: risk_order.get(x['risk_level'], 3))
@@ -94,9 +109,12 @@ def get_course_predictions(offering_id):
 @prediction_bp.route('/generate', methods=['POST'])
 @jwt_required()
 def generate_predictions():
-    """Generate new predictions"""
+    """Queue prediction generation as a background job"""
     try:
-        current_user = get_jwt_identity()
+        user = get_user_by_id(get_jwt_identity())
+        if not user:
+            return error_response('User not found', 404)
+        
         data = request.get_json()
         
         # Validate input
@@ -108,80 +126,129 @@ def generate_predictions():
         
         if generation_type == 'individual':
             # Generate for specific student/enrollment
-            if current_user['user_type'] == 'student':
+            if user.user_type == 'student':
                 # Students can only generate their own predictions
-                student_id = current_user['username']
+                student_id = user.student.student_id if user.student else None
             else:
                 # Faculty/admin can specify student
                 student_id = data.get('student_id')
-                if not student_id:
-                    return error_response('Student ID required', 400)
             
-            # Get enrollments
-            enrollments = db.session.query(Enrollment).filter(
+            if not student_id:
+                return error_response('Student ID required', 400)
+            
+            enrollment_query = db.session.query(Enrollment.enrollment_id).filter(
                 Enrollment.student_id == student_id,
                 Enrollment.enrollment_status == 'enrolled'
-            ).all()
-            
-            if not enrollments:
-                return error_response('No active enrollments found', 404)
-            
-            results = []
-            for enrollment in enrollments:
-                try:
-                    prediction = prediction_service.generate_prediction(
-                        enrollment.enrollment_id,
-                        save=True
-                    )
-                    
-                    # Add course info
-                    prediction['course_code'] = enrollment.offering.course.course_code
-                    prediction['course_name'] = enrollment.offering.course.course_name
-                    results.append({
-                        'enrollment_id': enrollment.enrollment_id,
-                        'status': 'success',
-                        'prediction': prediction
-                    })
-                except Exception as e:
-                    logger.error(f"Failed to generate prediction for enrollment {enrollment.enrollment_id}: {str(e)}")
-                    results.append({
-                        'enrollment_id': enrollment.enrollment_id,
-                        'status': 'error',
-                        'error': str(e)
-                    })
-            
-            return api_response({
-                'student_id': student_id,
-                'results': results,
-                'success_count': sum(1 for r in results if r['status'] == 'success')
-            }, 'Predictions generated successfully')
+            )
+            payload = {'type': 'individual', 'student_id': student_id}
             
         elif generation_type == 'batch':
             # Batch generation for a course (faculty/admin only)
-            if current_user['user_type'] not in ['faculty', 'admin']:
+            if user.user_type not in ['faculty', 'admin']:
                 return error_response('Unauthorized for batch generation', 403)
             
             offering_id = data.get('offering_id')
             if not offering_id:
                 return error_response('Offering ID required for batch generation', 400)
             
-            # Run batch prediction
-            results = prediction_service.batch_generate_predictions(offering_id)
+            # Faculty can only run batches for their own courses
+            if user.user_type == 'faculty':
+                offering = CourseOffering.query.get(offering_id)
+                if not offering or not user.faculty or offering.faculty_id != user.faculty.faculty_id:
+                    return error_response('Unauthorized access to this course', 403)
             
-            return api_response({
-                'offering_id': offering_id,
-                'results': results,
-                'total_processed': len(results),
-                'success_count': sum(1 for r in results if r['status'] == 'success')
-            }, 'Batch predictions generated successfully')
+            enrollment_query = db.session.query(Enrollment.enrollment_id).filter(
+                Enrollment.offering_id == offering_id,
+                Enrollment.enrollment_status == 'enrolled'
+            )
+            
+            # Optionally re-score only enrollments with new input
+            if data.get('only_changed'):
+                enrollment_query = enrollment_query.filter(
+                    Enrollment.enrollment_id.in_(
+                        dirty_tracking_service.get_enrollments_to_rescore(
+                            stale_days=data.get('stale_days'), offering_id=offering_id
+                        )
+                    )
+                )
+            payload = {'type': 'batch', 'offering_id': offering_id}
             
         else:
             return error_response('Invalid generation type', 400)
+        
+        enrollment_ids = [row.enrollment_id for row in enrollment_query.all()]
+        if not enrollment_ids:
+            if generation_type == 'batch' and data.get('only_changed'):
+                # Nothing changed or went stale since the last run - not an error
+                return api_response({
+                    'job_id': None,
+                    'status': None,
+                    'total': 0,
+                    'status_url': None
+                }, 'No enrollments need re-scoring')
+            return error_response('No active enrollments found', 404)
+        
+        payload['enrollment_ids'] = enrollment_ids
+        job = job_service.enqueue('generate_predictions', payload=payload, created_by=user.user_id)
+        
+        if not job:
+            return error_response('Failed to queue prediction job', 500)
+        
+        return api_response({
+            'job_id': job.job_id,
+            'status': job.status,
+            'total': len(enrollment_ids),
+            'status_url': f'/api/prediction/jobs/{job.job_id}'
+        }, 'Prediction job queued', status=202)
             
     except Exception as e:
-        logger.error(f"Error generating predictions: {str(e)}")
+        logger.error(f"Error queueing predictions: {str(e)}")
         return error_response(f'Error generating predictions: {str(e)}', 500)
 
+@prediction_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_prediction_job(job_id):
+    """Get progress and a page of per-enrollment results for a prediction job"""
+    try:
+        user = get_user_by_id(get_jwt_identity())
+        if not user:
+            return error_response('User not found', 404)
+        
+        job = job_service.get_job(job_id)
+        if not job or job.job_type != 'generate_predictions':
+            return error_response('Job not found', 404)
+        
+        # Only the requester or an admin can see a job
+        if user.user_type != 'admin' and job.created_by != user.user_id:
+            return error_response('Unauthorized access', 403)
+        
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+        status = request.args.get('status')  # 'success' or 'error'
+        
+        results, total = job_service.get_job_results(job_id, page, per_page, status)
+        
+        job_data = job.to_dict()
+        job_data.pop('payload', None)  # Enrollment id list can be large
+        job_data['results'] = [result.to_dict() for result in results]
+        
+        return api_response(
+            job_data,
+            'Prediction job retrieved successfully',
+            meta={
+                'pagination': {
+                    'page': page,
+                    'per_page': per_page,
+                    'total': total,
+                    'pages': (total + per_page - 1) // per_page
+                }
+            }
+        )
+        
+    except Exception as e:
+        logger.error(f"Error getting prediction job: {str(e)}")
+        return error_response(f'Error retrieving prediction job: {str(e)}', 500)
+
 @prediction_bp.route('/history/<int:enrollment_id>', methods=['GET'])
 @jwt_required()
 def get_prediction_history(enrollment_id):
@@ -267,24 +334,11 @@ def explain_prediction(prediction_id):
         if current_user['user_type'] == 'student' and current_user['username'] != enrollment.student_id:
             return error_response('Unauthorized access', 403)
         
-        # Get features from snapshot
-        features = prediction.feature_snapshot
-        if not features:
+        if not prediction.explanation and not prediction.feature_snapshot:
             return error_response('Feature data not available for this prediction', 404)
         
-        # Get explanation from model service
-        from backend.services.model_service import ModelService
-        model_service = ModelService()
-        
-        # Convert features dict to array in correct order
-        feature_names = model_service.get_feature_list()
-        feature_array = np.array([[features.get(name, 0) for name in feature_names]])
-        
-        explanation = model_service.explain_prediction(
-            feature_array,
-            prediction.predicted_grade,
-            float(prediction.confidence_score)
-        )
+        # Cached with the prediction, computed once otherwise
+        explanation = prediction_service.explain_predictions([prediction]).get(prediction_id)
         
         return api_response({
             'prediction_id': prediction_id,
@@ -334,7 +388,7 @@ def debug_prediction(enrollment_id):
         predicted_class, confidence, risk_level = model_service.predict(features)
         
         # Step 3: Get some sample data stats
-        from backend.models import Attendance, LMSActivity, AssessmentSubmission
+        from backend.models import Attendance, LMSActivity, LMSActivityDaily, AssessmentSubmission
         
         # Get attendance stats
         attendance_count = Attendance.query.filter_by(enrollment_id=enrollment_id).count()
@@ -350,6 +404,9 @@ def debug_prediction(enrollment_id):
         ).filter(
             LMSSession.enrollment_id == enrollment_id
         ).count()
+        lms_activity_count += db.session.query(
+            db.func.coalesce(db.func.sum(LMSActivityDaily.activity_count), 0)
+        ).filter(LMSActivityDaily.enrollment_id == enrollment_id).scalar()
         
         # Get assessment submissions
         submission_count = AssessmentSubmission.query.filter_by(
@@ -91,6 +91,51 @@ def track_page_view():
         logger.error(f"Error tracking page view: {str(e)}")
         return error_response('Failed to track page view', 500)
 
+@lms_bp.route('/track/batch', methods=['POST'])
+@jwt_required()
+@student_required
+def track_batch():
+    """Track a batch of client-buffered events.
+    
+    Body: {"events": [{"type": "page" | "resource" | "assessment",
+    "timestamp": <epoch ms or ISO 8601>, ...fields of the single-event
+    endpoints...}]}
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        # Get user info
+        user_id = get_jwt_identity()
+        user = get_user_by_id(user_id)
+        
+        if not user or not user.student:
+            return error_response('Student profile not found', 404)
+        
+        events = data.get('events')
+        if not isinstance(events, list) or not events:
+            return error_response('Events list is required', 400)
+        
+        if len(events) > lms_activity_service.MAX_BATCH_EVENTS:
+            return error_response(f'At most {lms_activity_service.MAX_BATCH_EVENTS} events per batch', 400)
+        
+        result, error = lms_activity_service.track_batch(
+            student_id=user.student.student_id,
+            events=events,
+            ip_address=request.remote_addr,
+            user_agent=request.headers.get('User-Agent', '')[:255]
+        )
+        
+        if error:
+            return error_response(error, 500)
+        
+        logger.debug("Tracked %s events for student %s", result['tracked'], user.student.student_id)
+        
+        return api_response(result, f"Tracked {result['tracked']} events")
+        
+    except Exception as e:
+        logger.error(f"Error tracking activity batch: {str(e)}")
+        return error_response('Failed to track activities', 500)
+
 @lms_bp.route('/track/resource', methods=['POST'])
 @jwt_required()
 @student_required
@@ -852,21 +852,18 @@ def download_submission(assessment_id):
         if not submission or not submission.file_path:
             return error_response('No file found', 404)
         
-        # Send file
-        from flask import send_file
-        upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
-        file_path = os.path.join(upload_folder, submission.file_path)
-        
-        if not os.path.exists(file_path):
-            return error_response('File not found on server', 404)
-        
-        return send_file(
-            file_path,
-            as_attachment=True,
+        # Send file (conditional and Range requests are answered by send_file)
+        response = file_service.send_stored_file(
+            submission.file_path,
             download_name=submission.file_name,
             mimetype=submission.mime_type
         )
         
+        if response is None:
+            return error_response('File not found on server', 404)
+        
+        return response
+        
     except Exception as e:
         logger.error(f"Error downloading file: {str(e)}")
         return error_response('Failed to download file', 500)
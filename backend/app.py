@@ -6,6 +6,9 @@ from backend.utils.cors import configure_cors
 from flask_jwt_extended import JWTManager
 from flask import send_from_directory
 from backend.middleware.activity_tracker import ActivityTracker
+from backend.middleware.query_instrumentation import QueryInstrumentation
+from backend.middleware.request_profiler import RequestProfiler
+from backend.utils.metrics import metrics
 
 
 def create_app(config_name=None):
@@ -65,6 +68,16 @@ def initialize_extensions(app):
     activity_tracker = ActivityTracker(app)
     app.logger.info("Activity tracker initialized")
     
+    # Initialize per-request SQL instrumentation
+    QueryInstrumentation(app)
+    app.logger.info("Query instrumentation initialized")
+    
+    # Initialize opt-in request profiling (no hooks unless PROFILING_ENABLED)
+    RequestProfiler(app)
+    
+    # Initialize metrics registry (multi-process aggregation, DB pool gauges)
+    metrics.init_app(app)
+    
     # Set up JWT user loading for activity tracker
     from backend.middleware.jwt_middleware import load_logged_in_user
     app.before_request(load_logged_in_user)
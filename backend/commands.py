@@ -1,5 +1,7 @@
 import click
+from functools import wraps
 from flask.cli import with_appcontext
+from backend.utils.profiling import profile_block
 
 @click.command()
 @with_appcontext
@@ -34,8 +36,150 @@ def update_feature_cache():
     except Exception as e:
         click.echo(f"Error updating feature cache: {str(e)}", err=True)
 
+@click.command()
+@click.option('--term-id', type=int, default=None, help='Only refresh students enrolled in this term')
+@with_appcontext
+def update_gpas(term_id):
+    """Recompute cumulative GPA for all students (or one term's students)"""
+    try:
+        from backend.services.gpa_service import gpa_service
+        updated = gpa_service.update_student_gpas(term_id=term_id)
+        if updated is None:
+            click.echo("Error updating GPAs", err=True)
+        else:
+            click.echo(f"Updated GPA for {updated} students!")
+    except Exception as e:
+        click.echo(f"Error updating GPAs: {str(e)}", err=True)
+
+@click.command()
+@click.argument('job_type')
+@with_appcontext
+def enqueue_job(job_type):
+    """Add a background job to the worker queue"""
+    try:
+        from backend.services.job_service import job_service
+        job = job_service.enqueue(job_type)
+        if job:
+            click.echo(f"Enqueued job {job.job_id} ({job_type})")
+        else:
+            click.echo("Error enqueueing job", err=True)
+    except Exception as e:
+        click.echo(f"Error enqueueing job: {str(e)}", err=True)
+
+@click.command()
+@with_appcontext
+def warmup_model():
+    """Load the ML model and report how long it took"""
+    try:
+        import time
+        from backend.services.model_service import ModelService
+        start = time.perf_counter()
+        info = ModelService().warmup()
+        click.echo(f"Loaded {info['model_name']} ({info['feature_count']} features) "
+                   f"in {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        click.echo(f"Error loading model: {str(e)}", err=True)
+
+@click.command()
+@click.option('--batch-size', type=int, default=None, help='Messages per SMTP connection')
+@with_appcontext
+def send_outbox(batch_size):
+    """Send one batch of pending outbox emails"""
+    try:
+        from backend.services.email_outbox_service import email_outbox_service
+        stats = email_outbox_service.send_pending(batch_size=batch_size)
+        click.echo(f"Sent {stats['sent']}, retrying {stats['retrying']}, "
+                   f"failed {stats['failed']}, skipped {stats['skipped']}")
+    except Exception as e:
+        click.echo(f"Error sending outbox: {str(e)}", err=True)
+
+@click.command()
+@click.option('--retention-days', type=int, default=None, help='Keep raw activities this many days')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches')
+@with_appcontext
+def compact_lms_activities(retention_days, max_batches):
+    """Compact old LMS activities into daily aggregates and archive them"""
+    try:
+        from backend.services.lms_retention_service import lms_retention_service
+        stats = lms_retention_service.compact(retention_days=retention_days, max_batches=max_batches)
+        click.echo(f"Compacted {stats['activities']} activities older than {stats['cutoff']} "
+                   f"in {stats['batches']} batches")
+        if stats['archive']:
+            click.echo(f"Archived to {stats['archive']}")
+    except Exception as e:
+        click.echo(f"Error compacting LMS activities: {str(e)}", err=True)
+
+@click.command()
+@click.option('--retention-days', type=int, default=None, help='Keep every prediction this many days')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches')
+@with_appcontext
+def compact_predictions(retention_days, max_batches):
+    """Thin old predictions to one per enrollment per week and archive the rest"""
+    try:
+        from backend.services.prediction_retention_service import prediction_retention_service
+        stats = prediction_retention_service.compact(retention_days=retention_days, max_batches=max_batches)
+        click.echo(f"Thinned {stats['predictions']} predictions older than {stats['cutoff']} "
+                   f"in {stats['batches']} batches")
+        if stats['archive']:
+            click.echo(f"Archived to {stats['archive']}")
+    except Exception as e:
+        click.echo(f"Error compacting predictions: {str(e)}", err=True)
+
+@click.command()
+@click.option('--term-id', 'term_ids', type=int, multiple=True, help='Completed term to evaluate (repeatable)')
+@click.option('--weeks', type=int, default=None, help='Evaluate at the end of weeks 1..N of each term')
+@with_appcontext
+def evaluate_model(term_ids, weeks):
+    """Backtest the deployed model over completed terms"""
+    try:
+        from backend.services.model_evaluation_service import model_evaluation_service
+        offsets = [7 * week for week in range(1, weeks + 1)] if weeks else None
+        evaluation = model_evaluation_service.run_backtest(term_ids=list(term_ids) or None, offsets=offsets)
+        click.echo(f"Evaluation {evaluation.evaluation_id}: {evaluation.enrollment_count} enrollments, "
+                   f"accuracy {evaluation.accuracy}, AUC {evaluation.auc}, "
+                   f"median lead time {evaluation.median_lead_time_days} days")
+    except Exception as e:
+        click.echo(f"Error evaluating model: {str(e)}", err=True)
+
+@click.command()
+@click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+@with_appcontext
+def build_drift_reference(csv_path):
+    """Build the drift reference profile from the model's training features (CSV)"""
+    try:
+        from backend.services.feature_drift_service import feature_drift_service, REFERENCE_PATH
+        reference = feature_drift_service.build_reference_from_csv(csv_path)
+        rows = next(iter(reference['features'].values()))['count']
+        click.echo(f"Reference profile for model {reference['model_version']} "
+                   f"built from {rows} rows: {REFERENCE_PATH}")
+    except Exception as e:
+        click.echo(f"Error building drift reference: {str(e)}", err=True)
+
+def profile_command(command):
+    """Run a command under cProfile when PROFILE=1 is set"""
+    callback = command.callback
+    if getattr(callback, 'profiled', False):
+        return command
+    
+    @wraps(callback)
+    def wrapper(*args, **kwargs):
+        with profile_block(f"cli_{command.name}"):
+            return callback(*args, **kwargs)
+    
+    wrapper.profiled = True
+    command.callback = wrapper
+    return command
+
 def register_commands(app):
     """Register all custom commands"""
-    app.cli.add_command(run_daily_tasks)
-    app.cli.add_command(generate_lms_summary)
-    app.cli.add_command(update_feature_cache)
\ No newline at end of file
+    app.cli.add_command(profile_command(run_daily_tasks))
+    app.cli.add_command(profile_command(generate_lms_summary))
+    app.cli.add_command(profile_command(update_feature_cache))
+    app.cli.add_command(profile_command(update_gpas))
+    app.cli.add_command(profile_command(enqueue_job))
+    app.cli.add_command(profile_command(warmup_model))
+    app.cli.add_command(profile_command(send_outbox))
+    app.cli.add_command(profile_command(compact_lms_activities))
+    app.cli.add_command(profile_command(compact_predictions))
+    app.cli.add_command(profile_command(evaluate_model))
+    app.cli.add_command(profile_command(build_drift_reference))
\ No newline at end of file
@@ -0,0 +1,376 @@
+#!/usr/bin/env python
+"""
+Benchmark harness for the prediction system's hot paths
+
+Times app cold start, feature calculation, single and batch prediction,
+alert checking, daily LMS summaries, dashboard endpoints and exports against whatever
+database the app config points at (populate it first with
+generate_test_data.py). Writes results as JSON and compares them with a
+stored baseline.
+
+Usage:
+    python backend/commands/benchmark.py
+    python backend/commands/benchmark.py --only feature_calculation,single_prediction
+    python backend/commands/benchmark.py --save-baseline
+    python backend/commands/benchmark.py --baseline benchmarks/baseline.json --fail-on-regression
+
+Prediction, alert and summary benchmarks write to the database; run them
+against a disposable generated dataset, not production.
+"""
+import sys
+import os
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from sqlalchemy import func, text
+
+from backend.app import create_app
+from backend.extensions import db
+from backend.models import (
+    User, Faculty, Student, AcademicTerm, CourseOffering, Enrollment, LMSSession
+)
+
+DEFAULT_OUTPUT = os.path.join(PROJECT_ROOT, 'benchmarks', 'results', 'latest.json')
+DEFAULT_BASELINE = os.path.join(PROJECT_ROOT, 'benchmarks', 'baseline.json')
+
+BENCHMARKS = []
+
+
+def benchmark(name, repeat=None):
+    """Register a benchmark; repeat=None uses the --samples option"""
+    def decorator(fn):
+        BENCHMARKS.append({'name': name, 'fn': fn, 'repeat': repeat})
+        return fn
+    return decorator
+
+
+class BenchmarkContext:
+    """Deterministic sample of ids the benchmarks run against"""
+
+    def __init__(self, app, samples, config_name=None):
+        self.app = app
+        self.samples = samples
+        self.config_name = config_name
+        self.client = app.test_client()
+        self.services = {}
+
+        enrollment_ids = [row.enrollment_id for row in db.session.query(
+            Enrollment.enrollment_id
+        ).filter(
+            Enrollment.enrollment_status == 'enrolled'
+        ).order_by(Enrollment.enrollment_id).all()]
+        # Evenly spaced so the sample is stable for a given dataset
+        step = max(1, len(enrollment_ids) // max(1, samples))
+        self.enrollment_ids = enrollment_ids[::step][:samples]
+
+        # Median-sized offering of the current term
+        term = AcademicTerm.query.filter_by(is_current=True).first()
+        offering_query = db.session.query(
+            CourseOffering.offering_id, func.count(Enrollment.enrollment_id).label('size')
+        ).join(
+            Enrollment, Enrollment.offering_id == CourseOffering.offering_id
+        ).group_by(CourseOffering.offering_id)
+        if term:
+            offering_query = offering_query.filter(CourseOffering.term_id == term.term_id)
+        offerings = sorted(offering_query.all(), key=lambda row: (row.size, row.offering_id))
+        self.offering_id = offerings[len(offerings) // 2].offering_id if offerings else None
+
+        busiest_day = db.session.query(
+            func.date(LMSSession.login_time).label('day'), func.count(LMSSession.session_id).label('sessions')
+        ).group_by('day').order_by(func.count(LMSSession.session_id).desc()).first()
+        self.summary_date = busiest_day.day if busiest_day else None
+        if isinstance(self.summary_date, str):
+            self.summary_date = datetime.strptime(self.summary_date, '%Y-%m-%d').date()
+
+        self.tokens = {}
+        faculty = Faculty.query.join(CourseOffering).filter(
+            CourseOffering.offering_id == self.offering_id
+        ).first() if self.offering_id else None
+        student = Student.query.join(Enrollment).filter(
+            Enrollment.enrollment_id == self.enrollment_ids[0]
+        ).first() if self.enrollment_ids else None
+        admin = User.query.filter_by(user_type='admin', is_active=True).order_by(User.user_id).first()
+        for role, user_id in (('faculty', faculty and faculty.user_id),
+                              ('student', student and student.user_id),
+                              ('admin', admin and admin.user_id)):
+            if user_id:
+                self.tokens[role] = self._token(user_id)
+
+    def service(self, name, factory):
+        """Construct each service once so model loading isn't timed"""
+        if name not in self.services:
+            self.services[name] = factory()
+        return self.services[name]
+
+    def _token(self, user_id):
+        from flask_jwt_extended import create_access_token
+        return create_access_token(identity=str(user_id), expires_delta=timedelta(hours=6))
+
+    def get(self, role, path):
+        if role not in self.tokens:
+            raise SkipBenchmark(f"no {role} user in the dataset")
+        response = self.client.get(path, headers={'Authorization': f"Bearer {self.tokens[role]}"})
+        if response.status_code >= 400:
+            raise RuntimeError(f"GET {path} returned {response.status_code}")
+        return response
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+# =====================================================
+# BENCHMARKS
+# =====================================================
+
+HEAVY_MODULES = ('numpy', 'pandas', 'scipy', 'sklearn', 'xgboost')
+
+STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+from backend.app import create_app
+create_app({config!r})
+print(json.dumps({{
+    'create_app_ms': round((time.perf_counter() - start) * 1000, 1),
+    'heavy_modules_loaded': sorted(m for m in {heavy!r} if m in sys.modules)
+}}))
+'''
+
+
+@benchmark('app_startup', repeat=5)
+def bench_app_startup(ctx, i):
+    """Fresh interpreter importing the app and running create_app (what
+    every worker and CLI command pays); details list the slowest imports"""
+    script = STARTUP_SCRIPT.format(config=ctx.config_name, heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    details = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    # -X importtime: "import time: self [us] | cumulative | package"
+    top_level = []
+    for line in completed.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and line.startswith('import time:') and parts[1].strip().isdigit():
+            name = parts[2].rstrip()
+            if not name.startswith('  '):
+                top_level.append((int(parts[1]), name.strip()))
+    details['slowest_imports_ms'] = {
+        name: round(cumulative / 1000, 1)
+        for cumulative, name in sorted(top_level, reverse=True)[:10]
+    }
+    return details
+
+
+@benchmark('feature_calculation')
+def bench_feature_calculation(ctx, i):
+    from backend.services.feature_calculator_service import FeatureCalculator
+    ctx.service('features', FeatureCalculator).calculate_features_for_enrollment(ctx.enrollment_ids[i % len(ctx.enrollment_ids)])
+
+
+@benchmark('single_prediction')
+def bench_single_prediction(ctx, i):
+    from backend.services.prediction_service import PredictionService
+    ctx.service('prediction', PredictionService).generate_prediction(ctx.enrollment_ids[i % len(ctx.enrollment_ids)], save=False)
+
+
+@benchmark('batch_prediction', repeat=1)
+def bench_batch_prediction(ctx, i):
+    if not ctx.offering_id:
+        raise SkipBenchmark("no offerings")
+    from backend.services.prediction_service import PredictionService
+    ctx.service('prediction', PredictionService).batch_generate_predictions(ctx.offering_id)
+
+
+@benchmark('alert_check')
+def bench_alert_check(ctx, i):
+    from backend.services.alert_service import AlertService
+    ctx.service('alerts', AlertService).check_and_create_alerts(ctx.enrollment_ids[i % len(ctx.enrollment_ids)])
+
+
+@benchmark('daily_summary', repeat=1)
+def bench_daily_summary(ctx, i):
+    if not ctx.summary_date:
+        raise SkipBenchmark("no LMS sessions")
+    from backend.services.lms_summary_service import LMSSummaryService
+    LMSSummaryService.generate_daily_summary(ctx.summary_date)
+
+
+@benchmark('faculty_dashboard')
+def bench_faculty_dashboard(ctx, i):
+    ctx.get('faculty', '/api/faculty/dashboard')
+
+
+@benchmark('student_dashboard')
+def bench_student_dashboard(ctx, i):
+    ctx.get('student', '/api/student/dashboard')
+
+
+@benchmark('admin_statistics')
+def bench_admin_statistics(ctx, i):
+    ctx.get('admin', '/api/admin/statistics')
+
+
+@benchmark('predictions_export', repeat=3)
+def bench_predictions_export(ctx, i):
+    ctx.get('admin', '/api/admin/predictions/export')
+
+
+@benchmark('student_performance_report', repeat=3)
+def bench_student_performance_report(ctx, i):
+    ctx.get('admin', '/api/admin/reports/student-performance')
+
+
+# =====================================================
+# RUNNER
+# =====================================================
+
+def run_benchmark(ctx, spec, samples):
+    repeat = spec['repeat'] or samples
+    timings = []
+    details = None
+    try:
+        for i in range(repeat):
+            start = time.perf_counter()
+            details = spec['fn'](ctx, i)
+            timings.append(time.perf_counter() - start)
+            # Don't let identity-map growth skew later iterations
+            db.session.remove()
+    except SkipBenchmark as e:
+        return {'status': 'skipped', 'reason': str(e)}
+    except Exception as e:
+        db.session.rollback()
+        return {'status': 'error', 'error': str(e)}
+
+    ordered = sorted(timings)
+    result = {
+        'status': 'ok',
+        'runs': len(timings),
+        'mean_ms': round(statistics.mean(timings) * 1000, 3),
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        'min_ms': round(ordered[0] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+    if details:
+        result['details'] = details
+    return result
+
+
+def dataset_summary():
+    tables = ['students', 'course_offerings', 'enrollments', 'attendance',
+              'lms_sessions', 'lms_activities', 'assessment_submissions', 'predictions']
+    summary = {}
+    for table in tables:
+        try:
+            summary[table] = db.session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+        except Exception:
+            db.session.rollback()
+            summary[table] = None
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Median change per benchmark; regressions are slower than threshold"""
+    comparison = {}
+    for name, result in results.items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if result.get('status') != 'ok' or not previous or previous.get('status') != 'ok':
+            continue
+        change = (result['median_ms'] - previous['median_ms']) / previous['median_ms'] if previous['median_ms'] else 0
+        comparison[name] = {
+            'baseline_median_ms': previous['median_ms'],
+            'median_ms': result['median_ms'],
+            'change_pct': round(change * 100, 1),
+            'regression': change > threshold
+        }
+    return comparison
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--samples', type=int, default=20, help='Iterations per benchmark')
+    parser.add_argument('--only', help='Comma-separated benchmark names')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='Also write results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Median slowdown fraction counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--config', default=None, help='App config name (e.g. development, testing)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    only = set(args.only.split(',')) if args.only else None
+
+    app = create_app(args.config) if args.config else create_app()
+    with app.app_context():
+        ctx = BenchmarkContext(app, args.samples, args.config)
+        if not ctx.enrollment_ids:
+            print("No enrollments found! Run generate_test_data.py first")
+            return 1
+
+        results = {}
+        for spec in BENCHMARKS:
+            if only and spec['name'] not in only:
+                continue
+            print(f"Running {spec['name']}...", flush=True)
+            results[spec['name']] = run_benchmark(ctx, spec, args.samples)
+            print(f"  {results[spec['name']]}")
+
+        report = {
+            'created_at': datetime.utcnow().isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'database': db.engine.dialect.name,
+            'samples': args.samples,
+            'dataset': dataset_summary(),
+            'benchmarks': results
+        }
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            report['comparison'] = compare(results, json.load(f), args.threshold)
+        print("\nComparison with baseline (median):")
+        for name, row in report['comparison'].items():
+            flag = '  REGRESSION' if row['regression'] else ''
+            print(f"  {name:32s} {row['baseline_median_ms']:10.1f}ms -> {row['median_ms']:10.1f}ms "
+                  f"({row['change_pct']:+.1f}%){flag}")
+            if row['regression']:
+                regressions.append(name)
+
+    for path in [args.output] + ([args.baseline] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"Wrote {path}")
+
+    if regressions and args.fail_on_regression:
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
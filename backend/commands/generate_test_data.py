@@ -0,0 +1,511 @@
+#!/usr/bin/env python
+"""
+Deterministic synthetic data generator for load and performance testing
+
+Produces users, students, faculty, courses, offerings, enrollments,
+attendance, LMS sessions/activities, assessments and submissions using
+bulk inserts. The same --seed and scale options always produce the same
+rows, so benchmark runs are comparable.
+
+Usage:
+    python backend/commands/generate_test_data.py --preset small --reset
+    python backend/commands/generate_test_data.py --preset large --seed 7
+    python backend/commands/generate_test_data.py --students 2000 --offerings 200
+
+The large preset (50k students, 5k offerings) yields roughly 6M attendance
+rows and 20M+ LMS activities; use MySQL or a SQLite file on fast disk.
+"""
+import sys
+import os
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from sqlalchemy import func, text
+from werkzeug.security import generate_password_hash
+
+from backend.app import create_app
+from backend.extensions import db
+from backend.models import (
+    User, Student, Faculty, AcademicTerm, Course, CourseOffering, Enrollment,
+    Attendance, LMSSession, LMSActivity, AssessmentType, Assessment, AssessmentSubmission
+)
+
+PRESETS = {
+    'tiny': {'students': 200, 'faculty': 10, 'courses': 20, 'offerings': 20},
+    'small': {'students': 2000, 'faculty': 50, 'courses': 100, 'offerings': 200},
+    'medium': {'students': 10000, 'faculty': 250, 'courses': 400, 'offerings': 1000},
+    'large': {'students': 50000, 'faculty': 1000, 'courses': 1500, 'offerings': 5000},
+}
+
+FIRST_NAMES = ['John', 'Jane', 'Michael', 'Sarah', 'David', 'Emma', 'James', 'Emily', 'Robert', 'Lisa',
+               'Ahmed', 'Fatima', 'Wei', 'Mei', 'Carlos', 'Sofia', 'Ivan', 'Olga', 'Kwame', 'Amara']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+              'Martinez', 'Khan', 'Chen', 'Okafor', 'Novak', 'Silva', 'Tanaka', 'Muller', 'Rossi']
+DEPARTMENTS = ['Computer Science', 'Mathematics', 'Physics', 'Engineering', 'Data Science']
+PROGRAMS = ['CS', 'DS', 'SE', 'IT', 'AI']
+EDUCATION_LEVELS = ['No Formal quals', 'Lower Than A Level', 'A Level or Equivalent',
+                    'HE Qualification', 'Post Graduate Qualification']
+ACTIVITY_TYPES = ['resource_view', 'forum_post', 'forum_reply', 'assignment_view',
+                  'quiz_attempt', 'video_watch', 'file_download', 'page_view']
+ACTIVITY_WEIGHTS = [30, 3, 5, 10, 4, 15, 8, 25]
+ASSESSMENT_PLAN = [
+    # (type name, mapped type, count, max score, weight each)
+    ('Quiz', 'Quiz', 4, 20, 5),
+    ('Assignment', 'TMA', 3, 100, 10),
+    ('Midterm Exam', 'Exam', 1, 100, 20),
+    ('Final Exam', 'Exam', 1, 100, 30),
+]
+
+# Fixed reference point so repeated runs produce identical dates
+DEFAULT_TERM_START = date(2025, 1, 13)
+
+
+class SyntheticDataGenerator:
+    """Generates a reproducible university dataset with bulk inserts"""
+
+    def __init__(self, seed=42, students=2000, faculty=50, courses=100, offerings=200,
+                 courses_per_student=4, term_weeks=15, classes_per_week=2,
+                 sessions_per_week=4, activities_per_session=5,
+                 term_start=DEFAULT_TERM_START, as_of=None, chunk_size=10000):
+        self.seed = seed
+        self.num_students = students
+        self.num_faculty = faculty
+        self.num_courses = courses
+        self.num_offerings = offerings
+        self.courses_per_student = min(courses_per_student, offerings)
+        self.term_weeks = term_weeks
+        self.classes_per_week = classes_per_week
+        self.sessions_per_week = sessions_per_week
+        self.activities_per_session = activities_per_session
+        self.term_start = term_start
+        self.term_end = term_start + timedelta(weeks=term_weeks)
+        # Activity is generated up to as_of (default: whole term)
+        self.as_of = min(as_of or self.term_end, self.term_end)
+        self.chunk_size = chunk_size
+        self.counts = {}
+        self.password_hash = None
+
+    def _rng(self, *key):
+        """Independent random stream per entity so output doesn't depend on chunking"""
+        value = self.seed
+        for part in key:
+            value = (value * 1000003 + part) & 0xFFFFFFFFFFFF
+        return random.Random(value)
+
+    def _next_id(self, column):
+        return (db.session.query(func.max(column)).scalar() or 0) + 1
+
+    def _insert(self, model, rows):
+        """Bulk insert in chunks, committing each chunk"""
+        for start in range(0, len(rows), self.chunk_size):
+            db.session.execute(model.__table__.insert(), rows[start:start + self.chunk_size])
+            db.session.commit()
+        self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+
+    def _log(self, message):
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}", flush=True)
+
+    # =====================================================
+    # DRIVER
+    # =====================================================
+
+    def generate(self):
+        """Generate the full dataset; returns row counts per table"""
+        started = time.perf_counter()
+        # Hashing is slow; every synthetic account shares one password
+        self.password_hash = generate_password_hash('password123')
+
+        self._tune_connection()
+        term_id = self.create_term()
+        type_ids = self.ensure_assessment_types()
+        self._create_users('adm', 'admin', 1)
+        faculty_ids = self.create_faculty()
+        student_ids = self.create_students()
+        course_ids = self.create_courses()
+        offerings = self.create_offerings(course_ids, term_id, faculty_ids)
+        assessments = self.create_assessments(offerings, type_ids)
+        self.create_enrollments_and_activity(student_ids, offerings, assessments)
+
+        self._log(f"Done in {time.perf_counter() - started:.1f}s: {self.counts}")
+        return self.counts
+
+    def _tune_connection(self):
+        """Relax durability on SQLite; bulk loads are re-runnable"""
+        if db.engine.dialect.name == 'sqlite':
+            db.session.execute(text('PRAGMA synchronous = OFF'))
+            db.session.execute(text('PRAGMA journal_mode = WAL'))
+
+    # =====================================================
+    # REFERENCE DATA
+    # =====================================================
+
+    def create_term(self):
+        code = f"SYN{self.seed}-{self.term_start.isoformat()}"
+        term = AcademicTerm.query.filter_by(term_code=code).first()
+        if term:
+            return term.term_id
+
+        # The generated term becomes the current one
+        AcademicTerm.query.update({AcademicTerm.is_current: False})
+        term = AcademicTerm(
+            term_name=f"Synthetic {self.term_start.strftime('%B %Y')}",
+            term_code=code,
+            start_date=self.term_start,
+            end_date=self.term_end,
+            is_current=True
+        )
+        db.session.add(term)
+        db.session.commit()
+        self._log(f"Created term {code}")
+        return term.term_id
+
+    def ensure_assessment_types(self):
+        type_ids = {}
+        for type_name, _, _, _, weight in ASSESSMENT_PLAN:
+            assessment_type = AssessmentType.query.filter_by(type_name=type_name).first()
+            if not assessment_type:
+                assessment_type = AssessmentType(type_name=type_name, weight_percentage=weight)
+                db.session.add(assessment_type)
+                db.session.flush()
+            type_ids[type_name] = assessment_type.type_id
+        db.session.commit()
+        return type_ids
+
+    # =====================================================
+    # PEOPLE
+    # =====================================================
+
+    def _create_users(self, prefix, user_type, count):
+        first_user_id = self._next_id(User.user_id)
+        created_at = datetime.combine(self.term_start, datetime.min.time())
+        rows = [{
+            'user_id': first_user_id + i,
+            'username': f"{prefix}{self.seed}_{i:06d}",
+            'email': f"{prefix}{self.seed}_{i:06d}@synthetic.test",
+            'password_hash': self.password_hash,
+            'user_type': user_type,
+            'is_active': True,
+            'created_at': created_at
+        } for i in range(count)]
+        self._insert(User, rows)
+        return first_user_id
+
+    def create_faculty(self):
+        first_user_id = self._create_users('fac', 'faculty', self.num_faculty)
+        rows = []
+        for i in range(self.num_faculty):
+            rng = self._rng(1, i)
+            rows.append({
+                'faculty_id': f"F{self.seed}-{i:05d}",
+                'user_id': first_user_id + i,
+                'first_name': rng.choice(FIRST_NAMES),
+                'last_name': rng.choice(LAST_NAMES),
+                'department': DEPARTMENTS[i % len(DEPARTMENTS)],
+                'position': rng.choice(['Lecturer', 'Senior Lecturer', 'Professor'])
+            })
+        self._insert(Faculty, rows)
+        self._log(f"Created {self.num_faculty} faculty")
+        return [row['faculty_id'] for row in rows]
+
+    def create_students(self):
+        first_user_id = self._create_users('stu', 'student', self.num_students)
+        rows = []
+        for i in range(self.num_students):
+            rng = self._rng(2, i)
+            rows.append({
+                'student_id': f"S{self.seed}-{i:06d}",
+                'user_id': first_user_id + i,
+                'first_name': rng.choice(FIRST_NAMES),
+                'last_name': rng.choice(LAST_NAMES),
+                'date_of_birth': date(1995 + rng.randint(0, 10), rng.randint(1, 12), rng.randint(1, 28)),
+                'gender': rng.choice(['M', 'F']),
+                'program_code': rng.choice(PROGRAMS),
+                'year_of_study': rng.randint(1, 4),
+                'enrollment_date': self.term_start - timedelta(days=365 * rng.randint(0, 3)),
+                'status': 'active',
+                'age_band': rng.choices(['0-35', '35-55', '55+'], weights=[80, 17, 3])[0],
+                'highest_education': rng.choice(EDUCATION_LEVELS),
+                'num_of_prev_attempts': rng.choices([0, 1, 2], weights=[85, 12, 3])[0],
+                'studied_credits': rng.choice([30, 60, 90, 120]),
+                'has_disability': rng.random() < 0.08
+            })
+            if len(rows) >= self.chunk_size:
+                self._insert(Student, rows)
+                rows = []
+        self._insert(Student, rows)
+        self._log(f"Created {self.num_students} students")
+        return [f"S{self.seed}-{i:06d}" for i in range(self.num_students)]
+
+    # =====================================================
+    # COURSES
+    # =====================================================
+
+    def create_courses(self):
+        rows = []
+        for i in range(self.num_courses):
+            department = DEPARTMENTS[i % len(DEPARTMENTS)]
+            rows.append({
+                'course_id': f"C{self.seed}-{i:05d}",
+                'course_code': f"{PROGRAMS[i % len(PROGRAMS)]}{100 + i}",
+                'course_name': f"{department} Topic {i}",
+                'credits': self._rng(3, i).choice([3, 4]),
+                'department': department,
+                'is_active': True
+            })
+        self._insert(Course, rows)
+        return [row['course_id'] for row in rows]
+
+    def create_offerings(self, course_ids, term_id, faculty_ids):
+        first_offering_id = self._next_id(CourseOffering.offering_id)
+        capacity = max(10, int(self.num_students * self.courses_per_student / self.num_offerings * 1.5))
+        rows = []
+        for i in range(self.num_offerings):
+            rows.append({
+                'offering_id': first_offering_id + i,
+                'course_id': course_ids[i % len(course_ids)],
+                'term_id': term_id,
+                'faculty_id': faculty_ids[i % len(faculty_ids)],
+                'section_number': f"{i // len(course_ids) + 1:03d}",
+                'capacity': capacity,
+                'enrolled_count': 0,
+                'meeting_pattern': 'MW' if i % 2 == 0 else 'TTh',
+                'location': f"Room {100 + i % 400}"
+            })
+        self._insert(CourseOffering, rows)
+        self._log(f"Created {self.num_offerings} offerings")
+        return [row['offering_id'] for row in rows]
+
+    def create_assessments(self, offerings, type_ids):
+        """Per offering: list of (assessment_id, max_score, due date)"""
+        first_assessment_id = self._next_id(Assessment.assessment_id)
+        created_at = datetime.combine(self.term_start, datetime.min.time())
+        rows = []
+        assessments = {}
+        for offering_id in offerings:
+            offering_assessments = []
+            for type_name, mapped, count, max_score, weight in ASSESSMENT_PLAN:
+                for n in range(count):
+                    if type_name == 'Final Exam':
+                        due = self.term_end - timedelta(days=2)
+                    elif type_name == 'Midterm Exam':
+                        due = self.term_start + timedelta(weeks=self.term_weeks // 2)
+                    else:
+                        due = self.term_start + timedelta(days=int(self.term_weeks * 7 * (n + 1) / (count + 1)))
+                    assessment_id = first_assessment_id + len(rows)
+                    rows.append({
+                        'assessment_id': assessment_id,
+                        'offering_id': offering_id,
+                        'type_id': type_ids[type_name],
+                        'title': f"{type_name} {n + 1}",
+                        'max_score': max_score,
+                        'due_date': datetime.combine(due, datetime.min.time()) + timedelta(hours=23, minutes=59),
+                        'weight': weight,
+                        'is_published': True,
+                        'created_at': created_at,
+                        'assessment_type_mapped': mapped
+                    })
+                    offering_assessments.append((assessment_id, max_score, due))
+            assessments[offering_id] = offering_assessments
+        self._insert(Assessment, rows)
+        self._log(f"Created {len(rows)} assessments")
+        return assessments
+
+    # =====================================================
+    # ENROLLMENTS AND ACTIVITY
+    # =====================================================
+
+    def create_enrollments_and_activity(self, student_ids, offerings, assessments):
+        """Enroll students round-robin and stream their activity in chunks"""
+        next_ids = {
+            'enrollment': self._next_id(Enrollment.enrollment_id),
+            'session': self._next_id(LMSSession.session_id),
+        }
+        buffers = {model: [] for model in (Enrollment, Attendance, LMSSession, LMSActivity, AssessmentSubmission)}
+        enrolled_counts = {}
+        num_offerings = len(offerings)
+
+        for index, student_id in enumerate(student_ids):
+            rng = self._rng(4, index)
+            # Latent engagement drives attendance, LMS use and scores
+            engagement = rng.betavariate(5, 2)
+            start = rng.randrange(num_offerings)
+            stride = 1 + rng.randrange(max(1, num_offerings - 1)) if num_offerings > 1 else 1
+            chosen = []
+            for k in range(self.courses_per_student):
+                offering_id = offerings[(start + k * stride) % num_offerings]
+                if offering_id not in chosen:
+                    chosen.append(offering_id)
+
+            for offering_id in chosen:
+                enrollment_id = next_ids['enrollment']
+                next_ids['enrollment'] += 1
+                enrolled_counts[offering_id] = enrolled_counts.get(offering_id, 0) + 1
+                buffers[Enrollment].append({
+                    'enrollment_id': enrollment_id,
+                    'student_id': student_id,
+                    'offering_id': offering_id,
+                    'enrollment_date': self.term_start - timedelta(days=rng.randint(1, 30)),
+                    'enrollment_status': 'enrolled'
+                })
+                erng = self._rng(5, enrollment_id)
+                self._attendance_rows(buffers[Attendance], enrollment_id, engagement, erng)
+                self._lms_rows(buffers[LMSSession], buffers[LMSActivity], next_ids,
+                               enrollment_id, engagement, erng)
+                self._submission_rows(buffers[AssessmentSubmission], enrollment_id,
+                                      assessments[offering_id], engagement, erng)
+
+            if len(buffers[LMSActivity]) >= self.chunk_size * 5 or len(buffers[Attendance]) >= self.chunk_size:
+                self._flush(buffers)
+            if (index + 1) % 5000 == 0:
+                self._log(f"  {index + 1}/{len(student_ids)} students enrolled ({self.counts})")
+
+        self._flush(buffers)
+
+        db.session.bulk_update_mappings(CourseOffering, [
+            {'offering_id': offering_id, 'enrolled_count': count}
+            for offering_id, count in enrolled_counts.items()
+        ])
+        db.session.commit()
+
+    def _flush(self, buffers):
+        # Parents before children
+        for model, rows in buffers.items():
+            if rows:
+                self._insert(model, rows)
+                rows.clear()
+
+    def _attendance_rows(self, rows, enrollment_id, engagement, rng):
+        days_between = 7 // self.classes_per_week
+        current = self.term_start
+        while current <= self.as_of:
+            for k in range(self.classes_per_week):
+                class_date = current + timedelta(days=k * days_between)
+                if class_date > self.as_of:
+                    break
+                roll = rng.random()
+                if roll < engagement * 0.9:
+                    status = 'present'
+                elif roll < engagement * 0.9 + 0.05:
+                    status = 'late'
+                elif roll < engagement * 0.9 + 0.08:
+                    status = 'excused'
+                else:
+                    status = 'absent'
+                rows.append({
+                    'enrollment_id': enrollment_id,
+                    'attendance_date': class_date,
+                    'status': status,
+                    'recorded_by': 'system'
+                })
+            current += timedelta(weeks=1)
+
+    def _lms_rows(self, sessions, activities, next_ids, enrollment_id, engagement, rng):
+        total_days = (self.as_of - self.term_start).days
+        expected_sessions = max(0, int(self.sessions_per_week * engagement * total_days / 7 * 2 * rng.random()))
+        for _ in range(expected_sessions):
+            session_id = next_ids['session']
+            next_ids['session'] += 1
+            login = datetime.combine(
+                self.term_start + timedelta(days=rng.randrange(max(1, total_days))),
+                datetime.min.time()
+            ) + timedelta(hours=rng.randint(7, 22), minutes=rng.randrange(60))
+            duration = rng.randint(5, 90)
+            sessions.append({
+                'session_id': session_id,
+                'enrollment_id': enrollment_id,
+                'login_time': login,
+                'logout_time': login + timedelta(minutes=duration),
+                'duration_minutes': duration,
+                'ip_address': '127.0.0.1',
+                'user_agent': 'synthetic'
+            })
+
+            count = max(1, int(rng.expovariate(1 / self.activities_per_session)))
+            activity_types = rng.choices(ACTIVITY_TYPES, weights=ACTIVITY_WEIGHTS, k=count)
+            for n, activity_type in enumerate(activity_types):
+                activities.append({
+                    'session_id': session_id,
+                    'enrollment_id': enrollment_id,
+                    'activity_type': activity_type,
+                    'activity_timestamp': login + timedelta(seconds=int(duration * 60 * n / count)),
+                    'resource_id': f"res_{rng.randrange(50)}",
+                    'duration_seconds': rng.randint(5, 600)
+                })
+
+    def _submission_rows(self, rows, enrollment_id, assessments, engagement, rng):
+        for assessment_id, max_score, due in assessments:
+            if due > self.as_of or rng.random() > 0.5 + engagement * 0.5:
+                continue
+            percentage = max(0.0, min(100.0, rng.gauss(40 + engagement * 55, 12)))
+            is_late = rng.random() > 0.85 + engagement * 0.1
+            submitted = datetime.combine(due, datetime.min.time()) + timedelta(
+                hours=rng.randint(1, 47) if is_late else -rng.randint(1, 72)
+            )
+            rows.append({
+                'enrollment_id': enrollment_id,
+                'assessment_id': assessment_id,
+                'submission_date': submitted,
+                'score': round(max_score * percentage / 100, 2),
+                'percentage': round(percentage, 2),
+                'is_late': is_late,
+                'late_penalty': 0,
+                'graded_date': submitted + timedelta(days=3),
+                'attempt_number': 1,
+                'submission_type': 'text'
+            })
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--students', type=int, help='Override the preset student count')
+    parser.add_argument('--faculty', type=int, help='Override the preset faculty count')
+    parser.add_argument('--courses', type=int, help='Override the preset course count')
+    parser.add_argument('--offerings', type=int, help='Override the preset offering count')
+    parser.add_argument('--courses-per-student', type=int, default=4)
+    parser.add_argument('--term-weeks', type=int, default=15)
+    parser.add_argument('--sessions-per-week', type=int, default=4)
+    parser.add_argument('--activities-per-session', type=int, default=5)
+    parser.add_argument('--as-of', type=date.fromisoformat,
+                        help='Only generate activity up to this date (YYYY-MM-DD)')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--config', default=None, help='App config name (e.g. development, testing)')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate all tables first')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scale = dict(PRESETS[args.preset])
+    for key in scale:
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+
+    app = create_app(args.config) if args.config else create_app()
+    with app.app_context():
+        if args.reset:
+            print("Dropping and recreating all tables...")
+            db.drop_all()
+            db.create_all()
+
+        generator = SyntheticDataGenerator(
+            seed=args.seed,
+            courses_per_student=args.courses_per_student,
+            term_weeks=args.term_weeks,
+            sessions_per_week=args.sessions_per_week,
+            activities_per_session=args.activities_per_session,
+            as_of=args.as_of,
+            chunk_size=args.chunk_size,
+            **scale
+        )
+        generator.generate()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ from flask import request, g
 from backend.models.tracking import LMSSession, LMSActivity
 from backend.models import Enrollment
 from backend.extensions import db
+from backend.services.dirty_tracking_service import dirty_tracking_service
 
 logger = logging.getLogger(__name__)
 
@@ -133,6 +134,7 @@ class ActivityTracker:
             )
             
             db.session.add(activity)
+            dirty_tracking_service.mark_dirty(g.current_enrollment_id, 'lms')
             db.session.commit()
             
             logger.debug(f"Tracked activity: {activity_type} for enrollment {g.current_enrollment_id}")
@@ -203,6 +205,7 @@ def track_activity(activity_type, resource_id=None, resource_name=None, **kwargs
                 **kwargs
             )
             db.session.add(activity)
+            dirty_tracking_service.mark_dirty(g.current_enrollment_id, 'lms')
             db.session.commit()
             logger.debug(f"Manually tracked activity: {activity_type}")
     except Exception as e:
@@ -0,0 +1,165 @@
+import logging
+import threading
+from bisect import bisect_left
+from collections import Counter
+from flask import request
+from flask_sqlalchemy.record_queries import get_recorded_queries
+
+logger = logging.getLogger('db')
+
+
+class EndpointQueryStats:
+    """Per-endpoint query count and DB time histograms for this process"""
+
+    QUERY_COUNT_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200]
+    DB_TIME_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, query_count, db_time_ms, duplicate_count):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    'requests': 0,
+                    'total_queries': 0,
+                    'max_queries': 0,
+                    'total_db_time_ms': 0.0,
+                    'max_db_time_ms': 0.0,
+                    'requests_with_duplicates': 0,
+                    'query_count_histogram': [0] * (len(self.QUERY_COUNT_BUCKETS) + 1),
+                    'db_time_histogram': [0] * (len(self.DB_TIME_BUCKETS_MS) + 1)
+                }
+
+            stats['requests'] += 1
+            stats['total_queries'] += query_count
+            stats['max_queries'] = max(stats['max_queries'], query_count)
+            stats['total_db_time_ms'] += db_time_ms
+            stats['max_db_time_ms'] = max(stats['max_db_time_ms'], db_time_ms)
+            if duplicate_count:
+                stats['requests_with_duplicates'] += 1
+            stats['query_count_histogram'][bisect_left(self.QUERY_COUNT_BUCKETS, query_count)] += 1
+            stats['db_time_histogram'][bisect_left(self.DB_TIME_BUCKETS_MS, db_time_ms)] += 1
+
+    def snapshot(self):
+        """Endpoint statistics sorted by total DB time, heaviest first"""
+        with self._lock:
+            endpoints = {
+                name: {key: list(value) if isinstance(value, list) else value
+                       for key, value in stats.items()}
+                for name, stats in self._endpoints.items()
+            }
+
+        results = []
+        for name, stats in endpoints.items():
+            requests = stats['requests']
+            results.append({
+                'endpoint': name,
+                'requests': requests,
+                'avg_queries': round(stats['total_queries'] / requests, 2),
+                'max_queries': stats['max_queries'],
+                'avg_db_time_ms': round(stats['total_db_time_ms'] / requests, 2),
+                'max_db_time_ms': round(stats['max_db_time_ms'], 2),
+                'total_db_time_ms': round(stats['total_db_time_ms'], 2),
+                'requests_with_duplicates': stats['requests_with_duplicates'],
+                'query_count_histogram': self._label(self.QUERY_COUNT_BUCKETS, stats['query_count_histogram']),
+                'db_time_histogram_ms': self._label(self.DB_TIME_BUCKETS_MS, stats['db_time_histogram'])
+            })
+
+        results.sort(key=lambda item: item['total_db_time_ms'], reverse=True)
+        return results
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    @staticmethod
+    def _label(bounds, counts):
+        labels = [f"<={bound}" for bound in bounds] + [f">{bounds[-1]}"]
+        return dict(zip(labels, counts))
+
+
+class QueryInstrumentation:
+    """Middleware that measures the SQL issued by each request.
+
+    Uses the queries Flask-SQLAlchemy records when SQLALCHEMY_RECORD_QUERIES
+    is on. Adds X-DB-* headers outside production, logs requests over the
+    slow thresholds to the 'db' logger (logs/db.log), and aggregates
+    per-endpoint histograms served by /api/admin/system/db-stats.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+        self.stats = EndpointQueryStats()
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize query instrumentation with the Flask app"""
+        self.enabled = app.config.get('SQLALCHEMY_RECORD_QUERIES', False)
+        self.add_headers = app.config.get(
+            'QUERY_STATS_HEADERS', app.config.get('ENV') != 'production'
+        )
+        self.slow_query_count = app.config.get('SLOW_REQUEST_QUERY_COUNT', 50)
+        self.slow_db_time_ms = app.config.get('SLOW_REQUEST_DB_TIME_MS', 500)
+
+        app.extensions['query_instrumentation'] = self
+
+        if self.enabled:
+            app.after_request(self.after_request)
+
+    def after_request(self, response):
+        """Summarize the queries recorded for this request"""
+        try:
+            queries = get_recorded_queries()
+            query_count = len(queries)
+            db_time_ms = sum(query.duration for query in queries) * 1000
+
+            statement_counts = Counter(query.statement for query in queries)
+            duplicates = {
+                statement: count
+                for statement, count in statement_counts.items()
+                if count > 1
+            }
+            duplicate_count = sum(count - 1 for count in duplicates.values())
+
+            endpoint = request.endpoint or 'unknown'
+            self.stats.record(endpoint, query_count, db_time_ms, duplicate_count)
+
+            if self.add_headers:
+                response.headers['X-DB-Query-Count'] = str(query_count)
+                response.headers['X-DB-Time-Ms'] = f"{db_time_ms:.1f}"
+                response.headers['X-DB-Duplicate-Queries'] = str(duplicate_count)
+
+            if query_count >= self.slow_query_count or db_time_ms >= self.slow_db_time_ms:
+                self._log_slow_request(endpoint, queries, query_count, db_time_ms, duplicates)
+
+        except Exception as e:
+            logger.error(f"Error recording query statistics: {str(e)}")
+
+        return response
+
+    def _log_slow_request(self, endpoint, queries, query_count, db_time_ms, duplicates):
+        lines = [
+            f"Slow request {request.method} {request.path} ({endpoint}): "
+            f"{query_count} queries, {db_time_ms:.1f}ms DB time, "
+            f"{sum(count - 1 for count in duplicates.values())} duplicates"
+        ]
+
+        # Repeated statements are the usual N+1 signature
+        for statement, count in sorted(duplicates.items(), key=lambda item: -item[1])[:5]:
+            lines.append(f"  repeated x{count}: {self._shorten(statement)}")
+
+        for query in sorted(queries, key=lambda q: q.duration, reverse=True)[:5]:
+            lines.append(
+                f"  {query.duration * 1000:.1f}ms at {query.location}: {self._shorten(query.statement)}"
+            )
+
+        logger.warning('\n'.join(lines))
+
+    @staticmethod
+    def _shorten(statement, limit=500):
+        statement = ' '.join(statement.split())
+        return statement if len(statement) <= limit else statement[:limit] + '...'
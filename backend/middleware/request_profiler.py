@@ -0,0 +1,75 @@
+import hmac
+import logging
+import random
+from flask import request, g
+from backend.utils.profiling import ProfileStore, start_profiler, stop_profiler
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfiler:
+    """Middleware that runs selected requests under cProfile.
+
+    A request is profiled when it carries the X-Profile header with
+    PROFILING_TOKEN as its value, or when it is picked by
+    PROFILING_SAMPLE_RATE. Without a token the header is ignored, in every
+    environment. When PROFILING_ENABLED is off no hooks are
+    registered at all; when on, unprofiled requests cost one header lookup.
+    Saved profiles are listed and summarized by /api/admin/system/profiles.
+    """
+
+    HEADER = 'X-Profile'
+
+    def __init__(self, app=None):
+        self.app = app
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize request profiling with the Flask app"""
+        self.enabled = app.config.get('PROFILING_ENABLED', False)
+        self.token = app.config.get('PROFILING_TOKEN')
+        self.sample_rate = app.config.get('PROFILING_SAMPLE_RATE', 0.0)
+        self.store = ProfileStore(
+            app.config.get('PROFILE_DIR'),
+            app.config.get('PROFILE_MAX_FILES', 200)
+        )
+
+        app.extensions['request_profiler'] = self
+
+        if self.enabled:
+            app.before_request(self.before_request)
+            app.after_request(self.after_request)
+            app.teardown_request(self.teardown_request)
+
+    def _should_profile(self):
+        header = request.headers.get(self.HEADER)
+        if header is not None and self.token:
+            return hmac.compare_digest(header, self.token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def before_request(self):
+        """Start profiling if this request is selected"""
+        if self._should_profile():
+            g.request_profiler = start_profiler()
+
+    def after_request(self, response):
+        """Save the profile and point the caller at it"""
+        profiler = g.pop('request_profiler', None)
+        if profiler is None:
+            return response
+
+        stop_profiler(profiler)
+        try:
+            profile_id = self.store.save(profiler, f"{request.method}_{request.endpoint or 'unknown'}")
+            response.headers['X-Profile-Id'] = profile_id
+            logger.info(f"Saved profile {profile_id} for {request.method} {request.path}")
+        except Exception as e:
+            logger.error(f"Error saving request profile: {str(e)}")
+        return response
+
+    def teardown_request(self, exc):
+        """Stop a profiler left running by an unhandled exception"""
+        profiler = g.pop('request_profiler', None)
+        if profiler is not None:
+            stop_profiler(profiler)
@@ -7,19 +7,23 @@ All SQLAlchemy models are imported here for easy access.
 # Import all models to make them available
 from .user import User, Student, Faculty
 from .academic import AcademicTerm, Course, CourseOffering, Enrollment
-from .tracking import Attendance, LMSSession, LMSActivity, LMSDailySummary
+from .tracking import Attendance, LMSSession, LMSActivity, LMSDailySummary, LMSActivityDaily, EngagementBaseline
 from .assessment import AssessmentType, Assessment, AssessmentSubmission
-from .prediction import Prediction, FeatureCache,MLFeatureStaging
+from .prediction import Prediction, FeatureCache,MLFeatureStaging, PredictionDirtyEnrollment, FeatureDriftStat, FeatureSchema
 from .alert import AlertType, Alert, Intervention
-from .system import SystemConfig, AuditLog, ModelVersion
+from .system import SystemConfig, AuditLog, ModelVersion, ModelEvaluation
+from .job import BackgroundJob, BackgroundJobResult, JobLock
+from .notification import EmailOutbox
 
 # This is done for easier importing of models in other modules
 __all__ = [
     'User', 'Student', 'Faculty',
     'AcademicTerm', 'Course', 'CourseOffering', 'Enrollment',
-    'Attendance', 'LMSSession', 'LMSActivity', 'LMSDailySummary',
+    'Attendance', 'LMSSession', 'LMSActivity', 'LMSDailySummary', 'LMSActivityDaily', 'EngagementBaseline',
     'AssessmentType', 'Assessment', 'AssessmentSubmission',
-    'Prediction', 'FeatureCache',
+    'Prediction', 'FeatureCache', 'PredictionDirtyEnrollment', 'FeatureDriftStat', 'FeatureSchema',
     'AlertType', 'Alert', 'Intervention',
-    'SystemConfig', 'AuditLog', 'ModelVersion','MLFeatureStaging'
+    'SystemConfig', 'AuditLog', 'ModelVersion', 'ModelEvaluation', 'MLFeatureStaging',
+    'BackgroundJob', 'BackgroundJobResult', 'JobLock',
+    'EmailOutbox'
 ]
\ No newline at end of file
@@ -146,6 +146,7 @@ class Enrollment(db.Model):
     enrollment_status = db.Column(db.Enum('enrolled', 'dropped', 'completed', 'withdrawn'), default='enrolled')
     final_grade = db.Column(db.String(2), nullable=True)
     grade_points = db.Column(db.Numeric(3, 2), nullable=True)
+    last_predicted_at = db.Column(db.DateTime, nullable=True)  # UTC, see DirtyTrackingService.clear
     
     # Relationships
     attendance_records = db.relationship('Attendance', backref='enrollment', lazy=True)
@@ -155,6 +156,7 @@ class Enrollment(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('student_id', 'offering_id', name='unique_enrollment'),
+        db.Index('idx_status_last_predicted', 'enrollment_status', 'last_predicted_at'),
     )
     
     def __init__(self, student_id, offering_id, enrollment_date, **kwargs):
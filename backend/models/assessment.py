@@ -145,8 +145,14 @@ class AssessmentSubmission(db.Model):
         assessment = Assessment.query.get(self.assessment_id)
         if assessment and assessment.max_score:
             self.percentage = (float(score) / float(assessment.max_score)) * 100
-        
+
         db.session.commit()
+
+        # Imported here: the statistics service imports these models
+        from backend.services.assessment_statistics_service import assessment_statistics_service
+        assessment_statistics_service.invalidate(
+            self.assessment_id, assessment.offering_id if assessment else None
+        )
     
     def to_dict(self):
         """Convert submission to dictionary for API responses"""
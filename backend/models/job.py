@@ -0,0 +1,133 @@
+from datetime import datetime
+from backend.extensions import db
+
+class BackgroundJob(db.Model):
+    """Persistent background job processed by the worker pool"""
+    __tablename__ = 'background_jobs'
+
+    job_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    job_type = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.Enum('queued', 'running', 'succeeded', 'failed', name='job_status'), default='queued')
+    priority = db.Column(db.Integer, default=0)
+    dedupe_key = db.Column(db.String(150), unique=True, nullable=True)
+    attempts = db.Column(db.Integer, default=0)
+    max_attempts = db.Column(db.Integer, default=3)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    duration_ms = db.Column(db.Integer, nullable=True)
+    progress_current = db.Column(db.Integer, default=0)
+    progress_total = db.Column(db.Integer, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error_message = db.Column(db.Text, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_status_run_after', 'status', 'run_after'),
+        db.Index('idx_job_type', 'job_type'),
+    )
+
+    def __init__(self, job_type, **kwargs):
+        self.job_type = job_type
+
+        # Optional fields
+        self.payload = kwargs.get('payload')
+        self.status = kwargs.get('status', 'queued')
+        self.priority = kwargs.get('priority', 0)
+        self.dedupe_key = kwargs.get('dedupe_key')
+        self.attempts = kwargs.get('attempts', 0)
+        self.max_attempts = kwargs.get('max_attempts', 3)
+        self.run_after = kwargs.get('run_after', datetime.utcnow())
+        self.progress_current = kwargs.get('progress_current', 0)
+        self.progress_total = kwargs.get('progress_total')
+        self.created_by = kwargs.get('created_by')
+
+    def to_dict(self):
+        """Convert job to dictionary for API responses"""
+        return {
+            'job_id': self.job_id,
+            'job_type': self.job_type,
+            'payload': self.payload,
+            'status': self.status,
+            'priority': self.priority,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'locked_by': self.locked_by,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration_ms': self.duration_ms,
+            'progress': {
+                'current': self.progress_current or 0,
+                'total': self.progress_total
+            },
+            'result': self.result,
+            'error_message': self.error_message,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f"<BackgroundJob {self.job_id}: {self.job_type} ({self.status})>"
+
+
+class JobLock(db.Model):
+    """Expiring named lock used for leader election between workers"""
+    __tablename__ = 'job_locks'
+
+    lock_name = db.Column(db.String(100), primary_key=True)
+    owner = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def __init__(self, lock_name, owner, expires_at):
+        self.lock_name = lock_name
+        self.owner = owner
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return f"<JobLock {self.lock_name}: {self.owner}>"
+
+
+class BackgroundJobResult(db.Model):
+    """Per-item result of a background job (e.g. one row per enrollment)"""
+    __tablename__ = 'background_job_results'
+
+    result_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('background_jobs.job_id', ondelete='CASCADE'), nullable=False)
+    enrollment_id = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.Enum('success', 'error', name='job_result_status'), nullable=False)
+    data = db.Column(db.JSON, nullable=True)
+    error_message = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_job_status', 'job_id', 'status'),
+    )
+
+    def __init__(self, job_id, status, **kwargs):
+        self.job_id = job_id
+        self.status = status
+
+        # Optional fields
+        self.enrollment_id = kwargs.get('enrollment_id')
+        self.data = kwargs.get('data')
+        self.error_message = kwargs.get('error_message')
+
+    def to_dict(self):
+        """Convert job result to dictionary for API responses"""
+        return {
+            'result_id': self.result_id,
+            'job_id': self.job_id,
+            'enrollment_id': self.enrollment_id,
+            'status': self.status,
+            'data': self.data,
+            'error': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f"<BackgroundJobResult {self.result_id}: job {self.job_id} ({self.status})>"
@@ -0,0 +1,69 @@
+from datetime import datetime
+from backend.extensions import db
+
+class EmailOutbox(db.Model):
+    """Outgoing email, written in the same transaction as the event that
+    triggers it and delivered by the outbox sender job"""
+    __tablename__ = 'email_outbox'
+
+    message_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    message_type = db.Column(db.String(50), nullable=False)  # 'student_alert', 'faculty_alert', 'weekly_summary'
+    recipient_email = db.Column(db.String(100), nullable=True)  # resolved by the sender for alert messages
+    recipient_name = db.Column(db.String(100), nullable=True)
+    alert_id = db.Column(db.Integer, db.ForeignKey('alerts.alert_id', ondelete='CASCADE'), nullable=True)
+    context = db.Column(db.JSON, nullable=True)
+    dedupe_key = db.Column(db.String(150), nullable=True, unique=True)  # one message per key, e.g. per recipient and week
+    status = db.Column(db.Enum('pending', 'sending', 'sent', 'skipped', 'failed', name='email_status'), default='pending')
+    attempts = db.Column(db.Integer, default=0)
+    max_attempts = db.Column(db.Integer, default=5)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    error_message = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_outbox_status_next', 'status', 'next_attempt_at'),
+        db.Index('idx_outbox_recipient', 'recipient_email'),
+    )
+
+    # Relationships
+    alert = db.relationship('Alert', lazy=True)
+
+    def __init__(self, message_type, **kwargs):
+        self.message_type = message_type
+
+        # Optional fields
+        self.recipient_email = kwargs.get('recipient_email')
+        self.recipient_name = kwargs.get('recipient_name')
+        self.alert_id = kwargs.get('alert_id')
+        if kwargs.get('alert') is not None:
+            # Unflushed alerts have no id yet; the relationship fills it in
+            self.alert = kwargs['alert']
+        self.context = kwargs.get('context')
+        self.dedupe_key = kwargs.get('dedupe_key')
+        self.status = kwargs.get('status', 'pending')
+        self.attempts = kwargs.get('attempts', 0)
+        self.max_attempts = kwargs.get('max_attempts', 5)
+        self.next_attempt_at = kwargs.get('next_attempt_at', datetime.utcnow())
+
+    def to_dict(self):
+        """Convert outbox message to dictionary for API responses"""
+        return {
+            'message_id': self.message_id,
+            'message_type': self.message_type,
+            'recipient_email': self.recipient_email,
+            'recipient_name': self.recipient_name,
+            'alert_id': self.alert_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.message_id}: {self.message_type} to {self.recipient_email} ({self.status})>"
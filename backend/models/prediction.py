@@ -1,5 +1,99 @@
 from datetime import datetime
+import hashlib
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from backend.extensions import db
+from backend.utils.feature_codec import encode_snapshot, decode_snapshot
+
+
+class FeatureSchema(db.Model):
+    """Ordered feature names of packed feature vectors.
+
+    Schemas are immutable and registered on first use, so lookups are
+    cached per process in both directions.
+    """
+    __tablename__ = 'feature_schemas'
+    
+    schema_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    fingerprint = db.Column(db.String(40), unique=True, nullable=False)  # sha1 of the ordered names
+    feature_count = db.Column(db.Integer, nullable=False)
+    feature_names = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    _ids = {}
+    _names = {}
+    
+    def __init__(self, fingerprint, feature_names):
+        self.fingerprint = fingerprint
+        self.feature_names = feature_names
+        self.feature_count = len(feature_names)
+    
+    @classmethod
+    def resolve(cls, feature_names):
+        """schema_id for an ordered list of feature names, registering it if new"""
+        feature_names = list(feature_names)
+        fingerprint = hashlib.sha1('\n'.join(feature_names).encode('utf-8')).hexdigest()
+        schema_id = cls._ids.get(fingerprint)
+        if schema_id is not None:
+            return schema_id
+        
+        table = cls.__table__
+        lookup = select(table.c.schema_id).where(table.c.fingerprint == fingerprint)
+        # Registered outside the caller's transaction so other workers see it
+        with db.engine.begin() as connection:
+            schema_id = connection.execute(lookup).scalar()
+        if schema_id is None:
+            try:
+                with db.engine.begin() as connection:
+                    schema_id = connection.execute(table.insert().values(
+                        fingerprint=fingerprint,
+                        feature_count=len(feature_names),
+                        feature_names=feature_names,
+                        created_at=datetime.utcnow()
+                    )).inserted_primary_key[0]
+            except IntegrityError:
+                # Registered concurrently by another worker
+                with db.engine.begin() as connection:
+                    schema_id = connection.execute(lookup).scalar()
+        
+        cls._ids[fingerprint] = schema_id
+        cls._names[schema_id] = feature_names
+        return schema_id
+    
+    @classmethod
+    def names_for(cls, schema_id):
+        """Ordered feature names of a schema"""
+        feature_names = cls._names.get(schema_id)
+        if feature_names is None:
+            feature_names = db.session.query(cls.feature_names).filter_by(schema_id=schema_id).scalar()
+            if feature_names is None:
+                raise ValueError(f"Unknown feature schema {schema_id}")
+            cls._names[schema_id] = feature_names
+        return feature_names
+    
+    @classmethod
+    def encode(cls, snapshot):
+        """(schema_id, packed vector) of a {feature: value} snapshot"""
+        feature_names, blob = encode_snapshot(snapshot)
+        return cls.resolve(feature_names), blob
+    
+    @classmethod
+    def decode(cls, schema_id, blob):
+        """{feature: value} snapshot of a packed vector"""
+        return decode_snapshot(cls.names_for(schema_id), blob)
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'schema_id': self.schema_id,
+            'feature_count': self.feature_count,
+            'feature_names': self.feature_names,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
+    def __repr__(self):
+        return f"<FeatureSchema {self.schema_id}: {self.feature_count} features>"
+
 
 class Prediction(db.Model):
     """Prediction model for grade predictions"""
@@ -11,13 +105,23 @@ class Prediction(db.Model):
     predicted_grade = db.Column(db.String(2), nullable=False)
     confidence_score = db.Column(db.Numeric(3, 2), nullable=False)
     risk_level = db.Column(db.Enum('low', 'medium', 'high'), nullable=False)
-    model_version = db.Column(db.String(20), nullable=False)
-    feature_snapshot = db.Column(db.JSON, nullable=True)
+    model_version = db.Column(db.String(50), nullable=False)  # ModelService version, as ModelVersion.version_name
+    # Features are stored packed (see FeatureSchema); the JSON column only
+    # holds rows written before the packed format
+    feature_vector = db.Column(db.LargeBinary, nullable=True)
+    feature_schema_id = db.Column(db.Integer, db.ForeignKey('feature_schemas.schema_id'), nullable=True)
+    feature_snapshot_json = db.Column('feature_snapshot', db.JSON(none_as_null=True), nullable=True)
+    explanation = db.Column(db.JSON, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     model_accuracy = db.Column(db.Numeric(5, 2), nullable=True)
     feature_version = db.Column(db.String(20), default='v1.0')
     
-    def __init__(self, enrollment_id, prediction_date, predicted_grade, confidence_score, risk_level, model_version, feature_snapshot=None):
+    __table_args__ = (
+        db.Index('idx_enrollment_date', 'enrollment_id', 'prediction_date'),
+        db.Index('idx_prediction_date', 'prediction_date'),
+    )
+    
+    def __init__(self, enrollment_id, prediction_date, predicted_grade, confidence_score, risk_level, model_version, feature_snapshot=None, explanation=None):
         self.enrollment_id = enrollment_id
         self.prediction_date = prediction_date
         self.predicted_grade = predicted_grade
@@ -25,10 +129,26 @@ class Prediction(db.Model):
         self.risk_level = risk_level
         self.model_version = model_version
         self.feature_snapshot = feature_snapshot
+        self.explanation = explanation
 
         self.model_accuracy = None
         self.feature_version = 'v1.0'
     
+    @property
+    def feature_snapshot(self):
+        """Features used for the prediction as {feature: value}"""
+        if self.feature_vector is not None:
+            return FeatureSchema.decode(self.feature_schema_id, self.feature_vector)
+        return self.feature_snapshot_json
+    
+    @feature_snapshot.setter
+    def feature_snapshot(self, snapshot):
+        if snapshot is None:
+            self.feature_schema_id, self.feature_vector = None, None
+        else:
+            self.feature_schema_id, self.feature_vector = FeatureSchema.encode(snapshot)
+        self.feature_snapshot_json = None
+    
     def to_dict(self):
         """Convert prediction to dictionary for API responses"""
         return {
@@ -40,6 +160,8 @@ class Prediction(db.Model):
             'risk_level': self.risk_level,
             'model_version': self.model_version,
             'feature_snapshot': self.feature_snapshot,
+            'feature_schema_id': self.feature_schema_id,
+            'explanation': self.explanation,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'model_accuracy': float(self.model_accuracy) if self.model_accuracy else None,
             'feature_version': self.feature_version
@@ -117,7 +239,9 @@ class MLFeatureStaging(db.Model):
     staging_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     enrollment_id = db.Column(db.Integer, db.ForeignKey('enrollments.enrollment_id'), nullable=False)
     calculation_date = db.Column(db.Date, nullable=False)
-    feature_data = db.Column(db.JSON, nullable=False)
+    feature_vector = db.Column(db.LargeBinary, nullable=True)
+    feature_schema_id = db.Column(db.Integer, db.ForeignKey('feature_schemas.schema_id'), nullable=True)
+    feature_data_json = db.Column('feature_data', db.JSON(none_as_null=True), nullable=True)  # rows staged before packing
     is_processed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -126,6 +250,21 @@ class MLFeatureStaging(db.Model):
         self.calculation_date = calculation_date
         self.feature_data = feature_data
     
+    @property
+    def feature_data(self):
+        """Staged features as {feature: value}"""
+        if self.feature_vector is not None:
+            return FeatureSchema.decode(self.feature_schema_id, self.feature_vector)
+        return self.feature_data_json
+    
+    @feature_data.setter
+    def feature_data(self, snapshot):
+        if snapshot is None:
+            self.feature_schema_id, self.feature_vector = None, None
+        else:
+            self.feature_schema_id, self.feature_vector = FeatureSchema.encode(snapshot)
+        self.feature_data_json = None
+    
     def mark_processed(self):
         """Mark this staging record as processed"""
         self.is_processed = True
@@ -143,4 +282,87 @@ class MLFeatureStaging(db.Model):
         }
     
     def __repr__(self):
-        return f"<MLFeatureStaging {self.staging_id} for enrollment {self.enrollment_id}>"
\ No newline at end of file
+        return f"<MLFeatureStaging {self.staging_id} for enrollment {self.enrollment_id}>"
+
+
+class PredictionDirtyEnrollment(db.Model):
+    """Enrollments that received new input since their last prediction"""
+    __tablename__ = 'prediction_dirty_enrollments'
+    
+    enrollment_id = db.Column(db.Integer, db.ForeignKey('enrollments.enrollment_id'), primary_key=True)
+    first_changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_source = db.Column(db.String(20), nullable=True)
+    
+    def __init__(self, enrollment_id, **kwargs):
+        self.enrollment_id = enrollment_id
+        now = datetime.utcnow()
+        self.first_changed_at = kwargs.get('first_changed_at', now)
+        self.last_changed_at = kwargs.get('last_changed_at', now)
+        self.last_source = kwargs.get('last_source')
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'enrollment_id': self.enrollment_id,
+            'first_changed_at': self.first_changed_at.isoformat() if self.first_changed_at else None,
+            'last_changed_at': self.last_changed_at.isoformat() if self.last_changed_at else None,
+            'last_source': self.last_source
+        }
+    
+    def __repr__(self):
+        return f"<PredictionDirtyEnrollment {self.enrollment_id} ({self.last_source})>"
+
+
+class FeatureDriftStat(db.Model):
+    """Streaming statistics of one model feature over one week of predictions.
+
+    sample_count/mean/m2 are Welford aggregates (variance = m2 / count);
+    histogram holds counts over the fixed bins of FeatureDriftService.
+    """
+    __tablename__ = 'feature_drift_stats'
+    
+    stat_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    model_version = db.Column(db.String(50), nullable=False)
+    window_start = db.Column(db.Date, nullable=False)
+    feature_name = db.Column(db.String(100), nullable=False)
+    sample_count = db.Column(db.BigInteger, nullable=False, default=0)
+    mean = db.Column(db.Float, nullable=False, default=0)
+    m2 = db.Column(db.Float, nullable=False, default=0)
+    min_value = db.Column(db.Float, nullable=True)
+    max_value = db.Column(db.Float, nullable=True)
+    histogram = db.Column(db.JSON, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('model_version', 'window_start', 'feature_name', name='unique_drift_window'),
+    )
+    
+    def __init__(self, model_version, window_start, feature_name, histogram, **kwargs):
+        self.model_version = model_version
+        self.window_start = window_start
+        self.feature_name = feature_name
+        self.histogram = histogram
+        self.sample_count = kwargs.get('sample_count', 0)
+        self.mean = kwargs.get('mean', 0)
+        self.m2 = kwargs.get('m2', 0)
+        self.min_value = kwargs.get('min_value')
+        self.max_value = kwargs.get('max_value')
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'model_version': self.model_version,
+            'window_start': self.window_start.isoformat() if self.window_start else None,
+            'feature_name': self.feature_name,
+            'sample_count': self.sample_count,
+            'mean': self.mean,
+            'std': (self.m2 / self.sample_count) ** 0.5 if self.sample_count else None,
+            'min_value': self.min_value,
+            'max_value': self.max_value,
+            'histogram': self.histogram,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def __repr__(self):
+        return f"<FeatureDriftStat {self.feature_name} week of {self.window_start}: n={self.sample_count}>"
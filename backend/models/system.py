@@ -118,11 +118,9 @@ class ModelVersion(db.Model):
         self.is_active = True
         db.session.commit()
         
-        # Update system config
-        config = SystemConfig.query.filter_by(config_key='model_version').first()
-        if config:
-            config.config_value = self.version_name
-            db.session.commit()
+        # Update system config (bumps the config version for every worker)
+        from backend.services.system_config_service import system_config_service
+        system_config_service.update({'model_version': self.version_name})
     
     def to_dict(self):
         """Convert model version to dictionary for API responses"""
@@ -143,4 +141,64 @@ class ModelVersion(db.Model):
         }
     
     def __repr__(self):
-        return f"<ModelVersion {self.version_name}>"
\ No newline at end of file
+        return f"<ModelVersion {self.version_name}>"
+
+class ModelEvaluation(db.Model):
+    """Backtest of a model version over completed terms"""
+    __tablename__ = 'model_evaluations'
+    
+    evaluation_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    version_id = db.Column(db.Integer, db.ForeignKey('model_versions.version_id', ondelete='CASCADE'), nullable=False)
+    status = db.Column(db.Enum('running', 'completed', 'failed'), default='running', nullable=False)
+    term_ids = db.Column(db.JSON, nullable=True)
+    cutoff_offsets = db.Column(db.JSON, nullable=True)  # days after course start
+    enrollment_count = db.Column(db.Integer, default=0)
+    failed_count = db.Column(db.Integer, default=0)
+    # Headline metrics at the last cutoff
+    accuracy = db.Column(db.Numeric(5, 4), nullable=True)
+    auc = db.Column(db.Numeric(5, 4), nullable=True)
+    brier_score = db.Column(db.Numeric(5, 4), nullable=True)
+    median_lead_time_days = db.Column(db.Numeric(6, 1), nullable=True)
+    metrics = db.Column(db.JSON, nullable=True)  # per-cutoff metrics, calibration, lead time
+    error_message = db.Column(db.Text, nullable=True)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    
+    # Relationships
+    model_version = db.relationship('ModelVersion', backref=db.backref('evaluations', lazy='dynamic'))
+    
+    __table_args__ = (
+        db.Index('idx_evaluation_version', 'version_id', 'completed_at'),
+    )
+    
+    def __init__(self, version_id, **kwargs):
+        self.version_id = version_id
+        
+        # Optional fields
+        self.status = kwargs.get('status', 'running')
+        self.term_ids = kwargs.get('term_ids')
+        self.cutoff_offsets = kwargs.get('cutoff_offsets')
+        self.started_at = kwargs.get('started_at', datetime.utcnow())
+    
+    def to_dict(self):
+        """Convert evaluation to dictionary for API responses"""
+        return {
+            'evaluation_id': self.evaluation_id,
+            'version_id': self.version_id,
+            'status': self.status,
+            'term_ids': self.term_ids,
+            'cutoff_offsets': self.cutoff_offsets,
+            'enrollment_count': self.enrollment_count,
+            'failed_count': self.failed_count,
+            'accuracy': float(self.accuracy) if self.accuracy is not None else None,
+            'auc': float(self.auc) if self.auc is not None else None,
+            'brier_score': float(self.brier_score) if self.brier_score is not None else None,
+            'median_lead_time_days': float(self.median_lead_time_days) if self.median_lead_time_days is not None else None,
+            'metrics': self.metrics,
+            'error_message': self.error_message,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+    
+    def __repr__(self):
+        return f"<ModelEvaluation {self.evaluation_id} of version {self.version_id}: {self.status}>"
@@ -193,4 +193,119 @@ class LMSDailySummary(db.Model):
         }
     
     def __repr__(self):
-        return f"<LMSDailySummary {self.enrollment_id} on {self.summary_date}>"
\ No newline at end of file
+        return f"<LMSDailySummary {self.enrollment_id} on {self.summary_date}>"
+
+class LMSActivityDaily(db.Model):
+    """Per-day, per-resource aggregate of LMS activities compacted out of
+    lms_activities by the retention job"""
+    __tablename__ = 'lms_activity_daily'
+    
+    aggregate_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    enrollment_id = db.Column(db.Integer, db.ForeignKey('enrollments.enrollment_id'), nullable=False)
+    activity_date = db.Column(db.Date, nullable=False)
+    activity_type = db.Column(db.Enum(
+        'resource_view', 'forum_post', 'forum_reply', 'assignment_view',
+        'quiz_attempt', 'video_watch', 'file_download', 'page_view'
+    ), nullable=False)
+    resource_id = db.Column(db.String(50), nullable=True)  # NULL: activities without a resource, each counted as distinct
+    activity_count = db.Column(db.Integer, nullable=False, default=0)
+    total_duration_seconds = db.Column(db.Integer, default=0)
+    first_activity_at = db.Column(db.DateTime, nullable=False)
+    last_activity_at = db.Column(db.DateTime, nullable=False)
+    
+    __table_args__ = (
+        db.Index('idx_activity_daily_enrollment', 'enrollment_id', 'activity_date'),
+        db.Index('idx_activity_daily_key', 'enrollment_id', 'activity_date', 'activity_type', 'resource_id'),
+    )
+    
+    def __init__(self, enrollment_id, activity_date, activity_type, first_activity_at, last_activity_at, **kwargs):
+        self.enrollment_id = enrollment_id
+        self.activity_date = activity_date
+        self.activity_type = activity_type
+        self.first_activity_at = first_activity_at
+        self.last_activity_at = last_activity_at
+        
+        # Optional fields
+        self.resource_id = kwargs.get('resource_id')
+        self.activity_count = kwargs.get('activity_count', 0)
+        self.total_duration_seconds = kwargs.get('total_duration_seconds', 0)
+    
+    def to_dict(self):
+        """Convert aggregate to dictionary for API responses"""
+        return {
+            'aggregate_id': self.aggregate_id,
+            'enrollment_id': self.enrollment_id,
+            'activity_date': self.activity_date.isoformat() if self.activity_date else None,
+            'activity_type': self.activity_type,
+            'resource_id': self.resource_id,
+            'activity_count': self.activity_count,
+            'total_duration_seconds': self.total_duration_seconds,
+            'first_activity_at': self.first_activity_at.isoformat() if self.first_activity_at else None,
+            'last_activity_at': self.last_activity_at.isoformat() if self.last_activity_at else None
+        }
+    
+    def __repr__(self):
+        return f"<LMSActivityDaily {self.enrollment_id} {self.activity_type} on {self.activity_date}>"
+
+
+class EngagementBaseline(db.Model):
+    """Rolling engagement distribution of an offering's students, refreshed
+    from lms_daily_summary by the daily summary job"""
+    __tablename__ = 'engagement_baselines'
+    
+    baseline_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    offering_id = db.Column(db.Integer, db.ForeignKey('course_offerings.offering_id'), nullable=False)
+    window_days = db.Column(db.Integer, nullable=False)
+    as_of_date = db.Column(db.Date, nullable=False)
+    student_count = db.Column(db.Integer, nullable=False, default=0)
+    # Per-student average daily activities (resource views + forum posts + pages viewed)
+    mean_activities = db.Column(db.Float, nullable=True)
+    median_activities = db.Column(db.Float, nullable=True)
+    p10_activities = db.Column(db.Float, nullable=True)
+    p25_activities = db.Column(db.Float, nullable=True)
+    p75_activities = db.Column(db.Float, nullable=True)
+    p90_activities = db.Column(db.Float, nullable=True)
+    mean_minutes = db.Column(db.Float, nullable=True)
+    median_minutes = db.Column(db.Float, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('offering_id', 'window_days', name='unique_offering_window'),
+    )
+    
+    def __init__(self, offering_id, window_days, as_of_date, **kwargs):
+        self.offering_id = offering_id
+        self.window_days = window_days
+        self.as_of_date = as_of_date
+        
+        # Statistics
+        self.student_count = kwargs.get('student_count', 0)
+        self.mean_activities = kwargs.get('mean_activities')
+        self.median_activities = kwargs.get('median_activities')
+        self.p10_activities = kwargs.get('p10_activities')
+        self.p25_activities = kwargs.get('p25_activities')
+        self.p75_activities = kwargs.get('p75_activities')
+        self.p90_activities = kwargs.get('p90_activities')
+        self.mean_minutes = kwargs.get('mean_minutes')
+        self.median_minutes = kwargs.get('median_minutes')
+    
+    def to_dict(self):
+        """Convert baseline to dictionary for API responses"""
+        return {
+            'offering_id': self.offering_id,
+            'window_days': self.window_days,
+            'as_of_date': self.as_of_date.isoformat() if self.as_of_date else None,
+            'student_count': self.student_count,
+            'mean_activities': self.mean_activities,
+            'median_activities': self.median_activities,
+            'p10_activities': self.p10_activities,
+            'p25_activities': self.p25_activities,
+            'p75_activities': self.p75_activities,
+            'p90_activities': self.p90_activities,
+            'mean_minutes': self.mean_minutes,
+            'median_minutes': self.median_minutes,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def __repr__(self):
+        return f"<EngagementBaseline {self.offering_id} {self.window_days}d as of {self.as_of_date}>"
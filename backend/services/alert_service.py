@@ -7,7 +7,10 @@ from backend.models import (
     Attendance, LMSDailySummary, Prediction, Assessment,
     AssessmentSubmission, CourseOffering
 )
-from backend.services.email_service import EmailService
+from backend.services.email_outbox_service import email_outbox_service
+from backend.services.system_config_service import system_config_service
+from backend.services.engagement_baseline_service import engagement_baseline_service
+from backend.utils.metrics import metrics
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,47 +19,25 @@ class AlertService:
     """Service for managing student alerts and notifications"""
     
     def __init__(self):
-        self.email_service = EmailService()
-        
         # Initialize thresholds with defaults
-        self._thresholds_loaded = False
         self.ATTENDANCE_THRESHOLD = 70
         self.LOW_ENGAGEMENT_THRESHOLD = 30
         self.FAILING_GRADE_THRESHOLD = 50
         self.MISSING_ASSIGNMENTS_THRESHOLD = 2
+        self._engagement_baselines = None
     
     def _load_thresholds(self):
-        """Load thresholds from database config - called when needed"""
-        if self._thresholds_loaded:
-            return
-            
+        """Refresh thresholds from the cached system config - called when needed"""
         try:
-            from backend.models.system import SystemConfig
-            
-            # Alert thresholds - load from config or use defaults
-            attendance_config = SystemConfig.query.filter_by(config_key='alert_attendance_threshold').first()
-            if attendance_config:
-                self.ATTENDANCE_THRESHOLD = int(attendance_config.config_value)
-            
-            engagement_config = SystemConfig.query.filter_by(config_key='alert_engagement_threshold').first()
-            if engagement_config:
-                self.LOW_ENGAGEMENT_THRESHOLD = int(engagement_config.config_value)
-            
-            grade_config = SystemConfig.query.filter_by(config_key='alert_grade_threshold').first()
-            if grade_config:
-                self.FAILING_GRADE_THRESHOLD = int(grade_config.config_value)
-            
-            assignments_config = SystemConfig.query.filter_by(config_key='alert_missing_threshold').first()
-            if assignments_config:
-                self.MISSING_ASSIGNMENTS_THRESHOLD = int(assignments_config.config_value)
-            
-            self._thresholds_loaded = True
-            logger.info("Alert thresholds loaded from database")
+            self.ATTENDANCE_THRESHOLD = system_config_service.get('alert_attendance_threshold')
+            self.LOW_ENGAGEMENT_THRESHOLD = system_config_service.get('alert_engagement_threshold')
+            self.FAILING_GRADE_THRESHOLD = system_config_service.get('alert_grade_threshold')
+            self.MISSING_ASSIGNMENTS_THRESHOLD = system_config_service.get('alert_missing_threshold')
             
         except Exception as e:
-            logger.warning(f"Could not load thresholds from database, using defaults: {str(e)}")
-            self._thresholds_loaded = True  # Prevent repeated attempts
+            logger.warning(f"Could not load thresholds from config, using defaults: {str(e)}")
         
+    @metrics.timed('alert_check', 'Alert check run latency')
     def check_and_create_alerts(self, enrollment_id: int = None):
         """
         Check all alert conditions and create alerts as needed
@@ -78,6 +59,12 @@ class AlertService:
             
             logger.info(f"Checking alerts for {len(enrollments)} enrollments")
             
+            # Peer baselines for every offering in the run, one lookup
+            self._engagement_baselines = engagement_baseline_service.get_baselines(
+                window_days=7,
+                offering_ids={e.offering_id for e in enrollments if e} if enrollment_id else None
+            )
+            
             for enrollment in enrollments:
                 if enrollment:
                     self._check_attendance_alert(enrollment)
@@ -155,8 +142,10 @@ class AlertService:
             )
             avg_activities = total_activities / len(daily_summaries)
             
-            # Get course average for comparison
+            # Get course median for comparison
             course_avg = self._get_course_average_engagement(enrollment.offering_id)
+            if course_avg is None:
+                return
             
             if avg_activities < (course_avg * self.LOW_ENGAGEMENT_THRESHOLD / 100):
                 recent_alert = self._get_recent_alert(
@@ -168,7 +157,7 @@ class AlertService:
                         enrollment_id=enrollment.enrollment_id,
                         type_name='Low Engagement',
                         severity='info',
-                        message=f"LMS activity is {avg_activities:.1f} per day (course average: {course_avg:.1f})"
+                        message=f"LMS activity is {avg_activities:.1f} per day (course median: {course_avg:.1f})"
                     )
                     
         except Exception as e:
@@ -307,9 +296,10 @@ class AlertService:
             
             logger.info(f"Created {severity} alert for enrollment {enrollment_id}: {type_name}")
             
-            # Send email notification for critical alerts
+            # Queue email notification for critical alerts; the outbox row
+            # commits with the alert and is sent by the outbox job
             if severity == 'critical':
-                self._send_alert_email(alert, enrollment_id)
+                email_outbox_service.enqueue_alert(alert)
                 
         except Exception as e:
             logger.error(f"Error creating alert: {str(e)}")
@@ -331,44 +321,17 @@ class AlertService:
             )
         ).first()
     
-    def _get_course_average_engagement(self, offering_id: int) -> float:
-        """Calculate average engagement for a course"""
-        # This is simplified - in production, calculate from all students
-        return 10.0  # Default average activities per day
-    
-    def _send_alert_email(self, alert: Alert, enrollment_id: int):
-        """Send email notification for critical alerts"""
-        try:
-            # Get student and course info
-            enrollment = Enrollment.query.get(enrollment_id)
-            if not enrollment:
-                return
-            
-            student = enrollment.student
-            course = enrollment.offering.course
-            
-            # Send to student
-            self.email_service.send_alert_email(
-                to_email=student.user.email,
-                student_name=f"{student.first_name} {student.last_name}",
-                alert_type=alert.severity,
-                course_name=course.course_name,
-                message=alert.alert_message
-            )
-            
-            # Also send to faculty for critical alerts
-            if alert.severity == 'critical' and enrollment.offering.faculty:
-                faculty = enrollment.offering.faculty
-                self.email_service.send_faculty_alert_email(
-                    to_email=faculty.user.email,
-                    faculty_name=f"{faculty.first_name} {faculty.last_name}",
-                    student_name=f"{student.first_name} {student.last_name}",
-                    course_name=course.course_name,
-                    alert_message=alert.alert_message
-                )
-                
-        except Exception as e:
-            logger.error(f"Error sending alert email: {str(e)}")
+    def _get_course_average_engagement(self, offering_id: int) -> Optional[float]:
+        """Median daily activities of the course's students over the last 7 days"""
+        if self._engagement_baselines is not None:
+            baseline = self._engagement_baselines.get(offering_id)
+        else:
+            baseline = engagement_baseline_service.get_baseline(offering_id, window_days=7)
+        
+        # No baseline yet (no activity in the course) - nothing to compare with
+        if not baseline or baseline.median_activities is None:
+            return None
+        return baseline.median_activities
     
     def get_student_alerts(self, student_id: int, 
                           unread_only: bool = False) -> List[Dict]:
@@ -10,6 +10,9 @@ import logging
 import os
 from flask import send_file, current_app
 from werkzeug.utils import secure_filename
+from backend.services.assessment_statistics_service import assessment_statistics_service
+from backend.services.dirty_tracking_service import dirty_tracking_service
+from backend.services.file_service import file_service
 
 logger = logging.getLogger(__name__)
 
@@ -313,7 +316,9 @@ class AssessmentService:
                 )
                 db.session.add(submission)
             
+            dirty_tracking_service.mark_dirty(enrollment_id, 'grade')
             db.session.commit()
+            assessment_statistics_service.invalidate(assessment_id, assessment.offering_id)
             return submission, None
             
         except Exception as e:
@@ -425,68 +430,15 @@ class AssessmentService:
     @staticmethod
     def get_assessment_statistics(assessment_id):
         """Get detailed statistics for an assessment"""
-        try:
-            assessment = Assessment.query.get(assessment_id)
-            if not assessment:
-                return None
-            
-            # Get all submissions with scores
-            submissions = AssessmentSubmission.query.filter_by(
-                assessment_id=assessment_id
-            ).filter(
-                AssessmentSubmission.score.isnot(None)
-            ).all()
-            
-            if not submissions:
-                return {
-                    'assessment_id': assessment_id,
-                    'title': assessment.title,
-                    'total_submissions': 0,
-                    'statistics': None
-                }
-            
-            scores = [float(s.score) for s in submissions]
-            max_score = float(assessment.max_score)
-            
-            # Calculate statistics
-            stats = {
-                'total_submissions': len(scores),
-                'average_score': round(sum(scores) / len(scores), 2),
-                'average_percentage': round((sum(scores) / len(scores)) / max_score * 100, 2),
-                'highest_score': max(scores),
-                'lowest_score': min(scores),
-                'median_score': round(sorted(scores)[len(scores) // 2], 2),
-                'grade_distribution': {}
-            }
-            
-            # Calculate grade distribution
-            for score in scores:
-                percentage = (score / max_score) * 100
-                if percentage >= 90:
-                    grade = 'A'
-                elif percentage >= 80:
-                    grade = 'B'
-                elif percentage >= 70:
-                    grade = 'C'
-                elif percentage >= 60:
-                    grade = 'D'
-                else:
-                    grade = 'F'
-                
-                stats['grade_distribution'][grade] = stats['grade_distribution'].get(grade, 0) + 1
-            
-            return {
-                'assessment_id': assessment_id,
-                'title': assessment.title,
-                'max_score': max_score,
-                'statistics': stats
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting assessment statistics: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        stats = assessment_statistics_service.get_assessment_statistics(assessment_id)
+        if stats is None:
             return None
+        
+        result = dict(stats)
+        if result['statistics'] is None:
+            result['total_submissions'] = 0
+        
+        return result
     
     @staticmethod
     def update_assessment(assessment_id, **update_data):
@@ -517,6 +469,7 @@ class AssessmentService:
                     setattr(assessment, field, update_data[field])
             
             db.session.commit()
+            assessment_statistics_service.invalidate(assessment_id, assessment.offering_id)
             logger.info(f"Assessment updated: {assessment.title} (ID: {assessment_id})")
             return assessment, None
             
@@ -631,8 +584,10 @@ class AssessmentService:
             if submission_count > 0:
                 return False, "Cannot delete assessment with existing submissions"
             
+            offering_id = assessment.offering_id
             db.session.delete(assessment)
             db.session.commit()
+            assessment_statistics_service.invalidate(assessment_id, offering_id)
             return True, "Assessment deleted successfully"
             
         except Exception as e:
@@ -778,7 +733,9 @@ class AssessmentService:
                 
                 db.session.add(submission)
             
+            dirty_tracking_service.mark_dirty(enrollment_id, 'submission')
             db.session.commit()
+            assessment_statistics_service.invalidate(assessment_id, assessment.offering_id)
             return submission, None
             
         except Exception as e:
@@ -895,28 +852,78 @@ class AssessmentService:
                 logger.warning(f"No file attached to submission {submission_id}")
                 return None
             
-            # Construct full file path
-            upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
-            full_path = os.path.join(upload_folder, submission.file_path)
-            
-            # Check if file exists
-            if not os.path.exists(full_path):
-                logger.error(f"File not found on disk: {full_path}")
-                return None
-            
-            # Send file
-            return send_file(
-                full_path,
-                as_attachment=True,
+            response = file_service.send_stored_file(
+                submission.file_path,
                 download_name=submission.file_name,
                 mimetype=submission.mime_type
             )
+            if response is None:
+                logger.error(f"File not found on disk: {submission.file_path}")
+            return response
             
         except Exception as e:
             logger.error(f"Error downloading submission file: {str(e)}")
             import traceback
             traceback.print_exc()
             return None
+    
+    @staticmethod
+    def get_submission_archive_entries(assessment_id, faculty_id=None):
+        """Files of every submission to an assessment as (archive name, path) pairs.
+        
+        Returns (assessment, entries), or (None, None) if the assessment
+        doesn't exist or the faculty member doesn't teach it. Paths are
+        resolved up front so the archive can be streamed outside the
+        request context.
+        """
+        try:
+            assessment = Assessment.query.get(assessment_id)
+            if not assessment:
+                return None, None
+            
+            if faculty_id and assessment.offering.faculty_id != faculty_id:
+                logger.warning(f"Faculty {faculty_id} attempted to export submissions for assessment {assessment_id} they don't teach")
+                return None, None
+            
+            rows = db.session.query(
+                AssessmentSubmission.file_path,
+                AssessmentSubmission.file_name,
+                AssessmentSubmission.attempt_number,
+                Student.student_id,
+                Student.first_name,
+                Student.last_name
+            ).join(
+                Enrollment, Enrollment.enrollment_id == AssessmentSubmission.enrollment_id
+            ).join(
+                Student, Student.student_id == Enrollment.student_id
+            ).filter(
+                AssessmentSubmission.assessment_id == assessment_id,
+                AssessmentSubmission.file_path.isnot(None)
+            ).order_by(
+                Student.last_name, Student.first_name, AssessmentSubmission.attempt_number
+            ).all()
+            
+            entries = []
+            used_names = set()
+            for row in rows:
+                full_path = file_service.get_full_path(row.file_path)
+                if not full_path:
+                    logger.warning(f"Skipping missing file for student {row.student_id}: {row.file_path}")
+                    continue
+                
+                folder = secure_filename(f"{row.student_id}_{row.last_name}_{row.first_name}")
+                file_name = secure_filename(row.file_name or '') or os.path.basename(row.file_path)
+                archive_name = f"{folder}/{file_name}"
+                if archive_name in used_names:
+                    archive_name = f"{folder}/attempt{row.attempt_number}_{file_name}"
+                used_names.add(archive_name)
+                entries.append((archive_name, full_path))
+            
+            return assessment, entries
+            
+        except Exception as e:
+            logger.error(f"Error collecting submission files: {str(e)}")
+            return None, None
 
 
 # Create service instance
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+from backend.models import Assessment, AssessmentSubmission, Enrollment
+from backend.extensions import db
+from sqlalchemy import func, case, and_
+from flask import current_app
+from datetime import datetime, timedelta
+import threading
+import logging
+from backend.utils.lazy_import import lazy_import
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+
+class AssessmentStatisticsService:
+    """Statistics engine for assessments and whole course offerings.
+
+    Scalar aggregates (counts, mean, min/max, late submissions, enrolled
+    students) are computed by the database in a single grouped query. The
+    distribution (median, standard deviation, percentiles, histogram and
+    grade bands) is computed with NumPy over one fetched array of scores.
+    Results are cached per process until the next grade write for the
+    assessment, bounded by STATISTICS_CACHE_TTL seconds.
+    """
+
+    PERCENTILES = (10, 25, 50, 75, 90)
+    HISTOGRAM_BINS = 10
+
+    # Lower bounds (percentage) for each grade band, matching the bands used
+    # by the faculty grading views
+    GRADE_BANDS = [('F', 0), ('D', 60), ('C', 70), ('B', 80), ('A', 90)]
+
+    _cache = {}
+    _lock = threading.Lock()
+
+    # =====================================================
+    # PUBLIC API
+    # =====================================================
+
+    @staticmethod
+    def get_assessment_statistics(assessment_id):
+        """Get full statistics for a single assessment"""
+        key = ('assessment', assessment_id)
+        cached = AssessmentStatisticsService._cache_get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            enrolled_count = db.session.query(
+                func.count(Enrollment.enrollment_id)
+            ).filter(
+                Enrollment.offering_id == Assessment.offering_id,
+                Enrollment.enrollment_status == 'enrolled'
+            ).correlate(Assessment).scalar_subquery()
+
+            row = db.session.query(
+                Assessment.assessment_id,
+                Assessment.offering_id,
+                Assessment.title,
+                Assessment.max_score,
+                func.count(AssessmentSubmission.submission_id).label('submitted_count'),
+                func.count(AssessmentSubmission.score).label('graded_count'),
+                func.avg(AssessmentSubmission.score).label('average_score'),
+                func.min(AssessmentSubmission.score).label('lowest_score'),
+                func.max(AssessmentSubmission.score).label('highest_score'),
+                func.sum(
+                    case((AssessmentSubmission.is_late == True, 1), else_=0)
+                ).label('late_count'),
+                enrolled_count.label('total_students')
+            ).outerjoin(
+                AssessmentSubmission,
+                AssessmentSubmission.assessment_id == Assessment.assessment_id
+            ).filter(
+                Assessment.assessment_id == assessment_id
+            ).group_by(
+                Assessment.assessment_id
+            ).first()
+
+            if not row:
+                return None
+
+            max_score = float(row.max_score) if row.max_score else 0.0
+
+            result = {
+                'assessment_id': row.assessment_id,
+                'offering_id': row.offering_id,
+                'title': row.title,
+                'max_score': max_score,
+                'total_students': int(row.total_students or 0),
+                'submitted_count': int(row.submitted_count or 0),
+                'graded_count': int(row.graded_count or 0),
+                'late_count': int(row.late_count or 0),
+                'submission_rate': AssessmentStatisticsService._rate(
+                    row.submitted_count, row.total_students
+                ),
+                'late_rate': AssessmentStatisticsService._rate(
+                    row.late_count, row.submitted_count
+                ),
+                'statistics': None
+            }
+
+            if result['graded_count'] > 0:
+                scores = np.fromiter(
+                    (float(score) for (score,) in db.session.query(
+                        AssessmentSubmission.score
+                    ).filter(
+                        AssessmentSubmission.assessment_id == assessment_id,
+                        AssessmentSubmission.score.isnot(None)
+                    )),
+                    dtype=np.float64
+                )
+
+                percentages = scores / max_score * 100 if max_score > 0 else np.zeros_like(scores)
+                average_score = float(row.average_score)
+
+                stats = {
+                    'average_score': round(average_score, 2),
+                    'average_percentage': round(average_score / max_score * 100, 2) if max_score > 0 else 0.0,
+                    'highest_score': float(row.highest_score),
+                    'lowest_score': float(row.lowest_score)
+                }
+                stats.update(AssessmentStatisticsService._distribution(scores, percentages))
+                result['statistics'] = stats
+
+            AssessmentStatisticsService._cache_set(key, result)
+            return result
+
+        except Exception as e:
+            logger.error(f"Error computing assessment statistics: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    @staticmethod
+    def get_offering_statistics(offering_id):
+        """Get statistics across all assessments of a course offering.
+
+        Scores are compared as percentages since assessments in an offering
+        have different maximum scores.
+        """
+        key = ('offering', offering_id)
+        cached = AssessmentStatisticsService._cache_get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            enrolled_count = db.session.query(
+                func.count(Enrollment.enrollment_id)
+            ).filter(
+                Enrollment.offering_id == offering_id,
+                Enrollment.enrollment_status == 'enrolled'
+            ).scalar_subquery()
+
+            assessment_count = db.session.query(
+                func.count(Assessment.assessment_id)
+            ).filter(
+                Assessment.offering_id == offering_id,
+                Assessment.is_published == True
+            ).scalar_subquery()
+
+            percentage_expr = AssessmentStatisticsService._percentage_expr()
+
+            row = db.session.query(
+                func.count(AssessmentSubmission.submission_id).label('submitted_count'),
+                func.count(AssessmentSubmission.score).label('graded_count'),
+                func.avg(percentage_expr).label('average_percentage'),
+                func.min(percentage_expr).label('lowest_percentage'),
+                func.max(percentage_expr).label('highest_percentage'),
+                func.sum(
+                    case((AssessmentSubmission.is_late == True, 1), else_=0)
+                ).label('late_count'),
+                enrolled_count.label('total_students'),
+                assessment_count.label('assessment_count')
+            ).select_from(
+                AssessmentSubmission
+            ).join(
+                Assessment, Assessment.assessment_id == AssessmentSubmission.assessment_id
+            ).filter(
+                Assessment.offering_id == offering_id,
+                Assessment.is_published == True
+            ).one()
+
+            total_students = int(row.total_students or 0)
+            total_assessments = int(row.assessment_count or 0)
+            expected_submissions = total_students * total_assessments
+
+            result = {
+                'offering_id': offering_id,
+                'total_students': total_students,
+                'assessment_count': total_assessments,
+                'submitted_count': int(row.submitted_count or 0),
+                'graded_count': int(row.graded_count or 0),
+                'late_count': int(row.late_count or 0),
+                'submission_rate': AssessmentStatisticsService._rate(
+                    row.submitted_count, expected_submissions
+                ),
+                'late_rate': AssessmentStatisticsService._rate(
+                    row.late_count, row.submitted_count
+                ),
+                'statistics': None
+            }
+
+            if result['graded_count'] > 0:
+                percentages = np.fromiter(
+                    (float(p) for (p,) in db.session.query(
+                        percentage_expr
+                    ).select_from(
+                        AssessmentSubmission
+                    ).join(
+                        Assessment, Assessment.assessment_id == AssessmentSubmission.assessment_id
+                    ).filter(
+                        Assessment.offering_id == offering_id,
+                        Assessment.is_published == True,
+                        AssessmentSubmission.score.isnot(None),
+                        Assessment.max_score > 0
+                    )),
+                    dtype=np.float64
+                )
+
+                stats = {
+                    'average_percentage': round(float(row.average_percentage or 0), 2),
+                    'highest_percentage': round(float(row.highest_percentage or 0), 2),
+                    'lowest_percentage': round(float(row.lowest_percentage or 0), 2)
+                }
+                stats.update(AssessmentStatisticsService._distribution(percentages, percentages))
+                result['statistics'] = stats
+
+            AssessmentStatisticsService._cache_set(key, result)
+            return result
+
+        except Exception as e:
+            logger.error(f"Error computing offering statistics: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    @staticmethod
+    def invalidate(assessment_id=None, offering_id=None):
+        """Drop cached statistics after a grade or submission write"""
+        with AssessmentStatisticsService._lock:
+            if assessment_id is not None:
+                AssessmentStatisticsService._cache.pop(('assessment', assessment_id), None)
+            if offering_id is not None:
+                AssessmentStatisticsService._cache.pop(('offering', offering_id), None)
+            elif assessment_id is not None:
+                # Offering unknown - drop every offering entry to stay correct
+                for key in [k for k in AssessmentStatisticsService._cache if k[0] == 'offering']:
+                    AssessmentStatisticsService._cache.pop(key, None)
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _distribution(values, percentages):
+        """Compute distribution statistics over a NumPy array of scores"""
+        percentile_values = np.percentile(values, AssessmentStatisticsService.PERCENTILES)
+
+        counts, edges = np.histogram(
+            np.clip(percentages, 0, 100),
+            bins=AssessmentStatisticsService.HISTOGRAM_BINS,
+            range=(0, 100)
+        )
+
+        band_labels = [label for label, _ in AssessmentStatisticsService.GRADE_BANDS]
+        band_edges = [lower for _, lower in AssessmentStatisticsService.GRADE_BANDS[1:]]
+        band_counts = np.bincount(
+            np.digitize(percentages, band_edges),
+            minlength=len(band_labels)
+        )
+
+        return {
+            'total_submissions': int(values.size),
+            'median_score': round(float(np.median(values)), 2),
+            'std_dev': round(float(np.std(values)), 2),
+            'percentiles': {
+                f'p{p}': round(float(v), 2)
+                for p, v in zip(AssessmentStatisticsService.PERCENTILES, percentile_values)
+            },
+            'histogram': [
+                {
+                    'range_start': float(edges[i]),
+                    'range_end': float(edges[i + 1]),
+                    'count': int(counts[i])
+                }
+                for i in range(len(counts))
+            ],
+            'grade_distribution': {
+                label: int(count)
+                for label, count in zip(band_labels, band_counts)
+                if count > 0
+            }
+        }
+
+    @staticmethod
+    def _percentage_expr():
+        """SQL expression for a submission's score as a percentage of max score"""
+        return case(
+            (and_(AssessmentSubmission.score.isnot(None), Assessment.max_score > 0),
+             AssessmentSubmission.score * 100.0 / Assessment.max_score),
+            else_=None
+        )
+
+    @staticmethod
+    def _rate(part, whole):
+        """Percentage rate rounded to two decimals"""
+        part = float(part or 0)
+        whole = float(whole or 0)
+        return round(part / whole * 100, 2) if whole > 0 else 0.0
+
+    @staticmethod
+    def _cache_ttl():
+        try:
+            return current_app.config.get('STATISTICS_CACHE_TTL', 300)
+        except RuntimeError:
+            return 300
+
+    @staticmethod
+    def _cache_get(key):
+        with AssessmentStatisticsService._lock:
+            entry = AssessmentStatisticsService._cache.get(key)
+            if entry and entry[0] > datetime.utcnow():
+                return entry[1]
+            AssessmentStatisticsService._cache.pop(key, None)
+            return None
+
+    @staticmethod
+    def _cache_set(key, value):
+        expires_at = datetime.utcnow() + timedelta(seconds=AssessmentStatisticsService._cache_ttl())
+        with AssessmentStatisticsService._lock:
+            AssessmentStatisticsService._cache[key] = (expires_at, value)
+
+
+# Create service instance
+assessment_statistics_service = AssessmentStatisticsService()
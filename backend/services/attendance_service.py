@@ -3,6 +3,7 @@ from backend.models.tracking import Attendance
 from backend.models.academic import Enrollment, CourseOffering, Course
 from backend.models.user import Student, User
 from backend.extensions import db
+from backend.services.dirty_tracking_service import dirty_tracking_service
 from sqlalchemy import func, desc, and_, case
 from datetime import datetime, date, timedelta
 import logging
@@ -55,6 +56,7 @@ class AttendanceService:
                 db.session.add(attendance_record)
                 logger.info(f"Created new attendance record for enrollment {enrollment_id}")
             
+            dirty_tracking_service.mark_dirty(enrollment_id, 'attendance')
             db.session.commit()
             return attendance_record
             
@@ -352,6 +354,7 @@ class AttendanceService:
         try:
             attendance = Attendance.query.get(attendance_id)
             if attendance:
+                dirty_tracking_service.mark_dirty(attendance.enrollment_id, 'attendance')
                 db.session.delete(attendance)
                 db.session.commit()
                 logger.info(f"Deleted attendance record {attendance_id}")
@@ -0,0 +1,119 @@
+from backend.models import PredictionDirtyEnrollment, Enrollment
+from backend.extensions import db
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.mysql import insert
+from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DirtyTrackingService:
+    """Tracks which enrollments need re-scoring.
+
+    Write paths for attendance, grades/submissions and LMS activity call
+    mark_dirty before committing, so the flag is committed atomically with
+    the new input. Saving a prediction clears the flag and stamps
+    enrollments.last_predicted_at, which the stale check reads instead of
+    scanning prediction history. All timestamps here are UTC.
+    """
+
+    @staticmethod
+    def mark_dirty(enrollment_id, source):
+        """Flag an enrollment as changed; joins the caller's transaction"""
+        DirtyTrackingService.mark_dirty_many([enrollment_id], source)
+
+    @staticmethod
+    def mark_dirty_many(enrollment_ids, source):
+        """Flag several enrollments as changed in one statement; joins the caller's transaction"""
+        enrollment_ids = sorted({e for e in enrollment_ids if e is not None})
+        if not enrollment_ids:
+            return
+
+        now = datetime.utcnow()
+        statement = insert(PredictionDirtyEnrollment).values([
+            {
+                'enrollment_id': enrollment_id,
+                'first_changed_at': now,
+                'last_changed_at': now,
+                'last_source': source
+            }
+            for enrollment_id in enrollment_ids
+        ])
+        # Already dirty: keep first_changed_at, move last_changed_at
+        db.session.execute(statement.on_duplicate_key_update(
+            last_changed_at=statement.inserted.last_changed_at,
+            last_source=statement.inserted.last_source
+        ))
+
+    @staticmethod
+    def clear(enrollment_id, computed_since):
+        """Record a prediction that started at computed_since and clear the flag.
+
+        Changes that arrived while the prediction was running keep the flag.
+        """
+        Enrollment.query.filter(
+            Enrollment.enrollment_id == enrollment_id
+        ).update({
+            Enrollment.last_predicted_at: computed_since
+        }, synchronize_session=False)
+
+        PredictionDirtyEnrollment.query.filter(
+            PredictionDirtyEnrollment.enrollment_id == enrollment_id,
+            PredictionDirtyEnrollment.last_changed_at <= computed_since
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def get_dirty_count():
+        """Number of enrollments waiting to be re-scored"""
+        return db.session.query(func.count(PredictionDirtyEnrollment.enrollment_id)).scalar() or 0
+
+    @staticmethod
+    def get_enrollments_to_rescore(stale_days=None, offering_id=None, limit=None):
+        """Enrolled enrollments that are dirty, never predicted, or stale.
+
+        An enrollment is stale when its latest prediction is older than
+        stale_days, even without new input (pass None to skip that check).
+        """
+        try:
+            conditions = [
+                PredictionDirtyEnrollment.enrollment_id.isnot(None),
+                Enrollment.last_predicted_at.is_(None)
+            ]
+            if stale_days is not None:
+                conditions.append(
+                    Enrollment.last_predicted_at < datetime.utcnow() - timedelta(days=stale_days)
+                )
+
+            query = db.session.query(
+                Enrollment.enrollment_id
+            ).outerjoin(
+                PredictionDirtyEnrollment,
+                PredictionDirtyEnrollment.enrollment_id == Enrollment.enrollment_id
+            ).filter(
+                Enrollment.enrollment_status == 'enrolled',
+                or_(*conditions)
+            )
+
+            if offering_id:
+                query = query.filter(Enrollment.offering_id == offering_id)
+
+            # Oldest pending changes first
+            query = query.order_by(
+                PredictionDirtyEnrollment.first_changed_at.is_(None),
+                PredictionDirtyEnrollment.first_changed_at,
+                Enrollment.enrollment_id
+            )
+
+            if limit:
+                query = query.limit(limit)
+
+            return [row.enrollment_id for row in query.all()]
+
+        except Exception as e:
+            logger.error(f"Error getting enrollments to rescore: {str(e)}")
+            return []
+
+
+# Create service instance
+dirty_tracking_service = DirtyTrackingService()
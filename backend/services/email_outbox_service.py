@@ -0,0 +1,330 @@
+from backend.models import (
+    EmailOutbox, Alert, Enrollment, Student, Faculty, User, Course, CourseOffering
+)
+from backend.extensions import db, mail
+from backend.services.email_service import EmailService
+from backend.utils.metrics import metrics
+from sqlalchemy.orm import aliased
+from flask import current_app
+from datetime import datetime, timedelta
+from collections import OrderedDict
+import smtplib
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+emails_total = metrics.counter('emails_total', 'Outbox emails by outcome')
+
+# Message types that are merged into one digest per recipient per batch
+DIGEST_TYPES = {'student_alert', 'faculty_alert'}
+
+# SMTP errors that mean the connection is gone, not that one message is bad
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+class EmailOutboxService:
+    """Service class for the transactional email outbox.
+
+    Producers add outbox rows to their own session without committing, so
+    an email exists exactly when the alert (or summary run) that caused it
+    is committed and SMTP is never on the producer's critical path. The
+    send_email_outbox job drains the table over one SMTP connection per
+    batch, merging alerts for the same recipient into a digest.
+    """
+
+    def __init__(self):
+        self.email_service = EmailService()
+
+    @staticmethod
+    def enqueue(message_type, recipient_email=None, recipient_name=None,
+                context=None, alert=None):
+        """Add a message to the current transaction (the caller commits)"""
+        message = EmailOutbox(
+            message_type=message_type,
+            recipient_email=recipient_email,
+            recipient_name=recipient_name,
+            context=context,
+            alert=alert,
+            max_attempts=current_app.config.get('MAIL_MAX_ATTEMPTS', 5)
+        )
+        db.session.add(message)
+        return message
+
+    @staticmethod
+    def enqueue_alert(alert, notify_faculty=True):
+        """Queue the student (and faculty) notifications for an alert.
+
+        Recipients are resolved when the batch is sent, so this never
+        loads the enrollment graph inside the alert sweep.
+        """
+        messages = [EmailOutboxService.enqueue('student_alert', alert=alert)]
+        if notify_faculty:
+            messages.append(EmailOutboxService.enqueue('faculty_alert', alert=alert))
+        return messages
+
+    def send_pending(self, batch_size=None):
+        """Claim and send one batch of due messages.
+
+        Returns counts of sent, skipped, retrying and failed messages.
+        """
+        batch_size = batch_size or current_app.config.get('MAIL_BATCH_SIZE', 200)
+        stats = {'sent': 0, 'skipped': 0, 'retrying': 0, 'failed': 0}
+
+        self.release_stale_claims()
+        token = uuid.uuid4().hex
+        messages = self._claim(token, batch_size)
+        if not messages:
+            return stats
+
+        try:
+            groups, unresolved = self._group(messages)
+            for message in unresolved:
+                self._mark(message, 'skipped', stats, error='No recipient')
+
+            if not current_app.config.get('MAIL_ENABLED', False):
+                for group in groups.values():
+                    for message in group['messages']:
+                        logger.info(f"Email disabled - would send {message.message_type} "
+                                    f"to {group['email']}")
+                        self._mark(message, 'skipped', stats, error='Email disabled')
+                db.session.commit()
+                return stats
+
+            self._deliver(groups, stats)
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error sending outbox batch: {str(e)}")
+            # Anything still claimed goes back to pending on the next sweep
+            EmailOutbox.query.filter(
+                EmailOutbox.locked_by == token,
+                EmailOutbox.status == 'sending'
+            ).update({
+                EmailOutbox.status: 'pending',
+                EmailOutbox.locked_by: None
+            }, synchronize_session=False)
+            db.session.commit()
+            raise
+
+        logger.info(f"Outbox batch: {stats['sent']} sent, {stats['retrying']} retrying, "
+                    f"{stats['failed']} failed, {stats['skipped']} skipped")
+        return stats
+
+    def _claim(self, token, batch_size):
+        now = datetime.utcnow()
+        candidate_ids = [
+            message_id for (message_id,) in db.session.query(EmailOutbox.message_id).filter(
+                EmailOutbox.status == 'pending',
+                EmailOutbox.next_attempt_at <= now
+            ).order_by(EmailOutbox.message_id).limit(batch_size).all()
+        ]
+        if not candidate_ids:
+            return []
+
+        # Conditional update - concurrent senders never claim the same row
+        EmailOutbox.query.filter(
+            EmailOutbox.message_id.in_(candidate_ids),
+            EmailOutbox.status == 'pending'
+        ).update({
+            EmailOutbox.status: 'sending',
+            EmailOutbox.locked_by: token,
+            EmailOutbox.locked_at: now,
+            EmailOutbox.attempts: EmailOutbox.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+
+        return EmailOutbox.query.filter(
+            EmailOutbox.locked_by == token,
+            EmailOutbox.status == 'sending'
+        ).order_by(EmailOutbox.message_id).all()
+
+    def _group(self, messages):
+        """Resolve recipients and group messages into one email each"""
+        alert_info = self._load_alert_info(
+            {m.alert_id for m in messages if m.alert_id is not None}
+        )
+
+        groups = OrderedDict()
+        unresolved = []
+        for message in messages:
+            info = alert_info.get(message.alert_id) if message.alert_id else None
+            if message.message_type == 'student_alert' and info:
+                email, name = info['student_email'], info['student_name']
+                item = {'alert_type': info['severity'], 'course_name': info['course_name'],
+                        'message': info['message']}
+            elif message.message_type == 'faculty_alert' and info:
+                email, name = info['faculty_email'], info['faculty_name']
+                item = {'student_name': info['student_name'], 'course_name': info['course_name'],
+                        'message': info['message']}
+            else:
+                email, name, item = message.recipient_email, message.recipient_name, message.context
+
+            if not email:
+                unresolved.append(message)
+                continue
+
+            if message.message_type in DIGEST_TYPES:
+                key = (message.message_type, email)
+            else:
+                key = (message.message_type, message.message_id)
+
+            group = groups.setdefault(key, {
+                'type': message.message_type, 'email': email, 'name': name,
+                'items': [], 'messages': []
+            })
+            group['items'].append(item)
+            group['messages'].append(message)
+
+        return groups, unresolved
+
+    @staticmethod
+    def _load_alert_info(alert_ids):
+        """Names, emails and course for a set of alerts in one query"""
+        if not alert_ids:
+            return {}
+
+        student_user = aliased(User)
+        faculty_user = aliased(User)
+        rows = db.session.query(
+            Alert.alert_id, Alert.severity, Alert.alert_message,
+            Course.course_name,
+            Student.first_name, Student.last_name, student_user.email,
+            Faculty.first_name, Faculty.last_name, faculty_user.email
+        ).join(
+            Enrollment, Alert.enrollment_id == Enrollment.enrollment_id
+        ).join(
+            Student, Enrollment.student_id == Student.student_id
+        ).join(
+            student_user, Student.user_id == student_user.user_id
+        ).join(
+            CourseOffering, Enrollment.offering_id == CourseOffering.offering_id
+        ).join(
+            Course, CourseOffering.course_id == Course.course_id
+        ).outerjoin(
+            Faculty, CourseOffering.faculty_id == Faculty.faculty_id
+        ).outerjoin(
+            faculty_user, Faculty.user_id == faculty_user.user_id
+        ).filter(Alert.alert_id.in_(alert_ids)).all()
+
+        return {
+            row[0]: {
+                'severity': row[1],
+                'message': row[2],
+                'course_name': row[3],
+                'student_name': f"{row[4]} {row[5]}",
+                'student_email': row[6],
+                'faculty_name': f"{row[7]} {row[8]}" if row[7] else None,
+                'faculty_email': row[9]
+            }
+            for row in rows
+        }
+
+    def _build_messages(self, groups):
+        """Render every group, one compiled template per message type"""
+        by_type = {}
+        for group in groups:
+            by_type.setdefault(group['type'], []).append(group)
+
+        for message_type, typed_groups in by_type.items():
+            try:
+                messages = self.email_service.build_batch(message_type, typed_groups)
+            except Exception as e:
+                logger.error(f"Error building {message_type} emails: {str(e)}")
+                messages = [None] * len(typed_groups)
+            for group, message in zip(typed_groups, messages):
+                group['message'] = message
+
+    def _deliver(self, groups, stats):
+        """Send every group over one SMTP connection"""
+        pending = list(groups.values())
+        self._build_messages(pending)
+        try:
+            with mail.connect() as connection:
+                while pending:
+                    group = pending[0]
+                    try:
+                        if group['message'] is None:
+                            raise ValueError('Template rendering failed')
+                        connection.send(group['message'])
+                    except CONNECTION_ERRORS:
+                        raise
+                    except Exception as e:
+                        # This message is bad (refused recipient, template
+                        # error); the rest of the batch carries on
+                        logger.error(f"Error sending email to {group['email']}: {str(e)}")
+                        for message in group['messages']:
+                            self._retry_or_fail(message, str(e), stats)
+                    else:
+                        for message in group['messages']:
+                            self._mark(message, 'sent', stats)
+                    pending.pop(0)
+
+        except CONNECTION_ERRORS + (smtplib.SMTPException, OSError) as e:
+            logger.warning(f"SMTP connection failed, {len(pending)} emails deferred: {str(e)}")
+            for group in pending:
+                for message in group['messages']:
+                    self._retry_or_fail(message, str(e), stats)
+
+    @staticmethod
+    def _mark(message, status, stats, error=None):
+        message.status = status
+        message.locked_by = None
+        message.error_message = error
+        if status == 'sent':
+            message.sent_at = datetime.utcnow()
+        stats[status] += 1
+        emails_total.inc(status=status)
+
+    @staticmethod
+    def _retry_or_fail(message, error, stats):
+        """Reschedule with exponential backoff, or fail after max_attempts"""
+        message.locked_by = None
+        message.error_message = error
+        if message.attempts < message.max_attempts:
+            base = current_app.config.get('MAIL_RETRY_BACKOFF', 60)
+            delay = min(base * (2 ** (message.attempts - 1)), 6 * 3600)
+            message.status = 'pending'
+            message.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            stats['retrying'] += 1
+            emails_total.inc(status='retrying')
+        else:
+            message.status = 'failed'
+            stats['failed'] += 1
+            emails_total.inc(status='failed')
+
+    @staticmethod
+    def release_stale_claims():
+        """Return messages claimed by a sender that died to the queue"""
+        try:
+            timeout = current_app.config.get('MAIL_LOCK_TIMEOUT', 600)
+            cutoff = datetime.utcnow() - timedelta(seconds=timeout)
+            released = EmailOutbox.query.filter(
+                EmailOutbox.status == 'sending',
+                EmailOutbox.locked_at < cutoff
+            ).update({
+                EmailOutbox.status: 'pending',
+                EmailOutbox.locked_by: None
+            }, synchronize_session=False)
+            db.session.commit()
+            if released:
+                logger.warning(f"Released {released} stale outbox claims")
+            return released
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error releasing stale outbox claims: {str(e)}")
+            return 0
+
+    @staticmethod
+    def get_status_counts():
+        """Message counts by status, for monitoring"""
+        rows = db.session.query(
+            EmailOutbox.status, db.func.count(EmailOutbox.message_id)
+        ).group_by(EmailOutbox.status).all()
+        return {status: count for status, count in rows}
+
+
+# Create service instance
+email_outbox_service = EmailOutboxService()
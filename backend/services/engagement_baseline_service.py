@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta, date
+from typing import Dict, Iterable, Optional
+from flask import current_app
+from sqlalchemy import func
+from backend.extensions import db
+from backend.models import LMSDailySummary, Enrollment, EngagementBaseline
+from backend.utils.lazy_import import lazy_import
+import logging
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+
+class EngagementBaselineService:
+    """Per-offering engagement distributions for peer comparisons.
+
+    A student's engagement over a window is their average daily activities
+    (resource views + forum posts + pages viewed) across the days they have
+    an lms_daily_summary row - the same measure the Low Engagement alert
+    uses. One engagement_baselines row per offering and window holds the
+    mean and percentiles of that measure across the offering's enrolled
+    students, so readers do a keyed lookup instead of scanning summaries.
+    """
+
+    def refresh(self, as_of: Optional[date] = None) -> Dict[int, int]:
+        """
+        Recompute the baselines of every offering with activity in each window
+
+        Args:
+            as_of: Last day of the windows (default yesterday)
+
+        Returns:
+            Dictionary of window_days to number of offerings refreshed
+        """
+        if as_of is None:
+            as_of = datetime.now().date() - timedelta(days=1)
+        windows = current_app.config.get('ENGAGEMENT_BASELINE_WINDOWS', [7, 28])
+
+        refreshed = {}
+        try:
+            for window_days in windows:
+                refreshed[window_days] = self._refresh_window(as_of, window_days)
+            db.session.commit()
+            logger.info(f"Engagement baselines as of {as_of} refreshed: {refreshed}")
+            return refreshed
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error refreshing engagement baselines: {str(e)}")
+            raise
+
+    def _refresh_window(self, as_of: date, window_days: int) -> int:
+        start = as_of - timedelta(days=window_days - 1)
+        activities = (LMSDailySummary.resource_views + LMSDailySummary.forum_posts
+                      + LMSDailySummary.pages_viewed)
+
+        # One row per enrolled student with activity in the window
+        rows = db.session.query(
+            Enrollment.offering_id,
+            func.sum(activities).label('activities'),
+            func.sum(LMSDailySummary.total_minutes).label('minutes'),
+            func.count(LMSDailySummary.summary_id).label('days')
+        ).join(
+            Enrollment, LMSDailySummary.enrollment_id == Enrollment.enrollment_id
+        ).filter(
+            LMSDailySummary.summary_date.between(start, as_of),
+            Enrollment.enrollment_status == 'enrolled'
+        ).group_by(
+            Enrollment.offering_id, LMSDailySummary.enrollment_id
+        ).all()
+
+        per_offering = defaultdict(lambda: ([], []))
+        for row in rows:
+            per_offering[row.offering_id][0].append(float(row.activities or 0) / row.days)
+            per_offering[row.offering_id][1].append(float(row.minutes or 0) / row.days)
+
+        existing = {
+            baseline.offering_id: baseline
+            for baseline in EngagementBaseline.query.filter_by(window_days=window_days).all()
+        }
+
+        for offering_id, (daily_activities, daily_minutes) in per_offering.items():
+            baseline = existing.pop(offering_id, None)
+            if baseline is None:
+                baseline = EngagementBaseline(offering_id, window_days, as_of)
+                db.session.add(baseline)
+            elif baseline.as_of_date > as_of:
+                # A newer refresh already covered this offering
+                continue
+
+            daily_activities = np.array(daily_activities)
+            p10, p25, p50, p75, p90 = np.percentile(daily_activities, [10, 25, 50, 75, 90])
+            baseline.as_of_date = as_of
+            baseline.student_count = len(daily_activities)
+            baseline.mean_activities = round(float(daily_activities.mean()), 2)
+            baseline.median_activities = round(float(p50), 2)
+            baseline.p10_activities = round(float(p10), 2)
+            baseline.p25_activities = round(float(p25), 2)
+            baseline.p75_activities = round(float(p75), 2)
+            baseline.p90_activities = round(float(p90), 2)
+            baseline.mean_minutes = round(float(np.mean(daily_minutes)), 2)
+            baseline.median_minutes = round(float(np.median(daily_minutes)), 2)
+
+        # Offerings with no activity left in the window have no baseline
+        for baseline in existing.values():
+            if baseline.as_of_date < as_of:
+                db.session.delete(baseline)
+
+        return len(per_offering)
+
+    @staticmethod
+    def get_baselines(window_days: int = 7,
+                      offering_ids: Optional[Iterable[int]] = None) -> Dict[int, EngagementBaseline]:
+        """Baselines of one window keyed by offering_id, in one query"""
+        query = EngagementBaseline.query.filter_by(window_days=window_days)
+        if offering_ids is not None:
+            query = query.filter(EngagementBaseline.offering_id.in_(list(offering_ids)))
+        return {baseline.offering_id: baseline for baseline in query.all()}
+
+    @staticmethod
+    def get_baseline(offering_id: int, window_days: int = 7) -> Optional[EngagementBaseline]:
+        """Baseline of one offering and window"""
+        return EngagementBaseline.query.filter_by(
+            offering_id=offering_id, window_days=window_days
+        ).first()
+
+
+# Create service instance
+engagement_baseline_service = EngagementBaselineService()
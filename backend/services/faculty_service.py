@@ -4,10 +4,11 @@ from backend.models import (
     AssessmentType, User, 
 )
 from backend.extensions import db
-from sqlalchemy import func, and_, or_, desc
+from sqlalchemy import func, and_, or_, desc, case
 from datetime import datetime, timedelta
 import logging
 from sqlalchemy import distinct  
+from backend.services.assessment_statistics_service import assessment_statistics_service
 
 
 logger = logging.getLogger(__name__)
@@ -861,57 +862,65 @@ class FacultyService:
             
             offering, course_code, course_name, credits = course_offering
             
-            # Get enrollment statistics
-            total_enrolled = Enrollment.query.filter_by(
-                offering_id=offering_id,
-                enrollment_status='enrolled'
-            ).count()
-            
-            # Get attendance statistics
-            avg_attendance = db.session.query(
-                func.avg(
-                    func.count(Attendance.attendance_id).filter(
-                        Attendance.status == 'present'
-                    ) * 100.0 / func.count(Attendance.attendance_id)
-                )
+            enrolled = and_(
+                Enrollment.offering_id == offering_id,
+                Enrollment.enrollment_status == 'enrolled'
+            )
+
+            # Attendance rate per enrolled student, averaged by the database
+            attendance_rates = db.session.query(
+                (func.sum(case((Attendance.status == 'present', 1), else_=0)) * 100.0
+                 / func.count(Attendance.attendance_id)).label('rate')
             ).join(
                 Enrollment, Enrollment.enrollment_id == Attendance.enrollment_id
             ).filter(
-                Enrollment.offering_id == offering_id,
-                Enrollment.enrollment_status == 'enrolled'
+                enrolled
             ).group_by(
                 Enrollment.enrollment_id
+            ).subquery()
+
+            avg_attendance = db.session.query(
+                func.avg(attendance_rates.c.rate)
             ).scalar() or 0
-            
-            # Get grade distribution
-            grade_distribution = db.session.query(
+
+            # Enrollment, grade distribution and at-risk counts from each
+            # enrolled student's latest prediction, in one grouped query
+            latest_prediction = db.session.query(
+                Prediction.enrollment_id,
+                func.max(Prediction.prediction_id).label('prediction_id')
+            ).group_by(
+                Prediction.enrollment_id
+            ).subquery()
+
+            grade_rows = db.session.query(
                 Prediction.predicted_grade,
-                func.count(Prediction.predicted_grade)
-            ).join(
-                Enrollment, Enrollment.enrollment_id == Prediction.enrollment_id
+                func.count(Enrollment.enrollment_id).label('students'),
+                func.sum(case(
+                    (or_(
+                        Prediction.predicted_grade.in_(['D', 'F']),
+                        Prediction.risk_level.in_(['high', 'very_high'])
+                    ), 1),
+                    else_=0
+                )).label('at_risk')
+            ).select_from(
+                Enrollment
+            ).outerjoin(
+                latest_prediction, latest_prediction.c.enrollment_id == Enrollment.enrollment_id
+            ).outerjoin(
+                Prediction, Prediction.prediction_id == latest_prediction.c.prediction_id
             ).filter(
-                Enrollment.offering_id == offering_id,
-                Enrollment.enrollment_status == 'enrolled'
+                enrolled
             ).group_by(
                 Prediction.predicted_grade
             ).all()
-            
-            grade_dist_dict = dict(grade_distribution) if grade_distribution else {}
-            
-            # Get at-risk student count
-            at_risk_count = db.session.query(
-                func.count(Enrollment.enrollment_id)
-            ).join(
-                Prediction, Prediction.enrollment_id == Enrollment.enrollment_id
-            ).filter(
-                Enrollment.offering_id == offering_id,
-                Enrollment.enrollment_status == 'enrolled',
-                or_(
-                    Prediction.predicted_grade.in_(['D', 'F']),
-                    Prediction.risk_level.in_(['high', 'very_high'])
-                )
-            ).scalar() or 0
-            
+
+            total_enrolled = sum(row.students for row in grade_rows)
+            at_risk_count = int(sum(row.at_risk or 0 for row in grade_rows))
+            grade_dist_dict = {
+                row.predicted_grade: row.students
+                for row in grade_rows if row.predicted_grade is not None
+            }
+
             return {
                 'offering_id': offering_id,
                 'course_code': course_code,
@@ -920,9 +929,10 @@ class FacultyService:
                 'section': offering.section_number,
                 'capacity': offering.capacity,
                 'enrolled_count': total_enrolled,
-                'attendance_rate': round(avg_attendance, 2),
+                'attendance_rate': round(float(avg_attendance), 2),
                 'at_risk_count': at_risk_count,
                 'grade_distribution': grade_dist_dict,
+                'assessment_statistics': assessment_statistics_service.get_offering_statistics(offering_id),
                 'meeting_pattern': offering.meeting_pattern,
                 'location': offering.location
             }
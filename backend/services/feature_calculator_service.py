@@ -1,28 +1,72 @@
+from __future__ import annotations
+
 import json
-import numpy as np
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from sqlalchemy import func
 from backend.extensions import db
 from backend.models import (
-    Enrollment, Attendance, LMSSession, LMSActivity, 
+    Enrollment, Attendance, LMSSession, LMSActivity, LMSActivityDaily,
     AssessmentSubmission, Assessment, LMSDailySummary, Student
 )
 from backend.utils.helpers import safe_float, safe_int
+from backend.utils.lazy_import import lazy_import
+from backend.utils.metrics import metrics
 import logging
 
+np = lazy_import('numpy')
+
 logger = logging.getLogger(__name__)
 
 class FeatureCalculator:
     """Calculate features matching OULAD format for ML model prediction"""
     
-    def __init__(self):
-        # Load feature list from model metadata
-        with open('ml_models/feature_list.json', 'r') as f:
-            self.feature_list = json.load(f)
+    # VLE clicks credited per LMS activity type and attendance status
+    CLICK_MAPPING = {
+        'resource_view': 1,
+        'forum_post': 5,
+        'forum_reply': 3,
+        'assignment_view': 2,
+        'quiz_attempt': 10,
+        'video_watch': 1,
+        'file_download': 2,
+        'page_view': 1
+    }
+    ATTENDANCE_CLICKS = {'present': 30, 'late': 15}
+    
+    # Assessment type names mapped to the model's CMA/TMA/Exam groups
+    ASSESSMENT_TYPE_MAPPING = {
+        # Map to CMA (Continuous Assessment)
+        'Quiz': 'CMA',
+        'Assignment': 'CMA',
+        'Participation': 'CMA',
+        
+        # Map to TMA (Tutor Marked Assessment)
+        'Midterm Exam': 'TMA',
+        'CMA': 'TMA',  # Your CMA maps to model's TMA
+        'TMA': 'TMA',
         
-        logger.info(f"Feature calculator initialized with {len(self.feature_list)} features")
+        # Map to Exam
+        'Final Exam': 'Exam',
+        'Exam': 'Exam'
+    }
+    
+    # Feature list from model metadata, read once per process on first use
+    _feature_list = None
+    _load_lock = threading.Lock()
     
+    @property
+    def feature_list(self) -> List[str]:
+        if FeatureCalculator._feature_list is None:
+            with FeatureCalculator._load_lock:
+                if FeatureCalculator._feature_list is None:
+                    with open('ml_models/feature_list.json', 'r') as f:
+                        FeatureCalculator._feature_list = json.load(f)
+                    logger.info(f"Feature calculator loaded {len(FeatureCalculator._feature_list)} features")
+        return FeatureCalculator._feature_list
+    
+    @metrics.timed('feature_calculation', 'Feature calculation latency per enrollment')
     def calculate_features_for_enrollment(self, enrollment_id: int, 
                                         as_of_date: Optional[datetime] = None) -> Dict:
         """
@@ -65,30 +109,15 @@ class FeatureCalculator:
         ).all()
         
         for attendance in attendance_records:
-            if attendance.status == 'present':
-                vle_records.append({
-                    'date': (attendance.attendance_date - self._get_course_start_date(enrollment_id)).days,
-                    'id_site': f'attendance_{attendance.attendance_id}',
-                    'sum_click': 30
-                })
-            elif attendance.status == 'late':
+            if attendance.status in self.ATTENDANCE_CLICKS:
                 vle_records.append({
                     'date': (attendance.attendance_date - self._get_course_start_date(enrollment_id)).days,
                     'id_site': f'attendance_{attendance.attendance_id}',
-                    'sum_click': 15
+                    'sum_click': self.ATTENDANCE_CLICKS[attendance.status]
                 })
         
         # Convert LMS activities to VLE format
-        click_mapping = {
-            'resource_view': 1,
-            'forum_post': 5,
-            'forum_reply': 3,
-            'assignment_view': 2,
-            'quiz_attempt': 10,
-            'video_watch': 1,
-            'file_download': 2,
-            'page_view': 1
-        }
+        click_mapping = self.CLICK_MAPPING
         
         activities = LMSActivity.query.join(LMSSession).filter(
             LMSSession.enrollment_id == enrollment_id,
@@ -102,6 +131,27 @@ class FeatureCalculator:
                 'sum_click': click_mapping.get(activity.activity_type, 1)
             })
         
+        # Activities past the retention window live on as daily aggregates
+        aggregates = LMSActivityDaily.query.filter(
+            LMSActivityDaily.enrollment_id == enrollment_id,
+            LMSActivityDaily.last_activity_at <= as_of_date
+        ).all()
+        
+        for aggregate in aggregates:
+            date = (aggregate.activity_date - self._get_course_start_date(enrollment_id)).days
+            clicks = click_mapping.get(aggregate.activity_type, 1) * aggregate.activity_count
+            if aggregate.resource_id:
+                vle_records.append({'date': date, 'id_site': aggregate.resource_id, 'sum_click': clicks})
+            else:
+                # Each activity without a resource counted as its own material;
+                # keep the distinct ids, with the clicks on the first
+                for i in range(aggregate.activity_count):
+                    vle_records.append({
+                        'date': date,
+                        'id_site': f'compacted_{aggregate.aggregate_id}_{i}',
+                        'sum_click': clicks if i == 0 else 0
+                    })
+        
         return vle_records
     
     def _get_course_start_date(self, enrollment_id: int):
@@ -225,21 +275,7 @@ class FeatureCalculator:
         exam_scores = [] # Final exams (Final Exam, Exam)
         
         # Type mapping based on your assessment_types table
-        TYPE_MAPPING = {
-           # Map to CMA (Continuous Assessment)
-        'Quiz': 'CMA',
-        'Assignment': 'CMA',
-        'Participation': 'CMA',
-        
-        # Map to TMA (Tutor Marked Assessment)
-        'Midterm Exam': 'TMA',
-        'CMA': 'TMA',  # Your CMA maps to model's TMA
-        'TMA': 'TMA',
-        
-        # Map to Exam
-        'Final Exam': 'Exam',
-        'Exam': 'Exam'
-        }
+        TYPE_MAPPING = self.ASSESSMENT_TYPE_MAPPING
         
         for submission in submissions:
             if submission.assessment and submission.score is not None:
@@ -268,9 +304,11 @@ class FeatureCalculator:
         features['avg_score_exam'] = np.mean(exam_scores) if exam_scores else 0
         
         # Log the calculated averages for debugging
-        logger.info(f"Enrollment {enrollment_id} - CMA: {features['avg_score_cma']:.2f} ({len(cma_scores)} scores), "
-                    f"TMA: {features['avg_score_tma']:.2f} ({len(tma_scores)} scores), "
-                    f"Exam: {features['avg_score_exam']:.2f} ({len(exam_scores)} scores)")
+        # Per-enrollment, so DEBUG with lazy formatting to stay off the hot path
+        logger.debug("Enrollment %s - CMA: %.2f (%d scores), TMA: %.2f (%d scores), Exam: %.2f (%d scores)",
+                     enrollment_id, features['avg_score_cma'], len(cma_scores),
+                     features['avg_score_tma'], len(tma_scores),
+                     features['avg_score_exam'], len(exam_scores))
         
         # Submission timing features
         on_time = 0
@@ -355,13 +393,9 @@ class FeatureCalculator:
         return self.feature_list
     
     def get_feature_importance(self) -> Dict:
-        """Get feature importance from model metadata"""
-        try:
-            with open('ml_models/feature_importance.json', 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            logger.warning("Feature importance file not found")
-            return {}
+        """Get feature importance of the loaded model"""
+        from backend.services.model_service import ModelService
+        return ModelService().get_feature_importance()
         
         
     def debug_feature_calculation(self, enrollment_id: int):
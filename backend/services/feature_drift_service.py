@@ -0,0 +1,354 @@
+"""Feature drift monitoring with streaming statistics.
+
+Every saved prediction's feature vector is folded into per-feature weekly
+aggregates: Welford count/mean/M2, min/max and a histogram over fixed bins.
+Bins are defined in standardized units of the training data (the model's
+fitted scaler), so production histograms line up with a training reference
+profile built once from the training feature matrix.
+
+Observations are buffered per process and merged into feature_drift_stats
+with Chan's parallel form of Welford's update, so saving a prediction never
+waits on a hot row and historical snapshots are never rescanned. The drift
+report merges the weekly rows and scores them against the reference with
+PSI and a binned KS statistic.
+"""
+from __future__ import annotations
+
+import atexit
+import csv
+import json
+import threading
+import time
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from backend.extensions import db
+from backend.models import FeatureDriftStat
+from backend.services.model_service import ModelService
+from backend.utils.lazy_import import lazy_import
+import logging
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_PATH = 'ml_models/feature_reference.json'
+
+# Bin edges in training standard deviations; values beyond them fall in the
+# two open-ended outer bins
+Z_EDGES = [-3.0, -2.5, -2.0, -1.5, -1.0, -0.5, 0.0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0]
+BIN_COUNT = len(Z_EDGES) + 1
+
+PSI_EPSILON = 1e-4  # floor for empty bins in the PSI log ratio
+
+SEVERITY = {'insufficient_data': 0, 'stable': 1, 'warning': 2, 'critical': 3}
+
+
+def _window_start(day: date) -> date:
+    """Monday of the week containing day"""
+    return day - timedelta(days=day.weekday())
+
+
+def _merge(a: Dict, b: Dict) -> Dict:
+    """Combine two Welford aggregates (Chan et al.)"""
+    if not a['count']:
+        return dict(b)
+    if not b['count']:
+        return dict(a)
+    count = a['count'] + b['count']
+    delta = b['mean'] - a['mean']
+    return {
+        'count': count,
+        'mean': a['mean'] + delta * b['count'] / count,
+        'm2': a['m2'] + b['m2'] + delta * delta * a['count'] * b['count'] / count,
+        'min': min(a['min'], b['min']),
+        'max': max(a['max'], b['max']),
+        'histogram': [x + y for x, y in zip(a['histogram'], b['histogram'])]
+    }
+
+
+class FeatureDriftService:
+    """Streaming per-feature statistics and drift scores against training"""
+
+    def __init__(self):
+        self.model_service = ModelService()
+        self._lock = threading.Lock()
+        self._buffer = {}  # (model_version, window_start) -> list of feature rows
+        self._buffered = 0
+        self._oldest = None
+        self._app = None
+        self._reference = None
+        self._reference_loaded = False
+
+    # Recording
+
+    def observe(self, features: np.ndarray, model_version: str):
+        """Record the feature vector of a saved prediction.
+
+        Never raises - drift monitoring must not fail a prediction.
+        """
+        try:
+            rows = np.asarray(features, dtype=float).reshape(-1, len(self.model_service.get_feature_list()))
+            key = (model_version, _window_start(datetime.utcnow().date()))
+            with self._lock:
+                if self._app is None:
+                    self._app = current_app._get_current_object()
+                    atexit.register(self._flush_at_exit)
+                self._buffer.setdefault(key, []).append(rows)
+                self._buffered += len(rows)
+                self._oldest = self._oldest or time.monotonic()
+                due = (self._buffered >= current_app.config.get('DRIFT_FLUSH_SIZE', 100)
+                       or time.monotonic() - self._oldest >= current_app.config.get('DRIFT_FLUSH_INTERVAL', 300))
+            if due:
+                self.flush()
+        except Exception as e:
+            logger.error(f"Error recording features for drift monitoring: {str(e)}")
+
+    def flush(self) -> int:
+        """Merge buffered observations into feature_drift_stats; returns rows merged"""
+        with self._lock:
+            buffer, self._buffer = self._buffer, {}
+            self._buffered, self._oldest = 0, None
+
+        merged = 0
+        for (model_version, window_start), chunks in buffer.items():
+            rows = np.vstack(chunks)
+            try:
+                self._merge_window(model_version, window_start, self._batch_stats(rows))
+                merged += len(rows)
+            except Exception as e:
+                logger.error(f"Error flushing drift statistics for {window_start}: {str(e)}")
+        return merged
+
+    def _flush_at_exit(self):
+        if self._buffered and self._app is not None:
+            with self._app.app_context():
+                self.flush()
+
+    def _batch_stats(self, rows: np.ndarray) -> Dict[str, Dict]:
+        """Welford aggregates and histograms of a batch, per feature"""
+        training = self.model_service.get_training_statistics()
+        stats = {}
+        for i, name in enumerate(self.model_service.get_feature_list()):
+            values = rows[:, i]
+            stats[name] = {
+                'count': len(values),
+                'mean': float(values.mean()),
+                'm2': float(((values - values.mean()) ** 2).sum()),
+                'min': float(values.min()),
+                'max': float(values.max()),
+                'histogram': self._histogram(values, training[name]).tolist()
+            }
+        return stats
+
+    @staticmethod
+    def _histogram(values: np.ndarray, training: Dict) -> np.ndarray:
+        z = (values - training['mean']) / (training['std'] or 1.0)
+        return np.bincount(np.searchsorted(Z_EDGES, z, side='right'), minlength=BIN_COUNT)
+
+    def _merge_window(self, model_version, window_start, batch, retry=True):
+        """Add a batch into the week's rows under a row lock"""
+        table = FeatureDriftStat.__table__
+        try:
+            with db.engine.begin() as connection:
+                existing = {
+                    row.feature_name: row for row in connection.execute(
+                        select(table).where(
+                            table.c.model_version == model_version,
+                            table.c.window_start == window_start
+                        ).with_for_update()
+                    )
+                }
+                for name, stats in batch.items():
+                    row = existing.get(name)
+                    if row is not None:
+                        stats = _merge({
+                            'count': row.sample_count, 'mean': row.mean, 'm2': row.m2,
+                            'min': row.min_value, 'max': row.max_value, 'histogram': row.histogram
+                        }, stats)
+                    values = {
+                        'sample_count': stats['count'],
+                        'mean': stats['mean'],
+                        'm2': stats['m2'],
+                        'min_value': stats['min'],
+                        'max_value': stats['max'],
+                        'histogram': stats['histogram'],
+                        'updated_at': datetime.utcnow()
+                    }
+                    if row is not None:
+                        connection.execute(table.update().where(table.c.stat_id == row.stat_id).values(values))
+                    else:
+                        connection.execute(table.insert().values(
+                            model_version=model_version, window_start=window_start,
+                            feature_name=name, **values
+                        ))
+        except IntegrityError:
+            # Another process created the week's rows first; they exist now
+            if not retry:
+                raise
+            self._merge_window(model_version, window_start, batch, retry=False)
+
+    # Reference profile
+
+    def get_reference(self) -> Optional[Dict]:
+        """Training reference profile, or None if it hasn't been built"""
+        if not self._reference_loaded:
+            try:
+                with open(REFERENCE_PATH, 'r') as f:
+                    self._reference = json.load(f)
+            except FileNotFoundError:
+                logger.warning("Feature reference profile not found - drift limited to mean shift")
+                self._reference = None
+            self._reference_loaded = True
+        return self._reference
+
+    def build_reference(self, rows: np.ndarray, source: str) -> Dict:
+        """Write the training reference profile from a training feature matrix"""
+        training = self.model_service.get_training_statistics()
+        features = {}
+        for i, name in enumerate(self.model_service.get_feature_list()):
+            values = rows[:, i]
+            histogram = self._histogram(values, training[name])
+            features[name] = {
+                'count': int(len(values)),
+                'mean': float(values.mean()),
+                'std': float(values.std()),
+                'proportions': (histogram / max(len(values), 1)).tolist()
+            }
+
+        reference = {
+            'model_version': self.model_service.get_model_info()['version'],
+            'source': source,
+            'created_at': datetime.utcnow().isoformat(),
+            'z_edges': Z_EDGES,
+            'features': features
+        }
+        with open(REFERENCE_PATH, 'w') as f:
+            json.dump(reference, f, indent=2)
+        self._reference, self._reference_loaded = reference, True
+        return reference
+
+    def build_reference_from_csv(self, path: str) -> Dict:
+        """Build the reference from a CSV with one column per model feature"""
+        feature_list = self.model_service.get_feature_list()
+        with open(path, newline='') as f:
+            reader = csv.DictReader(f)
+            missing = set(feature_list) - set(reader.fieldnames or [])
+            if missing:
+                raise ValueError(f"CSV is missing features: {sorted(missing)}")
+            rows = np.array([[float(record[name] or 0) for name in feature_list] for record in reader])
+        if not len(rows):
+            raise ValueError("CSV has no rows")
+        return self.build_reference(rows, source=path)
+
+    # Reporting
+
+    def get_drift_report(self, days: int = 28, model_version: Optional[str] = None) -> Dict:
+        """Drift of production features over the last `days` against training"""
+        self.flush()
+        model_version = model_version or self.model_service.get_model_info()['version']
+        since = _window_start(datetime.utcnow().date() - timedelta(days=days - 1))
+
+        rows = FeatureDriftStat.query.filter(
+            FeatureDriftStat.model_version == model_version,
+            FeatureDriftStat.window_start >= since
+        ).order_by(FeatureDriftStat.window_start).all()
+
+        combined, weekly = {}, {}
+        for row in rows:
+            stats = {
+                'count': row.sample_count, 'mean': row.mean, 'm2': row.m2,
+                'min': row.min_value, 'max': row.max_value, 'histogram': row.histogram
+            }
+            combined[row.feature_name] = _merge(
+                combined.get(row.feature_name, {'count': 0}), stats
+            )
+            weekly.setdefault(row.feature_name, []).append((row.window_start, stats))
+
+        training = self.model_service.get_training_statistics()
+        reference = self.get_reference()
+        features = []
+        for name in self.model_service.get_feature_list():
+            reference_feature = reference['features'].get(name) if reference else None
+            features.append(self._score_feature(
+                name, combined.get(name), weekly.get(name, []), training[name], reference_feature
+            ))
+        features.sort(key=lambda f: (SEVERITY[f['status']], f['psi'] or 0, f['mean_shift'] or 0), reverse=True)
+
+        status = max((f['status'] for f in features), key=SEVERITY.get, default='insufficient_data')
+        return {
+            'model_version': model_version,
+            'since': since.isoformat(),
+            'days': days,
+            'status': status,
+            'reference': ({'source': reference['source'], 'created_at': reference['created_at']}
+                          if reference else None),
+            'sample_count': max((f['sample_count'] for f in features), default=0),
+            'drifted_features': [f['feature'] for f in features if f['status'] in ('warning', 'critical')],
+            'features': features
+        }
+
+    def _score_feature(self, name, stats, weekly, training, reference) -> Dict:
+        config = current_app.config
+        result = {
+            'feature': name,
+            'sample_count': stats['count'] if stats else 0,
+            'mean': None, 'std': None, 'min': None, 'max': None,
+            'training_mean': training['mean'], 'training_std': training['std'],
+            'mean_shift': None, 'std_ratio': None, 'psi': None, 'ks': None,
+            'weekly_psi': [],
+            'status': 'insufficient_data'
+        }
+        if not stats or stats['count'] < config.get('DRIFT_MIN_SAMPLES', 50):
+            return result
+
+        std = (stats['m2'] / stats['count']) ** 0.5
+        scale = training['std'] or 1.0
+        result.update({
+            'mean': stats['mean'], 'std': std, 'min': stats['min'], 'max': stats['max'],
+            # Shift of the production mean in training standard deviations
+            'mean_shift': abs(stats['mean'] - training['mean']) / scale,
+            'std_ratio': std / scale
+        })
+
+        if reference:
+            psi, ks = self._compare(stats['histogram'], reference['proportions'])
+            result.update({'psi': psi, 'ks': ks})
+            result['weekly_psi'] = [
+                {'week': week.isoformat(), 'count': s['count'],
+                 'psi': self._compare(s['histogram'], reference['proportions'])[0]}
+                for week, s in weekly
+            ]
+            if psi >= config.get('DRIFT_PSI_CRITICAL', 0.25):
+                result['status'] = 'critical'
+            elif psi >= config.get('DRIFT_PSI_WARNING', 0.1):
+                result['status'] = 'warning'
+            else:
+                result['status'] = 'stable'
+        else:
+            shift = result['mean_shift']
+            if shift >= config.get('DRIFT_MEAN_SHIFT_CRITICAL', 1.0):
+                result['status'] = 'critical'
+            elif shift >= config.get('DRIFT_MEAN_SHIFT_WARNING', 0.5):
+                result['status'] = 'warning'
+            else:
+                result['status'] = 'stable'
+        return result
+
+    @staticmethod
+    def _compare(histogram: List[int], reference: List[float]):
+        """PSI and binned KS distance between a histogram and reference proportions"""
+        actual = np.array(histogram, dtype=float)
+        actual = actual / max(actual.sum(), 1)
+        expected = np.array(reference, dtype=float)
+        p = np.maximum(actual, PSI_EPSILON)
+        q = np.maximum(expected, PSI_EPSILON)
+        psi = float(((p - q) * np.log(p / q)).sum())
+        ks = float(np.abs(np.cumsum(actual) - np.cumsum(expected)).max())
+        return round(psi, 4), round(ks, 4)
+
+
+# Create service instance
+feature_drift_service = FeatureDriftService()
@@ -0,0 +1,369 @@
+"""Feature vectors at many cutoffs in one pass, for backtesting.
+
+FeatureCalculator.calculate_features_for_enrollment() answers "what did the
+model see on this date" for one enrollment by rescanning its whole history.
+FeatureTimelineService answers it for many enrollments at many cutoffs: each
+enrollment's events are loaded once, sorted by time, and every feature is
+turned into a cumulative series (running sums, running distinct counts,
+running min/max) that is read off at each cutoff with a binary search.
+
+The result is an (enrollments x cutoffs x features) tensor whose values
+match the single-cutoff calculator up to floating point rounding.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy.orm import joinedload
+from backend.extensions import db
+from backend.models import (
+    Enrollment, CourseOffering, Attendance, LMSSession, LMSActivity, LMSActivityDaily,
+    Assessment, AssessmentSubmission, AssessmentType
+)
+from backend.services.feature_calculator_service import FeatureCalculator
+from backend.utils.helpers import safe_float
+from backend.utils.lazy_import import lazy_import
+from backend.utils.metrics import metrics
+import logging
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_FEATURES = [
+    'days_active', 'total_clicks', 'unique_materials', 'activity_rate',
+    'avg_clicks_per_active_day', 'first_activity_day', 'last_activity_day',
+    'weekly_activity_std', 'activity_regularity', 'longest_inactivity_gap',
+    'weekend_activity_ratio', 'activity_trend'
+]
+
+ASSESSMENT_FEATURES = [
+    'submitted_assessments', 'submission_rate', 'avg_score', 'avg_score_cma',
+    'avg_score_tma', 'avg_score_exam', 'on_time_submissions',
+    'late_submission_count', 'avg_days_early'
+]
+
+# Values the calculator reports before an enrollment has any activity
+EMPTY_ACTIVITY = {name: 0 for name in ACTIVITY_FEATURES}
+EMPTY_ACTIVITY.update({'first_activity_day': -1, 'last_activity_day': -1})
+
+MODEL_TYPES = ('CMA', 'TMA', 'Exam')
+
+
+class FeatureTimelineService:
+    """Multi-cutoff feature computation over the production tables"""
+
+    def __init__(self):
+        self.calculator = FeatureCalculator()
+
+    @property
+    def feature_names(self) -> List[str]:
+        return self.calculator.get_feature_names()
+
+    @metrics.timed('feature_tensor', 'Multi-cutoff feature tensor latency per chunk of enrollments')
+    def _calculate_chunk(self, enrollment_ids: List[int], cutoffs, offsets) -> np.ndarray:
+        enrollments = {
+            e.enrollment_id: e for e in Enrollment.query.options(
+                joinedload(Enrollment.student),
+                joinedload(Enrollment.offering).joinedload(CourseOffering.term)
+            ).filter(Enrollment.enrollment_id.in_(enrollment_ids)).all()
+        }
+        missing = [eid for eid in enrollment_ids if eid not in enrollments]
+        if missing:
+            raise ValueError(f"Enrollments not found: {missing[:10]}")
+
+        start_dates = {
+            eid: (e.offering.term.start_date if e.offering and e.offering.term else e.enrollment_date)
+            for eid, e in enrollments.items()
+        }
+        vle_events = self._load_vle_events(enrollment_ids, start_dates)
+        submissions = self._load_submissions(enrollment_ids)
+        due_dates = self._load_due_dates({e.offering_id for e in enrollments.values()})
+
+        feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        tensor = np.zeros((len(enrollment_ids), len(cutoffs if cutoffs is not None else offsets),
+                           len(feature_index)))
+
+        for row, enrollment_id in enumerate(enrollment_ids):
+            enrollment = enrollments[enrollment_id]
+            if cutoffs is not None:
+                points = np.array(cutoffs, dtype='datetime64[us]')
+            else:
+                start = np.datetime64(datetime.combine(start_dates[enrollment_id], datetime.min.time()), 'us')
+                points = start + np.array(offsets, dtype='timedelta64[D]')
+
+            columns = {}
+            columns.update(self._activity_series(vle_events.get(enrollment_id), points))
+            columns.update(self._assessment_series(
+                submissions.get(enrollment_id), due_dates.get(enrollment.offering_id), points
+            ))
+            for name, value in self.calculator._calculate_demographic_features(enrollment).items():
+                columns[name] = np.full(len(points), float(value))
+
+            for name, values in columns.items():
+                if name in feature_index:
+                    tensor[row, :, feature_index[name]] = values
+
+        return tensor
+
+    def calculate_feature_tensor(self, enrollment_ids: Sequence[int],
+                                 cutoffs: Optional[Sequence[datetime]] = None,
+                                 offsets: Optional[Sequence[int]] = None,
+                                 chunk_size: int = 500) -> np.ndarray:
+        """Feature vectors for every enrollment at every cutoff.
+
+        Pass either absolute `cutoffs` (shared by all enrollments) or
+        `offsets`, days after each enrollment's course start - e.g.
+        range(7, 106, 7) for the end of every week of a 15-week term, which
+        lines up enrollments from different terms. An event counts at a
+        cutoff when its timestamp is <= the cutoff, as with as_of_date.
+
+        Returns an array of shape (len(enrollment_ids), len(cutoffs),
+        len(feature_names)), rows in the order of enrollment_ids.
+        """
+        if (cutoffs is None) == (offsets is None):
+            raise ValueError("Pass exactly one of cutoffs or offsets")
+
+        enrollment_ids = list(enrollment_ids)
+        chunks = [
+            self._calculate_chunk(enrollment_ids[i:i + chunk_size], cutoffs, offsets)
+            for i in range(0, len(enrollment_ids), chunk_size)
+        ]
+        if not chunks:
+            return np.zeros((0, len(cutoffs if cutoffs is not None else offsets), len(self.feature_names)))
+        return np.concatenate(chunks)
+
+    def _load_vle_events(self, enrollment_ids, start_dates) -> Dict[int, Dict]:
+        """Attendance, raw and compacted LMS activity as VLE events per enrollment.
+
+        Mirrors FeatureCalculator._convert_to_vle_format: each event has the
+        time it becomes visible, its day relative to course start, a site id
+        and a click count.
+        """
+        events = {}
+
+        def add(enrollment_id, when, day, site, clicks):
+            bucket = events.setdefault(enrollment_id, ([], [], [], []))
+            bucket[0].append(when)
+            bucket[1].append(day)
+            bucket[2].append(site)
+            bucket[3].append(clicks)
+
+        attendance_clicks = FeatureCalculator.ATTENDANCE_CLICKS
+        for enrollment_id, attendance_id, attendance_date, status in db.session.query(
+            Attendance.enrollment_id, Attendance.attendance_id,
+            Attendance.attendance_date, Attendance.status
+        ).filter(
+            Attendance.enrollment_id.in_(enrollment_ids),
+            Attendance.status.in_(list(attendance_clicks))
+        ):
+            add(enrollment_id, datetime.combine(attendance_date, datetime.min.time()),
+                (attendance_date - start_dates[enrollment_id]).days,
+                f'attendance_{attendance_id}', attendance_clicks[status])
+
+        click_mapping = FeatureCalculator.CLICK_MAPPING
+        for enrollment_id, activity_id, timestamp, activity_type, resource_id in db.session.query(
+            LMSSession.enrollment_id, LMSActivity.activity_id, LMSActivity.activity_timestamp,
+            LMSActivity.activity_type, LMSActivity.resource_id
+        ).join(
+            LMSSession, LMSSession.session_id == LMSActivity.session_id
+        ).filter(
+            LMSSession.enrollment_id.in_(enrollment_ids)
+        ).yield_per(10000):
+            add(enrollment_id, timestamp, (timestamp.date() - start_dates[enrollment_id]).days,
+                resource_id or f'activity_{activity_id}', click_mapping.get(activity_type, 1))
+
+        for aggregate in LMSActivityDaily.query.filter(
+            LMSActivityDaily.enrollment_id.in_(enrollment_ids)
+        ):
+            day = (aggregate.activity_date - start_dates[aggregate.enrollment_id]).days
+            clicks = click_mapping.get(aggregate.activity_type, 1) * aggregate.activity_count
+            if aggregate.resource_id:
+                add(aggregate.enrollment_id, aggregate.last_activity_at, day, aggregate.resource_id, clicks)
+            else:
+                for i in range(aggregate.activity_count):
+                    add(aggregate.enrollment_id, aggregate.last_activity_at, day,
+                        f'compacted_{aggregate.aggregate_id}_{i}', clicks if i == 0 else 0)
+
+        return events
+
+    @staticmethod
+    def _load_submissions(enrollment_ids) -> Dict[int, List]:
+        rows = db.session.query(
+            AssessmentSubmission.enrollment_id, AssessmentSubmission.submission_date,
+            AssessmentSubmission.score, AssessmentSubmission.is_late,
+            Assessment.due_date, AssessmentType.type_name
+        ).outerjoin(
+            Assessment, AssessmentSubmission.assessment_id == Assessment.assessment_id
+        ).outerjoin(
+            AssessmentType, Assessment.type_id == AssessmentType.type_id
+        ).filter(
+            AssessmentSubmission.enrollment_id.in_(enrollment_ids)
+        ).all()
+
+        submissions = {}
+        for row in rows:
+            submissions.setdefault(row.enrollment_id, []).append(row)
+        return submissions
+
+    @staticmethod
+    def _load_due_dates(offering_ids) -> Dict[int, np.ndarray]:
+        due_dates = {}
+        for offering_id, due_date in db.session.query(
+            Assessment.offering_id, Assessment.due_date
+        ).filter(
+            Assessment.offering_id.in_(offering_ids),
+            Assessment.due_date.isnot(None)
+        ):
+            due_dates.setdefault(offering_id, []).append(due_date)
+        return {
+            offering_id: np.sort(np.array(dates, dtype='datetime64[us]'))
+            for offering_id, dates in due_dates.items()
+        }
+
+    @staticmethod
+    def _first_occurrence(values) -> np.ndarray:
+        """1 where a value is seen for the first time in the sequence, else 0"""
+        flags = np.zeros(len(values))
+        flags[np.unique(values, return_index=True)[1]] = 1
+        return flags
+
+    @staticmethod
+    def _at(series, index, empty):
+        """Read cumulative series at prefix lengths `index` (0 = no events)"""
+        return np.where(index > 0, series[np.maximum(index - 1, 0)], empty)
+
+    def _activity_series(self, events, points) -> Dict[str, np.ndarray]:
+        """Activity features at each cutoff from cumulative event series.
+
+        An event's day never precedes the day of an earlier event (times
+        fall on their own day), so new active days always extend the
+        sorted day list at the end - gaps, first/last day and the trend's
+        sums over distinct days are then running quantities too.
+        """
+        if not events:
+            return {name: np.full(len(points), float(value)) for name, value in EMPTY_ACTIVITY.items()}
+
+        times = np.array(events[0], dtype='datetime64[us]')
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        days = np.array(events[1], dtype=np.int64)[order]
+        sites = np.array(events[2], dtype=object)[order]
+        clicks = np.array(events[3], dtype=float)[order]
+        x = days.astype(float)
+
+        new_day = self._first_occurrence(days)
+        days_active = np.cumsum(new_day)
+        total_clicks = np.cumsum(clicks)
+        first_day = np.minimum.accumulate(x)
+        last_day = np.maximum.accumulate(x)
+
+        # Weekly click totals: the running sum of squared week totals grows
+        # by (t + c)^2 - t^2 for an event of c clicks in a week at total t
+        weeks = days // 7
+        by_week = np.lexsort((np.arange(len(weeks)), weeks))
+        week_clicks = clicks[by_week]
+        running = np.cumsum(week_clicks)
+        group_start = np.r_[True, weeks[by_week][1:] != weeks[by_week][:-1]]
+        before_group = (running - week_clicks)[group_start][np.cumsum(group_start) - 1]
+        week_total = running - before_group
+        square_growth = np.empty(len(clicks))
+        square_growth[by_week] = week_total ** 2 - (week_total - week_clicks) ** 2
+        week_count = np.cumsum(self._first_occurrence(weeks))
+        square_sum = np.cumsum(square_growth)
+
+        # Gap to the previous active day, at the event that opens a new day
+        gap = np.zeros(len(days))
+        opens = np.flatnonzero(new_day)
+        gap[opens[1:]] = np.diff(x[opens])
+
+        weekend = new_day * np.isin(days % 7, (5, 6))
+        sum_x = np.cumsum(new_day * x)
+        sum_xx = np.cumsum(new_day * x * x)
+        sum_xy = np.cumsum(x * clicks)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_week = total_clicks / week_count
+            weekly_std = np.where(
+                week_count > 1,
+                np.sqrt(np.maximum(square_sum / week_count - mean_week ** 2, 0)), 0
+            )
+            regularity = np.where(
+                days_active > 1, 100 / ((last_day - first_day) / (days_active - 1) + 1), 0
+            )
+            trend = np.where(
+                days_active > 1,
+                (days_active * sum_xy - sum_x * total_clicks) / (days_active * sum_xx - sum_x ** 2), 0
+            )
+
+        series = {
+            'days_active': days_active,
+            'total_clicks': total_clicks,
+            'unique_materials': np.cumsum(self._first_occurrence(sites)),
+            'activity_rate': days_active / np.maximum(last_day - first_day + 1, 1) * 100,
+            'avg_clicks_per_active_day': total_clicks / days_active,
+            'first_activity_day': first_day,
+            'last_activity_day': last_day,
+            'weekly_activity_std': weekly_std,
+            'activity_regularity': regularity,
+            'longest_inactivity_gap': np.maximum.accumulate(gap),
+            'weekend_activity_ratio': np.cumsum(weekend) / days_active * 100,
+            'activity_trend': trend
+        }
+
+        index = np.searchsorted(times, points, side='right')
+        return {name: self._at(values, index, EMPTY_ACTIVITY[name]) for name, values in series.items()}
+
+    def _assessment_series(self, submissions, due_dates, points) -> Dict[str, np.ndarray]:
+        """Assessment features at each cutoff from cumulative submission series"""
+        due_count = (np.searchsorted(due_dates, points, side='right')
+                     if due_dates is not None else np.zeros(len(points), dtype=np.int64))
+        submission_rate_empty = np.where(due_count > 0, 0.0, 100.0)
+
+        if not submissions:
+            series = {name: np.zeros(len(points)) for name in ASSESSMENT_FEATURES}
+            series['submission_rate'] = submission_rate_empty
+            return series
+
+        submissions = sorted(submissions, key=lambda s: s.submission_date)
+        times = np.array([s.submission_date for s in submissions], dtype='datetime64[us]')
+        index = np.searchsorted(times, points, side='right')
+
+        def running(values):
+            return self._at(np.cumsum(np.array(values, dtype=float)), index, 0.0)
+
+        def running_mean(values, mask):
+            total, count = running(values), running(mask)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(count > 0, total / count, 0.0)
+
+        type_mapping = FeatureCalculator.ASSESSMENT_TYPE_MAPPING
+        scores = [safe_float(s.score) if s.score is not None else 0.0 for s in submissions]
+        scored = [s.score is not None for s in submissions]
+        model_types = [type_mapping.get(s.type_name) if s.score is not None else None for s in submissions]
+        late = [bool(s.is_late) for s in submissions]
+        has_due = [s.due_date is not None for s in submissions]
+        days_early = [(s.due_date - s.submission_date).days if s.due_date else 0 for s in submissions]
+
+        submitted = index.astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            submission_rate = np.where(due_count > 0, submitted / due_count * 100, 100.0)
+
+        series = {
+            'submitted_assessments': submitted,
+            'submission_rate': submission_rate,
+            'avg_score': running_mean(scores, scored),
+            'late_submission_count': running(late),
+            'on_time_submissions': submitted - running(late),
+            'avg_days_early': running_mean(days_early, has_due)
+        }
+        for model_type in MODEL_TYPES:
+            mask = [t == model_type for t in model_types]
+            series[f'avg_score_{model_type.lower()}'] = running_mean(
+                [score if m else 0.0 for score, m in zip(scores, mask)], mask
+            )
+        return series
+
+
+# Create service instance
+feature_timeline_service = FeatureTimelineService()
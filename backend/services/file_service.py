@@ -3,15 +3,20 @@ import os
 import uuid
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from flask import current_app
+from flask import current_app, send_file
 import mimetypes
 import hashlib
+import tempfile
+import logging
+
+logger = logging.getLogger(__name__)
 
 class FileService:
     """Service for handling file uploads and management"""
     
     ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt', 'zip', 'jpg', 'jpeg', 'png'}
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    BLOB_DIR = 'blobs'  # content-addressed storage under UPLOAD_FOLDER
     
     @staticmethod
     def allowed_file(filename):
@@ -20,8 +25,12 @@ class FileService:
                filename.rsplit('.', 1)[1].lower() in FileService.ALLOWED_EXTENSIONS
     
     @staticmethod
-    def validate_file(file):
-        """Validate file before upload"""
+    def validate_file(file, check_size=True):
+        """Validate file before upload.
+        
+        The size check seeks to the end of the upload; the streaming save
+        path passes check_size=False and enforces the limit while writing.
+        """
         if not file:
             return False, "No file provided"
         
@@ -32,17 +41,22 @@ class FileService:
             allowed = ', '.join(FileService.ALLOWED_EXTENSIONS)
             return False, f"File type not allowed. Allowed types: {allowed}"
         
-        # Check file size (requires reading the file)
-        file.seek(0, os.SEEK_END)
-        file_size = file.tell()
-        file.seek(0)  # Reset file pointer
-        
-        if file_size > FileService.MAX_FILE_SIZE:
-            max_mb = FileService.MAX_FILE_SIZE / (1024 * 1024)
-            return False, f"File too large. Maximum size: {max_mb}MB"
+        if check_size:
+            # Check file size (requires reading the file)
+            file.seek(0, os.SEEK_END)
+            file_size = file.tell()
+            file.seek(0)  # Reset file pointer
+            
+            if file_size > FileService.MAX_FILE_SIZE:
+                return False, FileService._too_large_message()
         
         return True, None
     
+    @staticmethod
+    def _too_large_message():
+        max_mb = FileService.MAX_FILE_SIZE / (1024 * 1024)
+        return f"File too large. Maximum size: {max_mb}MB"
+    
     @staticmethod
     def generate_file_path(student_id, assessment_id, filename):
         """Generate unique file path"""
@@ -61,38 +75,73 @@ class FileService:
         
         return relative_path, new_filename
     
+    @staticmethod
+    def blob_path(file_hash):
+        """Relative path of the content-addressed blob for a SHA-256 digest"""
+        return os.path.join(FileService.BLOB_DIR, file_hash[:2], file_hash[2:4], file_hash)
+    
     @staticmethod
     def save_submission_file(file, student_id, assessment_id):
-        """Save uploaded file and return file info"""
+        """Save uploaded file and return file info.
+        
+        The upload is streamed to a temporary file in large chunks while
+        SHA-256 is computed in the same pass, then stored under its digest
+        in UPLOAD_FOLDER/blobs. Identical files (a student resubmitting the
+        same document) share one blob; submissions reference it by path.
+        """
         try:
             # Validate file
-            is_valid, error_msg = FileService.validate_file(file)
+            is_valid, error_msg = FileService.validate_file(file, check_size=False)
             if not is_valid:
                 return None, error_msg
             
             # Get file info
             original_filename = secure_filename(file.filename)
-            file_size = file.seek(0, os.SEEK_END)
-            file.seek(0)
             mime_type = mimetypes.guess_type(original_filename)[0] or 'application/octet-stream'
             
-            # Generate file path
-            relative_path, new_filename = FileService.generate_file_path(
-                student_id, assessment_id, original_filename
-            )
-            
-            # Create full path
             upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
-            full_path = os.path.join(upload_folder, relative_path)
-            
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            chunk_size = current_app.config.get('UPLOAD_CHUNK_SIZE', 1024 * 1024)
             
-            # Save file
-            file.save(full_path)
+            # Temporary file on the same filesystem so the final move is a rename
+            tmp_dir = os.path.join(upload_folder, FileService.BLOB_DIR, 'tmp')
+            os.makedirs(tmp_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix=f"{student_id}_{assessment_id}_")
             
-            # Calculate file hash for integrity
-            file_hash = FileService.calculate_file_hash(full_path)
+            sha256_hash = hashlib.sha256()
+            file_size = 0
+            try:
+                with os.fdopen(fd, 'wb') as out:
+                    stream = file.stream
+                    while True:
+                        chunk = stream.read(chunk_size)
+                        if not chunk:
+                            break
+                        file_size += len(chunk)
+                        if file_size > FileService.MAX_FILE_SIZE:
+                            raise FileTooLarge()
+                        sha256_hash.update(chunk)
+                        out.write(chunk)
+                
+                file_hash = sha256_hash.hexdigest()
+                relative_path = FileService.blob_path(file_hash)
+                full_path = os.path.join(upload_folder, relative_path)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                
+                try:
+                    # link() fails if the blob exists, so concurrent uploads
+                    # of the same content can't clobber each other
+                    os.link(tmp_path, full_path)
+                except FileExistsError:
+                    logger.debug("Deduplicated upload %s", file_hash)
+                except OSError:
+                    # Filesystems without hard links
+                    if not os.path.exists(full_path):
+                        os.replace(tmp_path, full_path)
+            except FileTooLarge:
+                return None, FileService._too_large_message()
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
             
             return {
                 'file_path': relative_path,
@@ -108,21 +157,66 @@ class FileService:
             return None, f"Failed to save file: {str(e)}"
     
     @staticmethod
-    def calculate_file_hash(file_path):
+    def calculate_file_hash(file_path, chunk_size=1024 * 1024):
         """Calculate SHA-256 hash of file"""
         sha256_hash = hashlib.sha256()
         with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
+            for byte_block in iter(lambda: f.read(chunk_size), b""):
                 sha256_hash.update(byte_block)
         return sha256_hash.hexdigest()
     
+    @staticmethod
+    def get_full_path(file_path):
+        """Absolute path of a stored file, or None if it is missing or
+        resolves outside UPLOAD_FOLDER"""
+        if not file_path:
+            return None
+        upload_folder = os.path.abspath(current_app.config.get('UPLOAD_FOLDER', 'uploads'))
+        full_path = os.path.abspath(os.path.join(upload_folder, file_path))
+        if not full_path.startswith(upload_folder + os.sep) or not os.path.isfile(full_path):
+            return None
+        return full_path
+    
+    @staticmethod
+    def send_stored_file(file_path, download_name=None, mimetype=None):
+        """Response for a stored file, or None if it doesn't exist.
+        
+        send_file answers If-None-Match / If-Modified-Since with 304 and
+        Range requests with 206, and hands the open file to the WSGI
+        server's file_wrapper so it can use sendfile(). Blobs are named by
+        their SHA-256, which doubles as a strong ETag.
+        """
+        full_path = FileService.get_full_path(file_path)
+        if not full_path:
+            return None
+        
+        is_blob = file_path.startswith(FileService.BLOB_DIR + os.sep)
+        return send_file(
+            full_path,
+            as_attachment=True,
+            download_name=download_name or os.path.basename(file_path),
+            mimetype=mimetype or 'application/octet-stream',
+            conditional=True,
+            etag=os.path.basename(file_path) if is_blob else True
+        )
+    
     @staticmethod
     def delete_file(file_path):
-        """Delete a file"""
+        """Delete a file.
+        
+        Blobs are shared between submissions and are only removed once no
+        submission references them.
+        """
         try:
             upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
             full_path = os.path.join(upload_folder, file_path)
             
+            if file_path.startswith(FileService.BLOB_DIR + os.sep):
+                from backend.models import AssessmentSubmission
+                references = AssessmentSubmission.query.filter_by(file_path=file_path).count()
+                if references:
+                    return False
+            
             if os.path.exists(full_path):
                 os.remove(full_path)
                 return True
@@ -131,5 +225,10 @@ class FileService:
             print(f"Error deleting file: {str(e)}")
             return False
 
+
+class FileTooLarge(Exception):
+    """Upload exceeded MAX_FILE_SIZE while streaming"""
+
+
 # Create instance
 file_service = FileService()
\ No newline at end of file
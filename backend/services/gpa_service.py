@@ -106,31 +106,141 @@ class GPAService:
             db.session.rollback()
             return None
 
+    @staticmethod
+    def calculate_gpas(student_ids=None, term_id=None):
+        """Calculate GPA for many students with one grouped query.
+
+        Returns a dict of student_id -> GPA. Students without graded
+        enrollments are omitted; callers treat them as 0.0 like calculate_gpa.
+        Database errors are raised so callers never mistake a failed query
+        for students without grades.
+        """
+        try:
+            credits = func.coalesce(Course.credits, 3)  # Default 3 credits
+            
+            query = db.session.query(
+                Enrollment.student_id,
+                func.sum(Enrollment.grade_points * credits).label('total_grade_points'),
+                func.sum(credits).label('total_credit_hours')
+            ).join(
+                CourseOffering,
+                Enrollment.offering_id == CourseOffering.offering_id
+            ).join(
+                Course,
+                CourseOffering.course_id == Course.course_id
+            ).filter(
+                Enrollment.enrollment_status.in_(['enrolled', 'completed']),
+                Enrollment.grade_points.isnot(None)
+            ).group_by(
+                Enrollment.student_id
+            )
+            
+            if term_id:
+                query = query.filter(CourseOffering.term_id == term_id)
+            
+            gpas = {}
+            for chunk in GPAService._chunks(student_ids):
+                chunk_query = query.filter(Enrollment.student_id.in_(chunk)) if chunk is not None else query
+                
+                for row in chunk_query.all():
+                    total_credit_hours = float(row.total_credit_hours or 0)
+                    if total_credit_hours == 0:
+                        continue
+                    gpas[row.student_id] = round(float(row.total_grade_points) / total_credit_hours, 2)
+            
+            return gpas
+            
+        except Exception as e:
+            logger.error(f"Error calculating GPAs: {str(e)}")
+            raise
+    
+    @staticmethod
+    def update_student_gpas(student_ids=None, term_id=None):
+        """Recompute and bulk update cumulative GPA for a set of students.
+
+        Pass student_ids for an explicit set, or term_id to refresh every
+        student enrolled in that term. Returns the number of students updated,
+        or None on failure.
+        """
+        try:
+            if student_ids is None:
+                query = db.session.query(Enrollment.student_id).distinct()
+                if term_id:
+                    query = query.join(
+                        CourseOffering,
+                        Enrollment.offering_id == CourseOffering.offering_id
+                    ).filter(CourseOffering.term_id == term_id)
+                student_ids = [row.student_id for row in query.all()]
+            
+            student_ids = list(set(student_ids))
+            if not student_ids:
+                return 0
+            
+            # Raises on failure - nothing is written then, see except below
+            gpas = GPAService.calculate_gpas(student_ids)
+            
+            db.session.bulk_update_mappings(Student, [
+                {'student_id': student_id, 'gpa': gpas.get(student_id, 0.0)}
+                for student_id in student_ids
+            ])
+            db.session.commit()
+            
+            logger.info(f"Updated GPA for {len(student_ids)} students")
+            return len(student_ids)
+            
+        except Exception as e:
+            logger.error(f"Error updating student GPAs: {str(e)}")
+            db.session.rollback()
+            return None
+
     @staticmethod
     def get_course_grade_summary(offering_id):
         """Get grade summary for all students in a course"""
         try:
-            # Get all enrollments with assessment details
-            enrollments = db.session.query(
+            # One query: enrollments x offering assessments, with each
+            # student's submission (if any) joined in
+            rows = db.session.query(
                 Enrollment.enrollment_id,
                 Enrollment.student_id,
                 Student.first_name,
                 Student.last_name,
                 Enrollment.final_grade,
-                Enrollment.grade_points
+                Enrollment.grade_points,
+                Assessment.title,
+                Assessment.weight,
+                AssessmentSubmission.percentage
             ).join(
                 Student,
                 Enrollment.student_id == Student.student_id
+            ).outerjoin(
+                Assessment,
+                Assessment.offering_id == Enrollment.offering_id
+            ).outerjoin(
+                AssessmentSubmission,
+                and_(
+                    Assessment.assessment_id == AssessmentSubmission.assessment_id,
+                    AssessmentSubmission.enrollment_id == Enrollment.enrollment_id
+                )
             ).filter(
                 Enrollment.offering_id == offering_id,
                 Enrollment.enrollment_status == 'enrolled'
+            ).order_by(
+                Enrollment.enrollment_id
             ).all()
             
+            enrollments = {}
+            assessment_rows = {}
+            for row in rows:
+                if row.enrollment_id not in enrollments:
+                    enrollments[row.enrollment_id] = row
+                    assessment_rows[row.enrollment_id] = []
+                if row.title is not None:
+                    assessment_rows[row.enrollment_id].append(row)
+            
             results = []
             
-            for enrollment in enrollments:
-                # Get assessment summary
-                assessment_summary = GPAService._get_assessment_summary(enrollment.enrollment_id)
+            for enrollment_id, enrollment in enrollments.items():
+                assessment_summary = GPAService._summarize_assessments(assessment_rows[enrollment_id])
                 
                 # Calculate suggested grade
                 if assessment_summary['total_percentage'] is not None:
@@ -164,97 +274,127 @@ class GPAService:
     @staticmethod
     def _get_assessment_summary(enrollment_id):
         """Get assessment breakdown for an enrollment (simplified version)"""
+        summaries = GPAService._get_assessment_summaries([enrollment_id])
+        return summaries.get(enrollment_id, {'breakdown': [], 'total_percentage': None})
+
+    @staticmethod
+    def _get_assessment_summaries(enrollment_ids):
+        """Get assessment breakdowns for many enrollments with one query"""
         try:
-            # Get all assessments for this enrollment
-            assessments = db.session.query(
-                Assessment.assessment_id,
-                Assessment.title,
-                Assessment.weight,
-                Assessment.max_score,
-                AssessmentSubmission.score,
-                AssessmentSubmission.percentage
-            ).outerjoin(
-                AssessmentSubmission,
-                and_(
-                    Assessment.assessment_id == AssessmentSubmission.assessment_id,
-                    AssessmentSubmission.enrollment_id == enrollment_id
-                )
-            ).filter(
-                Assessment.offering_id == db.session.query(Enrollment.offering_id)
-                    .filter(Enrollment.enrollment_id == enrollment_id).scalar_subquery()
-            ).all()
-            
-            breakdown = []
-            total_weighted = 0
-            total_weight = 0
-            
-            # Group by assessment type (you can customize this)
-            assessment_types = {}
-            
-            for assessment in assessments:
-                # Simple type detection based on title
-                if 'quiz' in assessment.title.lower():
-                    type_name = 'Quiz'
-                elif 'assignment' in assessment.title.lower():
-                    type_name = 'Assignment'
-                elif 'midterm' in assessment.title.lower():
-                    type_name = 'Midterm Exam'
-                elif 'final' in assessment.title.lower():
-                    type_name = 'Final Exam'
-                else:
-                    type_name = 'Other'
+            summaries = {}
+            
+            for chunk in GPAService._chunks(enrollment_ids):
+                rows = db.session.query(
+                    Enrollment.enrollment_id,
+                    Assessment.title,
+                    Assessment.weight,
+                    AssessmentSubmission.percentage
+                ).join(
+                    Assessment,
+                    Assessment.offering_id == Enrollment.offering_id
+                ).outerjoin(
+                    AssessmentSubmission,
+                    and_(
+                        Assessment.assessment_id == AssessmentSubmission.assessment_id,
+                        AssessmentSubmission.enrollment_id == Enrollment.enrollment_id
+                    )
+                ).filter(
+                    Enrollment.enrollment_id.in_(chunk)
+                ).all()
                 
-                if type_name not in assessment_types:
-                    assessment_types[type_name] = {
-                        'scores': [],
-                        'weight': 0
-                    }
+                grouped = {enrollment_id: [] for enrollment_id in chunk}
+                for row in rows:
+                    grouped[row.enrollment_id].append(row)
                 
-                if assessment.percentage is not None:
-                    assessment_types[type_name]['scores'].append(float(assessment.percentage))
-                    if assessment.weight:
-                        assessment_types[type_name]['weight'] += float(assessment.weight)
-            
-            # Calculate averages
-            for type_name, data in assessment_types.items():
-                if data['scores']:
-                    avg_score = sum(data['scores']) / len(data['scores'])
-                    weight = data['weight'] / len(data['scores']) if data['weight'] else 25  # Default 25%
-                    
-                    breakdown.append({
-                        'type': type_name,
-                        'weight': weight,
-                        'average': round(avg_score, 2)
-                    })
-                    
-                    total_weighted += avg_score * weight
-                    total_weight += weight
-                else:
-                    breakdown.append({
-                        'type': type_name,
-                        'weight': 25,  # Default weight
-                        'average': None
-                    })
-            
-            # Default breakdown if no assessments
-            if not breakdown:
-                breakdown = [
-                    {'type': 'Quiz', 'weight': 20, 'average': None},
-                    {'type': 'Assignment', 'weight': 30, 'average': None},
-                    {'type': 'Midterm Exam', 'weight': 25, 'average': None},
-                    {'type': 'Final Exam', 'weight': 25, 'average': None}
-                ]
-            
-            total_percentage = (total_weighted / total_weight) if total_weight > 0 else None
-            
-            return {
-                'breakdown': breakdown,
-                'total_percentage': round(total_percentage, 2) if total_percentage else None
-            }
+                for enrollment_id, assessment_rows in grouped.items():
+                    summaries[enrollment_id] = GPAService._summarize_assessments(assessment_rows)
+            
+            return summaries
             
         except Exception as e:
             logger.error(f"Error getting assessment summary: {str(e)}")
-            return {'breakdown': [], 'total_percentage': None}
+            return {}
+
+    @staticmethod
+    def _summarize_assessments(assessments):
+        """Build the weighted breakdown from (title, weight, percentage) rows"""
+        breakdown = []
+        total_weighted = 0
+        total_weight = 0
+        
+        # Group by assessment type (you can customize this)
+        assessment_types = {}
+        
+        for assessment in assessments:
+            # Simple type detection based on title
+            if 'quiz' in assessment.title.lower():
+                type_name = 'Quiz'
+            elif 'assignment' in assessment.title.lower():
+                type_name = 'Assignment'
+            elif 'midterm' in assessment.title.lower():
+                type_name = 'Midterm Exam'
+            elif 'final' in assessment.title.lower():
+                type_name = 'Final Exam'
+            else:
+                type_name = 'Other'
+            
+            if type_name not in assessment_types:
+                assessment_types[type_name] = {
+                    'scores': [],
+                    'weight': 0
+                }
+            
+            if assessment.percentage is not None:
+                assessment_types[type_name]['scores'].append(float(assessment.percentage))
+                if assessment.weight:
+                    assessment_types[type_name]['weight'] += float(assessment.weight)
+        
+        # Calculate averages
+        for type_name, data in assessment_types.items():
+            if data['scores']:
+                avg_score = sum(data['scores']) / len(data['scores'])
+                weight = data['weight'] / len(data['scores']) if data['weight'] else 25  # Default 25%
+                
+                breakdown.append({
+                    'type': type_name,
+                    'weight': weight,
+                    'average': round(avg_score, 2)
+                })
+                
+                total_weighted += avg_score * weight
+                total_weight += weight
+            else:
+                breakdown.append({
+                    'type': type_name,
+                    'weight': 25,  # Default weight
+                    'average': None
+                })
+        
+        # Default breakdown if no assessments
+        if not breakdown:
+            breakdown = [
+                {'type': 'Quiz', 'weight': 20, 'average': None},
+                {'type': 'Assignment', 'weight': 30, 'average': None},
+                {'type': 'Midterm Exam', 'weight': 25, 'average': None},
+                {'type': 'Final Exam', 'weight': 25, 'average': None}
+            ]
+        
+        total_percentage = (total_weighted / total_weight) if total_weight > 0 else None
+        
+        return {
+            'breakdown': breakdown,
+            'total_percentage': round(total_percentage, 2) if total_percentage else None
+        }
+
+    @staticmethod
+    def _chunks(ids, size=1000):
+        """Split an id list into IN()-sized chunks; None means no filter"""
+        if ids is None:
+            yield None
+            return
+        ids = list(ids)
+        for i in range(0, len(ids), size):
+            yield ids[i:i + size]
 
     @staticmethod
     def finalize_grade(enrollment_id, final_grade, override_reason=None):
@@ -297,5 +437,79 @@ class GPAService:
             db.session.rollback()
             return False, "Failed to finalize grade"
 
+    @staticmethod
+    def finalize_grades(grades):
+        """Finalize many grades in one transaction, then refresh GPAs in bulk.
+
+        grades is a list of dicts with enrollment_id, final_grade and an
+        optional override_reason. Returns (success_count, errors, gpa_update)
+        where gpa_update reports whether GPAs were 'updated', 'queued' as an
+        update_gpas job after the bulk update failed, or 'failed'.
+        """
+        errors = []
+        try:
+            enrollment_ids = [g['enrollment_id'] for g in grades]
+            enrollments = {
+                e.enrollment_id: e
+                for chunk in GPAService._chunks(enrollment_ids)
+                for e in Enrollment.query.filter(Enrollment.enrollment_id.in_(chunk)).all()
+            }
+            summaries = GPAService._get_assessment_summaries(enrollment_ids)
+            
+            finalized = []
+            for grade_data in grades:
+                enrollment_id = grade_data['enrollment_id']
+                final_grade = grade_data['final_grade']
+                override_reason = grade_data.get('override_reason')
+                
+                enrollment = enrollments.get(enrollment_id)
+                if not enrollment:
+                    errors.append({'enrollment_id': enrollment_id, 'error': 'Enrollment not found'})
+                    continue
+                
+                # Validate grade
+                if final_grade not in GPAService.GRADE_POINTS:
+                    errors.append({'enrollment_id': enrollment_id, 'error': 'Invalid grade'})
+                    continue
+                
+                summary = summaries.get(enrollment_id, {'total_percentage': None})
+                suggested_grade = None
+                if summary['total_percentage'] is not None:
+                    suggested_grade = GPAService.calculate_letter_grade(summary['total_percentage'])
+                
+                enrollment.final_grade = final_grade
+                enrollment.grade_points = GPAService.GRADE_POINTS[final_grade]
+                finalized.append(enrollment)
+                
+                # If grade was overridden, log it
+                if suggested_grade and suggested_grade != final_grade:
+                    logger.info(f"Grade override for enrollment {enrollment_id}: "
+                               f"Suggested: {suggested_grade}, Final: {final_grade}, "
+                               f"Reason: {override_reason}")
+            
+            db.session.commit()
+            
+            # Update GPA once for every affected student
+            student_ids = list({e.student_id for e in finalized})
+            updated = GPAService.update_student_gpas(student_ids)
+            if updated is not None:
+                gpa_update = {'status': 'updated', 'students': updated}
+            else:
+                # Grades are committed - retry the GPA refresh in the background
+                from backend.services.job_service import job_service
+                job = job_service.enqueue('update_gpas', payload={'student_ids': student_ids})
+                if job:
+                    gpa_update = {'status': 'queued', 'job_id': job.job_id}
+                else:
+                    gpa_update = {'status': 'failed'}
+                logger.warning(f"GPA update after finalizing grades failed; retry {gpa_update['status']}")
+            
+            return len(finalized), errors, gpa_update
+            
+        except Exception as e:
+            logger.error(f"Error finalizing grades: {str(e)}")
+            db.session.rollback()
+            return 0, [{'enrollment_id': None, 'error': 'Failed to finalize grades'}], None
+
 # Create service instance
 gpa_service = GPAService()
\ No newline at end of file
@@ -0,0 +1,414 @@
+from backend.models import BackgroundJob, BackgroundJobResult, JobLock
+from backend.extensions import db
+from sqlalchemy import func, or_, case
+from sqlalchemy.exc import IntegrityError
+from flask import current_app
+from datetime import datetime, timedelta
+from backend.utils.metrics import metrics
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Registered task functions, keyed by job type
+TASKS = {}
+
+job_duration = metrics.histogram('job_duration_seconds', 'Background job run time')
+jobs_total = metrics.counter('jobs_total', 'Background job runs by outcome')
+
+
+def task(name):
+    """Register a function as a background task.
+
+    The function is called as fn(context, **payload) where context is a
+    JobContext for progress reporting.
+    """
+    def decorator(fn):
+        TASKS[name] = fn
+        return fn
+    return decorator
+
+
+class JobContext:
+    """Handle passed to a running task for progress reporting"""
+
+    def __init__(self, job_id, worker_id=None):
+        self.job_id = job_id
+        self.worker_id = worker_id
+
+    def report_progress(self, current, total=None):
+        """Persist progress without touching the task's own session state"""
+        values = {BackgroundJob.progress_current: current}
+        if total is not None:
+            values[BackgroundJob.progress_total] = total
+        self._update_lock(values)
+
+    def heartbeat(self):
+        """Refresh the job lock so the scheduler doesn't requeue a live job"""
+        return self._update_lock({})
+
+    def _update_lock(self, values):
+        """Update the job (and its lock time) if this worker still holds it"""
+        values = dict(values)
+        values[BackgroundJob.locked_at] = datetime.utcnow()
+        statement = BackgroundJob.__table__.update().where(BackgroundJob.job_id == self.job_id)
+        if self.worker_id is not None:
+            statement = statement.where(BackgroundJob.locked_by == self.worker_id)
+
+        with db.engine.begin() as connection:
+            return connection.execute(
+                statement.values({column.key: value for column, value in values.items()})
+            ).rowcount > 0
+
+
+class JobHeartbeat:
+    """Background thread refreshing a running job's lock every interval"""
+
+    def __init__(self, context, interval):
+        self.context = context
+        self.interval = interval
+        self._app = current_app._get_current_object()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join(timeout=self.interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with self._app.app_context():
+                    if not self.context.heartbeat():
+                        logger.warning(f"Job {self.context.job_id} lock is no longer held "
+                                       f"by {self.context.worker_id}")
+                        return
+            except Exception as e:
+                logger.error(f"Error refreshing lock of job {self.context.job_id}: {str(e)}")
+
+
+class JobService:
+    """Service class for the persistent background job queue"""
+
+    @staticmethod
+    def enqueue(job_type, payload=None, priority=0, dedupe_key=None,
+                max_attempts=None, run_after=None, created_by=None):
+        """Add a job to the queue.
+
+        With a dedupe_key only one job per key is ever created; enqueueing an
+        existing key returns the existing job.
+        """
+        try:
+            job = BackgroundJob(
+                job_type=job_type,
+                payload=payload or {},
+                priority=priority,
+                dedupe_key=dedupe_key,
+                max_attempts=max_attempts or current_app.config.get('JOB_MAX_ATTEMPTS', 3),
+                run_after=run_after or datetime.utcnow(),
+                created_by=created_by
+            )
+            db.session.add(job)
+            db.session.commit()
+            return job
+
+        except IntegrityError:
+            db.session.rollback()
+            return BackgroundJob.query.filter_by(dedupe_key=dedupe_key).first()
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error enqueueing job {job_type}: {str(e)}")
+            return None
+
+    @staticmethod
+    def claim_next(worker_id, job_types=None):
+        """Atomically claim the next runnable job for a worker.
+
+        locked_by is set to a token unique to this claim, so a thread still
+        running an earlier claim of the same job (requeued as stale and
+        claimed again, possibly by the same process) no longer owns it.
+        """
+        try:
+            now = datetime.utcnow()
+            token = f"{worker_id}:{uuid.uuid4().hex}"
+            query = db.session.query(BackgroundJob.job_id).filter(
+                BackgroundJob.status == 'queued',
+                BackgroundJob.run_after <= now
+            )
+            if job_types:
+                query = query.filter(BackgroundJob.job_type.in_(job_types))
+
+            candidates = query.order_by(
+                BackgroundJob.priority.desc(),
+                BackgroundJob.job_id
+            ).limit(10).all()
+
+            for (job_id,) in candidates:
+                # Conditional update - only one worker can move a job out of 'queued'
+                claimed = BackgroundJob.query.filter(
+                    BackgroundJob.job_id == job_id,
+                    BackgroundJob.status == 'queued'
+                ).update({
+                    BackgroundJob.status: 'running',
+                    BackgroundJob.locked_by: token,
+                    BackgroundJob.locked_at: now,
+                    BackgroundJob.started_at: now,
+                    BackgroundJob.attempts: BackgroundJob.attempts + 1
+                }, synchronize_session=False)
+                db.session.commit()
+
+                if claimed:
+                    return BackgroundJob.query.get(job_id)
+
+            return None
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error claiming job: {str(e)}")
+            return None
+
+    @staticmethod
+    def run_job(job):
+        """Execute a claimed job and record its outcome"""
+        fn = TASKS.get(job.job_type)
+        job_id = job.job_id
+        worker_id = job.locked_by  # per-claim token written by claim_next
+        context = JobContext(job_id, worker_id)
+        heartbeat_interval = current_app.config.get('JOB_HEARTBEAT_INTERVAL', 60)
+        started = time.perf_counter()
+
+        try:
+            if fn is None:
+                raise LookupError(f"No task registered for job type '{job.job_type}'")
+
+            with JobHeartbeat(context, heartbeat_interval):
+                result = fn(context, **(job.payload or {}))
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            job_duration.observe(duration_ms / 1000, job_type=job.job_type)
+            jobs_total.inc(job_type=job.job_type, status='succeeded')
+            JobService._complete(job_id, worker_id, result, duration_ms)
+            logger.info(f"Job {job_id} ({job.job_type}) succeeded in {duration_ms}ms")
+
+        except Exception as e:
+            db.session.rollback()
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            job_duration.observe(duration_ms / 1000, job_type=job.job_type)
+            jobs_total.inc(job_type=job.job_type, status='failed')
+            logger.error(f"Job {job_id} ({job.job_type}) failed after {duration_ms}ms: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            JobService._fail(job_id, worker_id, str(e), duration_ms)
+
+    @staticmethod
+    def _owned(job_id, worker_id):
+        """Query for a job still locked by worker_id (not requeued or re-claimed)"""
+        return BackgroundJob.query.filter(
+            BackgroundJob.job_id == job_id,
+            BackgroundJob.status == 'running',
+            BackgroundJob.locked_by == worker_id
+        )
+
+    @staticmethod
+    def _complete(job_id, worker_id, result, duration_ms):
+        updated = JobService._owned(job_id, worker_id).update({
+            BackgroundJob.status: 'succeeded',
+            BackgroundJob.result: result if isinstance(result, (dict, list)) or result is None else {'value': result},
+            BackgroundJob.finished_at: datetime.utcnow(),
+            BackgroundJob.duration_ms: duration_ms,
+            BackgroundJob.error_message: None,
+            BackgroundJob.locked_by: None
+        }, synchronize_session=False)
+        db.session.commit()
+
+        if not updated:
+            logger.warning(f"Job {job_id} finished on {worker_id} after its lock was released; "
+                           f"outcome not recorded")
+
+    @staticmethod
+    def _fail(job_id, worker_id, error_message, duration_ms):
+        """Mark a job failed, or requeue it with exponential backoff"""
+        try:
+            job = JobService._owned(job_id, worker_id).first()
+            if job is None:
+                logger.warning(f"Job {job_id} failed on {worker_id} after its lock was released; "
+                               f"outcome not recorded")
+                return
+
+            values = {
+                BackgroundJob.error_message: error_message,
+                BackgroundJob.duration_ms: duration_ms,
+                BackgroundJob.locked_by: None
+            }
+            if job.attempts < job.max_attempts:
+                base = current_app.config.get('JOB_RETRY_BACKOFF', 30)
+                delay = min(base * (2 ** (job.attempts - 1)), 3600)
+                values[BackgroundJob.status] = 'queued'
+                values[BackgroundJob.run_after] = datetime.utcnow() + timedelta(seconds=delay)
+                logger.info(f"Job {job_id} will retry in {delay}s "
+                            f"(attempt {job.attempts}/{job.max_attempts})")
+            else:
+                values[BackgroundJob.status] = 'failed'
+                values[BackgroundJob.finished_at] = datetime.utcnow()
+
+            # Conditional, in case the lock expired between the read and now
+            JobService._owned(job_id, worker_id).update(values, synchronize_session=False)
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error recording job failure: {str(e)}")
+
+    @staticmethod
+    def requeue_stale_jobs():
+        """Return jobs held by dead workers to the queue"""
+        try:
+            timeout = current_app.config.get('JOB_LOCK_TIMEOUT', 3600)
+            cutoff = datetime.utcnow() - timedelta(seconds=timeout)
+
+            requeued = BackgroundJob.query.filter(
+                BackgroundJob.status == 'running',
+                BackgroundJob.locked_at < cutoff
+            ).update({
+                BackgroundJob.status: case(
+                    (BackgroundJob.attempts < BackgroundJob.max_attempts, 'queued'),
+                    else_='failed'
+                ),
+                BackgroundJob.locked_by: None,
+                BackgroundJob.finished_at: case(
+                    (BackgroundJob.attempts < BackgroundJob.max_attempts, BackgroundJob.finished_at),
+                    else_=datetime.utcnow()
+                ),
+                BackgroundJob.error_message: 'Worker lock expired'
+            }, synchronize_session=False)
+            db.session.commit()
+
+            if requeued:
+                logger.warning(f"Released {requeued} stale jobs")
+            return requeued
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error requeueing stale jobs: {str(e)}")
+            return 0
+
+    @staticmethod
+    def acquire_lock(lock_name, owner, ttl_seconds):
+        """Acquire or renew an expiring named lock; True if owner holds it"""
+        try:
+            now = datetime.utcnow()
+            expires_at = now + timedelta(seconds=ttl_seconds)
+
+            renewed = JobLock.query.filter(
+                JobLock.lock_name == lock_name,
+                or_(JobLock.owner == owner, JobLock.expires_at < now)
+            ).update({
+                JobLock.owner: owner,
+                JobLock.expires_at: expires_at
+            }, synchronize_session=False)
+            db.session.commit()
+
+            if renewed:
+                return True
+
+            db.session.add(JobLock(lock_name, owner, expires_at))
+            db.session.commit()
+            return True
+
+        except IntegrityError:
+            # Lock row exists and is held by another live owner
+            db.session.rollback()
+            return False
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error acquiring lock {lock_name}: {str(e)}")
+            return False
+
+    @staticmethod
+    def get_job(job_id):
+        """Get a job by ID"""
+        return BackgroundJob.query.get(job_id)
+
+    @staticmethod
+    def add_result(job_id, status, enrollment_id=None, data=None, error_message=None):
+        """Stage a per-item result; committed with the caller's transaction"""
+        result = BackgroundJobResult(
+            job_id=job_id,
+            status=status,
+            enrollment_id=enrollment_id,
+            data=data,
+            error_message=error_message
+        )
+        db.session.add(result)
+        return result
+
+    @staticmethod
+    def get_job_results(job_id, page=1, per_page=50, status=None):
+        """Get a page of per-item results for a job; returns (results, total)"""
+        query = BackgroundJobResult.query.filter(BackgroundJobResult.job_id == job_id)
+        if status:
+            query = query.filter(BackgroundJobResult.status == status)
+
+        total = query.count()
+        results = query.order_by(
+            BackgroundJobResult.result_id
+        ).offset((page - 1) * per_page).limit(per_page).all()
+
+        return results, total
+
+    @staticmethod
+    def get_recent_jobs(status=None, job_type=None, limit=50):
+        """Get the most recent jobs, optionally filtered"""
+        query = BackgroundJob.query
+        if status:
+            query = query.filter(BackgroundJob.status == status)
+        if job_type:
+            query = query.filter(BackgroundJob.job_type == job_type)
+        return query.order_by(BackgroundJob.job_id.desc()).limit(limit).all()
+
+    @staticmethod
+    def get_job_metrics(hours=24):
+        """Per job type counts and duration statistics over a time window"""
+        try:
+            since = datetime.utcnow() - timedelta(hours=hours)
+
+            rows = db.session.query(
+                BackgroundJob.job_type,
+                func.count(BackgroundJob.job_id).label('total'),
+                func.sum(case((BackgroundJob.status == 'succeeded', 1), else_=0)).label('succeeded'),
+                func.sum(case((BackgroundJob.status == 'failed', 1), else_=0)).label('failed'),
+                func.sum(case((BackgroundJob.status == 'queued', 1), else_=0)).label('queued'),
+                func.sum(case((BackgroundJob.status == 'running', 1), else_=0)).label('running'),
+                func.avg(BackgroundJob.duration_ms).label('avg_duration_ms'),
+                func.max(BackgroundJob.duration_ms).label('max_duration_ms')
+            ).filter(
+                BackgroundJob.created_at >= since
+            ).group_by(
+                BackgroundJob.job_type
+            ).all()
+
+            return [{
+                'job_type': row.job_type,
+                'total': int(row.total or 0),
+                'succeeded': int(row.succeeded or 0),
+                'failed': int(row.failed or 0),
+                'queued': int(row.queued or 0),
+                'running': int(row.running or 0),
+                'avg_duration_ms': round(float(row.avg_duration_ms), 1) if row.avg_duration_ms is not None else None,
+                'max_duration_ms': row.max_duration_ms
+            } for row in rows]
+
+        except Exception as e:
+            logger.error(f"Error getting job metrics: {str(e)}")
+            return []
+
+
+# Create service instance
+job_service = JobService()
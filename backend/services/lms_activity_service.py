@@ -1,12 +1,24 @@
-from datetime import datetime
-from backend.models import LMSSession, LMSActivity, Enrollment
+from datetime import datetime, timedelta, timezone
+from backend.models import LMSSession, LMSActivity, Enrollment, CourseOffering
 from backend.extensions import db
+from backend.services.dirty_tracking_service import dirty_tracking_service
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Client event type -> activity_type column value
+BATCH_EVENT_TYPES = {
+    'page': 'page_view',
+    'resource': 'resource_view',
+    'assessment': 'assignment_view'
+}
+
 class LMSActivityService:
     
+    MAX_BATCH_EVENTS = 500
+    MAX_EVENT_AGE = timedelta(days=1)  # older client timestamps are clamped
+    SESSION_TIMEOUT = timedelta(hours=1)
+    
     @staticmethod
     def track_page_view(enrollment_id, page_url, page_title=None, ip_address=None, user_agent=None):
         """Track a page view"""
@@ -25,6 +37,7 @@ class LMSActivityService:
             )
             
             db.session.add(activity)
+            dirty_tracking_service.mark_dirty(enrollment_id, 'lms')
             db.session.commit()
             
             return activity
@@ -52,6 +65,7 @@ class LMSActivityService:
             )
             
             db.session.add(activity)
+            dirty_tracking_service.mark_dirty(enrollment_id, 'lms')
             db.session.commit()
             
             return activity
@@ -77,6 +91,7 @@ class LMSActivityService:
             )
             
             db.session.add(activity)
+            dirty_tracking_service.mark_dirty(enrollment_id, 'lms')
             db.session.commit()
             
             return activity
@@ -86,6 +101,173 @@ class LMSActivityService:
             db.session.rollback()
             return None
     
+    @staticmethod
+    def track_batch(student_id, events, ip_address=None, user_agent=None):
+        """Record a batch of client-buffered events for a student.
+        
+        Enrollments for every referenced course/offering are resolved with
+        one query, open sessions with another, and all activities are
+        written with a single multi-row insert. Events naming a course or
+        offering the student is not enrolled in are rejected and counted as
+        unmatched; events naming neither are general activity and go to the
+        first enrollment, like the single-event endpoints. Returns
+        (result, error).
+        """
+        try:
+            # One query for all of the student's active enrollments
+            enrollments = db.session.query(
+                Enrollment.enrollment_id, CourseOffering.offering_id, CourseOffering.course_id
+            ).join(
+                CourseOffering, Enrollment.offering_id == CourseOffering.offering_id
+            ).filter(
+                Enrollment.student_id == student_id,
+                Enrollment.enrollment_status == 'enrolled'
+            ).order_by(Enrollment.enrollment_id).all()
+            
+            if not enrollments:
+                return {'tracked': 0, 'rejected': len(events), 'unmatched': 0}, None
+            
+            by_course = {}
+            by_offering = {}
+            for enrollment_id, offering_id, course_id in enrollments:
+                by_course.setdefault(str(course_id), enrollment_id)
+                by_offering[str(offering_id)] = enrollment_id
+            default_enrollment = enrollments[0][0]
+            
+            now = datetime.utcnow()
+            rows = []
+            rejected = 0
+            unmatched = 0
+            for event in events:
+                activity = LMSActivityService._batch_event_row(event, now)
+                if activity is None:
+                    rejected += 1
+                    continue
+                
+                offering_id = event.get('offering_id')
+                course_id = event.get('course_id')
+                if offering_id:
+                    enrollment_id = by_offering.get(str(offering_id))
+                elif course_id:
+                    enrollment_id = by_course.get(str(course_id))
+                else:
+                    enrollment_id = default_enrollment
+                
+                if enrollment_id is None:
+                    # Not one of the student's courses - don't credit
+                    # another course's features with it
+                    unmatched += 1
+                    continue
+                
+                activity['enrollment_id'] = enrollment_id
+                rows.append(activity)
+            
+            if rows:
+                enrollment_ids = {row['enrollment_id'] for row in rows}
+                sessions = LMSActivityService._get_or_create_sessions(
+                    enrollment_ids, now, ip_address, user_agent
+                )
+                for row in rows:
+                    row['session_id'] = sessions[row['enrollment_id']]
+                
+                db.session.execute(LMSActivity.__table__.insert(), rows)
+                dirty_tracking_service.mark_dirty_many(enrollment_ids, 'lms')
+                db.session.commit()
+            
+            if unmatched:
+                logger.warning(f"Rejected {unmatched} activity events for courses student "
+                               f"{student_id} is not enrolled in")
+            
+            return {'tracked': len(rows), 'rejected': rejected + unmatched, 'unmatched': unmatched}, None
+            
+        except Exception as e:
+            logger.error(f"Error tracking activity batch: {str(e)}")
+            db.session.rollback()
+            return None, 'Failed to track activities'
+    
+    @staticmethod
+    def _batch_event_row(event, now):
+        """Activity column values for one client event, or None if invalid"""
+        if not isinstance(event, dict):
+            return None
+        
+        activity_type = BATCH_EVENT_TYPES.get(event.get('type'))
+        if not activity_type:
+            return None
+        
+        if activity_type == 'page_view':
+            resource_id = event.get('page_url')
+            resource_name = event.get('page_title') or resource_id
+            details = None
+        elif activity_type == 'resource_view':
+            resource_id = event.get('resource_id')
+            resource_name = event.get('resource_name')
+            details = {'resource_type': event.get('resource_type', 'document')}
+        else:
+            assessment_id = event.get('assessment_id')
+            resource_id = f"assessment_{assessment_id}" if assessment_id else None
+            resource_name = event.get('assessment_name')
+            details = None
+        
+        if not resource_id or not resource_name:
+            return None
+        
+        return {
+            'activity_type': activity_type,
+            'activity_timestamp': LMSActivityService._client_timestamp(event.get('timestamp'), now),
+            'resource_id': str(resource_id)[:50],
+            'resource_name': str(resource_name)[:255],
+            'duration_seconds': None,
+            'details': details
+        }
+    
+    @staticmethod
+    def _client_timestamp(value, now):
+        """Parse a client timestamp (epoch ms or ISO 8601, UTC), clamped to
+        [now - MAX_EVENT_AGE, now] to absorb clock skew"""
+        try:
+            if isinstance(value, (int, float)):
+                timestamp = datetime.utcfromtimestamp(value / 1000)
+            elif isinstance(value, str):
+                timestamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                if timestamp.tzinfo is not None:
+                    timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+            else:
+                return now
+        except (ValueError, OverflowError, OSError):
+            return now
+        
+        return min(max(timestamp, now - LMSActivityService.MAX_EVENT_AGE), now)
+    
+    @staticmethod
+    def _get_or_create_sessions(enrollment_ids, now, ip_address=None, user_agent=None):
+        """Active session id per enrollment, creating sessions where needed"""
+        open_sessions = LMSSession.query.filter(
+            LMSSession.enrollment_id.in_(enrollment_ids),
+            LMSSession.logout_time.is_(None),
+            LMSSession.login_time > now - LMSActivityService.SESSION_TIMEOUT
+        ).order_by(LMSSession.login_time).all()
+        
+        # Latest open session wins
+        sessions = {session.enrollment_id: session.session_id for session in open_sessions}
+        
+        missing = [enrollment_id for enrollment_id in enrollment_ids if enrollment_id not in sessions]
+        if missing:
+            new_sessions = [
+                LMSSession(
+                    enrollment_id=enrollment_id,
+                    login_time=now,
+                    ip_address=ip_address,
+                    user_agent=user_agent[:255] if user_agent else None
+                )
+                for enrollment_id in missing
+            ]
+            db.session.add_all(new_sessions)
+            db.session.flush()  # one flush for all new session ids
+            sessions.update({session.enrollment_id: session.session_id for session in new_sessions})
+        
+        return sessions
+    
     @staticmethod
     def _get_or_create_session(enrollment_id, ip_address=None, user_agent=None):
         """Get active session or create new one"""
@@ -0,0 +1,183 @@
+from backend.models import LMSActivity, LMSActivityDaily, LMSSession
+from backend.extensions import db
+from flask import current_app
+from datetime import datetime, timedelta
+import gzip
+import json
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = [
+    'activity_id', 'session_id', 'enrollment_id', 'activity_type', 'activity_timestamp',
+    'resource_id', 'resource_name', 'duration_seconds', 'details'
+]
+
+
+class LMSRetentionService:
+    """Tiered retention for lms_activities.
+
+    Raw activities older than LMS_RETENTION_DAYS are folded into
+    lms_activity_daily (one row per enrollment, day, activity type and
+    resource), written to gzipped JSON-lines archives and deleted in
+    bounded batches. Feature calculation reads both tables, so features
+    are unchanged by compaction: every per-day click total, active day
+    and distinct resource survives in the aggregates.
+    """
+
+    MIN_RETENTION_DAYS = 7  # never compact days the daily summary job may still read
+
+    @staticmethod
+    def compact(retention_days=None, batch_size=None, max_batches=None, archive_dir=None):
+        """Compact raw activities older than the retention window.
+
+        Returns a dict with the number of activities compacted, aggregate
+        rows written, batches run and the archive file.
+        """
+        retention_days = max(
+            retention_days or current_app.config.get('LMS_RETENTION_DAYS', 180),
+            LMSRetentionService.MIN_RETENTION_DAYS
+        )
+        batch_size = batch_size or current_app.config.get('LMS_COMPACTION_BATCH_SIZE', 5000)
+        max_batches = max_batches or current_app.config.get('LMS_COMPACTION_MAX_BATCHES', 200)
+        archive_dir = archive_dir or current_app.config.get('LMS_ARCHIVE_DIR', 'archives/lms_activities')
+
+        today = datetime.utcnow().date()
+        cutoff = datetime.combine(today - timedelta(days=retention_days), datetime.min.time())
+        stats = {'activities': 0, 'aggregates': 0, 'batches': 0, 'archive': None, 'cutoff': cutoff.isoformat()}
+
+        archive = None
+        try:
+            for _ in range(max_batches):
+                rows = LMSRetentionService._next_batch(cutoff, batch_size)
+                if not rows:
+                    break
+
+                if archive is None:
+                    os.makedirs(archive_dir, exist_ok=True)
+                    stats['archive'] = os.path.join(
+                        archive_dir, f"lms_activities_{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.jsonl.gz"
+                    )
+                    archive = gzip.open(stats['archive'], 'at', encoding='utf-8')
+
+                # Archive first: if the transaction below fails the rows stay
+                # in lms_activities and are archived again (dedupe on activity_id)
+                for row in rows:
+                    archive.write(json.dumps(dict(zip(ARCHIVE_COLUMNS, row[1:])), default=str))
+                    archive.write('\n')
+                archive.flush()
+
+                stats['aggregates'] += LMSRetentionService._merge_aggregates(rows)
+                LMSActivity.query.filter(
+                    LMSActivity.activity_id.in_([row.activity_id for row in rows])
+                ).delete(synchronize_session=False)
+                db.session.commit()
+
+                stats['activities'] += len(rows)
+                stats['batches'] += 1
+
+            if stats['activities']:
+                logger.info(f"Compacted {stats['activities']} LMS activities older than {cutoff.date()} "
+                            f"into {stats['aggregates']} aggregate updates ({stats['archive']})")
+            return stats
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error compacting LMS activities: {str(e)}")
+            raise
+
+        finally:
+            if archive is not None:
+                archive.close()
+
+    @staticmethod
+    def _next_batch(cutoff, batch_size):
+        """Oldest raw activities before the cutoff, with the session's enrollment.
+
+        Feature calculation attributes activities through their session,
+        so aggregates are keyed the same way.
+        """
+        return db.session.query(
+            LMSSession.enrollment_id.label('aggregate_enrollment_id'),
+            LMSActivity.activity_id,
+            LMSActivity.session_id,
+            LMSActivity.enrollment_id,
+            LMSActivity.activity_type,
+            LMSActivity.activity_timestamp,
+            LMSActivity.resource_id,
+            LMSActivity.resource_name,
+            LMSActivity.duration_seconds,
+            LMSActivity.details
+        ).join(
+            LMSSession, LMSSession.session_id == LMSActivity.session_id
+        ).filter(
+            LMSActivity.activity_timestamp < cutoff
+        ).order_by(LMSActivity.activity_id).limit(batch_size).all()
+
+    @staticmethod
+    def _merge_aggregates(rows):
+        """Fold a batch of raw rows into lms_activity_daily"""
+        groups = {}
+        for row in rows:
+            key = (row.aggregate_enrollment_id, row.activity_timestamp.date(), row.activity_type, row.resource_id)
+            group = groups.get(key)
+            if group is None:
+                groups[key] = {
+                    'activity_count': 1,
+                    'total_duration_seconds': row.duration_seconds or 0,
+                    'first_activity_at': row.activity_timestamp,
+                    'last_activity_at': row.activity_timestamp
+                }
+            else:
+                group['activity_count'] += 1
+                group['total_duration_seconds'] += row.duration_seconds or 0
+                group['first_activity_at'] = min(group['first_activity_at'], row.activity_timestamp)
+                group['last_activity_at'] = max(group['last_activity_at'], row.activity_timestamp)
+
+        # A day can span batches; add to aggregates written by earlier ones
+        enrollment_ids = {key[0] for key in groups}
+        dates = {key[1] for key in groups}
+        existing = {
+            (a.enrollment_id, a.activity_date, a.activity_type, a.resource_id): a
+            for a in LMSActivityDaily.query.filter(
+                LMSActivityDaily.enrollment_id.in_(enrollment_ids),
+                LMSActivityDaily.activity_date.between(min(dates), max(dates))
+            ).all()
+        }
+
+        new_rows = []
+        for key, group in groups.items():
+            aggregate = existing.get(key)
+            if aggregate is not None:
+                aggregate.activity_count += group['activity_count']
+                aggregate.total_duration_seconds = (aggregate.total_duration_seconds or 0) + group['total_duration_seconds']
+                aggregate.first_activity_at = min(aggregate.first_activity_at, group['first_activity_at'])
+                aggregate.last_activity_at = max(aggregate.last_activity_at, group['last_activity_at'])
+            else:
+                enrollment_id, activity_date, activity_type, resource_id = key
+                new_rows.append(dict(
+                    group,
+                    enrollment_id=enrollment_id,
+                    activity_date=activity_date,
+                    activity_type=activity_type,
+                    resource_id=resource_id
+                ))
+
+        if new_rows:
+            db.session.execute(LMSActivityDaily.__table__.insert(), new_rows)
+        return len(groups)
+
+    @staticmethod
+    def get_status():
+        """Row counts and the oldest raw activity, for monitoring"""
+        return {
+            'raw_activities': db.session.query(db.func.count(LMSActivity.activity_id)).scalar(),
+            'oldest_raw_activity': db.session.query(db.func.min(LMSActivity.activity_timestamp)).scalar(),
+            'aggregate_rows': db.session.query(db.func.count(LMSActivityDaily.aggregate_id)).scalar(),
+            'retention_days': current_app.config.get('LMS_RETENTION_DAYS', 180)
+        }
+
+
+# Create service instance
+lms_retention_service = LMSRetentionService()
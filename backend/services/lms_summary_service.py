@@ -2,6 +2,8 @@ from datetime import datetime, timedelta
 from sqlalchemy import func
 from backend.models import LMSSession, LMSActivity, LMSDailySummary, Enrollment
 from backend.extensions import db
+from backend.utils.metrics import metrics
+from backend.services.engagement_baseline_service import engagement_baseline_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,6 +12,7 @@ class LMSSummaryService:
     """Service to aggregate daily LMS activity summaries"""
     
     @staticmethod
+    @metrics.timed('lms_daily_summary', 'LMS daily summary generation latency')
     def generate_daily_summary(date=None):
         """
         Generate daily summary for all students
@@ -37,6 +40,13 @@ class LMSSummaryService:
         except Exception as e:
             logger.error(f"Error generating daily summary: {str(e)}")
             db.session.rollback()
+            return
+        
+        try:
+            # Roll the per-offering engagement baselines forward to this day
+            engagement_baseline_service.refresh(date)
+        except Exception as e:
+            logger.error(f"Error refreshing engagement baselines: {str(e)}")
     
     @staticmethod
     def _generate_summary_for_enrollment(enrollment_id, date):
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from flask import current_app
+from backend.extensions import db
+from backend.models import Enrollment, CourseOffering, AcademicTerm, ModelVersion, ModelEvaluation
+from backend.services.feature_timeline_service import feature_timeline_service
+from backend.services.model_service import ModelService
+from backend.utils.lazy_import import lazy_import
+import logging
+
+np = lazy_import('numpy')
+sk_metrics = lazy_import('sklearn.metrics')
+
+logger = logging.getLogger(__name__)
+
+# Final grades counted as a fail when scoring predictions
+FAILING_GRADES = {'F'}
+
+# Risk levels that raise an alert (see PredictionService.generate_prediction)
+ALERT_RISK_LEVELS = {'medium', 'high'}
+
+CALIBRATION_BINS = 10
+
+
+class ModelEvaluationService:
+    """Backtests the deployed model over completed terms.
+
+    For every enrollment with a final grade in a finished term, features are
+    reconstructed at weekly cutoffs (FeatureTimelineService), scored in
+    batches and compared with the final grade. Accuracy, AUC, Brier score
+    and calibration are computed per cutoff, along with how far ahead of
+    term end failing students were first flagged. Results are stored as a
+    ModelEvaluation of the deployed ModelVersion.
+    """
+
+    def __init__(self):
+        self.model_service = ModelService()
+
+    def run_backtest(self, term_ids: Optional[Sequence[int]] = None,
+                     offsets: Optional[Sequence[int]] = None,
+                     progress=None) -> ModelEvaluation:
+        """Evaluate the deployed model; progress(current, total) is called per chunk"""
+        version = self._resolve_version()
+        evaluation = ModelEvaluation(version.version_id, term_ids=list(term_ids) if term_ids else None)
+        db.session.add(evaluation)
+        db.session.commit()
+
+        try:
+            enrollments = self._completed_enrollments(term_ids)
+            if not enrollments:
+                raise ValueError("No graded enrollments in completed terms")
+
+            term_days = np.array([(row.end_date - row.start_date).days for row in enrollments])
+            if offsets is None:
+                offsets = list(range(7, int(term_days.max()) + 1, 7)) or [int(term_days.max())]
+            offsets = [int(offset) for offset in offsets]
+            evaluation.cutoff_offsets = offsets
+
+            failed = np.array([row.final_grade in FAILING_GRADES for row in enrollments])
+            pass_probability = self._score(
+                [row.enrollment_id for row in enrollments], offsets, progress
+            )
+
+            cutoff_metrics = [
+                self._cutoff_metrics(offset, failed, 1 - pass_probability[:, k], term_days >= offset)
+                for k, offset in enumerate(offsets)
+            ]
+            lead_time = self._lead_time(failed, pass_probability, offsets, term_days)
+            final = cutoff_metrics[-1]
+
+            evaluation.enrollment_count = len(enrollments)
+            evaluation.failed_count = int(failed.sum())
+            evaluation.accuracy = final['accuracy']
+            evaluation.auc = final['auc']
+            evaluation.brier_score = final['brier_score']
+            evaluation.median_lead_time_days = lead_time['median_days']
+            evaluation.metrics = {'cutoffs': cutoff_metrics, 'lead_time': lead_time}
+            evaluation.status = 'completed'
+            evaluation.completed_at = datetime.utcnow()
+
+            # The version's headline numbers now come from the backtest
+            version.accuracy = final['accuracy']
+            version.precision_score = final['precision']
+            version.recall_score = final['recall']
+            version.f1_score = final['f1_score']
+            db.session.commit()
+
+            logger.info(f"Backtest of model {version.version_name}: {len(enrollments)} enrollments, "
+                        f"accuracy {final['accuracy']}, AUC {final['auc']}")
+            return evaluation
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error running model backtest: {str(e)}")
+            evaluation.status = 'failed'
+            evaluation.error_message = str(e)
+            evaluation.completed_at = datetime.utcnow()
+            db.session.commit()
+            raise
+
+    def _resolve_version(self) -> ModelVersion:
+        """The ModelVersion row of the deployed model, registered on first backtest"""
+        version_name = self.model_service.get_model_info()['version']
+        version = ModelVersion.query.filter_by(version_name=version_name).first()
+        if version is None:
+            version = ModelVersion(
+                version_name,
+                model_file_path='ml_models/grade_predictor.pkl',
+                feature_list=self.model_service.get_feature_list(),
+                notes='Registered by model backtest'
+            )
+            db.session.add(version)
+            db.session.commit()
+        return version
+
+    @staticmethod
+    def _completed_enrollments(term_ids):
+        query = db.session.query(
+            Enrollment.enrollment_id, Enrollment.final_grade,
+            AcademicTerm.start_date, AcademicTerm.end_date
+        ).join(
+            CourseOffering, Enrollment.offering_id == CourseOffering.offering_id
+        ).join(
+            AcademicTerm, CourseOffering.term_id == AcademicTerm.term_id
+        ).filter(
+            AcademicTerm.end_date < datetime.now().date(),
+            Enrollment.final_grade.isnot(None)
+        )
+        if term_ids:
+            query = query.filter(AcademicTerm.term_id.in_(term_ids))
+        return query.order_by(Enrollment.enrollment_id).all()
+
+    def _score(self, enrollment_ids: List[int], offsets: List[int], progress=None) -> np.ndarray:
+        """Pass probability per enrollment and cutoff, (enrollments x cutoffs)"""
+        chunk_size = current_app.config.get('BACKTEST_CHUNK_SIZE', 1000)
+        scores = np.zeros((len(enrollment_ids), len(offsets)))
+        for start in range(0, len(enrollment_ids), chunk_size):
+            chunk = enrollment_ids[start:start + chunk_size]
+            tensor = feature_timeline_service.calculate_feature_tensor(chunk, offsets=offsets)
+            probabilities = self.model_service.predict_pass_probability(
+                tensor.reshape(-1, tensor.shape[2])
+            )
+            scores[start:start + len(chunk)] = probabilities.reshape(len(chunk), len(offsets))
+            if progress:
+                progress(start + len(chunk), len(enrollment_ids))
+        return scores
+
+    @staticmethod
+    def _cutoff_metrics(offset, failed, fail_probability, in_term) -> Dict:
+        """Classification and calibration metrics for failing at one cutoff"""
+        predicted_fail = fail_probability > 0.5
+        true_positive = int((predicted_fail & failed).sum())
+        flagged, actual = int(predicted_fail.sum()), int(failed.sum())
+        precision = true_positive / flagged if flagged else None
+        recall = true_positive / actual if actual else None
+        f1_score = (2 * precision * recall / (precision + recall)
+                    if precision and recall else None)
+
+        # AUC needs both outcomes present
+        auc = (float(sk_metrics.roc_auc_score(failed, fail_probability))
+               if 0 < actual < len(failed) else None)
+
+        bins = np.minimum((fail_probability * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)
+        calibration = []
+        for b in range(CALIBRATION_BINS):
+            mask = bins == b
+            count = int(mask.sum())
+            calibration.append({
+                'bin': [b / CALIBRATION_BINS, (b + 1) / CALIBRATION_BINS],
+                'count': count,
+                'mean_predicted': round(float(fail_probability[mask].mean()), 4) if count else None,
+                'observed_fail_rate': round(float(failed[mask].mean()), 4) if count else None
+            })
+
+        return {
+            'offset_days': offset,
+            'week': offset // 7,
+            'in_term_share': round(float(in_term.mean()), 4),
+            'accuracy': round(float((predicted_fail == failed).mean()), 4),
+            'precision': round(precision, 4) if precision is not None else None,
+            'recall': round(recall, 4) if recall is not None else None,
+            'f1_score': round(f1_score, 4) if f1_score is not None else None,
+            'auc': round(auc, 4) if auc is not None else None,
+            'brier_score': round(float(((fail_probability - failed) ** 2).mean()), 4),
+            'flagged_rate': round(flagged / len(failed), 4),
+            'calibration': calibration
+        }
+
+    def _lead_time(self, failed, pass_probability, offsets, term_days) -> Dict:
+        """Days between the first at-risk flag and term end.
+
+        A student is flagged at a cutoff when the model's risk level there
+        would raise an alert; cutoffs after the student's term ended don't
+        count.
+        """
+        offsets = np.array(offsets)
+        risk = np.vectorize(
+            lambda p: self.model_service._calculate_risk_level(int(p >= 0.5), max(p, 1 - p)),
+            otypes=[object]
+        )(pass_probability)
+        flagged = np.isin(risk, list(ALERT_RISK_LEVELS)) & (offsets[None, :] <= term_days[:, None])
+
+        ever_flagged = flagged.any(axis=1)
+        first_flag = flagged.argmax(axis=1)
+        detected = failed & ever_flagged
+        lead_days = (term_days - offsets[first_flag])[detected]
+
+        return {
+            'failed_students': int(failed.sum()),
+            'detected': int(detected.sum()),
+            'detection_rate': round(float(detected.sum() / failed.sum()), 4) if failed.any() else None,
+            'false_alarm_rate': (round(float((ever_flagged & ~failed).sum() / (~failed).sum()), 4)
+                                 if (~failed).any() else None),
+            'median_days': round(float(np.median(lead_days)), 1) if len(lead_days) else None,
+            'mean_days': round(float(lead_days.mean()), 1) if len(lead_days) else None,
+            'first_flag_by_week': {
+                int(offset // 7): int((detected & (first_flag == k)).sum())
+                for k, offset in enumerate(offsets)
+            }
+        }
+
+    @staticmethod
+    def get_latest_evaluation(version_id: int) -> Optional[ModelEvaluation]:
+        """Most recent completed backtest of a model version"""
+        return ModelEvaluation.query.filter_by(
+            version_id=version_id, status='completed'
+        ).order_by(ModelEvaluation.completed_at.desc()).first()
+
+
+# Create service instance
+model_evaluation_service = ModelEvaluationService()
@@ -1,9 +1,16 @@
+from __future__ import annotations
+
 import pickle
 import json
-import numpy as np
+import threading
 from typing import Dict, List, Tuple, Optional
 import logging
 from datetime import datetime
+from backend.utils.lazy_import import lazy_import
+from backend.utils.metrics import metrics
+
+np = lazy_import('numpy')
+xgb = lazy_import('xgboost')
 
 logger = logging.getLogger(__name__)
 
@@ -14,20 +21,41 @@ class ModelService:
     _model = None
     _scaler = None
     _metadata = None
+    _feature_list = None
+    _feature_importance = None
+    _load_lock = threading.Lock()
     
     def __new__(cls):
-        """Singleton pattern for model service"""
+        """Singleton pattern for model service.
+        
+        Construction is cheap: the model artifacts (and the ML libraries
+        unpickling them) are loaded on first use or by warmup().
+        """
         if cls._instance is None:
             cls._instance = super(ModelService, cls).__new__(cls)
-            cls._instance._initialize()
         return cls._instance
     
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+    
+    def warmup(self) -> Dict:
+        """Load the model now instead of on the first prediction"""
+        self._ensure_loaded()
+        return self.get_model_info()
+    
+    def _ensure_loaded(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._initialize()
+    
     def _initialize(self):
-        """Initialize the model service"""
+        """Load the model artifacts"""
         try:
             # Load model
             with open('ml_models/grade_predictor.pkl', 'rb') as f:
-                self._model = pickle.load(f)
+                model = pickle.load(f)
             logger.info("Model loaded successfully")
             
             # Load scaler
@@ -45,10 +73,17 @@ class ModelService:
                 self._feature_list = json.load(f)
             logger.info(f"Feature list loaded: {len(self._feature_list)} features")
             
+            # Global importance belongs to this model version; read it once
+            self._feature_importance = self._load_feature_importance(model)
+            
+            # Published last - other threads treat a set _model as fully loaded
+            self._model = model
+            
         except Exception as e:
             logger.error(f"Error loading model: {str(e)}")
             raise
     
+    @metrics.timed('model_predict', 'Model inference latency')
     def predict(self, features: np.ndarray) -> Tuple[str, float, str]:
         """
         Make a prediction using the loaded model
@@ -59,6 +94,7 @@ class ModelService:
         Returns:
             Tuple of (predicted_grade, confidence, risk_level)
         """
+        self._ensure_loaded()
         try:
             # Scale features
             features_scaled = self._scaler.transform(features)
@@ -82,6 +118,23 @@ class ModelService:
             logger.error(f"Prediction error: {str(e)}")
             raise
     
+    @metrics.timed('model_predict_matrix', 'Batched model inference latency')
+    def predict_pass_probability(self, features: np.ndarray) -> np.ndarray:
+        """
+        Probability of the pass class for every row of a feature matrix
+
+        Args:
+            features: Feature array (n_samples, n_features)
+
+        Returns:
+            Array of n_samples probabilities
+        """
+        self._ensure_loaded()
+        features_scaled = self._scaler.transform(features)
+        probabilities = self._model.predict_proba(features_scaled)
+        classes = list(getattr(self._model, 'classes_', [0, 1]))
+        return probabilities[:, classes.index(1)]
+
     def batch_predict(self, feature_list: List[np.ndarray]) -> List[Tuple[str, float, str]]:
         """
         Make predictions for multiple students
@@ -131,6 +184,7 @@ class ModelService:
     
     def get_model_info(self) -> Dict:
         """Get information about the loaded model"""
+        self._ensure_loaded()
         return {
             'model_name': self._metadata.get('model_name', 'Unknown'),
             'model_type': self._metadata.get('model_type', 'Unknown'),
@@ -142,10 +196,20 @@ class ModelService:
     
     def get_feature_list(self) -> List[str]:
         """Get the list of required features"""
+        self._ensure_loaded()
         return self._feature_list
     
+    def get_training_statistics(self) -> Dict[str, Dict[str, float]]:
+        """Per-feature training mean and standard deviation, from the fitted scaler"""
+        self._ensure_loaded()
+        return {
+            name: {'mean': float(mean), 'std': float(scale)}
+            for name, mean, scale in zip(self._feature_list, self._scaler.mean_, self._scaler.scale_)
+        }
+
     def validate_features(self, features: np.ndarray) -> bool:
         """Validate that features match expected shape"""
+        self._ensure_loaded()
         expected_features = len(self._feature_list)
         actual_features = features.shape[1] if len(features.shape) > 1 else features.shape[0]
         
@@ -156,13 +220,126 @@ class ModelService:
         return True
     
     def get_feature_importance(self) -> Dict:
-        """Get feature importance scores"""
+        """Get feature importance scores of the loaded model"""
+        self._ensure_loaded()
+        return self._feature_importance
+    
+    def _load_feature_importance(self, model) -> Dict[str, float]:
+        """Normalised global importance, from the exported file if present, else the model"""
         try:
             with open('ml_models/feature_importance.json', 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
-            logger.warning("Feature importance file not found")
+            pass
+        
+        importances = getattr(model, 'feature_importances_', None)
+        if importances is None and hasattr(model, 'coef_'):
+            importances = np.abs(np.ravel(model.coef_))
+        if importances is None:
+            logger.warning("Model exposes no feature importance")
             return {}
+        
+        importances = np.asarray(importances, dtype=float)
+        total = importances.sum()
+        if total > 0:
+            importances = importances / total
+        return {name: float(value) for name, value in zip(self._feature_list, importances)}
+    
+    def feature_contributions(self, features: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Per-row feature contributions to the pass log-odds
+        
+        For tree models these are XGBoost's path-based (TreeSHAP)
+        contributions; for linear models coefficient x scaled value. Each
+        row's contributions plus its base value sum to the model margin.
+        
+        Args:
+            features: Feature array (n_samples, n_features)
+            
+        Returns:
+            Tuple of (contributions (n_samples, n_features), base values
+            (n_samples,)), or None if the model type is not supported
+        """
+        self._ensure_loaded()
+        features_scaled = self._scaler.transform(features)
+        
+        if hasattr(self._model, 'get_booster'):
+            booster = self._model.get_booster()
+            matrix = xgb.DMatrix(features_scaled, feature_names=booster.feature_names)
+            contributions = booster.predict(matrix, pred_contribs=True)
+            return contributions[:, :-1], contributions[:, -1]
+        
+        if hasattr(self._model, 'coef_'):
+            coefficients = np.ravel(self._model.coef_)
+            base = np.full(len(features_scaled), float(np.ravel(self._model.intercept_)[0]))
+            return features_scaled * coefficients, base
+        
+        return None
+    
+    @metrics.timed('model_explain', 'Batched prediction explanation latency')
+    def explain_batch(self, features: np.ndarray,
+                      predictions: Optional[List[Tuple[str, float]]] = None,
+                      top_n: int = 5) -> List[Dict]:
+        """
+        Explain every row of a feature matrix with one model call
+        
+        Args:
+            features: Feature array (n_samples, n_features)
+            predictions: (predicted_grade, confidence) per row; scored
+                here when not given
+            top_n: Number of factors to return per row
+            
+        Returns:
+            List of explanation dictionaries, one per row
+        """
+        self._ensure_loaded()
+        features = np.asarray(features, dtype=float).reshape(-1, len(self._feature_list))
+        
+        if predictions is None:
+            pass_probability = self.predict_pass_probability(features)
+            predictions = [
+                (self._convert_to_grade(int(p >= 0.5)), float(max(p, 1 - p)))
+                for p in pass_probability
+            ]
+        
+        contributions = self.feature_contributions(features)
+        explanations = []
+        for row, (prediction, confidence) in enumerate(predictions):
+            if contributions is not None:
+                row_contributions = contributions[0][row]
+                order = np.argsort(-np.abs(row_contributions))[:top_n]
+                base_value = float(contributions[1][row])
+            else:
+                # Without per-row contributions fall back to global ranking
+                row_contributions = None
+                order = sorted(range(len(self._feature_list)),
+                               key=lambda i: -self._feature_importance.get(self._feature_list[i], 0))[:top_n]
+                base_value = None
+            
+            factors = []
+            for i in order:
+                name = self._feature_list[i]
+                factor = {
+                    'name': name,
+                    'value': float(features[row, i]),
+                    'importance': float(self._feature_importance.get(name, 0))
+                }
+                if row_contributions is not None:
+                    contribution = float(row_contributions[i])
+                    factor['contribution'] = round(contribution, 4)
+                    # Contributions are towards the pass class
+                    factor['impact'] = 'positive' if contribution >= 0 else 'negative'
+                factors.append(factor)
+            
+            explanations.append({
+                'prediction': prediction,
+                'confidence': confidence,
+                'base_value': round(base_value, 4) if base_value is not None else None,
+                'top_factors': factors,
+                'explanation': self._generate_explanation(prediction, confidence, factors)
+            })
+        
+        return explanations
     
     def explain_prediction(self, features: np.ndarray, prediction: str, 
                          confidence: float) -> Dict:
@@ -177,30 +354,7 @@ class ModelService:
         Returns:
             Dictionary with explanation details
         """
-        feature_importance = self.get_feature_importance()
-        feature_values = features.flatten()
-        
-        # Get top contributing features
-        important_features = []
-        for i, (feature_name, value) in enumerate(zip(self._feature_list, feature_values)):
-            importance = feature_importance.get(feature_name, 0)
-            if importance > 0.05:  # Only include features with >5% importance
-                important_features.append({
-                    'name': feature_name,
-                    'value': float(value),
-                    'importance': float(importance),
-                    'impact': 'positive' if value > 0 else 'negative'
-                })
-        
-        # Sort by importance
-        important_features.sort(key=lambda x: x['importance'], reverse=True)
-        
-        return {
-            'prediction': prediction,
-            'confidence': confidence,
-            'top_factors': important_features[:5],  # Top 5 factors
-            'explanation': self._generate_explanation(prediction, confidence, important_features)
-        }
+        return self.explain_batch(features, [(prediction, confidence)])[0]
     
     def _generate_explanation(self, prediction: str, confidence: float, 
                             factors: List[Dict]) -> str:
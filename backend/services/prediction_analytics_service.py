@@ -3,10 +3,11 @@ from typing import List, Dict, Optional
 from sqlalchemy import and_, or_, func, desc
 from backend.extensions import db
 from backend.models import (
-    Prediction, ModelVersion, Enrollment, Student, Faculty,
+    Prediction, ModelVersion, ModelEvaluation, Enrollment, Student, Faculty,
     CourseOffering, Course, User, Assessment, AssessmentSubmission,
     Attendance, LMSDailySummary, FeatureCache
 )
+from backend.services.model_evaluation_service import ModelEvaluationService
 import logging
 import json
 
@@ -45,13 +46,10 @@ class PredictionAnalyticsService:
                 Prediction.prediction_date >= datetime.now() - timedelta(days=7)
             ).count()
             
-            # Get accuracy metrics
-            # Get predictions with high confidence (>= 0.7)
-            accurate_predictions = query.filter(
-                Prediction.confidence_score >= 0.7
-            ).count()
-            
-            accuracy_rate = (accurate_predictions / total_predictions * 100) if total_predictions > 0 else 0
+            # Get model performance stats - accuracy is measured by backtests
+            # against final grades, not inferred from confidence
+            model_stats = self._get_model_performance_stats()
+            accuracy_rate = model_stats['accuracy']
             
             # Get predictions by grade
             grade_distribution = {}
@@ -63,9 +61,6 @@ class PredictionAnalyticsService:
             for grade, count in grade_counts:
                 grade_distribution[grade] = count
             
-            # Get model performance stats
-            model_stats = self._get_model_performance_stats()
-            
             return {
                 'total_predictions': total_predictions,
                 'recent_predictions': recent_predictions,
@@ -322,14 +317,13 @@ class PredictionAnalyticsService:
             }
     
     def get_model_performance(self) -> Dict:
-        """Get performance metrics for prediction models"""
+        """Get performance metrics for prediction models.
+
+        Metrics come from the latest completed backtest of the active model
+        version (see ModelEvaluationService).
+        """
         try:
-            # Get latest active model
-            latest_model = ModelVersion.query.filter_by(
-                is_active=True
-            ).order_by(
-                desc(ModelVersion.created_at)
-            ).first()
+            latest_model = self._get_evaluated_model()
             
             if not latest_model:
                 return {
@@ -340,27 +334,36 @@ class PredictionAnalyticsService:
                     'recall': 0,
                     'f1_score': 0,
                     'total_predictions': 0,
-                    'last_trained': None
+                    'last_trained': None,
+                    'evaluation': None
                 }
             
             # Get prediction count for this model
             total_predictions = Prediction.query.filter(
-                Prediction.model_version == latest_model.version
+                Prediction.model_version == latest_model.version_name
             ).count()
             
+            evaluation = ModelEvaluationService.get_latest_evaluation(latest_model.version_id)
+            stats = self._version_stats(latest_model)
+            
             return {
-                'model_version': latest_model.version,
-                'model_name': latest_model.model_type,
-                'accuracy': float(latest_model.accuracy) * 100 if latest_model.accuracy else 0,
-                'precision': float(latest_model.precision) * 100 if latest_model.precision else 0,
-                'recall': float(latest_model.recall) * 100 if latest_model.recall else 0,
-                'f1_score': float(latest_model.f1_score) * 100 if latest_model.f1_score else 0,
+                'model_version': latest_model.version_name,
+                'model_name': latest_model.version_name,
+                'accuracy': stats['accuracy'],
+                'precision': stats['precision'],
+                'recall': stats['recall'],
+                'f1_score': stats['f1_score'],
+                'auc': float(evaluation.auc) if evaluation and evaluation.auc is not None else None,
+                'brier_score': float(evaluation.brier_score) if evaluation and evaluation.brier_score is not None else None,
+                'median_lead_time_days': (float(evaluation.median_lead_time_days)
+                                          if evaluation and evaluation.median_lead_time_days is not None else None),
                 'total_predictions': total_predictions,
-                'last_trained': latest_model.created_at.isoformat() if latest_model.created_at else None,
+                'last_trained': latest_model.training_date.isoformat() if latest_model.training_date else None,
+                'last_evaluated': evaluation.completed_at.isoformat() if evaluation else None,
+                'evaluation': evaluation.to_dict() if evaluation else None,
                 'metrics': {
-                    'feature_importance': latest_model.feature_importance,
-                    'training_samples': latest_model.training_samples,
-                    'validation_samples': latest_model.validation_samples
+                    'feature_list': latest_model.feature_list,
+                    'hyperparameters': latest_model.hyperparameters
                 }
             }
             
@@ -373,9 +376,37 @@ class PredictionAnalyticsService:
                 'recall': 0,
                 'f1_score': 0,
                 'total_predictions': 0,
-                'last_trained': None
+                'last_trained': None,
+                'evaluation': None
             }
     
+    def _get_evaluated_model(self) -> Optional[ModelVersion]:
+        """The active model version, else the most recently evaluated one"""
+        active = ModelVersion.query.filter_by(
+            is_active=True
+        ).order_by(
+            desc(ModelVersion.created_at)
+        ).first()
+        if active:
+            return active
+        
+        return ModelVersion.query.join(
+            ModelEvaluation, ModelEvaluation.version_id == ModelVersion.version_id
+        ).filter(
+            ModelEvaluation.status == 'completed'
+        ).order_by(
+            desc(ModelEvaluation.completed_at)
+        ).first()
+    
+    def _version_stats(self, model: ModelVersion) -> Dict:
+        """Backtested headline metrics of a version, in percent"""
+        return {
+            'accuracy': float(model.accuracy) * 100 if model.accuracy else 0,
+            'precision': float(model.precision_score) * 100 if model.precision_score else 0,
+            'recall': float(model.recall_score) * 100 if model.recall_score else 0,
+            'f1_score': float(model.f1_score) * 100 if model.f1_score else 0
+        }
+    
     def _get_student_performance(self, enrollment_id: int) -> Dict:
         """Get student's current performance metrics from feature cache"""
         try:
@@ -578,9 +609,7 @@ class PredictionAnalyticsService:
     def _get_model_performance_stats(self) -> Dict:
         """Get model performance statistics"""
         try:
-            latest_model = ModelVersion.query.filter_by(
-                is_active=True
-            ).first()
+            latest_model = self._get_evaluated_model()
             
             if not latest_model:
                 return {
@@ -590,12 +619,7 @@ class PredictionAnalyticsService:
                     'f1_score': 0
                 }
             
-            return {
-                'accuracy': float(latest_model.accuracy) * 100 if latest_model.accuracy else 0,
-                'precision': float(latest_model.precision) * 100 if latest_model.precision else 0,
-                'recall': float(latest_model.recall) * 100 if latest_model.recall else 0,
-                'f1_score': float(latest_model.f1_score) * 100 if latest_model.f1_score else 0
-            }
+            return self._version_stats(latest_model)
             
         except:
             return {
@@ -603,4 +627,4 @@ class PredictionAnalyticsService:
                 'precision': 0,
                 'recall': 0,
                 'f1_score': 0
-            }
\ No newline at end of file
+            }
@@ -0,0 +1,224 @@
+from backend.models import Prediction, SystemConfig
+from backend.extensions import db
+from flask import current_app
+from datetime import datetime, timedelta
+import gzip
+import json
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = [
+    'prediction_id', 'enrollment_id', 'prediction_date', 'predicted_grade', 'confidence_score',
+    'risk_level', 'model_version', 'feature_snapshot', 'explanation', 'created_at',
+    'model_accuracy', 'feature_version'
+]
+
+
+class PredictionRetentionService:
+    """Tiered retention for predictions.
+
+    Every prediction from the last PREDICTION_RETENTION_DAYS is kept. Older
+    history is thinned to one prediction per enrollment per ISO week - the
+    last one of the week - and the thinned rows are written to gzipped
+    JSON-lines archives and deleted in bounded batches. The latest
+    prediction of every enrollment always survives.
+
+    History before the last cutoff a run fully processed (the watermark,
+    kept in system_config) is already thinned, so each run only reads
+    predictions in [watermark, cutoff) - about one day of new history.
+    """
+
+    MIN_RETENTION_DAYS = 14  # trend views and dirty tracking read recent history
+    ENROLLMENTS_PER_SCAN = 200  # enrollments whose old history is read at a time
+    WATERMARK_KEY = 'prediction_compacted_through'
+
+    @staticmethod
+    def compact(retention_days=None, batch_size=None, max_batches=None, archive_dir=None):
+        """Thin predictions older than the retention window.
+
+        Returns a dict with the number of predictions archived, enrollments
+        thinned, batches run and the archive file.
+        """
+        retention_days = max(
+            retention_days or current_app.config.get('PREDICTION_RETENTION_DAYS', 90),
+            PredictionRetentionService.MIN_RETENTION_DAYS
+        )
+        batch_size = batch_size or current_app.config.get('PREDICTION_COMPACTION_BATCH_SIZE', 2000)
+        max_batches = max_batches or current_app.config.get('PREDICTION_COMPACTION_MAX_BATCHES', 100)
+        archive_dir = archive_dir or current_app.config.get('PREDICTION_ARCHIVE_DIR', 'archives/predictions')
+
+        # prediction_date is local time (PredictionService.generate_prediction).
+        # Align to a Monday so no week is split by the cutoff
+        cutoff_date = datetime.now().date() - timedelta(days=retention_days)
+        cutoff_date -= timedelta(days=cutoff_date.weekday())
+        cutoff = datetime.combine(cutoff_date, datetime.min.time())
+        watermark = PredictionRetentionService.get_watermark()
+        stats = {'predictions': 0, 'enrollments': 0, 'batches': 0, 'archive': None,
+                 'cutoff': cutoff.isoformat(), 'since': watermark.isoformat() if watermark else None}
+
+        if watermark is not None and watermark >= cutoff:
+            return stats
+
+        archive = None
+        last_enrollment_id = 0
+        complete = False
+        try:
+            while stats['batches'] < max_batches:
+                enrollment_ids = PredictionRetentionService._next_enrollments(
+                    watermark, cutoff, last_enrollment_id
+                )
+                if not enrollment_ids:
+                    complete = True
+                    break
+                last_enrollment_id = enrollment_ids[-1]
+
+                thinned_ids, enrollments = PredictionRetentionService._thinned_ids(
+                    watermark, cutoff, enrollment_ids
+                )
+                stats['enrollments'] += enrollments
+
+                for start in range(0, len(thinned_ids), batch_size):
+                    if stats['batches'] >= max_batches:
+                        break
+                    batch_ids = thinned_ids[start:start + batch_size]
+
+                    rows = Prediction.query.filter(
+                        Prediction.prediction_id.in_(batch_ids)
+                    ).order_by(Prediction.prediction_id).all()
+
+                    if archive is None:
+                        os.makedirs(archive_dir, exist_ok=True)
+                        stats['archive'] = os.path.join(
+                            archive_dir, f"predictions_{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.jsonl.gz"
+                        )
+                        archive = gzip.open(stats['archive'], 'at', encoding='utf-8')
+
+                    # Archive first: if the delete fails the rows stay in
+                    # predictions and are archived again (dedupe on prediction_id)
+                    for row in rows:
+                        archive.write(json.dumps(
+                            {column: getattr(row, column) for column in ARCHIVE_COLUMNS}, default=str
+                        ))
+                        archive.write('\n')
+                    archive.flush()
+
+                    Prediction.query.filter(
+                        Prediction.prediction_id.in_(batch_ids)
+                    ).delete(synchronize_session=False)
+                    db.session.commit()
+
+                    stats['predictions'] += len(batch_ids)
+                    stats['batches'] += 1
+
+            if complete:
+                # Everything before the cutoff is thinned; the next run
+                # starts from here. An interrupted run keeps the old
+                # watermark and rescans [watermark, cutoff)
+                PredictionRetentionService._set_watermark(cutoff)
+
+            if stats['predictions']:
+                logger.info(f"Thinned {stats['predictions']} predictions older than {cutoff.date()} "
+                            f"for {stats['enrollments']} enrollments ({stats['archive']})")
+            return stats
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error compacting predictions: {str(e)}")
+            raise
+
+        finally:
+            if archive is not None:
+                archive.close()
+
+    @staticmethod
+    def get_watermark():
+        """Cutoff of the last complete run; history before it is thinned"""
+        value = db.session.query(SystemConfig.config_value).filter_by(
+            config_key=PredictionRetentionService.WATERMARK_KEY
+        ).scalar()
+        return datetime.fromisoformat(value) if value else None
+
+    @staticmethod
+    def _set_watermark(cutoff):
+        row = SystemConfig.query.filter_by(config_key=PredictionRetentionService.WATERMARK_KEY).first()
+        if row is None:
+            row = SystemConfig(PredictionRetentionService.WATERMARK_KEY, None,
+                               'Predictions before this time are thinned (compact_predictions)')
+            db.session.add(row)
+        row.config_value = cutoff.isoformat()
+        db.session.commit()
+
+    @staticmethod
+    def _window(query, watermark, cutoff):
+        query = query.filter(Prediction.prediction_date < cutoff)
+        if watermark is not None:
+            query = query.filter(Prediction.prediction_date >= watermark)
+        return query
+
+    @staticmethod
+    def _next_enrollments(watermark, cutoff, after_enrollment_id):
+        """Next enrollments, by id, with more than one prediction in [watermark, cutoff)"""
+        query = db.session.query(Prediction.enrollment_id).filter(
+            Prediction.enrollment_id > after_enrollment_id
+        )
+        rows = PredictionRetentionService._window(query, watermark, cutoff).group_by(
+            Prediction.enrollment_id
+        ).having(
+            db.func.count(Prediction.prediction_id) > 1
+        ).order_by(
+            Prediction.enrollment_id
+        ).limit(PredictionRetentionService.ENROLLMENTS_PER_SCAN).all()
+        return [row.enrollment_id for row in rows]
+
+    @staticmethod
+    def _thinned_ids(watermark, cutoff, enrollment_ids):
+        """Ids of predictions to thin for some enrollments, and how many enrollments have any.
+
+        Rows are bucketed by ISO week in Python, which works on every
+        database. Within a week the latest prediction is kept. Watermark and
+        cutoff are Mondays, so no week straddles the window.
+        """
+        query = db.session.query(
+            Prediction.prediction_id, Prediction.enrollment_id, Prediction.prediction_date
+        ).filter(
+            Prediction.enrollment_id.in_(enrollment_ids)
+        )
+        candidates = PredictionRetentionService._window(query, watermark, cutoff).order_by(
+            Prediction.enrollment_id, Prediction.prediction_date.desc(), Prediction.prediction_id.desc()
+        ).all()
+
+        thinned_ids = []
+        thinned_enrollments = set()
+        kept = set()
+        for row in candidates:
+            year, week, _ = row.prediction_date.isocalendar()
+            key = (row.enrollment_id, year, week)
+            if key not in kept:
+                # Newest of the week - the one kept
+                kept.add(key)
+                continue
+            thinned_ids.append(row.prediction_id)
+            thinned_enrollments.add(row.enrollment_id)
+
+        return thinned_ids, len(thinned_enrollments)
+
+    @staticmethod
+    def get_status():
+        """Row counts and the retention cutoff, for monitoring"""
+        retention_days = current_app.config.get('PREDICTION_RETENTION_DAYS', 90)
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        return {
+            'predictions': db.session.query(db.func.count(Prediction.prediction_id)).scalar(),
+            'predictions_past_retention': db.session.query(db.func.count(Prediction.prediction_id)).filter(
+                Prediction.prediction_date < cutoff
+            ).scalar(),
+            'oldest_prediction': db.session.query(db.func.min(Prediction.prediction_date)).scalar(),
+            'compacted_through': PredictionRetentionService.get_watermark(),
+            'retention_days': retention_days
+        }
+
+
+# Create service instance
+prediction_retention_service = PredictionRetentionService()
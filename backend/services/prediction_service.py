@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from sqlalchemy import and_
@@ -8,8 +10,12 @@ from backend.models import (
 )
 from backend.services.feature_calculator_service import FeatureCalculator
 from backend.services.model_service import ModelService
+from backend.services.dirty_tracking_service import dirty_tracking_service
+from backend.services.feature_drift_service import feature_drift_service
+from backend.utils.lazy_import import lazy_import
 import logging
-import numpy as np
+
+np = lazy_import('numpy')
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +39,8 @@ class PredictionService:
             Dictionary with prediction details
         """
         try:
-            logger.info(f"Generating prediction for enrollment {enrollment_id}")
+            logger.debug("Generating prediction for enrollment %s", enrollment_id)
+            computed_since = datetime.utcnow()
             
             # Calculate features
             features = self.feature_calculator.calculate_features_for_enrollment(
@@ -75,16 +82,17 @@ class PredictionService:
                 # Cache features for performance
                 self._cache_features(enrollment_id, features)
                 
+                # Inputs up to now are reflected in this prediction
+                dirty_tracking_service.clear(enrollment_id, computed_since)
+                
                 db.session.commit()
                 prediction_data['prediction_id'] = prediction.prediction_id
+                
+                # Streaming statistics for the drift monitor
+                feature_drift_service.observe(features, model_info['version'])
             
-            # Add explanation
-            explanation = self.model_service.explain_prediction(
-                features, predicted_grade, confidence
-            )
-            prediction_data['explanation'] = explanation
-            
-            logger.info(f"Prediction generated successfully: {predicted_grade} ({confidence:.2f})")
+            logger.debug("Prediction generated for enrollment %s: %s (%.2f)",
+                         enrollment_id, predicted_grade, confidence)
             return prediction_data
             
         except Exception as e:
@@ -92,24 +100,38 @@ class PredictionService:
             db.session.rollback()
             raise
     
-    def batch_generate_predictions(self, offering_id: int) -> List[Dict]:
+    def batch_generate_predictions(self, offering_id: int,
+                                   only_changed: bool = False,
+                                   stale_days: Optional[int] = None) -> List[Dict]:
         """
         Generate predictions for all students in a course offering
         
         Args:
             offering_id: The course offering ID
+            only_changed: Only re-score enrollments with new input since
+                their last prediction (or never predicted)
+            stale_days: With only_changed, also re-score enrollments whose
+                latest prediction is older than this many days
             
         Returns:
             List of prediction results
         """
         try:
             # Get all active enrollments for the offering
-            enrollments = Enrollment.query.filter(
+            query = Enrollment.query.filter(
                 and_(
                     Enrollment.offering_id == offering_id,
                     Enrollment.enrollment_status == 'enrolled'
                 )
-            ).all()
+            )
+            
+            if only_changed:
+                enrollment_ids = dirty_tracking_service.get_enrollments_to_rescore(
+                    stale_days=stale_days, offering_id=offering_id
+                )
+                query = query.filter(Enrollment.enrollment_id.in_(enrollment_ids))
+            
+            enrollments = query.all()
             
             results = []
             success_count = 0
@@ -133,6 +155,7 @@ class PredictionService:
                         'error': str(e)
                     })
             
+            feature_drift_service.flush()
             logger.info(f"Batch prediction complete: {success_count}/{len(enrollments)} successful")
             return results
             
@@ -223,6 +246,50 @@ class PredictionService:
         
         return results
     
+    def explain_predictions(self, predictions: List[Prediction]) -> Dict[int, Dict]:
+        """
+        Explanations for stored predictions, keyed by prediction_id
+        
+        Cached explanations are reused; the rest are computed from their
+        feature snapshots in one batched model call and saved.
+        
+        Args:
+            predictions: Prediction records
+            
+        Returns:
+            Dictionary of prediction_id to explanation
+        """
+        model_version = self.model_service.get_model_info()['version']
+        explanations = {}
+        missing = []
+        for prediction in predictions:
+            if prediction.explanation and (prediction.model_version == model_version
+                                           or not prediction.feature_snapshot):
+                explanations[prediction.prediction_id] = prediction.explanation
+            elif prediction.feature_snapshot:
+                missing.append(prediction)
+        
+        if missing:
+            feature_names = self.model_service.get_feature_list()
+            snapshots = [prediction.feature_snapshot for prediction in missing]
+            features = np.array([
+                [snapshot.get(name) or 0 for name in feature_names]
+                for snapshot in snapshots
+            ], dtype=float)
+            computed = self.model_service.explain_batch(features, [
+                (prediction.predicted_grade, float(prediction.confidence_score))
+                for prediction in missing
+            ])
+            
+            for prediction, explanation in zip(missing, computed):
+                explanations[prediction.prediction_id] = explanation
+                # Only cache what the scoring model itself would have said
+                if prediction.model_version == model_version:
+                    prediction.explanation = explanation
+            db.session.commit()
+        
+        return explanations
+    
     def compare_predictions(self, enrollment_id: int, 
                           date1: datetime, date2: datetime) -> Dict:
         """
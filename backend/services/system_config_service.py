@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+from flask import current_app
+from backend.extensions import db
+from backend.models import SystemConfig, AuditLog
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Row holding the configuration version; every write bumps it
+VERSION_KEY = 'config_version'
+
+# Rows holding run state of maintenance jobs, not settings
+STATE_KEYS = {VERSION_KEY, 'prediction_compacted_through'}
+
+# Known settings: key -> (type, default, description)
+SETTINGS = {
+    'attendance_threshold': (int, 70, 'Minimum attendance percentage'),
+    'prediction_frequency': (str, 'daily', 'How often to run predictions'),
+    'alert_email_enabled': (bool, True, 'Send email alerts'),
+    'model_version': (str, 'v1.0', 'Current active model version'),
+    'max_file_upload_size': (int, 10485760, 'Maximum upload size in bytes'),
+    'session_timeout': (int, 3600, 'Session timeout in seconds'),
+    'password_min_length': (int, 8, 'Minimum password length'),
+    'maintenance_mode': (bool, False, 'Reject non-admin requests'),
+    'alert_attendance_threshold': (int, 70, 'Attendance percentage below which an alert is raised'),
+    'alert_engagement_threshold': (int, 30, 'Engagement score below which an alert is raised'),
+    'alert_grade_threshold': (int, 50, 'Average score below which an alert is raised'),
+    'alert_missing_threshold': (int, 2, 'Missing assignments before an alert is raised'),
+}
+
+
+def _parse(key: str, value: Any) -> Any:
+    """Coerce a stored or submitted value to the setting's type"""
+    kind = SETTINGS[key][0] if key in SETTINGS else str
+    if value is None:
+        return None
+    if kind is bool:
+        if isinstance(value, bool):
+            return value
+        return str(value).strip().lower() in ('true', '1', 'yes', 'on')
+    return kind(value)
+
+
+class SystemConfigService:
+    """In-process cache of the system_config table.
+
+    All rows are loaded with one query and kept with the version stamp they
+    were read at. Reads are dictionary lookups; at most every
+    SYSTEM_CONFIG_CHECK_INTERVAL seconds a read first compares the cached
+    version with the stored one and reloads if another worker has written.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Typed value of a setting, its registered default if unset"""
+        self._revalidate()
+        if key in self._values:
+            return self._values[key]
+        if default is None and key in SETTINGS:
+            return SETTINGS[key][1]
+        return default
+
+    def get_all(self) -> Dict[str, Any]:
+        """All settings, registered defaults filled in"""
+        self._revalidate()
+        values = {key: setting[1] for key, setting in SETTINGS.items()}
+        values.update(self._values)
+        return values
+
+    @property
+    def version(self) -> Optional[int]:
+        self._revalidate()
+        return self._version
+
+    def update(self, values: Dict[str, Any], user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Persist settings and bump the version so every worker reloads
+
+        Args:
+            values: Setting key to new value
+            user_id: Admin making the change, for the audit log
+
+        Returns:
+            All settings after the update
+
+        Raises:
+            ValueError: For unknown keys or values of the wrong type
+        """
+        unknown = [key for key in values if key not in SETTINGS]
+        if unknown:
+            raise ValueError(f"Unknown configuration keys: {', '.join(sorted(unknown))}")
+        try:
+            parsed = {key: _parse(key, value) for key, value in values.items()}
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid configuration value: {str(e)}")
+
+        try:
+            rows = {
+                row.config_key: row for row in SystemConfig.query.filter(
+                    SystemConfig.config_key.in_(list(parsed) + [VERSION_KEY])
+                ).with_for_update().all()
+            }
+
+            old_values = {}
+            for key, value in parsed.items():
+                stored = str(value).lower() if isinstance(value, bool) else str(value)
+                row = rows.get(key)
+                if row is None:
+                    db.session.add(SystemConfig(key, stored, SETTINGS[key][2]))
+                    old_values[key] = None
+                else:
+                    old_values[key] = row.config_value
+                    row.config_value = stored
+
+            version_row = rows.get(VERSION_KEY)
+            if version_row is None:
+                version_row = SystemConfig(VERSION_KEY, '0', 'Bumped on every configuration change')
+                db.session.add(version_row)
+            version_row.config_value = str(int(version_row.config_value or 0) + 1)
+
+            db.session.add(AuditLog(
+                'update_system_config',
+                user_id=user_id,
+                table_name='system_config',
+                old_values=old_values,
+                new_values=values
+            ))
+            db.session.commit()
+            logger.info(f"System configuration updated to version {version_row.config_value}: "
+                        f"{', '.join(sorted(parsed))}")
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error updating system configuration: {str(e)}")
+            raise
+
+        self.invalidate()
+        return self.get_all()
+
+    def invalidate(self):
+        """Reload on the next read"""
+        with self._lock:
+            self._version = None
+            self._checked_at = 0.0
+
+    def _revalidate(self):
+        interval = current_app.config.get('SYSTEM_CONFIG_CHECK_INTERVAL', 5)
+        if self._version is not None and time.monotonic() - self._checked_at < interval:
+            return
+
+        with self._lock:
+            if self._version is not None and time.monotonic() - self._checked_at < interval:
+                return
+            try:
+                stored_version = db.session.query(SystemConfig.config_value).filter_by(
+                    config_key=VERSION_KEY
+                ).scalar()
+                stored_version = int(stored_version or 0)
+                if stored_version != self._version:
+                    self._load(stored_version)
+            except Exception as e:
+                # Keep serving what we have (or defaults) until the next check
+                logger.warning(f"Could not refresh system configuration: {str(e)}")
+                if self._version is None:
+                    self._version = -1
+            self._checked_at = time.monotonic()
+
+    def _load(self, version: int):
+        values = {}
+        for key, value in db.session.query(SystemConfig.config_key, SystemConfig.config_value):
+            if key in STATE_KEYS:
+                continue
+            try:
+                values[key] = _parse(key, value)
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring invalid value for system config {key}: {value!r}")
+        self._values = values
+        self._version = version
+        logger.info(f"System configuration version {version} loaded ({len(values)} settings)")
+
+
+# Create service instance
+system_config_service = SystemConfigService()
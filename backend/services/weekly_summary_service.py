@@ -0,0 +1,153 @@
+from backend.extensions import db
+from backend.models import (
+    Student, User, Enrollment, CourseOffering, Course, LMSDailySummary,
+    AssessmentSubmission, Assessment, Attendance, Prediction
+)
+from backend.services.gpa_service import GPAService
+from sqlalchemy import func, case, select, and_
+from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WeeklySummaryService:
+    """Builds the weekly summary email data for the whole student body"""
+
+    @staticmethod
+    def summary_query(week_start, week_end):
+        """One statement returning a row per active enrollment.
+
+        LMS activity, submissions, attendance and the latest prediction are
+        aggregated per enrollment in derived tables and joined once, ordered
+        by student so rows can be streamed and grouped.
+        """
+        week_start_dt = datetime.combine(week_start, datetime.min.time())
+        week_end_dt = datetime.combine(week_end + timedelta(days=1), datetime.min.time())
+
+        lms = select(
+            LMSDailySummary.enrollment_id,
+            func.sum(LMSDailySummary.total_minutes).label('minutes'),
+            func.sum(LMSDailySummary.resource_views).label('resource_views')
+        ).where(
+            LMSDailySummary.summary_date.between(week_start, week_end)
+        ).group_by(LMSDailySummary.enrollment_id).subquery()
+
+        percentage = func.coalesce(
+            AssessmentSubmission.percentage,
+            AssessmentSubmission.score * 100 / Assessment.max_score
+        )
+        submissions = select(
+            AssessmentSubmission.enrollment_id,
+            func.sum(case(
+                (and_(AssessmentSubmission.submission_date >= week_start_dt,
+                      AssessmentSubmission.submission_date < week_end_dt), 1),
+                else_=0
+            )).label('submitted_this_week'),
+            func.avg(case(
+                (AssessmentSubmission.score.isnot(None), percentage),
+                else_=None
+            )).label('average_percentage')
+        ).join(
+            Assessment, AssessmentSubmission.assessment_id == Assessment.assessment_id
+        ).group_by(AssessmentSubmission.enrollment_id).subquery()
+
+        attendance = select(
+            Attendance.enrollment_id,
+            func.count(Attendance.attendance_id).label('sessions'),
+            func.sum(case((Attendance.status.in_(['present', 'late']), 1), else_=0)).label('attended')
+        ).where(
+            Attendance.attendance_date <= week_end
+        ).group_by(Attendance.enrollment_id).subquery()
+
+        latest_prediction = select(
+            Prediction.enrollment_id,
+            func.max(Prediction.prediction_id).label('prediction_id')
+        ).group_by(Prediction.enrollment_id).subquery()
+
+        return select(
+            Student.student_id, Student.first_name, Student.last_name, User.email,
+            Course.course_name,
+            lms.c.minutes, lms.c.resource_views,
+            submissions.c.submitted_this_week, submissions.c.average_percentage,
+            attendance.c.sessions, attendance.c.attended,
+            Prediction.predicted_grade
+        ).select_from(Enrollment).join(
+            Student, Enrollment.student_id == Student.student_id
+        ).join(
+            User, Student.user_id == User.user_id
+        ).join(
+            CourseOffering, Enrollment.offering_id == CourseOffering.offering_id
+        ).join(
+            Course, CourseOffering.course_id == Course.course_id
+        ).outerjoin(
+            lms, lms.c.enrollment_id == Enrollment.enrollment_id
+        ).outerjoin(
+            submissions, submissions.c.enrollment_id == Enrollment.enrollment_id
+        ).outerjoin(
+            attendance, attendance.c.enrollment_id == Enrollment.enrollment_id
+        ).outerjoin(
+            latest_prediction, latest_prediction.c.enrollment_id == Enrollment.enrollment_id
+        ).outerjoin(
+            Prediction, Prediction.prediction_id == latest_prediction.c.prediction_id
+        ).where(
+            Enrollment.enrollment_status == 'enrolled',
+            Student.status == 'active'
+        ).order_by(Student.student_id, Course.course_name)
+
+    @staticmethod
+    def iter_summaries(week_end=None, chunk_size=2000):
+        """Yield (student dict, summary_data) for every active student.
+
+        Rows are streamed from the server and grouped by student, so memory
+        stays flat regardless of the size of the student body.
+        """
+        week_end = week_end or datetime.now().date()
+        week_start = week_end - timedelta(days=6)
+
+        result = db.session.execute(
+            WeeklySummaryService.summary_query(week_start, week_end).execution_options(
+                stream_results=True, yield_per=chunk_size
+            )
+        )
+
+        current_id, student, summary = None, None, None
+        for row in result:
+            if row.student_id != current_id:
+                if student is not None:
+                    yield student, WeeklySummaryService._finish(summary)
+                current_id = row.student_id
+                student = {
+                    'student_id': row.student_id,
+                    'name': f"{row.first_name} {row.last_name}",
+                    'email': row.email
+                }
+                summary = {
+                    'courses': [],
+                    'total_study_time': 0,
+                    'resources_accessed': 0,
+                    'assignments_submitted': 0
+                }
+
+            summary['courses'].append({
+                'name': row.course_name,
+                'attendance_rate': round(100.0 * row.attended / row.sessions, 1) if row.sessions else 0,
+                'current_grade': (GPAService.calculate_letter_grade(float(row.average_percentage))
+                                  if row.average_percentage is not None else '-'),
+                'predicted_grade': row.predicted_grade or '-'
+            })
+            summary['total_study_time'] += int(row.minutes or 0)
+            summary['resources_accessed'] += int(row.resource_views or 0)
+            summary['assignments_submitted'] += int(row.submitted_this_week or 0)
+
+        if student is not None:
+            yield student, WeeklySummaryService._finish(summary)
+
+    @staticmethod
+    def _finish(summary):
+        # Minutes are summed per course; the email shows hours
+        summary['total_study_time'] = round(summary['total_study_time'] / 60, 1)
+        return summary
+
+
+weekly_summary_service = WeeklySummaryService()
@@ -0,0 +1,193 @@
+"""Background task registrations and cron schedules for the worker pool"""
+from backend.services.job_service import task
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cron schedules run by the elected scheduler leader (see worker.py).
+# Each fire time is enqueued once cluster-wide.
+SCHEDULES = [
+    {'name': 'daily_tasks', 'cron': '0 1 * * *', 'job_type': 'run_daily_tasks'},
+    {'name': 'hourly_tasks', 'cron': '0 * * * *', 'job_type': 'run_hourly_tasks'},
+    {'name': 'changed_predictions', 'cron': '0 2 * * *', 'job_type': 'generate_changed_predictions'},
+    {'name': 'weekly_summaries', 'cron': '0 18 * * 0', 'job_type': 'send_weekly_summaries'},
+    {'name': 'email_outbox', 'cron': '* * * * *', 'job_type': 'send_email_outbox'},
+    {'name': 'lms_compaction', 'cron': '30 3 * * *', 'job_type': 'compact_lms_activities'},
+    {'name': 'prediction_compaction', 'cron': '45 3 * * *', 'job_type': 'compact_predictions'},
+    {'name': 'feature_drift', 'cron': '0 6 * * *', 'job_type': 'check_feature_drift'},
+]
+
+
+@task('run_daily_tasks')
+def run_daily_tasks_job(context):
+    from backend.tasks.scheduled_tasks import run_daily_tasks
+    run_daily_tasks()
+
+
+@task('run_hourly_tasks')
+def run_hourly_tasks_job(context):
+    from backend.tasks.scheduled_tasks import run_hourly_tasks
+    run_hourly_tasks()
+
+
+@task('generate_lms_summary')
+def generate_lms_summary_job(context, date=None):
+    from backend.services.lms_summary_service import LMSSummaryService
+    from datetime import datetime
+    summary_date = datetime.strptime(date, '%Y-%m-%d').date() if date else None
+    LMSSummaryService.generate_daily_summary(summary_date)
+
+
+@task('generate_weekly_predictions')
+def generate_weekly_predictions_job(context):
+    from backend.tasks.scheduled_tasks import generate_weekly_predictions
+    generate_weekly_predictions()
+
+
+@task('generate_changed_predictions')
+def generate_changed_predictions_job(context, stale_days=None, limit=None):
+    from backend.tasks.scheduled_tasks import generate_changed_predictions
+    return generate_changed_predictions(stale_days=stale_days, limit=limit)
+
+
+@task('send_weekly_summaries')
+def send_weekly_summaries_job(context, week_end=None):
+    from backend.tasks.scheduled_tasks import send_weekly_summaries
+    from datetime import datetime
+    end_date = datetime.strptime(week_end, '%Y-%m-%d').date() if week_end else None
+    return send_weekly_summaries(end_date)
+
+
+@task('send_email_outbox')
+def send_email_outbox_job(context, max_batches=None):
+    """Drain the email outbox, one SMTP connection per batch"""
+    from flask import current_app
+    from backend.services.email_outbox_service import email_outbox_service
+
+    max_batches = max_batches or current_app.config.get('MAIL_MAX_BATCHES_PER_RUN', 10)
+    totals = {'sent': 0, 'skipped': 0, 'retrying': 0, 'failed': 0}
+    for _ in range(max_batches):
+        stats = email_outbox_service.send_pending()
+        for key, value in stats.items():
+            totals[key] += value
+        if not any(stats.values()):
+            break
+    return totals
+
+
+@task('compact_lms_activities')
+def compact_lms_activities_job(context, retention_days=None, max_batches=None):
+    """Fold raw LMS activities past the retention window into daily aggregates"""
+    from backend.services.lms_retention_service import lms_retention_service
+    return lms_retention_service.compact(retention_days=retention_days, max_batches=max_batches)
+
+
+@task('compact_predictions')
+def compact_predictions_job(context, retention_days=None, max_batches=None):
+    """Thin predictions past the retention window to one per enrollment per week"""
+    from backend.services.prediction_retention_service import prediction_retention_service
+    return prediction_retention_service.compact(retention_days=retention_days, max_batches=max_batches)
+
+
+@task('evaluate_model')
+def evaluate_model_job(context, term_ids=None, offsets=None):
+    """Backtest the deployed model over completed terms"""
+    from backend.services.model_evaluation_service import model_evaluation_service
+    evaluation = model_evaluation_service.run_backtest(
+        term_ids=term_ids, offsets=offsets, progress=context.report_progress
+    )
+    return {
+        'evaluation_id': evaluation.evaluation_id,
+        'enrollment_count': evaluation.enrollment_count,
+        'accuracy': float(evaluation.accuracy) if evaluation.accuracy is not None else None,
+        'auc': float(evaluation.auc) if evaluation.auc is not None else None
+    }
+
+
+@task('check_feature_drift')
+def check_feature_drift_job(context, days=28):
+    """Score recent production features against training and log drift"""
+    from backend.services.feature_drift_service import feature_drift_service
+
+    report = feature_drift_service.get_drift_report(days=days)
+    if report['status'] in ('warning', 'critical'):
+        logger.warning(f"Feature drift {report['status']} for model {report['model_version']}: "
+                       f"{', '.join(report['drifted_features'])}")
+    return {
+        'status': report['status'],
+        'sample_count': report['sample_count'],
+        'drifted_features': report['drifted_features']
+    }
+
+
+@task('update_gpas')
+def update_gpas_job(context, student_ids=None, term_id=None):
+    from backend.services.gpa_service import gpa_service
+    updated = gpa_service.update_student_gpas(student_ids=student_ids, term_id=term_id)
+    if updated is None:
+        raise RuntimeError('GPA update failed')
+    return {'updated': updated}
+
+
+@task('generate_predictions')
+def generate_predictions_job(context, enrollment_ids, **kwargs):
+    """Generate predictions for a list of enrollments, recording each outcome"""
+    from backend.extensions import db
+    from backend.models import Enrollment
+    from backend.services.job_service import job_service
+    from backend.services.prediction_service import PredictionService
+    from backend.services.feature_drift_service import feature_drift_service
+
+    prediction_service = PredictionService()
+    enrollments = {
+        e.enrollment_id: e
+        for e in Enrollment.query.filter(Enrollment.enrollment_id.in_(enrollment_ids)).all()
+    }
+
+    total = len(enrollment_ids)
+    success_count = 0
+    context.report_progress(0, total)
+
+    for index, enrollment_id in enumerate(enrollment_ids, start=1):
+        enrollment = enrollments.get(enrollment_id)
+        try:
+            if not enrollment:
+                raise LookupError('Enrollment not found')
+
+            prediction = prediction_service.generate_prediction(enrollment_id, save=True)
+            job_service.add_result(
+                context.job_id, 'success',
+                enrollment_id=enrollment_id,
+                data={
+                    'student_id': enrollment.student_id,
+                    'course_code': enrollment.offering.course.course_code,
+                    'course_name': enrollment.offering.course.course_name,
+                    'prediction_id': prediction.get('prediction_id'),
+                    'predicted_grade': prediction['predicted_grade'],
+                    'confidence_score': float(prediction['confidence_score']),
+                    'risk_level': prediction['risk_level'],
+                    'model_version': prediction.get('model_version')
+                }
+            )
+            success_count += 1
+        except Exception as e:
+            logger.error(f"Failed to generate prediction for enrollment {enrollment_id}: {str(e)}")
+            db.session.rollback()
+            job_service.add_result(
+                context.job_id, 'error',
+                enrollment_id=enrollment_id,
+                data={'student_id': enrollment.student_id} if enrollment else None,
+                error_message=str(e)
+            )
+
+        db.session.commit()
+
+        if index % 10 == 0 or index == total:
+            context.report_progress(index, total)
+
+    feature_drift_service.flush()
+    return {
+        'total_processed': total,
+        'success_count': success_count,
+        'error_count': total - success_count
+    }
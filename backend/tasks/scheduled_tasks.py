@@ -33,6 +33,7 @@ def run_daily_tasks():
         
     except Exception as e:
         logger.error(f"Error in daily tasks: {str(e)}")
+        raise  # lets the job queue retry with backoff
 
 def run_hourly_tasks():
     """
@@ -50,6 +51,7 @@ def run_hourly_tasks():
         
     except Exception as e:
         logger.error(f"Error in hourly tasks: {str(e)}")
+        raise  # lets the job queue retry with backoff
 
 def generate_weekly_predictions():
     """
@@ -73,40 +75,97 @@ def generate_weekly_predictions():
         except Exception as e:
             logger.error(f"Error generating prediction for {enrollment.enrollment_id}: {str(e)}")
 
-def send_weekly_summaries():
+def generate_changed_predictions(stale_days=None, limit=None):
     """
-    Send weekly performance summaries to students
-    Run this every Sunday evening
+    Re-score only enrollments with new attendance, grades or LMS activity
+    since their last prediction, plus any not re-scored in stale_days days.
+    Run this nightly instead of generate_weekly_predictions
     """
-    from backend.models import Student
-    from backend.services.email_service import EmailService
+    from flask import current_app
+    from backend.services.dirty_tracking_service import dirty_tracking_service
     
-    logger.info("Sending weekly summaries...")
+    if stale_days is None:
+        stale_days = current_app.config.get('PREDICTION_STALE_DAYS', 7)
+    
+    enrollment_ids = dirty_tracking_service.get_enrollments_to_rescore(
+        stale_days=stale_days, limit=limit
+    )
+    logger.info(f"Re-scoring {len(enrollment_ids)} changed or stale enrollments")
+    
+    prediction_service = PredictionService()
+    success_count = 0
+    
+    for enrollment_id in enrollment_ids:
+        try:
+            prediction_service.generate_prediction(enrollment_id, save=True)
+            success_count += 1
+        except Exception as e:
+            logger.error(f"Error generating prediction for {enrollment_id}: {str(e)}")
+    
+    return {
+        'total_processed': len(enrollment_ids),
+        'success_count': success_count
+    }
+
+def send_weekly_summaries(week_end=None):
+    """
+    Queue weekly performance summaries to students
+    Run this every Sunday evening; the outbox job does the sending.
+    Safe to re-run: each student gets at most one summary per week.
+    """
+    from flask import current_app
+    from backend.extensions import db
+    from backend.models import EmailOutbox
+    from backend.services.weekly_summary_service import WeeklySummaryService
+    
+    logger.info("Queueing weekly summaries...")
     
     try:
-        email_service = EmailService()
-        students = Student.query.filter_by(is_active=True).all()
+        max_attempts = current_app.config.get('MAIL_MAX_ATTEMPTS', 5)
+        chunk_size = current_app.config.get('MAIL_BATCH_SIZE', 200) * 5
+        now = datetime.utcnow()
+        week_end = week_end or datetime.now().date()
+        # ISO week of the window start, so a retry after midnight still
+        # maps to the week already (partly) queued
+        year, week, _ = (week_end - timedelta(days=6)).isocalendar()
+        queued = 0
+        rows = []
         
-        for student in students:
-            # Get student's weekly data
-            # This is simplified - you'd need to implement the data gathering
-            summary_data = {
-                'courses': [],  # Populate with actual data
-                'total_study_time': 0,
-                'resources_accessed': 0,
-                'assignments_submitted': 0
-            }
-            
-            email_service.send_weekly_summary(
-                to_email=student.user.email,
-                name=f"{student.first_name} {student.last_name}",
-                summary_data=summary_data
-            )
+        def flush():
+            # Separate connection - the summary query is still streaming
+            # on the session's connection. Rows already queued by an
+            # earlier, failed run are skipped by the unique dedupe_key
+            nonlocal queued
+            with db.engine.begin() as connection:
+                result = connection.execute(EmailOutbox.__table__.insert().prefix_with('IGNORE'), rows)
+            queued += max(result.rowcount, 0)
+            rows.clear()
+        
+        for student, summary_data in WeeklySummaryService.iter_summaries(week_end):
+            rows.append({
+                'message_type': 'weekly_summary',
+                'recipient_email': student['email'],
+                'recipient_name': student['name'],
+                'context': summary_data,
+                'dedupe_key': f"weekly_summary:{year}-W{week:02d}:{student['email']}",
+                'status': 'pending',
+                'attempts': 0,
+                'max_attempts': max_attempts,
+                'next_attempt_at': now,
+                'created_at': now
+            })
+            if len(rows) >= chunk_size:
+                flush()
         
-        logger.info("Weekly summaries sent successfully")
+        if rows:
+            flush()
+        logger.info(f"Queued weekly summaries for {queued} students")
+        return {'queued': queued}
         
     except Exception as e:
-        logger.error(f"Error sending weekly summaries: {str(e)}")
+        db.session.rollback()
+        logger.error(f"Error queueing weekly summaries: {str(e)}")
+        raise
 
 # Command to run manually
 if __name__ == "__main__":
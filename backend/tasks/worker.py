@@ -0,0 +1,137 @@
+"""Worker pool that executes background jobs outside the web processes"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import os
+import signal
+import socket
+import threading
+import logging
+
+from backend.services.job_service import job_service
+from backend.utils.cron import CronSchedule
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Polls the job table and runs claimed jobs on a thread pool.
+
+    One worker per host is usually enough; run more processes to scale out.
+    Every worker competes for the scheduler lease, and only the current
+    leader enqueues cron jobs.
+    """
+
+    SCHEDULER_LOCK = 'scheduler'
+
+    def __init__(self, app, concurrency=None, poll_interval=None,
+                 job_types=None, run_scheduler=True):
+        self.app = app
+        self.concurrency = concurrency or app.config.get('JOB_WORKER_CONCURRENCY', 2)
+        self.poll_interval = poll_interval or app.config.get('JOB_POLL_INTERVAL', 2)
+        self.job_types = job_types
+        self.run_scheduler = run_scheduler
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._slots = threading.Semaphore(self.concurrency)
+        self._stop = threading.Event()
+        self._last_schedule_tick = None
+
+        from backend.tasks.jobs import SCHEDULES
+        self.schedules = [
+            (entry, CronSchedule(entry['cron']))
+            for entry in app.config.get('JOB_SCHEDULES', SCHEDULES)
+        ]
+
+    def run(self):
+        """Run until SIGINT/SIGTERM"""
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+
+        logger.info(f"Worker {self.worker_id} started with concurrency {self.concurrency}")
+
+        if self.run_scheduler:
+            threading.Thread(target=self._scheduler_loop, daemon=True).start()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while not self._stop.is_set():
+                if not self._slots.acquire(timeout=self.poll_interval):
+                    continue
+
+                with self.app.app_context():
+                    job = job_service.claim_next(self.worker_id, self.job_types)
+                    job_id = job.job_id if job else None
+
+                if job_id is None:
+                    self._slots.release()
+                    self._stop.wait(self.poll_interval)
+                    continue
+
+                executor.submit(self._execute, job_id)
+
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def stop(self):
+        self._stop.set()
+
+    def _handle_signal(self, signum, frame):
+        logger.info(f"Worker {self.worker_id} received signal {signum}, finishing running jobs")
+        self.stop()
+
+    def _execute(self, job_id):
+        try:
+            with self.app.app_context():
+                job = job_service.get_job(job_id)
+                if job:
+                    job_service.run_job(job)
+        except Exception as e:
+            logger.error(f"Unhandled error running job {job_id}: {str(e)}")
+        finally:
+            self._slots.release()
+
+    # =====================================================
+    # SCHEDULER
+    # =====================================================
+
+    def _scheduler_loop(self):
+        interval = self.app.config.get('JOB_SCHEDULER_INTERVAL', 30)
+
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    job_service.requeue_stale_jobs()
+
+                    is_leader = job_service.acquire_lock(
+                        self.SCHEDULER_LOCK, self.worker_id, ttl_seconds=interval * 3
+                    )
+                    if is_leader:
+                        self._enqueue_due_jobs()
+                    else:
+                        self._last_schedule_tick = None
+            except Exception as e:
+                logger.error(f"Error in scheduler loop: {str(e)}")
+
+            self._stop.wait(interval)
+
+    def _enqueue_due_jobs(self):
+        """Enqueue every schedule that fired since the last tick.
+
+        Each fire time gets a dedupe key, so a leader handover or restart
+        never enqueues the same run twice.
+        """
+        now = datetime.utcnow().replace(second=0, microsecond=0)
+        start = self._last_schedule_tick or now - timedelta(minutes=1)
+        start = max(start, now - timedelta(hours=1))  # Don't replay long outages
+
+        minute = start + timedelta(minutes=1)
+        while minute <= now:
+            for entry, schedule in self.schedules:
+                if schedule.matches(minute):
+                    job_service.enqueue(
+                        entry['job_type'],
+                        payload=entry.get('payload'),
+                        dedupe_key=f"schedule:{entry['name']}:{minute.strftime('%Y%m%d%H%M')}"
+                    )
+                    logger.info(f"Scheduled {entry['name']} for {minute}")
+            minute += timedelta(minutes=1)
+
+        self._last_schedule_tick = now
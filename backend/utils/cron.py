@@ -0,0 +1,68 @@
+"""Minimal cron expression matching for the job scheduler"""
+from datetime import datetime
+
+
+class CronSchedule:
+    """Five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Supports '*', lists ('1,15'), ranges ('1-5'), and steps ('*/15', '0-30/5').
+    Day of week uses cron numbering (0 = Sunday).
+    """
+
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expression):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Invalid cron expression: {expression}")
+
+        self.expression = expression
+        self.fields = [
+            self._parse_field(part, low, high)
+            for part, (low, high) in zip(parts, self.FIELD_RANGES)
+        ]
+        self.dom_restricted = parts[2] != '*'
+        self.dow_restricted = parts[4] != '*'
+
+    @staticmethod
+    def _parse_field(field, low, high):
+        values = set()
+        for item in field.split(','):
+            step = 1
+            if '/' in item:
+                item, step_str = item.split('/', 1)
+                step = int(step_str)
+
+            if item == '*':
+                start, end = low, high
+            elif '-' in item:
+                start_str, end_str = item.split('-', 1)
+                start, end = int(start_str), int(end_str)
+            else:
+                start = int(item)
+                end = high if step > 1 else start
+
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Invalid cron field: {field}")
+
+            values.update(range(start, end + 1, step))
+        return values
+
+    def matches(self, moment: datetime) -> bool:
+        """Check whether the schedule fires in the minute containing moment"""
+        minutes, hours, days, months, weekdays = self.fields
+
+        if moment.minute not in minutes or moment.hour not in hours or moment.month not in months:
+            return False
+
+        day_match = moment.day in days
+        weekday_match = (moment.weekday() + 1) % 7 in weekdays
+
+        # Standard cron semantics: when both day fields are restricted,
+        # either one matching is enough
+        if self.dom_restricted and self.dow_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def __repr__(self):
+        return f"<CronSchedule {self.expression}>"
@@ -0,0 +1,71 @@
+"""Precompiled Jinja templates for outgoing email.
+
+Templates live in backend/templates/email and are compiled once per
+process on first use; rendering a batch reuses the compiled template for
+every recipient. Values are HTML-escaped (alert messages and names are
+user-influenced).
+"""
+import os
+import threading
+import logging
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', 'email')
+
+
+class EmailTemplates:
+    """Registry of compiled email templates"""
+
+    def __init__(self, directory=TEMPLATE_DIR):
+        self.environment = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(['html']),
+            undefined=StrictUndefined,
+            auto_reload=False,  # compiled once; no per-render mtime checks
+            trim_blocks=True,
+            lstrip_blocks=True
+        )
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """Compiled template by file name, compiling it on first use"""
+        template = self._templates.get(name)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(name)
+                if template is None:
+                    template = self.environment.get_template(name)
+                    self._templates[name] = template
+        return template
+
+    def compile_all(self):
+        """Compile every template up front (e.g. before a large send)"""
+        for name in self.environment.list_templates(extensions=['html']):
+            if not name.startswith('_'):
+                self.get(name)
+        return sorted(self._templates)
+
+    def render(self, name, **context):
+        return self.get(name).render(context)
+
+    def render_batch(self, name, contexts):
+        """Render one template for many recipients.
+
+        Returns a body per context, or None where that context failed to
+        render, so one bad record doesn't sink the batch.
+        """
+        template = self.get(name)
+        bodies = []
+        for context in contexts:
+            try:
+                bodies.append(template.render(context))
+            except Exception as e:
+                logger.error(f"Error rendering {name}: {str(e)}")
+                bodies.append(None)
+        return bodies
+
+
+email_templates = EmailTemplates()
@@ -0,0 +1,37 @@
+"""Packed float32 encoding of feature vectors.
+
+A snapshot is stored as little-endian float32 values in the order of a
+registered feature schema (see FeatureSchema), instead of a JSON object
+repeating every feature name. Missing values are stored as NaN.
+"""
+import math
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# float32 holds ~7 significant digits; decoded values are rounded to that
+# so 72.5 reads back as 72.5, not 72.49999237060547
+SIGNIFICANT_DIGITS = 7
+
+
+def pack_features(values: Iterable[Optional[float]]) -> bytes:
+    """Pack numbers into a float32 vector; None becomes NaN"""
+    values = [math.nan if value is None else float(value) for value in values]
+    return struct.pack(f'<{len(values)}f', *values)
+
+
+def unpack_features(blob: bytes) -> Tuple[float, ...]:
+    """Raw float32 values of a packed vector"""
+    return struct.unpack(f'<{len(blob) // 4}f', blob)
+
+
+def encode_snapshot(snapshot: Dict[str, Optional[float]]) -> Tuple[List[str], bytes]:
+    """Split a {feature: value} snapshot into its feature names and packed values"""
+    return list(snapshot), pack_features(snapshot.values())
+
+
+def decode_snapshot(feature_names: List[str], blob: bytes) -> Dict[str, Optional[float]]:
+    """Rebuild a {feature: value} snapshot from a packed vector and its schema"""
+    return {
+        name: None if math.isnan(value) else float(f'{value:.{SIGNIFICANT_DIGITS}g}')
+        for name, value in zip(feature_names, unpack_features(blob))
+    }
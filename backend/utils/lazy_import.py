@@ -0,0 +1,48 @@
+"""Deferred imports for heavy libraries (numpy, pandas, ML frameworks).
+
+    np = lazy_import('numpy')
+
+binds a placeholder that imports numpy on first attribute access, so
+modules imported while the app factory registers blueprints don't pay
+for libraries only some requests use. Modules that use the placeholder in
+annotations need `from __future__ import annotations`.
+"""
+import importlib
+import threading
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first use"""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with self.__dict__['_lock']:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self.__dict__['_name'])
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name):
+    """Return a proxy for module `name` that imports it on first attribute access"""
+    return LazyModule(name)
@@ -1,31 +1,47 @@
 import os
+import sys
+import copy
+import json
+import time
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+import threading
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
 
+# Pipeline settings; setup_app_logging overrides these from the app config
+LOG_SETTINGS = {
+    'async': True,           # write through a background QueueListener
+    'format': 'text',        # 'text' or 'json' for log files
+    'queue_size': 10000,     # records buffered before new ones are dropped
+    'rate_limits': {},       # logger name prefix -> INFO/DEBUG records per second per call site
+}
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
 def setup_logger(name, log_file=None):
-    """Create a logger with file and console handlers"""
+    """Create a logger with file and console handlers.
+
+    With async logging on (the default) the logger only gets a QueueHandler;
+    formatting and file/console I/O happen on the listener thread.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
-    
+    # This logger writes its own console output; don't repeat it via root
+    logger.propagate = not name
+
     # Clear existing handlers
     if logger.handlers:
         logger.handlers = []
-    
+
     # Create logs directory
     if log_file:
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
-    
-    # Console handler with colored output
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    
-    # Format with colors for console
-    console_formatter = ColoredFormatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    console_handler.setFormatter(console_formatter)
-    
+
+    handlers = []
+
     # File handler with rotation
     if log_file:
         file_handler = RotatingFileHandler(
@@ -34,21 +50,148 @@ def setup_logger(name, log_file=None):
             backupCount=5
         )
         file_handler.setLevel(logging.INFO)
-        
-        # Standard formatter for file
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s [in %(pathname)s:%(lineno)d]'
-        )
-        file_handler.setFormatter(file_formatter)
-        
-        # Add handler to logger
-        logger.addHandler(file_handler)
-    
-    # Add console handler
-    logger.addHandler(console_handler)
-    
+
+        if LOG_SETTINGS['format'] == 'json':
+            file_handler.setFormatter(JsonFormatter())
+        else:
+            # Standard formatter for file
+            file_handler.setFormatter(logging.Formatter(
+                TEXT_FORMAT + ' [in %(pathname)s:%(lineno)d]'
+            ))
+        handlers.append(file_handler)
+
+    # Console handler with colored output
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(ColoredFormatter(TEXT_FORMAT))
+    handlers.append(console_handler)
+
+    for handler in _wrap_handlers(name, handlers):
+        logger.addHandler(handler)
+
     return logger
 
+
+def _wrap_handlers(name, handlers):
+    """Route handlers through the shared queue when async logging is on"""
+    if LOG_SETTINGS['async']:
+        handlers = [_pipeline.register(name, handlers)]
+
+    if LOG_SETTINGS['rate_limits']:
+        rate_limit = RateLimitFilter(LOG_SETTINGS['rate_limits'])
+        for handler in handlers:
+            handler.filters = [f for f in handler.filters if not isinstance(f, RateLimitFilter)]
+            handler.addFilter(rate_limit)
+    return handlers
+
+
+# =====================================================
+# ASYNC PIPELINE
+# =====================================================
+
+class _TargetQueueHandler(QueueHandler):
+    """QueueHandler that tags records with the logger it was attached to
+    and drops (and counts) records when the queue is full"""
+
+    def __init__(self, log_queue, target):
+        super().__init__(log_queue)
+        self.target = target
+
+    def prepare(self, record):
+        # Resolve args and the traceback now (they may not be picklable or
+        # thread-safe) but keep the exception text separate from the message
+        # so the listener's formatters can lay it out
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        record.log_target = self.target
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _pipeline.dropped += 1
+
+
+_exception_formatter = logging.Formatter()
+
+
+class _Dispatcher:
+    """Listener-side handler sending each record to its target's handlers"""
+
+    def __init__(self):
+        self.targets = {}
+
+    def handle(self, record):
+        for handler in self.targets.get(getattr(record, 'log_target', None), ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class _LoggingPipeline:
+    """One bounded queue and listener thread shared by every configured logger"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.dispatcher = _Dispatcher()
+        self.queue_handlers = {}
+        self.queue = None
+        self.listener = None
+        self.dropped = 0
+
+    def register(self, name, handlers):
+        with self.lock:
+            if self.listener is None:
+                self._start()
+            for old in self.dispatcher.targets.get(name, ()):
+                old.close()
+            self.dispatcher.targets[name] = handlers
+            if name not in self.queue_handlers:
+                self.queue_handlers[name] = _TargetQueueHandler(self.queue, name)
+            return self.queue_handlers[name]
+
+    def _start(self):
+        self.queue = queue.Queue(LOG_SETTINGS['queue_size'])
+        for queue_handler in self.queue_handlers.values():
+            queue_handler.queue = self.queue
+        self.listener = QueueListener(self.queue, self.dispatcher)
+        self.listener.start()
+
+    def stop(self):
+        """Flush queued records and stop the listener thread"""
+        with self.lock:
+            if self.listener is not None:
+                try:
+                    self.listener.stop()
+                except queue.Full:
+                    pass
+                self.listener = None
+            if self.dropped:
+                sys.stderr.write(f"Logging queue overflowed; {self.dropped} records dropped\n")
+
+    def restart_after_fork(self):
+        # The listener thread does not survive fork and the queue's locks may
+        # be held; give the child its own queue and thread
+        self.lock = threading.Lock()
+        if self.listener is not None:
+            self.listener = None
+            self._start()
+
+
+_pipeline = _LoggingPipeline()
+atexit.register(_pipeline.stop)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_pipeline.restart_after_fork)
+
+
+# =====================================================
+# FORMATTERS AND FILTERS
+# =====================================================
+
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with colored output"""
     COLORS = {
@@ -59,26 +202,121 @@ class ColoredFormatter(logging.Formatter):
         'CRITICAL': '\033[91m\033[1m',  # Bold Red
         'RESET': '\033[0m'    # Reset
     }
-    
+
     def format(self, record):
         levelname = record.levelname
         if levelname in self.COLORS:
+            # Color a copy - the record is shared with the other handlers
+            record = copy.copy(record)
             record.levelname = f"{self.COLORS[levelname]}{levelname}{self.COLORS['RESET']}"
         return super().format(record)
 
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line for log shippers"""
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.utcfromtimestamp(record.created).isoformat(timespec='milliseconds') + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'process': record.process,
+            'thread': record.threadName
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per call site for INFO and DEBUG records.
+
+    `limits` maps logger name prefixes to records per second; the most
+    specific prefix wins and unmatched loggers are not limited. Hot loops
+    (per-enrollment logging in batch runs) are capped per call site, while
+    warnings and errors always pass. The next record let through reports
+    how many were suppressed.
+    """
+
+    def __init__(self, limits):
+        super().__init__()
+        self.limits = dict(limits)
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.rates = {}
+
+    def _rate_for(self, name):
+        rate = self.rates.get(name, False)
+        if rate is False:
+            matches = [prefix for prefix in self.limits
+                       if prefix == '' or name == prefix or name.startswith(prefix + '.')]
+            rate = float(self.limits[max(matches, key=len)]) if matches else None
+            self.rates[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        if rate is None:
+            return True
+
+        burst = max(1.0, rate)
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self.lock:
+            tokens, last, suppressed = self.buckets.get(key, (burst, now, 0))
+            tokens = min(burst, tokens + (now - last) * rate)
+            if tokens < 1:
+                self.buckets[key] = (tokens, now, suppressed + 1)
+                return False
+            self.buckets[key] = (tokens - 1, now, 0)
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} [{suppressed} similar messages suppressed]"
+            record.args = None
+        return True
+
+
 def setup_app_logging(app):
     """Configure application logging"""
+    LOG_SETTINGS.update({
+        'async': app.config.get('LOG_ASYNC', True),
+        'format': app.config.get('LOG_FORMAT', 'text'),
+        'queue_size': app.config.get('LOG_QUEUE_SIZE', 10000),
+        'rate_limits': app.config.get('LOG_RATE_LIMITS', {}),
+    })
+
     # Set up main application logger
     main_logger = setup_logger('app', 'logs/app.log')
     app.logger.handlers = main_logger.handlers
     app.logger.setLevel(main_logger.level)
-    
+    app.logger.propagate = False
+
     # Set up specialized loggers
     setup_logger('auth', 'logs/auth.log')
     setup_logger('db', 'logs/db.log')
     setup_logger('prediction', 'logs/prediction.log')
-    
+
+    # Service modules log through the root logger; move the handlers
+    # configured there (basicConfig in wsgi.py / worker.py) behind the same
+    # queue so hot paths never block on the terminal. The handlers keep
+    # their own formatters and levels, and the root level is untouched
+    root = logging.getLogger()
+    root_handlers = [h for h in root.handlers if not isinstance(h, _TargetQueueHandler)]
+    if root_handlers:
+        root.handlers = [h for h in root.handlers if h not in root_handlers]
+        for handler in _wrap_handlers('', root_handlers):
+            if handler not in root.handlers:
+                root.addHandler(handler)
+
     # Log app startup
     app.logger.info(f"Application started in {app.config['ENV']} mode")
-    
-    return app
\ No newline at end of file
+
+    return app
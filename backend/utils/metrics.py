@@ -0,0 +1,350 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Counters and histograms are kept in memory per process. When METRICS_DIR is
+set, each process periodically writes its snapshot to
+METRICS_DIR/metrics_<pid>.json and the /api/common/metrics endpoint sums the
+snapshots of every live process, so scrapes are correct under multi-process
+gunicorn. Snapshots of exited processes are deleted when collected, so their
+counters are not added again after worker restarts.
+"""
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Gauges from other processes are only reported while their snapshot is fresh
+GAUGE_MAX_AGE_SECONDS = 120
+
+
+class _Metric:
+    def __init__(self, registry, name, help_text):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.series = {}
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted(labels.items()))
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.series[key] = self.series.get(key, 0) + amount
+        self.registry.maybe_flush()
+
+    def export(self):
+        return [[dict(key), value] for key, value in self.series.items()]
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, registry, name, help_text, buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help_text)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            data = self.series.get(key)
+            if data is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                data = self.series[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            data['counts'][bisect_left(self.buckets, value)] += 1
+            data['sum'] += value
+            data['count'] += 1
+        self.registry.maybe_flush()
+
+    def time(self, **labels):
+        """Context manager that observes the elapsed time of its block"""
+        return _Timer(self, labels)
+
+    def export(self):
+        return [[dict(key), {'counts': list(data['counts']), 'sum': data['sum'], 'count': data['count']}]
+                for key, data in self.series.items()]
+
+
+class Gauge(_Metric):
+    """Gauge whose value is read from a callback at collection time"""
+    type = 'gauge'
+
+    def __init__(self, registry, name, help_text, callback):
+        super().__init__(registry, name, help_text)
+        self.callback = callback
+
+    def export(self):
+        try:
+            values = self.callback()
+        except Exception as e:
+            logger.debug(f"Gauge {self.name} unavailable: {str(e)}")
+            return []
+        if isinstance(values, dict):
+            return [[dict(key), value] for key, value in values.items()]
+        return [[{}, values]]
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """Process-wide registry of counters, histograms and gauges"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.directory = None
+        self.flush_interval = 5
+        self._last_flush = 0.0
+
+    def init_app(self, app):
+        """Configure multi-process aggregation from the app config"""
+        self.directory = app.config.get('METRICS_DIR')
+        self.flush_interval = app.config.get('METRICS_FLUSH_INTERVAL', 5)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            atexit.register(self.flush)
+            # A snapshot under this pid belongs to an exited process
+            self._discard_own_snapshot()
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=self._discard_own_snapshot)
+
+        from backend.extensions import db
+
+        def pool_stats():
+            with app.app_context():
+                pool = db.engine.pool
+            return {
+                (('state', 'checked_out'),): pool.checkedout(),
+                (('state', 'checked_in'),): pool.checkedin(),
+                (('state', 'overflow'),): pool.overflow(),
+                (('state', 'size'),): pool.size()
+            }
+
+        self.gauge('db_pool_connections', 'Database connection pool connections by state', pool_stats)
+
+    # =====================================================
+    # METRIC DEFINITION
+    # =====================================================
+
+    def counter(self, name, help_text):
+        return self._get_or_create(name, lambda: Counter(self, name, help_text))
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(name, lambda: Histogram(self, name, help_text, buckets))
+
+    def gauge(self, name, help_text, callback):
+        return self._get_or_create(name, lambda: Gauge(self, name, help_text, callback))
+
+    def timed(self, name, help_text, **labels):
+        """Decorator recording call latency in <name>_seconds and
+        exceptions in <name>_failures_total"""
+        histogram = self.histogram(f"{name}_seconds", help_text)
+        failures = self.counter(f"{name}_failures_total", f"Failed calls: {help_text}")
+
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                except Exception:
+                    failures.inc(**labels)
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - start, **labels)
+            return wrapper
+        return decorator
+
+    def _get_or_create(self, name, factory):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = factory()
+            return metric
+
+    # =====================================================
+    # MULTI-PROCESS SNAPSHOTS
+    # =====================================================
+
+    def snapshot(self):
+        """Serializable view of this process's metrics"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+            exported = {
+                metric.name: {
+                    'type': metric.type,
+                    'help': metric.help,
+                    'buckets': list(getattr(metric, 'buckets', [])),
+                    'series': metric.export() if metric.type != 'gauge' else []
+                }
+                for metric in metrics
+            }
+
+        # Gauge callbacks may touch the DB pool - run them outside the lock
+        for metric in metrics:
+            if metric.type == 'gauge':
+                exported[metric.name]['series'] = metric.export()
+
+        return {'pid': os.getpid(), 'time': time.time(), 'metrics': exported}
+
+    def maybe_flush(self):
+        if self.directory and time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write this process's snapshot for other processes to aggregate"""
+        if not self.directory:
+            return
+        self._last_flush = time.time()
+        try:
+            path = os.path.join(self.directory, f"metrics_{os.getpid()}.json")
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error writing metrics snapshot: {str(e)}")
+
+    def collect_all(self):
+        """Snapshots for every process (this one read live)"""
+        snapshots = [self.snapshot()]
+        if not self.directory:
+            return snapshots
+
+        self.flush()
+        own_pid = os.getpid()
+        for path in glob.glob(os.path.join(self.directory, 'metrics_*.json')):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                pid = data.get('pid')
+                if pid == own_pid:
+                    continue
+                if not self._pid_alive(pid):
+                    os.remove(path)
+                    continue
+                snapshots.append(data)
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def _discard_own_snapshot(self):
+        """Remove a leftover snapshot of an exited process that had this pid"""
+        try:
+            os.remove(os.path.join(self.directory, f"metrics_{os.getpid()}.json"))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Error removing stale metrics snapshot: {str(e)}")
+
+    @staticmethod
+    def _pid_alive(pid):
+        if not isinstance(pid, int) or pid <= 0:
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            # Exists, owned by another user
+            return True
+        return True
+
+    # =====================================================
+    # EXPOSITION
+    # =====================================================
+
+    def render(self):
+        """Aggregate all processes and render Prometheus text format"""
+        now = time.time()
+        merged = {}
+
+        for snapshot in self.collect_all():
+            fresh = now - snapshot.get('time', 0) <= GAUGE_MAX_AGE_SECONDS
+            for name, metric in snapshot['metrics'].items():
+                entry = merged.setdefault(name, {
+                    'type': metric['type'],
+                    'help': metric['help'],
+                    'buckets': metric['buckets'],
+                    'series': {}
+                })
+
+                for labels, value in metric['series']:
+                    if metric['type'] == 'gauge':
+                        # Gauges are per process; keep them apart by pid
+                        if not fresh:
+                            continue
+                        labels = dict(labels, pid=str(snapshot['pid']))
+                    key = tuple(sorted(labels.items()))
+
+                    if metric['type'] == 'histogram':
+                        current = entry['series'].setdefault(
+                            key, {'counts': [0] * len(value['counts']), 'sum': 0.0, 'count': 0}
+                        )
+                        current['counts'] = [a + b for a, b in zip(current['counts'], value['counts'])]
+                        current['sum'] += value['sum']
+                        current['count'] += value['count']
+                    elif metric['type'] == 'counter':
+                        entry['series'][key] = entry['series'].get(key, 0) + value
+                    else:
+                        entry['series'][key] = value
+
+        lines = []
+        for name in sorted(merged):
+            entry = merged[name]
+            lines.append(f"# HELP {name} {entry['help']}")
+            lines.append(f"# TYPE {name} {entry['type']}")
+
+            for key, value in sorted(entry['series'].items()):
+                labels = dict(key)
+                if entry['type'] == 'histogram':
+                    cumulative = 0
+                    bounds = [str(b) for b in entry['buckets']] + ['+Inf']
+                    for bound, count in zip(bounds, value['counts']):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{self._labels(dict(labels, le=bound))} {cumulative}")
+                    lines.append(f"{name}_sum{self._labels(labels)} {value['sum']}")
+                    lines.append(f"{name}_count{self._labels(labels)} {value['count']}")
+                else:
+                    lines.append(f"{name}{self._labels(labels)} {value}")
+
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _labels(labels):
+        if not labels:
+            return ''
+        parts = []
+        for key, value in sorted(labels.items()):
+            escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            parts.append(f'{key}="{escaped}"')
+        return '{' + ','.join(parts) + '}'
+
+
+# Shared registry
+metrics = MetricsRegistry()
@@ -0,0 +1,173 @@
+"""Opt-in cProfile helpers shared by the request profiler and batch commands.
+
+Profiles are written as pstats files named <name>_<timestamp>_<pid>.prof in
+PROFILE_DIR so they can be summarized by /api/admin/system/profiles or
+opened with snakeviz / `python -m pstats`.
+
+Batch commands and scripts are profiled by setting PROFILE=1 in the
+environment, e.g. `PROFILE=1 flask run-daily-tasks`.
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_PROFILE_DIR = os.path.join(PROJECT_ROOT, 'profiles')
+
+SORT_KEYS = {'cumulative', 'tottime', 'ncalls'}
+
+# cProfile cannot run two profilers at once in a process (Python 3.12+
+# refuses outright); overlapping requests are simply not profiled
+_active_lock = threading.Lock()
+
+
+class ProfileStore:
+    """Directory of saved profiles with pruning and top-N summaries"""
+
+    def __init__(self, directory=None, max_files=200):
+        self.directory = directory or os.environ.get('PROFILE_DIR', DEFAULT_PROFILE_DIR)
+        self.max_files = max_files
+
+    def save(self, profiler, name):
+        """Dump a stopped profiler and return the profile id (file name)"""
+        os.makedirs(self.directory, exist_ok=True)
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_') or 'profile'
+        timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+        profile_id = f"{safe_name}_{timestamp}_{os.getpid()}.prof"
+        profiler.dump_stats(os.path.join(self.directory, profile_id))
+        self._prune()
+        return profile_id
+
+    def list_profiles(self, limit=100):
+        """Newest profiles first"""
+        if not os.path.isdir(self.directory):
+            return []
+
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith('.prof'):
+                stat = entry.stat()
+                profiles.append({
+                    'profile_id': entry.name,
+                    'size_bytes': stat.st_size,
+                    'created_at': datetime.utcfromtimestamp(stat.st_mtime).isoformat()
+                })
+        profiles.sort(key=lambda item: item['created_at'], reverse=True)
+        return profiles[:limit]
+
+    def path_for(self, profile_id):
+        """Resolve a profile id to a path, rejecting anything outside the directory"""
+        if not profile_id or os.path.basename(profile_id) != profile_id or not profile_id.endswith('.prof'):
+            return None
+        path = os.path.join(self.directory, profile_id)
+        return path if os.path.isfile(path) else None
+
+    def summarize(self, profile_id, limit=30, sort='cumulative'):
+        """Top-N functions of a saved profile, or None if it doesn't exist"""
+        path = self.path_for(profile_id)
+        if not path:
+            return None
+        if sort not in SORT_KEYS:
+            sort = 'cumulative'
+
+        stats = pstats.Stats(path, stream=io.StringIO())
+        rows = []
+        for (filename, line, function), (primitive_calls, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({
+                'function': function,
+                'location': f"{self._short_path(filename)}:{line}",
+                'ncalls': calls,
+                'primitive_calls': primitive_calls,
+                'tottime_ms': round(tottime * 1000, 3),
+                'cumtime_ms': round(cumtime * 1000, 3)
+            })
+
+        sort_field = {'cumulative': 'cumtime_ms', 'tottime': 'tottime_ms', 'ncalls': 'ncalls'}[sort]
+        rows.sort(key=lambda row: row[sort_field], reverse=True)
+
+        return {
+            'profile_id': profile_id,
+            'total_calls': stats.total_calls,
+            'total_time_ms': round(stats.total_tt * 1000, 3),
+            'sort': sort,
+            'functions': rows[:limit]
+        }
+
+    def _prune(self):
+        try:
+            profiles = self.list_profiles(limit=None)
+            for profile in profiles[self.max_files:]:
+                os.remove(os.path.join(self.directory, profile['profile_id']))
+        except OSError as e:
+            logger.warning(f"Error pruning profiles: {str(e)}")
+
+    @staticmethod
+    def _short_path(filename):
+        # Trim site-packages / project prefixes so summaries stay readable
+        marker = 'site-packages' + os.sep
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+        if filename.startswith(PROJECT_ROOT + os.sep):
+            return filename[len(PROJECT_ROOT) + 1:]
+        return filename
+
+
+def start_profiler():
+    """Start a cProfile profiler, or return None if one is already running"""
+    if not _active_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiling tool is active (e.g. a debugger)
+        _active_lock.release()
+        return None
+    return profiler
+
+
+def stop_profiler(profiler):
+    profiler.disable()
+    _active_lock.release()
+
+
+def profiling_requested():
+    return os.environ.get('PROFILE', '').lower() in ('1', 'true', 'yes')
+
+
+@contextmanager
+def profile_block(name, enabled=None, store=None):
+    """Profile the enclosed block when enabled (default: PROFILE env var)"""
+    if enabled is None:
+        enabled = profiling_requested()
+    profiler = start_profiler() if enabled else None
+    if profiler is None:
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        stop_profiler(profiler)
+        profile_id = (store or ProfileStore()).save(profiler, name)
+        logger.info(f"Saved profile {profile_id}")
+
+
+def profiled(name):
+    """Decorator form of profile_block for batch entry points"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profile_block(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,75 @@
+"""Streaming ZIP archives.
+
+iter_zip() yields a ZIP file piece by piece while reading the member files
+in chunks, so an archive of any size is produced with constant memory and
+without a temporary file. Members are stored uncompressed by default -
+submissions are mostly PDFs, Office documents and images, which are
+already compressed.
+"""
+import os
+import zipfile
+from datetime import datetime
+
+
+class _ChunkBuffer:
+    """Write-only, unseekable file object that hands written bytes to the caller.
+
+    zipfile detects the missing seek() and writes data descriptors after
+    each member instead of rewinding to patch the local headers.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_zip(entries, chunk_size=1024 * 1024, compression=zipfile.ZIP_STORED):
+    """Yield the bytes of a ZIP archive of `entries`.
+
+    entries is an iterable of (archive_name, file_path); files that have
+    disappeared from disk are skipped.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=compression, allowZip64=True) as archive:
+        for archive_name, file_path in entries:
+            try:
+                source = open(file_path, 'rb')
+            except OSError:
+                continue
+
+            with source:
+                stat = os.fstat(source.fileno())
+                info = zipfile.ZipInfo(archive_name, datetime.fromtimestamp(stat.st_mtime).timetuple()[:6])
+                info.compress_type = compression
+                info.file_size = stat.st_size
+                with archive.open(info, mode='w', force_zip64=stat.st_size >= zipfile.ZIP64_LIMIT) as member:
+                    while True:
+                        chunk = source.read(chunk_size)
+                        if not chunk:
+                            break
+                        member.write(chunk)
+                        data = buffer.drain()
+                        if data:
+                            yield data
+
+            data = buffer.drain()
+            if data:
+                yield data
+
+    yield buffer.drain()
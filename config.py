@@ -16,6 +16,8 @@ class Config:
     # Database
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_RECORD_QUERIES = True
+    SLOW_REQUEST_QUERY_COUNT = int(os.environ.get('SLOW_REQUEST_QUERY_COUNT', 50))  # log requests at/over this many queries
+    SLOW_REQUEST_DB_TIME_MS = int(os.environ.get('SLOW_REQUEST_DB_TIME_MS', 500))  # ...or this much DB time
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_recycle': 280,
         'pool_timeout': 20,
@@ -38,15 +40,86 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@university.edu')
     MAIL_ENABLED = os.environ.get('MAIL_ENABLED', 'false').lower() == 'true'
+    # Outbox sender (send_email_outbox job) - one SMTP connection per batch
+    MAIL_BATCH_SIZE = int(os.environ.get('MAIL_BATCH_SIZE', 200))
+    MAIL_MAX_BATCHES_PER_RUN = 10
+    MAIL_MAX_ATTEMPTS = 5
+    MAIL_RETRY_BACKOFF = 60  # base retry delay in seconds, doubled per attempt
+    MAIL_LOCK_TIMEOUT = 600  # 'sending' messages older than this are released
+    
+    # system_config rows are cached per process; the stored version is
+    # re-checked at most this often (seconds)
+    SYSTEM_CONFIG_CHECK_INTERVAL = 5
     
     # ML Model
     MODEL_PATH = os.path.join(basedir, 'ml_models')
+    MODEL_WARMUP = os.environ.get('MODEL_WARMUP', 'false').lower() == 'true'  # load the model at process start, not first prediction
+    PREDICTION_STALE_DAYS = int(os.environ.get('PREDICTION_STALE_DAYS', 7))  # re-score unchanged enrollments after this
+    BACKTEST_CHUNK_SIZE = 1000  # enrollments per feature tensor / inference batch in model backtests
+    ENGAGEMENT_BASELINE_WINDOWS = [7, 28]  # days; per-offering baselines refreshed by the daily LMS summary
+    
+    # Feature drift monitor - scored features are buffered per process and
+    # merged into weekly feature_drift_stats rows
+    DRIFT_FLUSH_SIZE = 100  # buffered feature vectors before a merge
+    DRIFT_FLUSH_INTERVAL = 300  # seconds before a partial buffer is merged
+    DRIFT_MIN_SAMPLES = 50  # fewer scored vectors than this report insufficient_data
+    DRIFT_PSI_WARNING = 0.1
+    DRIFT_PSI_CRITICAL = 0.25
+    DRIFT_MEAN_SHIFT_WARNING = 0.5  # training std deviations, used without a reference profile
+    DRIFT_MEAN_SHIFT_CRITICAL = 1.0
     
     # Upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(basedir, 'uploads')
+    UPLOAD_CHUNK_SIZE = 1024 * 1024  # bytes per read/write when streaming uploads to disk
     ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls', 'txt', 'pdf', 'doc', 'docx',  'zip', 'jpg', 'jpeg', 'png'}
     
+    # LMS activity retention (compact_lms_activities job) - raw rows older
+    # than this are folded into lms_activity_daily and archived to gzip files
+    LMS_RETENTION_DAYS = int(os.environ.get('LMS_RETENTION_DAYS', 180))
+    LMS_COMPACTION_BATCH_SIZE = 5000  # raw rows per transaction
+    LMS_COMPACTION_MAX_BATCHES = 200  # per run; the rest waits for the next night
+    LMS_ARCHIVE_DIR = os.environ.get('LMS_ARCHIVE_DIR', os.path.join(basedir, 'archives', 'lms_activities'))
+    
+    # Prediction history retention (compact_predictions job) - older
+    # predictions are thinned to one per enrollment per week and archived
+    PREDICTION_RETENTION_DAYS = int(os.environ.get('PREDICTION_RETENTION_DAYS', 90))
+    PREDICTION_COMPACTION_BATCH_SIZE = 2000  # predictions per transaction
+    PREDICTION_COMPACTION_MAX_BATCHES = 100  # per run; the rest waits for the next night
+    PREDICTION_ARCHIVE_DIR = os.environ.get('PREDICTION_ARCHIVE_DIR', os.path.join(basedir, 'archives', 'predictions'))
+    
+    # Statistics cache (seconds) - bounds staleness across worker processes
+    STATISTICS_CACHE_TTL = int(os.environ.get('STATISTICS_CACHE_TTL', 300))
+    
+    # Metrics - set METRICS_DIR for multi-process servers (gunicorn) so
+    # /api/common/metrics sums all workers; snapshots of exited workers are dropped
+    METRICS_DIR = os.environ.get('METRICS_DIR')
+    METRICS_FLUSH_INTERVAL = 5  # seconds between per-process snapshot writes
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # bearer token for scrapes; endpoint is off without it
+    
+    # Profiling - requests send "X-Profile: <PROFILING_TOKEN>" or are sampled;
+    # batch commands use PROFILE=1. Summaries at /api/admin/system/profiles
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')  # required for header-triggered profiling
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))  # fraction of requests, 0 = header only
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(basedir, 'profiles'))
+    PROFILE_MAX_FILES = 200  # oldest profiles are deleted beyond this
+    
+    # Logging - records go through a queue to a listener thread, so request
+    # and batch code never blocks on file or console I/O
+    LOG_ASYNC = True
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')  # 'text' or 'json' for logs/*.log
+    LOG_QUEUE_SIZE = 10000  # records buffered before new ones are dropped
+    LOG_RATE_LIMITS = {'backend.services': 20}  # INFO/DEBUG records per second per call site, by logger prefix
+    
+    # Background jobs (worker.py)
+    JOB_WORKER_CONCURRENCY = int(os.environ.get('JOB_WORKER_CONCURRENCY', 2))
+    JOB_POLL_INTERVAL = 2  # seconds between queue polls when idle
+    JOB_SCHEDULER_INTERVAL = 30  # seconds between scheduler ticks
+    JOB_MAX_ATTEMPTS = 3
+    JOB_RETRY_BACKOFF = 30  # base retry delay in seconds, doubled per attempt
+    JOB_LOCK_TIMEOUT = 3600  # running jobs whose lock hasn't been refreshed for this long are requeued
+    JOB_HEARTBEAT_INTERVAL = 60  # seconds between lock refreshes of a running job
     
     # API
     API_TITLE = 'University Grade Prediction System API'
@@ -72,6 +145,7 @@ class TestingConfig(Config):
     ENV = 'testing'
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # pool sizing options don't apply to SQLite
     WTF_CSRF_ENABLED = False
     
     # Use faster password hashing for tests
@@ -79,6 +153,9 @@ class TestingConfig(Config):
     
     # No email in testing
     MAIL_SUPPRESS_SEND = True
+    
+    # Synchronous logging so test output appears in order
+    LOG_ASYNC = False
 
 class ProductionConfig(Config):
     """Production configuration"""
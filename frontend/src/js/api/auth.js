@@ -81,6 +81,11 @@ const authApi = {
     
     // Logout
     logout() {
+        // Send and drop this user's buffered activity before the token goes
+        if (typeof activityTracker !== 'undefined') {
+            activityTracker.clear();
+        }
+        
         localStorage.removeItem('access_token');
         localStorage.removeItem('refresh_token');
         localStorage.removeItem('user');
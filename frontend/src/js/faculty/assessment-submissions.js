@@ -254,6 +254,41 @@ async function downloadSubmission(submissionId) {
     }
 }
 
+async function downloadAllSubmissions() {
+    try {
+        const token = localStorage.getItem('token');
+        const response = await fetch(`${API_URL}/api/faculty/assessments/${assessmentId}/submissions/archive`, {
+            headers: {
+                'Authorization': `Bearer ${token}`
+            }
+        });
+        
+        if (response.ok) {
+            const blob = await response.blob();
+            const contentDisposition = response.headers.get('content-disposition');
+            const fileName = contentDisposition
+                ? contentDisposition.split('filename=')[1].replace(/['"]/g, '')
+                : 'submissions.zip';
+            
+            const url = window.URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = fileName;
+            document.body.appendChild(a);
+            a.click();
+            window.URL.revokeObjectURL(url);
+            document.body.removeChild(a);
+        } else if (response.status === 404) {
+            showError('No submitted files to download');
+        } else {
+            showError('Failed to download submissions');
+        }
+    } catch (error) {
+        console.error('Error downloading submissions:', error);
+        showError('Error downloading submissions');
+    }
+}
+
 // Utility functions
 function getUrlParameter(name) {
     const urlParams = new URLSearchParams(window.location.search);
@@ -1,65 +1,185 @@
 // Activity tracker utility
+//
+// Events are buffered in localStorage (shared by all tabs and page loads)
+// and sent together to /student/lms/track/batch, instead of one request
+// per page view per tab. The buffer is kept per user, so events recorded
+// by one student are never sent with another student's token, and it is
+// cleared on logout.
 const activityTracker = {
-    
+
+    STORAGE_KEY: 'lms_event_buffer',
+    FLUSH_INTERVAL: 300000,  // send buffered events at most every 5 minutes
+    MAX_BUFFER: 50,          // ...or as soon as this many are waiting
+    MAX_BATCH: 500,          // server limit per request
+
     // Track page views automatically
-    trackPageView: async function() {
+    trackPageView: function() {
+        this.record({
+            type: 'page',
+            page_url: window.location.pathname,
+            page_title: document.title,
+            course_id: this.getCourseIdFromPage()
+        });
+    },
+
+    // Track when viewing an assessment
+    trackAssessmentView: function(assessmentId, assessmentName) {
+        this.record({
+            type: 'assessment',
+            assessment_id: assessmentId,
+            assessment_name: assessmentName
+        });
+    },
+
+    // Track resource/material views
+    trackResourceView: function(resourceId, resourceName, resourceType = 'document') {
+        this.record({
+            type: 'resource',
+            resource_id: resourceId,
+            resource_name: resourceName,
+            resource_type: resourceType,
+            course_id: this.getCourseIdFromPage()
+        });
+    },
+
+    // Add an event to the buffer, stamped with the client time
+    record: function(event) {
+        const key = this._bufferKey();
+        if (!key) {
+            return;
+        }
+
+        const buffer = this._readBuffer(key);
+        buffer.push(Object.assign({ timestamp: Date.now() }, event));
+        this._writeBuffer(key, buffer.slice(-this.MAX_BATCH));
+
+        if (buffer.length >= this.MAX_BUFFER) {
+            this.flush();
+        }
+    },
+
+    // Send buffered events; keepalive lets the request outlive the page
+    flush: async function(keepalive = false) {
+        // The key is fixed now: a failed send goes back to this user's
+        // buffer even if someone else has logged in meanwhile
+        const key = this._bufferKey();
+        if (!key) {
+            return;
+        }
+
+        const events = this._readBuffer(key);
+        if (events.length === 0) {
+            return;
+        }
+
+        // Take the events out first so other tabs don't send them again
+        this._writeBuffer(key, []);
+        localStorage.setItem(`${key}_flushed_at`, String(Date.now()));
+
         try {
-            const pageData = {
-                page_url: window.location.pathname,
-                page_title: document.title,
-                course_id: this.getCourseIdFromPage()
-            };
-            
-            await apiClient.post('student/lms/track/page', pageData);
+            const response = await fetch(`${API_URL}/student/lms/track/batch`, {
+                method: 'POST',
+                headers: apiClient._getHeaders(),
+                body: JSON.stringify({ events: events }),
+                keepalive: keepalive
+            });
+
+            // Keep the events for the next flush if the token had expired,
+            // the request was throttled or the server had a problem
+            if (response.status === 401 || response.status === 429 || response.status >= 500) {
+                this._requeue(key, events);
+            }
         } catch (error) {
-            console.error('Failed to track page view:', error);
+            console.error('Failed to send activity events:', error);
+            this._requeue(key, events);
         }
     },
-    
-    // Track when viewing an assessment
-    trackAssessmentView: async function(assessmentId, assessmentName) {
+
+    // Send what is buffered, then drop the current user's buffer (on logout)
+    clear: function() {
+        const key = this._bufferKey();
+        if (!key) {
+            return;
+        }
+
+        // Headers are read before flush returns, while the token still exists
+        this.flush(true);
+        localStorage.removeItem(key);
+        localStorage.removeItem(`${key}_flushed_at`);
+    },
+
+    // Flush if the oldest flush across all tabs is due
+    _flushIfDue: function(keepalive = false) {
+        const key = this._bufferKey();
+        if (!key) {
+            return;
+        }
+
+        const lastFlush = parseInt(localStorage.getItem(`${key}_flushed_at`) || '0', 10);
+        if (Date.now() - lastFlush >= this.FLUSH_INTERVAL) {
+            this.flush(keepalive);
+        }
+    },
+
+    _requeue: function(key, events) {
+        this._writeBuffer(key, events.concat(this._readBuffer(key)).slice(-this.MAX_BATCH));
+    },
+
+    // Buffer key of the logged-in user, or null when nobody is logged in
+    _bufferKey: function() {
+        const user = authApi.getCurrentUser();
+        return user && user.id ? `${this.STORAGE_KEY}_${user.id}` : null;
+    },
+
+    _readBuffer: function(key) {
         try {
-            await apiClient.post('student/lms/track/assessment', {
-                assessment_id: assessmentId,
-                assessment_name: assessmentName
-            });
+            return JSON.parse(localStorage.getItem(key) || '[]');
         } catch (error) {
-            console.error('Failed to track assessment view:', error);
+            return [];
         }
     },
-    
-    // Track resource/material views
-    trackResourceView: async function(resourceId, resourceName, resourceType = 'document') {
+
+    _writeBuffer: function(key, events) {
         try {
-            await apiClient.post('student/lms/track/resource', {
-                resource_id: resourceId,
-                resource_name: resourceName,
-                resource_type: resourceType
-            });
+            localStorage.setItem(key, JSON.stringify(events));
         } catch (error) {
-            console.error('Failed to track resource view:', error);
+            console.error('Failed to buffer activity events:', error);
         }
     },
-    
+
     // Helper to extract course ID from page
     getCourseIdFromPage: function() {
         // Try to get from URL params
         const urlParams = new URLSearchParams(window.location.search);
         return urlParams.get('course_id') || null;
     },
-    
+
     // Initialize tracking on page load
     init: function() {
+        // Events of the old shared buffer can't be attributed to a user
+        localStorage.removeItem(this.STORAGE_KEY);
+        localStorage.removeItem(`${this.STORAGE_KEY}_flushed_at`);
+
         // Track page view on load
         if (authApi.isLoggedIn() && authApi.hasRole('student')) {
             this.trackPageView();
-            
+            this._flushIfDue();
+
             // Track page view every 5 minutes if still on page
             setInterval(() => {
                 if (document.visibilityState === 'visible') {
                     this.trackPageView();
                 }
-            }, 300000); // 5 minutes
+                this._flushIfDue();
+            }, this.FLUSH_INTERVAL);
+
+            // Pages being left may never reach the next interval; check
+            // whether a flush is due while the request can still complete
+            document.addEventListener('visibilitychange', () => {
+                if (document.visibilityState === 'hidden') {
+                    this._flushIfDue(true);
+                }
+            });
         }
     }
 };
@@ -67,4 +187,4 @@ const activityTracker = {
 // Initialize when DOM is ready
 document.addEventListener('DOMContentLoaded', function() {
     activityTracker.init();
-});
\ No newline at end of file
+});
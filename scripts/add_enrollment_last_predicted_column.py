@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.extensions import db
+from backend.app import create_app
+from sqlalchemy import text
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def add_enrollment_last_predicted_column():
+    """Add enrollments.last_predicted_at and backfill it from predictions"""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            # Check if column already exists
+            result = db.session.execute(text("""
+                SELECT COLUMN_NAME
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_NAME = 'enrollments'
+                AND TABLE_SCHEMA = DATABASE()
+                AND COLUMN_NAME = 'last_predicted_at'
+            """))
+            if result.first():
+                logger.info("last_predicted_at column already exists. No migration needed.")
+                return
+
+            db.session.execute(text("ALTER TABLE enrollments ADD COLUMN last_predicted_at DATETIME NULL AFTER grade_points"))
+            db.session.execute(text(
+                "ALTER TABLE enrollments ADD INDEX idx_status_last_predicted (enrollment_status, last_predicted_at)"
+            ))
+            logger.info("Added last_predicted_at column")
+
+            # One-off scan of prediction history. prediction_date is local
+            # time; the offset from UTC is negligible against a staleness
+            # window measured in days
+            db.session.execute(text("""
+                UPDATE enrollments e
+                JOIN (
+                    SELECT enrollment_id, MAX(prediction_date) AS last_prediction
+                    FROM predictions
+                    GROUP BY enrollment_id
+                ) p ON p.enrollment_id = e.enrollment_id
+                SET e.last_predicted_at = p.last_prediction
+            """))
+            logger.info("Backfilled last_predicted_at from predictions")
+
+            db.session.commit()
+            logger.info("Migration completed successfully!")
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Migration failed: {str(e)}")
+            raise
+
+if __name__ == "__main__":
+    add_enrollment_last_predicted_column()
@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.extensions import db
+from backend.app import create_app
+from sqlalchemy import text
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def add_outbox_dedupe_key():
+    """Add the unique dedupe_key column to the email_outbox table"""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            # Check if column already exists
+            result = db.session.execute(text("""
+                SELECT COLUMN_NAME
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_NAME = 'email_outbox'
+                AND TABLE_SCHEMA = DATABASE()
+                AND COLUMN_NAME = 'dedupe_key'
+            """))
+            if result.first():
+                logger.info("dedupe_key column already exists. No migration needed.")
+                return
+
+            db.session.execute(text("ALTER TABLE email_outbox ADD COLUMN dedupe_key VARCHAR(150) NULL AFTER context"))
+            db.session.execute(text("ALTER TABLE email_outbox ADD UNIQUE KEY unique_outbox_dedupe (dedupe_key)"))
+            logger.info("Added dedupe_key column")
+
+            db.session.commit()
+            logger.info("Migration completed successfully!")
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Migration failed: {str(e)}")
+            raise
+
+if __name__ == "__main__":
+    add_outbox_dedupe_key()
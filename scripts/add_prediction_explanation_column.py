@@ -0,0 +1,47 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.extensions import db
+from backend.app import create_app
+from sqlalchemy import text
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def add_prediction_explanation_column():
+    """Add the cached explanation column to the predictions table and widen
+    model_version to hold the full model version"""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            # Check if column already exists
+            result = db.session.execute(text("""
+                SELECT COLUMN_NAME
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_NAME = 'predictions'
+                AND TABLE_SCHEMA = DATABASE()
+                AND COLUMN_NAME = 'explanation'
+            """))
+            if result.first():
+                logger.info("explanation column already exists")
+            else:
+                db.session.execute(text("ALTER TABLE predictions ADD COLUMN explanation JSON NULL AFTER feature_snapshot"))
+                logger.info("Added explanation column")
+
+            # Model versions are export timestamps (26 characters)
+            db.session.execute(text("ALTER TABLE predictions MODIFY model_version VARCHAR(50) NOT NULL"))
+            logger.info("Widened model_version column")
+
+            db.session.commit()
+            logger.info("Migration completed successfully!")
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Migration failed: {str(e)}")
+            raise
+
+if __name__ == "__main__":
+    add_prediction_explanation_column()
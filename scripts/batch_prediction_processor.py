@@ -15,6 +15,7 @@ from backend.models.prediction import MLFeatureStaging, Prediction
 from backend.models.academic import Enrollment
 from backend.services.feature_calculator_service import FeatureCalculator
 from backend.services.prediction_service import PredictionService
+from backend.utils.profiling import profile_block
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -137,20 +138,22 @@ if __name__ == '__main__':
     
     args = parser.parse_args()
     
-    if args.all:
-        logger.info("Running complete batch prediction pipeline")
-        stage_features_for_all_enrollments()
-        process_staged_predictions(args.batch_size)
-        cleanup_old_staging_records()
-    else:
-        if args.stage:
+    # PROFILE=1 saves a cProfile of the whole run to PROFILE_DIR
+    with profile_block('batch_prediction_processor'):
+        if args.all:
+            logger.info("Running complete batch prediction pipeline")
             stage_features_for_all_enrollments()
-        
-        if args.process:
             process_staged_predictions(args.batch_size)
-        
-        if args.cleanup:
             cleanup_old_staging_records()
+        else:
+            if args.stage:
+                stage_features_for_all_enrollments()
+        
+            if args.process:
+                process_staged_predictions(args.batch_size)
+        
+            if args.cleanup:
+                cleanup_old_staging_records()
         
-        if not any([args.stage, args.process, args.cleanup]):
-            parser.print_help()
\ No newline at end of file
+            if not any([args.stage, args.process, args.cleanup]):
+                parser.print_help()
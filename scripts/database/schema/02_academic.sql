@@ -50,9 +50,11 @@ CREATE TABLE IF NOT EXISTS enrollments (
     enrollment_status ENUM('enrolled', 'dropped', 'completed', 'withdrawn') DEFAULT 'enrolled',
     final_grade VARCHAR(2) NULL, -- A, B, C, D, F
     grade_points DECIMAL(3,2) NULL,
+    last_predicted_at DATETIME NULL, -- UTC start of the latest prediction
     FOREIGN KEY (student_id) REFERENCES students(student_id),
     FOREIGN KEY (offering_id) REFERENCES course_offerings(offering_id),
     UNIQUE KEY unique_enrollment (student_id, offering_id),
     INDEX idx_student_offering (student_id, offering_id),
-    INDEX idx_status (enrollment_status)
+    INDEX idx_status (enrollment_status),
+    INDEX idx_status_last_predicted (enrollment_status, last_predicted_at)
 );
\ No newline at end of file
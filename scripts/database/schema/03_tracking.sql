@@ -64,4 +64,40 @@ CREATE TABLE IF NOT EXISTS lms_daily_summary (
     FOREIGN KEY (enrollment_id) REFERENCES enrollments(enrollment_id),
     UNIQUE KEY unique_daily (enrollment_id, summary_date),
     INDEX idx_date (summary_date)
-);
\ No newline at end of file
+);
+-- Per-day, per-resource aggregates of compacted lms_activities (retention job)
+CREATE TABLE IF NOT EXISTS lms_activity_daily (
+    aggregate_id INT PRIMARY KEY AUTO_INCREMENT,
+    enrollment_id INT NOT NULL,
+    activity_date DATE NOT NULL,
+    activity_type ENUM('resource_view', 'forum_post', 'forum_reply', 'assignment_view', 
+                       'quiz_attempt', 'video_watch', 'file_download', 'page_view') NOT NULL,
+    resource_id VARCHAR(50) NULL, -- NULL groups activities without a resource; each counts as a distinct site
+    activity_count INT NOT NULL DEFAULT 0,
+    total_duration_seconds INT DEFAULT 0,
+    first_activity_at TIMESTAMP NOT NULL,
+    last_activity_at TIMESTAMP NOT NULL,
+    FOREIGN KEY (enrollment_id) REFERENCES enrollments(enrollment_id),
+    INDEX idx_activity_daily_enrollment (enrollment_id, activity_date),
+    INDEX idx_activity_daily_key (enrollment_id, activity_date, activity_type, resource_id)
+);
+
+-- Rolling per-offering engagement baselines (refreshed by the daily summary job)
+CREATE TABLE IF NOT EXISTS engagement_baselines (
+    baseline_id INT PRIMARY KEY AUTO_INCREMENT,
+    offering_id INT NOT NULL,
+    window_days INT NOT NULL,
+    as_of_date DATE NOT NULL,
+    student_count INT NOT NULL DEFAULT 0,
+    mean_activities FLOAT NULL, -- per-student average daily activities
+    median_activities FLOAT NULL,
+    p10_activities FLOAT NULL,
+    p25_activities FLOAT NULL,
+    p75_activities FLOAT NULL,
+    p90_activities FLOAT NULL,
+    mean_minutes FLOAT NULL,
+    median_minutes FLOAT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (offering_id) REFERENCES course_offerings(offering_id),
+    UNIQUE KEY unique_offering_window (offering_id, window_days)
+);
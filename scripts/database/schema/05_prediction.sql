@@ -1,3 +1,12 @@
+-- Ordered feature names of packed feature vectors
+CREATE TABLE IF NOT EXISTS feature_schemas (
+    schema_id INT PRIMARY KEY AUTO_INCREMENT,
+    fingerprint VARCHAR(40) UNIQUE NOT NULL, -- sha1 of the ordered feature names
+    feature_count INT NOT NULL,
+    feature_names JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Predictions
 CREATE TABLE IF NOT EXISTS predictions (
     prediction_id INT PRIMARY KEY AUTO_INCREMENT,
@@ -6,11 +15,16 @@ CREATE TABLE IF NOT EXISTS predictions (
     predicted_grade VARCHAR(2) NOT NULL,
     confidence_score DECIMAL(3,2) CHECK (confidence_score >= 0 AND confidence_score <= 1),
     risk_level ENUM('low', 'medium', 'high') NOT NULL,
-    model_version VARCHAR(20) NOT NULL,
-    feature_snapshot JSON NULL, -- Store features used for prediction
+    model_version VARCHAR(50) NOT NULL,
+    feature_vector BLOB NULL, -- float32 features in feature_schema_id order
+    feature_schema_id INT NULL,
+    feature_snapshot JSON NULL, -- Legacy {feature: value} snapshots, converted by migrate_feature_snapshots.py
+    explanation JSON NULL, -- Per-feature contributions, computed with the prediction
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (enrollment_id) REFERENCES enrollments(enrollment_id),
+    FOREIGN KEY (feature_schema_id) REFERENCES feature_schemas(schema_id),
     INDEX idx_enrollment_date (enrollment_id, prediction_date),
+    INDEX idx_prediction_date (prediction_date), -- trends and retention scan by date
     INDEX idx_risk_level (risk_level)
 );
 
@@ -33,4 +47,30 @@ CREATE TABLE IF NOT EXISTS feature_cache (
     FOREIGN KEY (enrollment_id) REFERENCES enrollments(enrollment_id),
     UNIQUE KEY unique_cache (enrollment_id, feature_date),
     INDEX idx_date (feature_date)
-);
\ No newline at end of file
+);
+
+-- Enrollments with new attendance, LMS activity or grades since their last prediction
+CREATE TABLE IF NOT EXISTS prediction_dirty_enrollments (
+    enrollment_id INT PRIMARY KEY,
+    first_changed_at DATETIME NOT NULL,
+    last_changed_at DATETIME NOT NULL,
+    last_source VARCHAR(20),
+    FOREIGN KEY (enrollment_id) REFERENCES enrollments(enrollment_id),
+    INDEX idx_last_changed (last_changed_at)
+);
+
+-- Per-feature streaming statistics of scored features, one row per model version, week and feature
+CREATE TABLE IF NOT EXISTS feature_drift_stats (
+    stat_id INT PRIMARY KEY AUTO_INCREMENT,
+    model_version VARCHAR(50) NOT NULL,
+    window_start DATE NOT NULL,
+    feature_name VARCHAR(100) NOT NULL,
+    sample_count BIGINT NOT NULL DEFAULT 0,
+    mean DOUBLE NOT NULL DEFAULT 0,
+    m2 DOUBLE NOT NULL DEFAULT 0,
+    min_value DOUBLE,
+    max_value DOUBLE,
+    histogram JSON NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY unique_drift_window (model_version, window_start, feature_name)
+);
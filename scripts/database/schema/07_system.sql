@@ -42,6 +42,27 @@ CREATE TABLE IF NOT EXISTS model_versions (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Model backtests over completed terms (model_evaluation_service)
+CREATE TABLE IF NOT EXISTS model_evaluations (
+    evaluation_id INT PRIMARY KEY AUTO_INCREMENT,
+    version_id INT NOT NULL,
+    status ENUM('running', 'completed', 'failed') NOT NULL DEFAULT 'running',
+    term_ids JSON,
+    cutoff_offsets JSON,
+    enrollment_count INT DEFAULT 0,
+    failed_count INT DEFAULT 0,
+    accuracy DECIMAL(5,4),
+    auc DECIMAL(5,4),
+    brier_score DECIMAL(5,4),
+    median_lead_time_days DECIMAL(6,1),
+    metrics JSON,
+    error_message TEXT,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP NULL,
+    FOREIGN KEY (version_id) REFERENCES model_versions(version_id) ON DELETE CASCADE,
+    INDEX idx_evaluation_version (version_id, completed_at)
+);
+
 -- Views for common queries
 CREATE OR REPLACE VIEW v_current_enrollments AS
 SELECT 
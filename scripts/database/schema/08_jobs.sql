@@ -0,0 +1,46 @@
+-- Background jobs processed by the worker pool (worker.py)
+CREATE TABLE IF NOT EXISTS background_jobs (
+    job_id INT PRIMARY KEY AUTO_INCREMENT,
+    job_type VARCHAR(100) NOT NULL,
+    payload JSON NULL,
+    status ENUM('queued', 'running', 'succeeded', 'failed') DEFAULT 'queued',
+    priority INT DEFAULT 0,
+    dedupe_key VARCHAR(150) UNIQUE NULL,
+    attempts INT DEFAULT 0,
+    max_attempts INT DEFAULT 3,
+    run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMP NULL,
+    started_at TIMESTAMP NULL,
+    finished_at TIMESTAMP NULL,
+    duration_ms INT NULL,
+    progress_current INT DEFAULT 0,
+    progress_total INT NULL,
+    result JSON NULL,
+    error_message TEXT,
+    created_by INT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (created_by) REFERENCES users(user_id),
+    INDEX idx_status_run_after (status, run_after),
+    INDEX idx_job_type (job_type)
+);
+
+-- Per-item results of background jobs (e.g. per-enrollment predictions)
+CREATE TABLE IF NOT EXISTS background_job_results (
+    result_id INT PRIMARY KEY AUTO_INCREMENT,
+    job_id INT NOT NULL,
+    enrollment_id INT NULL,
+    status ENUM('success', 'error') NOT NULL,
+    data JSON NULL,
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (job_id) REFERENCES background_jobs(job_id) ON DELETE CASCADE,
+    INDEX idx_job_status (job_id, status)
+);
+
+-- Leader election leases (e.g. the cron scheduler)
+CREATE TABLE IF NOT EXISTS job_locks (
+    lock_name VARCHAR(100) PRIMARY KEY,
+    owner VARCHAR(100) NOT NULL,
+    expires_at TIMESTAMP NOT NULL
+);
@@ -0,0 +1,23 @@
+-- Outgoing email queue (transactional outbox), drained by the send_email_outbox job
+CREATE TABLE IF NOT EXISTS email_outbox (
+    message_id INT PRIMARY KEY AUTO_INCREMENT,
+    message_type VARCHAR(50) NOT NULL,
+    recipient_email VARCHAR(100) NULL,
+    recipient_name VARCHAR(100) NULL,
+    alert_id INT NULL,
+    context JSON NULL,
+    dedupe_key VARCHAR(150) NULL,
+    status ENUM('pending', 'sending', 'sent', 'skipped', 'failed') DEFAULT 'pending',
+    attempts INT DEFAULT 0,
+    max_attempts INT DEFAULT 5,
+    next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMP NULL,
+    sent_at TIMESTAMP NULL,
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (alert_id) REFERENCES alerts(alert_id) ON DELETE CASCADE,
+    UNIQUE KEY unique_outbox_dedupe (dedupe_key),
+    INDEX idx_outbox_status_next (status, next_attempt_at),
+    INDEX idx_outbox_recipient (recipient_email)
+);
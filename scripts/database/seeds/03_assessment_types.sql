@@ -24,5 +24,6 @@ VALUES
 ('attendance_threshold', '70', 'Minimum attendance percentage'),
 ('prediction_frequency', 'daily', 'How often to run predictions'),
 ('alert_email_enabled', 'true', 'Send email alerts'),
-('model_version', 'v1.0', 'Current active model version')
+('model_version', 'v1.0', 'Current active model version'),
+('config_version', '0', 'Bumped on every configuration change')
 ON DUPLICATE KEY UPDATE config_key = VALUES(config_key);
\ No newline at end of file
@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.extensions import db
+from backend.app import create_app
+from backend.models import FeatureSchema, Prediction, MLFeatureStaging
+from sqlalchemy import text
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+# table -> (model, primary key, legacy JSON column attribute, decoded property)
+TABLES = {
+    'predictions': (Prediction, 'prediction_id', 'feature_snapshot_json', 'feature_snapshot'),
+    'ml_feature_staging': (MLFeatureStaging, 'staging_id', 'feature_data_json', 'feature_data'),
+}
+
+def add_packed_columns(table, legacy_column):
+    """Add feature_vector/feature_schema_id and make the JSON column nullable"""
+    result = db.session.execute(text("""
+        SELECT COLUMN_NAME
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_NAME = :table
+        AND TABLE_SCHEMA = DATABASE()
+        AND COLUMN_NAME IN ('feature_vector', 'feature_schema_id')
+    """), {'table': table})
+    existing_columns = [row[0] for row in result]
+
+    if 'feature_vector' not in existing_columns:
+        db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN feature_vector BLOB NULL"))
+        logger.info(f"Added {table}.feature_vector column")
+
+    if 'feature_schema_id' not in existing_columns:
+        db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN feature_schema_id INT NULL"))
+        db.session.execute(text(
+            f"ALTER TABLE {table} ADD FOREIGN KEY (feature_schema_id) REFERENCES feature_schemas(schema_id)"
+        ))
+        logger.info(f"Added {table}.feature_schema_id column")
+
+    db.session.execute(text(f"ALTER TABLE {table} MODIFY {legacy_column} JSON NULL"))
+    db.session.commit()
+
+def convert_rows(model, key, legacy_attribute, snapshot_attribute):
+    """Pack legacy JSON snapshots in batches; returns the number converted"""
+    primary_key = getattr(model, key)
+    legacy_column = getattr(model, legacy_attribute)
+    converted = 0
+    last_id = 0
+
+    while True:
+        rows = model.query.filter(
+            primary_key > last_id,
+            legacy_column.isnot(None),
+            model.feature_vector.is_(None)
+        ).order_by(primary_key).limit(BATCH_SIZE).all()
+        if not rows:
+            break
+
+        for row in rows:
+            # The setter packs the values and clears the JSON column
+            setattr(row, snapshot_attribute, getattr(row, legacy_attribute))
+        db.session.commit()
+
+        converted += len(rows)
+        last_id = getattr(rows[-1], key)
+        logger.info(f"Converted {converted} {model.__tablename__} rows")
+
+    return converted
+
+def migrate_feature_snapshots():
+    """Convert JSON feature snapshots to packed float32 vectors"""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            FeatureSchema.__table__.create(db.engine, checkfirst=True)
+
+            for table, (model, key, legacy_attribute, snapshot_attribute) in TABLES.items():
+                legacy_column = getattr(model, legacy_attribute).property.columns[0].name
+                add_packed_columns(table, legacy_column)
+                converted = convert_rows(model, key, legacy_attribute, snapshot_attribute)
+                logger.info(f"{table}: {converted} snapshots packed")
+
+            logger.info("Migration completed successfully!")
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Migration failed: {str(e)}")
+            raise
+
+if __name__ == "__main__":
+    migrate_feature_snapshots()
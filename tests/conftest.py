@@ -0,0 +1,56 @@
+"""Shared fixtures: a testing app on in-memory SQLite and small data builders"""
+import itertools
+from datetime import date
+
+import pytest
+
+from backend.app import create_app
+from backend.extensions import db as _db
+from backend.models import (
+    User, Student, Course, AcademicTerm, CourseOffering, Enrollment
+)
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def db(app):
+    """A fresh schema for every test"""
+    _db.create_all()
+    yield _db
+    _db.session.remove()
+    _db.drop_all()
+
+
+@pytest.fixture
+def make_enrollment(db):
+    """Build a student enrolled in a new offering of a term starting on term_start"""
+    counter = itertools.count(1)
+
+    def make(term_start=date(2024, 1, 8), **student_fields):
+        n = next(counter)
+        user = User(f'student{n}', f'student{n}@example.edu', 'password', 'student')
+        db.session.add(user)
+        db.session.flush()
+
+        student = Student(f'S{n:05d}', user.user_id, 'Test', f'Student{n}', term_start, **student_fields)
+        term = AcademicTerm(f'Term {n}', f'T{n}', term_start, date(term_start.year + 1, 1, 1))
+        course = Course(f'C{n}', f'CS{n:03d}', f'Course {n}', 3)
+        db.session.add_all([student, term, course])
+        db.session.flush()
+
+        offering = CourseOffering(course.course_id, term.term_id, section_number='01')
+        db.session.add(offering)
+        db.session.flush()
+
+        enrollment = Enrollment(student.student_id, offering.offering_id, term_start)
+        db.session.add(enrollment)
+        db.session.commit()
+        return enrollment
+
+    return make
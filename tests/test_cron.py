@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pytest
+
+from backend.utils.cron import CronSchedule
+
+
+def test_every_minute_matches_any_time():
+    schedule = CronSchedule('* * * * *')
+    assert schedule.matches(datetime(2024, 2, 29, 23, 59))
+    assert schedule.matches(datetime(2024, 1, 1, 0, 0))
+
+
+def test_fixed_time():
+    schedule = CronSchedule('45 3 * * *')
+    assert schedule.matches(datetime(2024, 3, 5, 3, 45))
+    assert not schedule.matches(datetime(2024, 3, 5, 3, 46))
+    assert not schedule.matches(datetime(2024, 3, 5, 4, 45))
+
+
+def test_steps_lists_and_ranges():
+    assert CronSchedule('*/15 * * * *').fields[0] == {0, 15, 30, 45}
+    assert CronSchedule('0-30/10 * * * *').fields[0] == {0, 10, 20, 30}
+    assert CronSchedule('5/20 * * * *').fields[0] == {5, 25, 45}
+    assert CronSchedule('0 8-10,14 * * *').fields[1] == {8, 9, 10, 14}
+
+
+def test_day_of_week_uses_cron_numbering():
+    schedule = CronSchedule('0 18 * * 0')  # Sundays
+    assert schedule.matches(datetime(2024, 3, 10, 18, 0))  # Sunday
+    assert not schedule.matches(datetime(2024, 3, 11, 18, 0))  # Monday
+
+    weekdays = CronSchedule('0 9 * * 1-5')
+    assert weekdays.matches(datetime(2024, 3, 11, 9, 0))  # Monday
+    assert weekdays.matches(datetime(2024, 3, 15, 9, 0))  # Friday
+    assert not weekdays.matches(datetime(2024, 3, 16, 9, 0))  # Saturday
+
+
+def test_day_of_month_and_month():
+    schedule = CronSchedule('0 0 1 1,7 *')
+    assert schedule.matches(datetime(2024, 1, 1))
+    assert schedule.matches(datetime(2024, 7, 1))
+    assert not schedule.matches(datetime(2024, 2, 1))
+    assert not schedule.matches(datetime(2024, 1, 2))
+
+
+def test_both_day_fields_restricted_match_either():
+    # Standard cron: the 1st of the month or any Monday
+    schedule = CronSchedule('0 0 1 * 1')
+    assert schedule.matches(datetime(2024, 3, 1))  # Friday the 1st
+    assert schedule.matches(datetime(2024, 3, 4))  # Monday the 4th
+    assert not schedule.matches(datetime(2024, 3, 5))  # Tuesday the 5th
+
+
+@pytest.mark.parametrize('expression', [
+    '* * * *',          # too few fields
+    '* * * * * *',      # too many fields
+    '60 * * * *',       # minute out of range
+    '* 24 * * *',       # hour out of range
+    '* * 0 * *',        # day of month starts at 1
+    '* * * 13 *',       # month out of range
+    '* * * * 7',        # day of week is 0-6
+    '10-5 * * * *',     # reversed range
+    '*/0 * * * *',      # zero step
+    'x * * * *',        # not a number
+])
+def test_invalid_expressions_raise(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_every_registered_schedule_parses():
+    from backend.tasks.jobs import SCHEDULES
+    for entry in SCHEDULES:
+        CronSchedule(entry['cron'])
@@ -0,0 +1,100 @@
+import math
+from datetime import datetime
+
+import pytest
+
+from backend.models import FeatureSchema, Prediction
+from backend.utils.feature_codec import (
+    pack_features, unpack_features, encode_snapshot, decode_snapshot
+)
+
+
+@pytest.fixture
+def schema_cache(monkeypatch):
+    """Per-test schema caches; the schema tables are rebuilt for every test"""
+    monkeypatch.setattr(FeatureSchema, '_ids', {})
+    monkeypatch.setattr(FeatureSchema, '_names', {})
+
+
+def test_pack_uses_four_bytes_per_value():
+    assert len(pack_features([])) == 0
+    assert len(pack_features([1.0, 2.0, 3.0])) == 12
+
+
+def test_pack_unpack_round_trip():
+    values = [0.0, 1.0, -2.5, 1024.0, 0.75]
+    assert unpack_features(pack_features(values)) == tuple(values)
+
+
+def test_none_is_stored_as_nan():
+    unpacked = unpack_features(pack_features([1.0, None, 3]))
+    assert unpacked[0] == 1.0
+    assert math.isnan(unpacked[1])
+    assert unpacked[2] == 3.0
+
+
+def test_decode_rounds_to_float32_precision():
+    names = ['score', 'rate', 'ratio', 'count', 'tiny']
+    values = [72.5, 0.1, 1 / 3, 123456, 1.5e-05]
+    decoded = decode_snapshot(names, pack_features(values))
+    assert decoded['score'] == 72.5
+    assert decoded['rate'] == 0.1
+    assert decoded['ratio'] == pytest.approx(1 / 3, rel=1e-6)
+    assert decoded['count'] == 123456
+    assert decoded['tiny'] == 1.5e-05
+
+
+def test_snapshot_round_trip_preserves_order_and_missing_values():
+    snapshot = {'zeta': 3.0, 'alpha': None, 'mid': 0.25}
+    names, blob = encode_snapshot(snapshot)
+    assert names == ['zeta', 'alpha', 'mid']
+
+    decoded = decode_snapshot(names, blob)
+    assert list(decoded) == names
+    assert decoded == snapshot
+
+
+def test_schema_is_registered_once(db, schema_cache):
+    first = FeatureSchema.resolve(['a', 'b'])
+    assert FeatureSchema.resolve(['a', 'b']) == first
+    assert FeatureSchema.resolve(['b', 'a']) != first
+
+    # Another worker with a cold cache finds the same schema
+    FeatureSchema._ids.clear()
+    FeatureSchema._names.clear()
+    assert FeatureSchema.resolve(['a', 'b']) == first
+    assert FeatureSchema.names_for(first) == ['a', 'b']
+    assert db.session.query(FeatureSchema).count() == 2
+
+
+def test_unknown_schema_raises(db, schema_cache):
+    with pytest.raises(ValueError):
+        FeatureSchema.names_for(999)
+
+
+def test_prediction_snapshot_round_trip(db, schema_cache, make_enrollment):
+    enrollment = make_enrollment()
+    snapshot = {'attendance_rate': 0.9, 'avg_score': 72.5, 'late_count': None}
+    prediction = Prediction(enrollment.enrollment_id, datetime(2024, 3, 1), 'B', 0.8,
+                            'low', 'v1', feature_snapshot=snapshot)
+    db.session.add(prediction)
+    db.session.commit()
+    assert prediction.feature_snapshot_json is None
+    assert len(prediction.feature_vector) == 12
+
+    db.session.expire_all()
+    FeatureSchema._names.clear()
+    prediction = db.session.get(Prediction, prediction.prediction_id)
+    assert prediction.feature_snapshot == snapshot
+    assert prediction.to_dict()['feature_snapshot'] == snapshot
+
+
+def test_legacy_json_snapshot_is_still_readable(db, schema_cache, make_enrollment):
+    enrollment = make_enrollment()
+    prediction = Prediction(enrollment.enrollment_id, datetime(2024, 3, 1), 'B', 0.8, 'low', 'v1')
+    prediction.feature_snapshot_json = {'avg_score': 72.5}
+    db.session.add(prediction)
+    db.session.commit()
+
+    db.session.expire_all()
+    assert db.session.get(Prediction, prediction.prediction_id).feature_snapshot == {'avg_score': 72.5}
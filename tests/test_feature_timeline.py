@@ -0,0 +1,133 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.models import (
+    Attendance, LMSSession, LMSActivity, LMSActivityDaily,
+    AssessmentType, Assessment, AssessmentSubmission
+)
+from backend.services.feature_calculator_service import FeatureCalculator
+from backend.services.feature_timeline_service import feature_timeline_service
+
+TERM_START = datetime(2024, 1, 8)
+ACTIVITY_TYPES = list(FeatureCalculator.CLICK_MAPPING)
+TYPE_NAMES = ['Quiz', 'Assignment', 'Midterm Exam', 'Final Exam', 'Lab']  # Lab maps to no model type
+
+
+def _random_history(db, enrollment, rng, types):
+    """Attendance, raw and compacted LMS activity, assessments and submissions"""
+    eid = enrollment.enrollment_id
+
+    for day in rng.sample(range(100), rng.randrange(0, 30)):
+        status = rng.choice(['present', 'late', 'absent', 'excused'])
+        db.session.add(Attendance(eid, (TERM_START + timedelta(days=day)).date(), status))
+
+    for _ in range(rng.randrange(0, 4)):
+        session = LMSSession(eid, TERM_START + timedelta(days=rng.randrange(100)))
+        db.session.add(session)
+        db.session.flush()
+        for _ in range(rng.randrange(1, 25)):
+            db.session.add(LMSActivity(
+                session.session_id, eid, rng.choice(ACTIVITY_TYPES),
+                TERM_START + timedelta(days=rng.randrange(100), seconds=rng.randrange(86400)),
+                resource_id=rng.choice([None, 'R1', 'R2', 'R3'])
+            ))
+
+    for day in rng.sample(range(60), rng.randrange(0, 8)):
+        first = TERM_START + timedelta(days=day, seconds=rng.randrange(40000))
+        db.session.add(LMSActivityDaily(
+            eid, first.date(), rng.choice(ACTIVITY_TYPES), first,
+            first + timedelta(seconds=rng.randrange(40000)),
+            resource_id=rng.choice([None, 'R1', 'R9']), activity_count=rng.randrange(1, 6)
+        ))
+
+    for n in range(rng.randrange(0, 10)):
+        due_date = TERM_START + timedelta(days=rng.randrange(5, 105), hours=23, minutes=59)
+        assessment = Assessment(
+            enrollment.offering_id, rng.choice(types).type_id, f'Assessment {n}', 100,
+            due_date=rng.choice([due_date, due_date, None]), is_published=True
+        )
+        db.session.add(assessment)
+        db.session.flush()
+        if rng.random() < 0.8:
+            reference = assessment.due_date or due_date
+            db.session.add(AssessmentSubmission(
+                eid, assessment.assessment_id,
+                reference - timedelta(days=rng.randrange(-3, 10), minutes=rng.randrange(600)),
+                score=rng.choice([None, rng.randrange(0, 101)]), is_late=rng.random() < 0.3
+            ))
+
+    db.session.commit()
+
+
+@pytest.fixture
+def enrollments(db, make_enrollment):
+    types = [AssessmentType(name) for name in TYPE_NAMES]
+    db.session.add_all(types)
+    db.session.commit()
+
+    rng = random.Random(43)
+    result = []
+    for _ in range(8):
+        enrollment = make_enrollment(term_start=TERM_START.date(), age_band=rng.choice(['0-35', '35-55', '55+']))
+        _random_history(db, enrollment, rng, types)
+        result.append(enrollment)
+    # One without any history
+    result.append(make_enrollment(term_start=TERM_START.date()))
+    return result
+
+
+def _single(enrollment_id, as_of):
+    return FeatureCalculator().calculate_features_for_enrollment(enrollment_id, as_of)[0]
+
+
+def test_tensor_matches_single_cutoff_calculator(enrollments):
+    rng = random.Random(7)
+    cutoffs = [TERM_START - timedelta(days=1)]
+    cutoffs += [TERM_START + timedelta(days=d) for d in range(0, 112, 7)]
+    cutoffs += [TERM_START + timedelta(days=rng.randrange(110), seconds=rng.randrange(86400)) for _ in range(8)]
+    ids = [e.enrollment_id for e in enrollments]
+
+    tensor = feature_timeline_service.calculate_feature_tensor(ids, cutoffs=cutoffs, chunk_size=4)
+    assert tensor.shape == (len(ids), len(cutoffs), len(feature_timeline_service.feature_names))
+
+    names = feature_timeline_service.feature_names
+    for row, enrollment_id in enumerate(ids):
+        for column, cutoff in enumerate(cutoffs):
+            expected = _single(enrollment_id, cutoff)
+            np.testing.assert_allclose(
+                tensor[row, column], expected, rtol=1e-7, atol=1e-6,
+                err_msg=f'enrollment {enrollment_id} at {cutoff}: '
+                        f'{[n for n, a, b in zip(names, tensor[row, column], expected) if not np.isclose(a, b)]}'
+            )
+
+
+def test_offsets_are_days_after_course_start(enrollments):
+    offsets = [0, 14, 49, 105]
+    ids = [e.enrollment_id for e in enrollments[:4]]
+
+    tensor = feature_timeline_service.calculate_feature_tensor(ids, offsets=offsets)
+    for row, enrollment_id in enumerate(ids):
+        for column, offset in enumerate(offsets):
+            np.testing.assert_allclose(tensor[row, column], _single(enrollment_id, TERM_START + timedelta(days=offset)),
+                                       rtol=1e-7, atol=1e-6)
+
+
+def test_cutoffs_or_offsets_required(make_enrollment):
+    ids = [make_enrollment().enrollment_id]
+    with pytest.raises(ValueError):
+        feature_timeline_service.calculate_feature_tensor(ids)
+    with pytest.raises(ValueError):
+        feature_timeline_service.calculate_feature_tensor(ids, cutoffs=[TERM_START], offsets=[7])
+
+
+def test_unknown_enrollment_raises(make_enrollment):
+    with pytest.raises(ValueError):
+        feature_timeline_service.calculate_feature_tensor([make_enrollment().enrollment_id, 999999], offsets=[7])
+
+
+def test_no_enrollments_gives_empty_tensor(db):
+    tensor = feature_timeline_service.calculate_feature_tensor([], offsets=[7, 14])
+    assert tensor.shape == (0, 2, len(feature_timeline_service.feature_names))
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+from backend.models import BackgroundJob
+from backend.services.job_service import JobService, JobContext
+
+WORKER = 'host:1234'
+
+
+def _expire_lock(db, job_id):
+    db.session.query(BackgroundJob).filter_by(job_id=job_id).update({
+        BackgroundJob.locked_at: datetime.utcnow() - timedelta(days=1)
+    })
+    db.session.commit()
+
+
+def test_each_claim_gets_its_own_token(db):
+    job = JobService.enqueue('noop')
+
+    first = JobService.claim_next(WORKER)
+    first_token = first.locked_by
+    assert first_token.startswith(f'{WORKER}:')
+
+    # The lock expires and the same process claims the job again
+    _expire_lock(db, job.job_id)
+    assert JobService.requeue_stale_jobs() == 1
+    second = JobService.claim_next(WORKER)
+    second_token = second.locked_by
+    assert second_token.startswith(f'{WORKER}:')
+    assert second_token != first_token
+
+    # The thread running the first claim no longer owns the job
+    assert not JobContext(job.job_id, first_token).heartbeat()
+    JobService._complete(job.job_id, first_token, {'from': 'first'}, 10)
+    JobService._fail(job.job_id, first_token, 'late failure', 10)
+    db.session.expire_all()
+    job = db.session.get(BackgroundJob, job.job_id)
+    assert job.status == 'running'
+    assert job.locked_by == second_token
+
+    JobService._complete(job.job_id, second_token, {'from': 'second'}, 10)
+    db.session.expire_all()
+    job = db.session.get(BackgroundJob, job.job_id)
+    assert job.status == 'succeeded'
+    assert job.result == {'from': 'second'}
+
+
+def test_stale_job_out_of_attempts_is_failed_with_finished_at(db):
+    job = JobService.enqueue('noop', max_attempts=1)
+    JobService.claim_next(WORKER)
+    _expire_lock(db, job.job_id)
+
+    assert JobService.requeue_stale_jobs() == 1
+    db.session.expire_all()
+    job = db.session.get(BackgroundJob, job.job_id)
+    assert job.status == 'failed'
+    assert job.finished_at is not None
+    assert job.locked_by is None
+
+
+def test_stale_job_with_attempts_left_is_requeued(db):
+    job = JobService.enqueue('noop', max_attempts=3)
+    JobService.claim_next(WORKER)
+    _expire_lock(db, job.job_id)
+
+    JobService.requeue_stale_jobs()
+    db.session.expire_all()
+    job = db.session.get(BackgroundJob, job.job_id)
+    assert job.status == 'queued'
+    assert job.finished_at is None
@@ -0,0 +1,104 @@
+import gzip
+import json
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.models import LMSActivity, LMSActivityDaily, LMSSession
+from backend.services.feature_calculator_service import FeatureCalculator
+from backend.services.lms_retention_service import lms_retention_service
+
+RETENTION_DAYS = 30
+ACTIVITY_TYPES = list(FeatureCalculator.CLICK_MAPPING)
+
+
+def _add_activities(db, enrollment, rng, start, days, count):
+    """Random activities over `days` days from `start`, some without a resource"""
+    sessions = {}
+    for _ in range(count):
+        timestamp = start + timedelta(days=rng.randrange(days), seconds=rng.randrange(86400))
+        session = sessions.get(timestamp.date())
+        if session is None:
+            session = LMSSession(enrollment.enrollment_id, datetime.combine(timestamp.date(), datetime.min.time()))
+            db.session.add(session)
+            db.session.flush()
+            sessions[timestamp.date()] = session
+        db.session.add(LMSActivity(
+            session.session_id, enrollment.enrollment_id, rng.choice(ACTIVITY_TYPES), timestamp,
+            resource_id=rng.choice([None, None, 'R1', 'R2', 'R3', 'R4']),
+            duration_seconds=rng.randrange(600)
+        ))
+    db.session.commit()
+
+
+def _features(enrollment_id, as_of_dates):
+    calculator = FeatureCalculator()
+    return [calculator.calculate_features_for_enrollment(enrollment_id, as_of) for as_of in as_of_dates]
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_compaction_preserves_features(db, make_enrollment, tmp_path, seed):
+    rng = random.Random(seed)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    term_start = today - timedelta(days=120)
+    enrollment = make_enrollment(term_start=term_start.date())
+
+    # Mostly past the retention window, with a recent tail that stays raw
+    _add_activities(db, enrollment, rng, term_start, 100, 150)
+    _add_activities(db, enrollment, rng, today - timedelta(days=10), 10, 20)
+
+    as_of_dates = [None] + [term_start + timedelta(days=d) for d in range(0, 121, 7)]
+    before = _features(enrollment.enrollment_id, as_of_dates)
+
+    # Small batches so some days are merged across batches
+    stats = lms_retention_service.compact(retention_days=RETENTION_DAYS, batch_size=17,
+                                          max_batches=100, archive_dir=str(tmp_path))
+    db.session.expire_all()
+
+    cutoff = today - timedelta(days=RETENTION_DAYS)
+    assert stats['activities'] > 0
+    assert LMSActivity.query.filter(LMSActivity.activity_timestamp < cutoff).count() == 0
+    assert LMSActivity.query.count() == 170 - stats['activities']
+    assert db.session.query(db.func.sum(LMSActivityDaily.activity_count)).scalar() == stats['activities']
+
+    with gzip.open(stats['archive'], 'rt', encoding='utf-8') as archive:
+        archived = [json.loads(line) for line in archive]
+    assert len(archived) == stats['activities']
+    assert len({row['activity_id'] for row in archived}) == stats['activities']
+
+    after = _features(enrollment.enrollment_id, as_of_dates)
+    for as_of, expected, actual in zip(as_of_dates, before, after):
+        np.testing.assert_allclose(actual, expected, err_msg=f'as of {as_of}')
+
+
+def test_compaction_is_bounded_by_max_batches(db, make_enrollment, tmp_path):
+    rng = random.Random(4)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    enrollment = make_enrollment(term_start=(today - timedelta(days=120)).date())
+    _add_activities(db, enrollment, rng, today - timedelta(days=100), 50, 40)
+
+    stats = lms_retention_service.compact(retention_days=RETENTION_DAYS, batch_size=10,
+                                          max_batches=2, archive_dir=str(tmp_path))
+    assert stats['batches'] == 2
+    assert stats['activities'] == 20
+    assert LMSActivity.query.count() == 20
+
+    # The next run picks up where this one stopped
+    stats = lms_retention_service.compact(retention_days=RETENTION_DAYS, batch_size=10,
+                                          max_batches=10, archive_dir=str(tmp_path))
+    assert stats['activities'] == 20
+    assert LMSActivity.query.count() == 0
+
+
+def test_retention_below_minimum_is_raised(db, make_enrollment, tmp_path):
+    rng = random.Random(5)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    enrollment = make_enrollment(term_start=(today - timedelta(days=30)).date())
+    _add_activities(db, enrollment, rng, today - timedelta(days=5), 5, 10)
+
+    stats = lms_retention_service.compact(retention_days=1, archive_dir=str(tmp_path))
+    assert stats['activities'] == 0
+    assert stats['archive'] is None
+    assert LMSActivity.query.count() == 10
@@ -0,0 +1,146 @@
+import io
+import logging
+import time
+import types
+
+import pytest
+from flask import Flask
+
+from backend.utils import logger as log_module
+from backend.utils.logger import RateLimitFilter, setup_app_logging, _pipeline, _TargetQueueHandler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(log_module, 'time', types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def _record(name='backend.services.x', level=logging.INFO, lineno=10, msg='scored %s', args=(1,)):
+    return logging.LogRecord(name, level, '/app/backend/services/x.py', lineno, msg, args, None)
+
+
+def _passed(limiter, count, **kwargs):
+    return sum(limiter.filter(_record(**kwargs)) for _ in range(count))
+
+
+def test_burst_then_suppress(clock):
+    limiter = RateLimitFilter({'backend': 2})
+    assert _passed(limiter, 10) == 2
+
+    clock.now += 0.5  # one token back at 2/s
+    assert _passed(limiter, 10) == 1
+
+    clock.now += 60  # refills only up to the burst
+    assert _passed(limiter, 10) == 2
+
+
+def test_fractional_rate_allows_one_record(clock):
+    limiter = RateLimitFilter({'backend': 0.1})
+    assert _passed(limiter, 5) == 1
+    clock.now += 5
+    assert _passed(limiter, 5) == 0
+    clock.now += 5
+    assert _passed(limiter, 5) == 1
+
+
+def test_each_call_site_has_its_own_bucket(clock):
+    limiter = RateLimitFilter({'backend': 1})
+    assert _passed(limiter, 3, lineno=10) == 1
+    assert _passed(limiter, 3, lineno=20) == 1
+    assert _passed(limiter, 3, name='backend.services.y') == 1
+
+
+def test_warnings_always_pass(clock):
+    limiter = RateLimitFilter({'': 1})
+    assert _passed(limiter, 5, level=logging.WARNING) == 5
+    assert _passed(limiter, 5, level=logging.ERROR) == 5
+    assert _passed(limiter, 5, level=logging.DEBUG) == 1
+
+
+def test_most_specific_prefix_wins(clock):
+    limiter = RateLimitFilter({'': 1, 'backend': 2, 'backend.services.x': 5})
+    assert _passed(limiter, 10, name='backend.services.x') == 5
+    assert _passed(limiter, 10, name='backend.services.xy') == 2  # not a child of backend.services.x
+    assert _passed(limiter, 10, name='backend') == 2
+    assert _passed(limiter, 10, name='werkzeug') == 1
+
+
+def test_unmatched_loggers_are_not_limited(clock):
+    limiter = RateLimitFilter({'backend': 1})
+    assert _passed(limiter, 10, name='werkzeug') == 10
+    assert _passed(limiter, 10, name='backendx') == 10
+
+
+def test_next_record_reports_suppressed_count(clock):
+    limiter = RateLimitFilter({'backend': 1})
+    first = _record()
+    assert limiter.filter(first)
+    assert first.getMessage() == 'scored 1'
+    assert _passed(limiter, 3) == 0
+
+    clock.now += 1
+    record = _record(args=(5,))
+    assert limiter.filter(record)
+    assert record.getMessage() == 'scored 5 [3 similar messages suppressed]'
+
+    clock.now += 1
+    record = _record(args=(6,))
+    assert limiter.filter(record)
+    assert record.getMessage() == 'scored 6'
+
+
+@pytest.fixture
+def logging_app(monkeypatch, tmp_path):
+    """A bare app for setup_app_logging, leaving the global pipeline as it was"""
+    monkeypatch.chdir(tmp_path)
+    for key, value in log_module.LOG_SETTINGS.items():
+        monkeypatch.setitem(log_module.LOG_SETTINGS, key, value)
+    targets = _pipeline.dispatcher.targets
+    for name in ('', 'app', 'auth', 'db', 'prediction'):
+        if name in targets:
+            monkeypatch.setitem(targets, name, list(targets[name]))
+
+    root = logging.getLogger()
+    monkeypatch.setattr(root, 'handlers', [])
+    level = root.level
+    yield Flask(__name__)
+    root.setLevel(level)
+
+
+def _wait_for(stream, text):
+    deadline = time.monotonic() + 5
+    while text not in stream.getvalue() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return stream.getvalue()
+
+
+def test_root_handlers_keep_their_level_and_format(logging_app):
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter('%(levelname)s|%(name)s|%(message)s'))
+    handler.setLevel(logging.DEBUG)
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG)
+
+    logging_app.config.update(ENV='testing', LOG_ASYNC=True)
+    setup_app_logging(logging_app)
+    # Idempotent: a second call doesn't wrap the queue handler again
+    setup_app_logging(logging_app)
+
+    assert root.level == logging.DEBUG
+    assert len(root.handlers) == 1 and isinstance(root.handlers[0], _TargetQueueHandler)
+
+    logging.getLogger('backend.services.test_logging').debug('batch %d scored', 7)
+    output = _wait_for(stream, 'batch 7 scored')
+    assert 'DEBUG|backend.services.test_logging|batch 7 scored' in output
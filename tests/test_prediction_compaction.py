@@ -0,0 +1,146 @@
+import gzip
+import json
+import random
+from datetime import datetime, timedelta
+
+from backend.models import Prediction
+from backend.services.prediction_retention_service import PredictionRetentionService
+
+
+def _add_predictions(db, enrollment, rng, days, per_day=3):
+    """Predictions on each of the last `days` days, a few per day"""
+    now = datetime.now()
+    for day in range(days):
+        for _ in range(rng.randrange(1, per_day + 1)):
+            db.session.add(Prediction(
+                enrollment.enrollment_id,
+                now - timedelta(days=day, seconds=rng.randrange(1, 86400)),
+                rng.choice('ABCDF'), 0.8, 'low', 'v1'
+            ))
+    db.session.commit()
+
+
+def _expected_survivors(cutoff, since=None):
+    """Ids kept by thinning [since, cutoff) to the latest prediction per enrollment and ISO week"""
+    kept = {}
+    survivors = set()
+    for p in Prediction.query.order_by(Prediction.prediction_date.desc(), Prediction.prediction_id.desc()):
+        if p.prediction_date >= cutoff or (since is not None and p.prediction_date < since):
+            survivors.add(p.prediction_id)
+            continue
+        key = (p.enrollment_id,) + tuple(p.prediction_date.isocalendar()[:2])
+        if key not in kept:
+            kept[key] = p.prediction_id
+            survivors.add(p.prediction_id)
+    return survivors
+
+
+def _cutoff(retention_days):
+    """Monday on or before retention_days ago, as the service computes it"""
+    day = datetime.now().date() - timedelta(days=retention_days)
+    return datetime.combine(day - timedelta(days=day.weekday()), datetime.min.time())
+
+
+def _ids():
+    return {p.prediction_id for p in Prediction.query}
+
+
+def test_keeps_latest_prediction_per_week(db, make_enrollment, tmp_path):
+    rng = random.Random(49)
+    enrollments = [make_enrollment() for _ in range(3)]
+    for enrollment in enrollments:
+        _add_predictions(db, enrollment, rng, 120)
+    latest = {
+        e.enrollment_id: Prediction.query.filter_by(enrollment_id=e.enrollment_id).order_by(
+            Prediction.prediction_date.desc()).first().prediction_id
+        for e in enrollments
+    }
+    before = _ids()
+    cutoff = _cutoff(30)
+    expected = _expected_survivors(cutoff)
+
+    stats = PredictionRetentionService.compact(retention_days=30, batch_size=25, archive_dir=str(tmp_path))
+    assert stats['cutoff'] == cutoff.isoformat()
+    assert stats['since'] is None
+
+    db.session.expire_all()
+    assert _ids() == expected
+    assert stats['predictions'] == len(before) - len(expected)
+    assert stats['enrollments'] == 3
+    assert set(latest.values()) <= expected
+
+    # Every recent prediction survives
+    recent = {pid for pid, in db.session.query(Prediction.prediction_id).filter(Prediction.prediction_date >= cutoff)}
+    assert recent and recent <= expected
+
+    with gzip.open(stats['archive'], 'rt', encoding='utf-8') as archive:
+        archived = {json.loads(line)['prediction_id'] for line in archive}
+    assert archived == before - expected
+
+    assert PredictionRetentionService.get_watermark() == cutoff
+    assert PredictionRetentionService.get_status()['compacted_through'] == cutoff
+
+
+def test_next_run_only_reads_since_the_watermark(db, make_enrollment, tmp_path):
+    rng = random.Random(50)
+    enrollment = make_enrollment()
+    _add_predictions(db, enrollment, rng, 120)
+
+    first = PredictionRetentionService.compact(retention_days=60, archive_dir=str(tmp_path))
+    watermark = datetime.fromisoformat(first['cutoff'])
+    assert PredictionRetentionService.get_watermark() == watermark
+
+    # Same cutoff: nothing to do
+    again = PredictionRetentionService.compact(retention_days=60, archive_dir=str(tmp_path))
+    assert again['predictions'] == 0 and again['archive'] is None
+
+    # A duplicate behind the watermark is outside the window and left alone
+    old = Prediction.query.filter(Prediction.prediction_date < watermark).first()
+    db.session.add(Prediction(enrollment.enrollment_id, old.prediction_date - timedelta(seconds=1),
+                              'C', 0.5, 'medium', 'v1'))
+    db.session.commit()
+    behind = {pid for pid, in db.session.query(Prediction.prediction_id).filter(
+        Prediction.prediction_date < watermark)}
+    cutoff = _cutoff(30)
+    expected = _expected_survivors(cutoff, since=watermark)
+
+    later = PredictionRetentionService.compact(retention_days=30, archive_dir=str(tmp_path))
+    assert later['since'] == watermark.isoformat()
+    assert later['cutoff'] == cutoff.isoformat()
+
+    db.session.expire_all()
+    assert _ids() == expected
+    assert behind <= expected
+    assert PredictionRetentionService.get_watermark() == cutoff
+
+
+def test_run_out_of_budget_keeps_the_watermark(db, make_enrollment, tmp_path):
+    rng = random.Random(51)
+    enrollment = make_enrollment()
+    _add_predictions(db, enrollment, rng, 80)
+    cutoff = _cutoff(30)
+    expected = _expected_survivors(cutoff)
+
+    partial = PredictionRetentionService.compact(retention_days=30, batch_size=5, max_batches=2,
+                                                 archive_dir=str(tmp_path))
+    assert partial['batches'] == 2
+    assert partial['predictions'] == 10
+    assert PredictionRetentionService.get_watermark() is None
+
+    # The next run rescans the whole window and finishes
+    rest = PredictionRetentionService.compact(retention_days=30, batch_size=5, max_batches=100,
+                                              archive_dir=str(tmp_path))
+    assert PredictionRetentionService.get_watermark() == cutoff
+    db.session.expire_all()
+    assert _ids() == expected
+
+
+def test_retention_below_minimum_is_raised(db, make_enrollment, tmp_path):
+    rng = random.Random(52)
+    enrollment = make_enrollment()
+    _add_predictions(db, enrollment, rng, 10)
+    count = Prediction.query.count()
+
+    stats = PredictionRetentionService.compact(retention_days=1, archive_dir=str(tmp_path))
+    assert stats['predictions'] == 0
+    assert Prediction.query.count() == count
@@ -0,0 +1,118 @@
+import pytest
+
+from backend.models import SystemConfig, AuditLog
+from backend.services.system_config_service import (
+    SystemConfigService, SETTINGS, VERSION_KEY, _parse
+)
+
+
+@pytest.fixture
+def service(db):
+    return SystemConfigService()
+
+
+@pytest.mark.parametrize('key, value, expected', [
+    ('attendance_threshold', '75', 75),
+    ('attendance_threshold', 80, 80),
+    ('model_version', 2, '2'),
+    ('alert_email_enabled', 'true', True),
+    ('alert_email_enabled', ' Yes ', True),
+    ('alert_email_enabled', 'on', True),
+    ('alert_email_enabled', '1', True),
+    ('alert_email_enabled', 'false', False),
+    ('alert_email_enabled', '0', False),
+    ('alert_email_enabled', False, False),
+    ('unregistered_key', 42, '42'),
+    ('attendance_threshold', None, None),
+])
+def test_parse_coerces_to_setting_type(key, value, expected):
+    assert _parse(key, value) == expected
+
+
+def test_parse_rejects_bad_numbers():
+    with pytest.raises(ValueError):
+        _parse('attendance_threshold', 'seventy')
+
+
+def test_defaults_when_unset(service):
+    assert service.get('attendance_threshold') == 70
+    assert service.get('maintenance_mode') is False
+    assert service.get('not_a_setting') is None
+    assert service.get('not_a_setting', 'fallback') == 'fallback'
+    assert service.get_all() == {key: setting[1] for key, setting in SETTINGS.items()}
+
+
+def test_stored_values_are_typed(db, service):
+    db.session.add_all([
+        SystemConfig('attendance_threshold', '65', ''),
+        SystemConfig('maintenance_mode', 'true', ''),
+    ])
+    db.session.commit()
+    assert service.get('attendance_threshold') == 65
+    assert service.get('maintenance_mode') is True
+
+
+def test_update_bumps_version_and_audits(db, service):
+    assert service.version == 0
+
+    values = service.update({'attendance_threshold': '60', 'maintenance_mode': 'on'}, user_id=None)
+    assert values['attendance_threshold'] == 60
+    assert values['maintenance_mode'] is True
+    assert service.version == 1
+    assert db.session.query(SystemConfig.config_value).filter_by(config_key='maintenance_mode').scalar() == 'true'
+
+    service.update({'attendance_threshold': 55})
+    assert service.version == 2
+
+    logs = AuditLog.query.filter_by(action='update_system_config').order_by(AuditLog.log_id).all()
+    assert len(logs) == 2
+    assert logs[0].old_values == {'attendance_threshold': None, 'maintenance_mode': None}
+    assert logs[1].old_values == {'attendance_threshold': '60'}
+    assert logs[1].new_values == {'attendance_threshold': 55}
+
+
+@pytest.mark.parametrize('values', [
+    {'no_such_setting': 1},
+    {'attendance_threshold': 'seventy'},
+])
+def test_invalid_update_changes_nothing(db, service, values):
+    with pytest.raises(ValueError):
+        service.update(values)
+    assert SystemConfig.query.count() == 0
+    assert AuditLog.query.count() == 0
+
+
+def test_other_workers_see_writes_after_the_check_interval(app, db, monkeypatch):
+    writer, reader = SystemConfigService(), SystemConfigService()
+    monkeypatch.setitem(app.config, 'SYSTEM_CONFIG_CHECK_INTERVAL', 3600)
+    assert reader.get('attendance_threshold') == 70
+
+    writer.update({'attendance_threshold': 40})
+    assert writer.get('attendance_threshold') == 40
+    # Within the interval the reader serves its cached copy
+    assert reader.get('attendance_threshold') == 70
+
+    monkeypatch.setitem(app.config, 'SYSTEM_CONFIG_CHECK_INTERVAL', 0)
+    assert reader.get('attendance_threshold') == 40
+    assert reader.version == writer.version
+
+
+def test_invalidate_forces_reload(app, db, monkeypatch, service):
+    monkeypatch.setitem(app.config, 'SYSTEM_CONFIG_CHECK_INTERVAL', 3600)
+    assert service.get('session_timeout') == 3600
+
+    SystemConfigService().update({'session_timeout': 600})
+    assert service.get('session_timeout') == 3600
+    service.invalidate()
+    assert service.get('session_timeout') == 600
+
+
+def test_state_rows_are_not_settings(db, service):
+    db.session.add(SystemConfig('prediction_compacted_through', '2024-01-01T00:00:00', ''))
+    db.session.commit()
+    service.update({'attendance_threshold': 50})
+
+    values = service.get_all()
+    assert VERSION_KEY not in values
+    assert 'prediction_compacted_through' not in values
+    assert service.get('prediction_compacted_through') is None
@@ -0,0 +1,46 @@
+"""Background job worker entry point.
+
+Run alongside the web servers, e.g.:
+    python worker.py --concurrency 4
+"""
+import os
+import argparse
+import logging
+from backend.app import create_app
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the background job worker')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='Number of jobs to run in parallel (default: JOB_WORKER_CONCURRENCY)')
+    parser.add_argument('--job-types', default=None,
+                        help='Comma-separated job types to process (default: all)')
+    parser.add_argument('--no-scheduler', action='store_true',
+                        help='Do not take part in cron scheduling')
+    args = parser.parse_args()
+
+    app = create_app(os.environ.get('FLASK_CONFIG', 'development'))
+
+    # Register task functions
+    import backend.tasks.jobs  # noqa: F401
+    from backend.tasks.worker import Worker
+
+    if app.config.get('MODEL_WARMUP'):
+        from backend.services.model_service import ModelService
+        ModelService().warmup()
+
+    worker = Worker(
+        app,
+        concurrency=args.concurrency,
+        job_types=args.job_types.split(',') if args.job_types else None,
+        run_scheduler=not args.no_scheduler
+    )
+    worker.run()
+
+
+if __name__ == '__main__':
+    main()